@@ -0,0 +1,192 @@
+import time
+import asyncio
+import logging
+from collections import defaultdict
+
+from discord_webhook import AsyncDiscordWebhook, DiscordEmbed
+
+
+MAX_EMBEDS = 10  # discord's per-message limit
+
+
+class _Alert:
+    __slots__ = ('webhook_url', 'embed', 'content')
+
+    def __init__(self, webhook_url, embed, content):
+        self.webhook_url = webhook_url
+        self.embed = embed
+        self.content = content
+
+
+class AlertDispatcher:
+    """
+    Gets discord webhook posts off the websocket hot path.
+
+    Handlers call ``submit()``, which never awaits: alerts go on a bounded
+    queue and the call returns False (the alert is counted as dropped) when
+    the queue is full. A collector groups alerts per webhook for ``window``
+    seconds and hands them to ``workers`` senders as multi-embed posts (at
+    most ``max_posts`` per window). Each webhook posts one message at a time
+    and waits out discord's rate-limit headers. Alerts beyond that, plus
+    anything dropped, are folded into a summary embed instead of queueing up
+    behind the limit.
+
+    >>> alert_dispatcher.submit(os.environ.get('total_volume'), embed, content='<@375862240601047070>')
+    """
+    def __init__(self, maxsize: int = 2000, workers: int = 4, window: float = 0.75, max_pending: int = 40, max_posts: int = 3):
+        self.maxsize = maxsize
+        self.workers = workers
+        self.window = window
+        self.max_pending = max_pending
+        self.max_posts = max_posts
+        self.queue = None
+        self.batches = None
+        self._pending = defaultdict(list)
+        self._dropped = defaultdict(int)
+        self._blocked_until = defaultdict(float)
+        self._hook_locks = defaultdict(asyncio.Lock)
+        self._tasks = []
+        self._loop = None
+        self.submitted = 0
+        self.dropped = 0
+        self.summarized = 0
+        self.posts = 0
+        self.embeds_sent = 0
+        self.rate_limited = 0
+        self.failed = 0
+
+    def _ensure_started(self):
+        loop = asyncio.get_running_loop()
+        if self._loop is loop:
+            return
+        self._loop = loop
+        self.queue = asyncio.Queue(maxsize=self.maxsize)
+        self.batches = asyncio.Queue()
+        self._hook_locks = defaultdict(asyncio.Lock)
+        self._tasks = [loop.create_task(self._collect())]
+        self._tasks += [loop.create_task(self._send_loop()) for _ in range(self.workers)]
+
+    def submit(self, webhook_url: str, embed: DiscordEmbed, content: str = None) -> bool:
+        """Queue an alert without waiting; False if it was dropped under load."""
+        if not webhook_url:
+            return False
+        self._ensure_started()
+        try:
+            self.queue.put_nowait(_Alert(webhook_url, embed, content))
+        except asyncio.QueueFull:
+            self.dropped += 1
+            self._dropped[webhook_url] += 1
+            return False
+        self.submitted += 1
+        return True
+
+    async def _collect(self):
+        while True:
+            alert = await self.queue.get()
+            pending = self._pending[alert.webhook_url]
+            pending.append(alert)
+            if len(pending) == 1:
+                self._loop.call_later(self.window, self._flush, alert.webhook_url)
+            elif len(pending) >= self.max_pending:
+                self._flush(alert.webhook_url)
+
+    def _flush(self, webhook_url):
+        pending = self._pending.pop(webhook_url, None)
+        if pending:
+            self.batches.put_nowait((webhook_url, pending))
+
+    def _summary(self, overflow, dropped):
+        embed = DiscordEmbed(title='Alert overflow', color='808080')
+        lines = []
+        if overflow:
+            titles = [getattr(alert.embed, 'title', None) or 'alert' for alert in overflow]
+            shown = '\n'.join(f'> {t}' for t in titles[:15])
+            more = f'\n> ... and {len(titles) - 15} more' if len(titles) > 15 else ''
+            lines.append(f'**{len(overflow)}** more alerts in this window:\n{shown}{more}')
+        if dropped:
+            lines.append(f'**{dropped}** alerts dropped while the feed was overloaded.')
+        embed.set_description('\n'.join(lines)[:4000])
+        embed.set_timestamp()
+        return embed
+
+    def _compose(self, webhook_url, alerts):
+        """Split a batch into posts of up to MAX_EMBEDS; past ``max_posts`` the rest (and any drops) get summarized."""
+        dropped = self._dropped.pop(webhook_url, 0)
+        capacity = MAX_EMBEDS * self.max_posts
+        if len(alerts) > capacity or dropped:
+            keep, overflow = alerts[:capacity - 1], alerts[capacity - 1:]
+            self.summarized += len(overflow)
+        else:
+            keep, overflow = alerts, []
+        embeds = [alert.embed for alert in keep]
+        if overflow or dropped:
+            embeds.append(self._summary(overflow, dropped))
+        content = next((alert.content for alert in alerts if alert.content), None)
+        # the mention only goes out with the first post
+        return [(content if i == 0 else None, embeds[i:i + MAX_EMBEDS]) for i in range(0, len(embeds), MAX_EMBEDS)]
+
+    def _rate_limit(self, webhook_url, response):
+        headers = response.headers
+        now = time.monotonic()
+        if response.status_code == 429:
+            self.rate_limited += 1
+            retry_after = headers.get('Retry-After')
+            try:
+                retry_after = float(retry_after) if retry_after else float(response.json().get('retry_after', 1))
+            except Exception:
+                retry_after = 1.0
+            self._blocked_until[webhook_url] = now + retry_after
+            return True
+        if headers.get('X-RateLimit-Remaining') == '0':
+            try:
+                self._blocked_until[webhook_url] = now + float(headers.get('X-RateLimit-Reset-After', 1))
+            except ValueError:
+                self._blocked_until[webhook_url] = now + 1.0
+        return False
+
+    async def _post(self, webhook_url, content, embeds):
+        for _ in range(3):
+            wait = self._blocked_until[webhook_url] - time.monotonic()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            hook = AsyncDiscordWebhook(webhook_url, content=content, rate_limit_retry=False)
+            for embed in embeds:
+                hook.add_embed(embed)
+            response = await hook.execute()
+            if not self._rate_limit(webhook_url, response):
+                return response
+        return response
+
+    async def _send_loop(self):
+        while True:
+            webhook_url, alerts = await self.batches.get()
+            async with self._hook_locks[webhook_url]:
+                # anything that piled up while this webhook was busy rides along
+                alerts += self._pending.pop(webhook_url, [])
+                for content, embeds in self._compose(webhook_url, alerts):
+                    try:
+                        response = await self._post(webhook_url, content, embeds)
+                        if response.status_code >= 400:
+                            self.failed += 1
+                        else:
+                            self.posts += 1
+                            self.embeds_sent += len(embeds)
+                    except Exception as e:
+                        self.failed += 1
+                        logging.error(f"Webhook post failed: {e}")
+
+    def stats(self) -> dict:
+        return {
+            'submitted': self.submitted,
+            'dropped': self.dropped,
+            'summarized': self.summarized,
+            'posts': self.posts,
+            'embeds_sent': self.embeds_sent,
+            'rate_limited': self.rate_limited,
+            'failed': self.failed,
+            'queued': self.queue.qsize() if self.queue is not None else 0,
+            'pending_batches': self.batches.qsize() if self.batches is not None else 0,
+        }
+
+
+alert_dispatcher = AlertDispatcher()
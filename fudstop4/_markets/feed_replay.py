@@ -0,0 +1,278 @@
+import os
+import gzip
+import json
+import time
+import asyncio
+import inspect
+import logging
+
+import numpy as np
+from aiohttp import web, WSMsgType
+from polygon.websocket import WebSocketClient
+from polygon.websocket.models import parse, Market
+
+from fudstop4.apis._asyncpg.materialized_screen import LatencyStats
+
+logger = logging.getLogger(__name__)
+
+
+def read_frames(path: str):
+    """Yield ``(offset_ns, raw_frame)`` from a recording."""
+    with gzip.open(path, 'rt', encoding='utf-8') as f:
+        for line in f:
+            offset, _, frame = line.rstrip('\n').partition('\t')
+            yield int(offset), frame
+
+
+def write_frames(path: str, frames):
+    """Write ``(offset_ns, raw_frame)`` pairs - handy for synthetic recordings."""
+    with gzip.open(path, 'wt', encoding='utf-8', compresslevel=6) as f:
+        for offset, frame in frames:
+            f.write(f"{int(offset)}\t{frame.replace(chr(10), '')}\n")
+
+
+async def _drive(result):
+    """Handlers are coroutines (handle_option_msg) or async generators (MarketDBManager inserts)."""
+    if inspect.isasyncgen(result):
+        async for _ in result:
+            pass
+    elif inspect.isawaitable(result):
+        await result
+
+
+def _depth(queue):
+    if queue is None:
+        return None
+    return queue.qsize() if hasattr(queue, 'qsize') else len(queue)
+
+
+class FeedRecorder:
+    """
+    Captures raw polygon websocket frames, with arrival time, to a gzip file
+    (one ``<offset_ns>\\t<json frame>`` line per frame).
+
+    >>> recorder = FeedRecorder('open_bell.feed.gz')
+    >>> await recorder.record(Market.Options, ['T.*', 'A.*'], duration=600, forward=handle_option_msg, forward_args=(queue,))
+    """
+    def __init__(self, path: str):
+        self.path = path
+        self.frames = 0
+        self.bytes = 0
+        self._file = None
+        self._start = None
+
+    def open(self):
+        self._file = gzip.open(self.path, 'wt', encoding='utf-8', compresslevel=6)
+        self._start = time.perf_counter_ns()
+        return self
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def write(self, frame):
+        if isinstance(frame, bytes):
+            frame = frame.decode('utf-8')
+        self._file.write(f"{time.perf_counter_ns() - self._start}\t{frame.replace(chr(10), '')}\n")
+        self.frames += 1
+        self.bytes += len(frame)
+
+    async def record(self, market, subscriptions: list, duration: float = None, api_key: str = None,
+                     forward=None, forward_args: tuple = ()):
+        """Record the live feed for ``duration`` seconds (forever if None), optionally still feeding ``forward``."""
+        market = Market(market)
+        client = WebSocketClient(api_key=api_key or os.environ.get('YOUR_POLYGON_KEY'), market=market,
+                                 subscriptions=subscriptions, raw=True)
+
+        async def processor(frame):
+            self.write(frame)
+            if forward is not None:
+                msgs = parse(json.loads(frame), logger, market)
+                if msgs:
+                    await _drive(forward(msgs, *forward_args))
+
+        self.open()
+        try:
+            await asyncio.wait_for(client.connect(processor), duration)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            await client.close()
+            self.close()
+        return {'path': self.path, 'frames': self.frames, 'bytes': self.bytes}
+
+
+class FeedReplayer:
+    """
+    Drives existing handlers from a recording at 1x, Nx or max speed
+    (``speed=None``) and measures them.
+
+    Stages timed per frame: ``parse`` (json -> polygon models), ``handler``
+    (the awaited handler call) and ``lag`` (how late the frame went out
+    versus the recording's schedule - non-zero lag at 1x means the handler
+    can't keep up with the live feed). Pass the handler's queue to sample
+    its depth.
+
+    >>> ring = MessageRing()
+    >>> await FeedReplayer('open_bell.feed.gz', Market.Stocks).run(handle_stock_msg, speed=10, args=(ring,), queue=ring)
+    """
+    def __init__(self, path: str, market=Market.Stocks):
+        self.path = path
+        self.market = Market(market)
+
+    def _reset(self):
+        self.stages = {name: LatencyStats(window=100000) for name in ('parse', 'handler', 'lag')}
+        self.depths = []
+        self.frames = 0
+        self.messages = 0
+        self.errors = 0
+
+    async def _handle(self, handler, msgs, args, per_message):
+        started = time.perf_counter()
+        try:
+            if per_message:
+                for m in msgs:
+                    await _drive(handler(m, *args))
+            else:
+                await _drive(handler(msgs, *args))
+        except Exception as e:
+            self.errors += 1
+            logger.error(f"Handler failed during replay: {e}")
+        self.stages['handler'].record(time.perf_counter() - started)
+
+    async def run(self, handler, speed: float = 1.0, args: tuple = (), per_message: bool = False,
+                  queue=None, limit: int = None) -> dict:
+        """Replay straight into ``handler(msgs, *args)`` (or ``handler(m, *args)`` with ``per_message``)."""
+        self._reset()
+        loop_start = time.perf_counter()
+        for offset, frame in read_frames(self.path):
+            if limit is not None and self.frames >= limit:
+                break
+            if speed:
+                due = loop_start + offset / 1e9 / speed
+                wait = due - time.perf_counter()
+                if wait > 0:
+                    await asyncio.sleep(wait)
+                self.stages['lag'].record(max(0.0, time.perf_counter() - due))
+            started = time.perf_counter()
+            msgs = [m for m in parse(json.loads(frame), logger, self.market) if m is not None]
+            self.stages['parse'].record(time.perf_counter() - started)
+            self.frames += 1
+            self.messages += len(msgs)
+            if msgs:
+                await self._handle(handler, msgs, args, per_message)
+            if queue is not None:
+                self.depths.append(_depth(queue))
+            if not speed:
+                await asyncio.sleep(0)  # let consumers run between frames, as they would on the socket
+        return self.report(time.perf_counter() - loop_start, speed)
+
+    async def run_via_server(self, handler, speed: float = 1.0, args: tuple = (), per_message: bool = False,
+                             queue=None) -> dict:
+        """Replay through a local StubFeedServer and the real polygon WebSocketClient."""
+        self._reset()
+        async with StubFeedServer(self.path, speed=speed) as server:
+            client = WebSocketClient(api_key='replay', feed=server.feed, market=self.market, secure=False,
+                                     subscriptions=['*'], max_reconnects=0)
+
+            async def processor(msgs):
+                self.frames += 1
+                self.messages += len(msgs)
+                await self._handle(handler, msgs, args, per_message)
+                if queue is not None:
+                    self.depths.append(_depth(queue))
+
+            loop_start = time.perf_counter()
+            await client.connect(processor)
+            elapsed = time.perf_counter() - loop_start
+            for lag in server.lags:
+                self.stages['lag'].record(lag)
+        return self.report(elapsed, speed)
+
+    def report(self, elapsed: float, speed) -> dict:
+        depths = np.array([d for d in self.depths if d is not None], dtype=float)
+        return {
+            'path': self.path,
+            'speed': speed or 'max',
+            'frames': self.frames,
+            'messages': self.messages,
+            'errors': self.errors,
+            'elapsed': round(elapsed, 4),
+            'msgs_per_sec': round(self.messages / elapsed, 1) if elapsed else None,
+            'frames_per_sec': round(self.frames / elapsed, 1) if elapsed else None,
+            'stages': {name: stats.summary() for name, stats in self.stages.items() if stats.count},
+            'queue_depth': {
+                'max': int(depths.max()),
+                'mean': round(float(depths.mean()), 1),
+                'p95': round(float(np.percentile(depths, 95)), 1),
+            } if depths.size else None,
+        }
+
+
+class StubFeedServer:
+    """
+    Local websocket server speaking enough of polygon's protocol (connected /
+    auth / subscribe status frames) to stream a recording to a real client.
+    The socket closes when the recording ends.
+    """
+    def __init__(self, path: str, speed: float = 1.0, host: str = '127.0.0.1', port: int = 0):
+        self.path = path
+        self.speed = speed
+        self.host = host
+        self.port = port
+        self.lags = []
+        self._runner = None
+
+    @property
+    def feed(self):
+        return f"{self.host}:{self.port}"
+
+    async def _stream(self, request):
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        await ws.send_str(json.dumps([{'ev': 'status', 'status': 'connected', 'message': 'Connected Successfully'}]))
+        subscribed = False
+        async for msg in ws:
+            if msg.type != WSMsgType.TEXT:
+                break
+            action = json.loads(msg.data).get('action')
+            if action == 'auth':
+                await ws.send_str(json.dumps([{'ev': 'status', 'status': 'auth_success', 'message': 'authenticated'}]))
+            elif action == 'subscribe' and not subscribed:
+                subscribed = True
+                await ws.send_str(json.dumps([{'ev': 'status', 'status': 'success', 'message': 'subscribed'}]))
+                break
+        if subscribed:
+            start = time.perf_counter()
+            for offset, frame in read_frames(self.path):
+                if self.speed:
+                    due = start + offset / 1e9 / self.speed
+                    wait = due - time.perf_counter()
+                    if wait > 0:
+                        await asyncio.sleep(wait)
+                    self.lags.append(max(0.0, time.perf_counter() - due))
+                await ws.send_str(frame)
+        await ws.close()
+        return ws
+
+    async def start(self):
+        app = web.Application()
+        app.router.add_get('/{market}', self._stream)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        self.port = site._server.sockets[0].getsockname()[1]
+        return self
+
+    async def stop(self):
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def __aenter__(self):
+        return await self.start()
+
+    async def __aexit__(self, *exc):
+        await self.stop()
@@ -21,6 +21,8 @@ import random
 import asyncio
 from pytz import timezone
 from fudstop4.apis.polygonio.polygon_options import PolygonOptions
+from fudstop4._markets.alert_dispatcher import alert_dispatcher
+from fudstop4._markets.tick_store import tick_store
 db = PolygonOptions(database='fudstop3')
 from market_handlers.list_sets import indices_names_and_symbols_dict
 from _markets.list_sets.dicts import hex_color_dict
@@ -39,7 +41,7 @@ all_forex_pairs = {v: k for k, v in all_forex_pairs.items()}
 aware_datetime = utc.localize(datetime.utcnow())
 from .list_sets import crypto_conditions_dict, crypto_exchanges
 class MarketDBManager(PolygonOptions):
-    def __init__(self, host, port, user, password, database, **kwargs):
+    def __init__(self, host, port, user, password, database, ticks_to_postgres: bool = True, **kwargs):
         self.host=host
         self.port=port
         self.user=user
@@ -81,6 +83,8 @@ class MarketDBManager(PolygonOptions):
         ]
 
         self.colors = hex_color_dict
+        # raw trades always land in the local tick store; set False to keep them out of postgres
+        self.ticks_to_postgres = ticks_to_postgres
         super().__init__(host=host,port=port,database=database,password=password,user=user,**kwargs)
 
 
@@ -99,11 +103,11 @@ class MarketDBManager(PolygonOptions):
         }
 
 
-        df = pd.DataFrame(data)
+        tick_store.append('stock_trades', m.symbol, m.timestamp, data)
 
-
-
-        await self.batch_insert_dataframe(df, table_name='stock_trades', unique_columns='insertion_timestamp')
+        if self.ticks_to_postgres:
+            df = pd.DataFrame(data)
+            await self.batch_insert_dataframe(df, table_name='stock_trades', unique_columns='insertion_timestamp')
         yield data
 
 
@@ -251,8 +255,11 @@ class MarketDBManager(PolygonOptions):
 
  
 
-        df = pd.DataFrame(trade_message_data, index=[0])
-        await self.batch_insert_dataframe(df, table_name='option_trades', unique_columns='insertion_timestamp')
+        tick_store.append('option_trades', underlying_symbol, m.timestamp, trade_message_data)
+
+        if self.ticks_to_postgres:
+            df = pd.DataFrame(trade_message_data, index=[0])
+            await self.batch_insert_dataframe(df, table_name='option_trades', unique_columns='insertion_timestamp')
         yield trade_message_data
 
 
@@ -329,7 +336,6 @@ class MarketDBManager(PolygonOptions):
 
 
         if volume > 500 and volume == total_volume:
-            hook = AsyncDiscordWebhook(os.environ.get('total_volume'), content=f"<@375862240601047070>")
             embed = DiscordEmbed(title=f'{ticker} {strike} {call_put} {expiry}', description=f'```py\nThis feed is returning tickers where the last trade for the contract == the total volume for that contract on the day.```', color=self.hex_colors['yellow'])
             embed.add_embed_field(name=f"Feed:", value=f"> **Volume == Total Volume**", inline=False)
             embed.add_embed_field(name=f"Day Stats:", value=f"> Open: **${official_open}**\n> Now: **${open}**\n> Price % Change: **{round(float(price_percent_change),2)}%**\n> Price Diff: **{price_diff}**\n> VWAP: **${day_vwap}**", inline=False)
@@ -337,9 +343,10 @@ class MarketDBManager(PolygonOptions):
             embed.add_embed_field(name=f"Volume:", value=f"> Trade: **{float(volume):,}**\n> Total: **{total_volume}**\n> Volume % Total: **{round(float(volume_percent_total),2)}%**\n> Volume to Price: **{round(float(volume_to_price),2)}%**")
             embed.set_timestamp()
             embed.set_footer(text=f'{sym} | {agg_timestamp}')
-            hook.add_embed(embed)
-            asyncio.create_task(hook.execute())
+            alert_dispatcher.submit(os.environ.get('total_volume'), embed, content=f"<@375862240601047070>")
+
 
+        tick_store.append('option_aggs', ticker, m.end_timestamp, agg_message_data)
 
         df = pd.DataFrame(agg_message_data, index=[0])
         await self.batch_insert_dataframe(df, table_name='option_aggs', unique_columns='insertion_timestamp')
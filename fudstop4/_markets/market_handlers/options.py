@@ -11,6 +11,7 @@ from datetime import datetime
 from math import isnan
 from datetime import timezone
 from .cfg import hex_colors
+from fudstop4._markets.alert_dispatcher import alert_dispatcher
 from apis.helpers import calculate_price_to_strike, get_human_readable_string
 
 from pytz import timezone
@@ -159,7 +160,6 @@ async def handle_option_msg(msgs: WebSocketMessage, data_queue: asyncio.Queue):
 
             await data_queue.put(agg_message_data)
             if volume > 500 and volume == total_volume:
-                hook = AsyncDiscordWebhook(os.environ.get('total_volume'), content=f"<@375862240601047070>")
                 embed = DiscordEmbed(title=f'{ticker} {strike} {call_put} {expiry}', description=f'```py\nThis feed is returning tickers where the last trade for the contract == the total volume for that contract on the day.```', color=hex_colors['yellow'])
                 embed.add_embed_field(name=f"Feed:", value=f"> **Volume == Total Volume**", inline=False)
                 embed.add_embed_field(name=f"Day Stats:", value=f"> Open: **${official_open}**\n> Now: **${open}**\n> Price % Change: **{round(float(price_percent_change),2)}%**\n> Price Diff: **{price_diff}**\n> VWAP: **${day_vwap}**", inline=False)
@@ -167,8 +167,7 @@ async def handle_option_msg(msgs: WebSocketMessage, data_queue: asyncio.Queue):
                 embed.add_embed_field(name=f"Volume:", value=f"> Trade: **{float(volume):,}**\n> Total: **{total_volume}**\n> Volume % Total: **{round(float(volume_percent_total),2)}%**\n> Volume to Price: **{round(float(volume_to_price),2)}%**")
                 embed.set_timestamp()
                 embed.set_footer(text=f'{sym} | {agg_timestamp}')
-                hook.add_embed(embed)
-                await hook.execute()
+                alert_dispatcher.submit(os.environ.get('total_volume'), embed, content=f"<@375862240601047070>")
                 # if db_manager is not None:
                     # asyncio.create_task(db_manager.save_structured_message(agg_message_data, "optionagg"))
 
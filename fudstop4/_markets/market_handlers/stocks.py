@@ -5,104 +5,92 @@ from datetime import datetime
 import asyncio
 
 from list_sets.ticker_lists import most_active_tickers
+from fudstop4._markets.ring_buffer import MessageRing
 
 
+MOST_ACTIVE_TICKERS = frozenset(most_active_tickers)
 
+# shared ring for the stock stream - consumers: `async for batch in stock_ring.batches(): ...`
+stock_ring = MessageRing(capacity=262144)
 
-batch_data_aggs = []
-batch_data_trades = []
-batch_data_quotes = []
-async def handle_stock_msg(msgs: List[WebSocketMessage], data_queue: asyncio.Queue, db=None):
+# messages a full asyncio.Queue (older callers) had to give up
+queue_dropped = 0
 
-    global batch_data_aggs, batch_data_trades, batch_data_quotes
 
-
-    for m in msgs:
-        if m.symbol in most_active_tickers:
-
-
-
-
-            if isinstance(m, EquityAgg):
-                data = {
-                    'type': 'EquityAgg',
-                    'ticker': m.symbol,
-                    'close_price': m.close,
-                    'high_price': m.high,
-                    'low_price': m.low,
-                    'open_price': m.open,
-                    'volume': m.volume,
-                    'official_open': m.official_open_price,
-                    'accumulated_volume': m.accumulated_volume,
-                    'vwap_price': m.vwap,
-                    'agg_timestamp': datetime.fromtimestamp(m.end_timestamp / 1000.0) if m.end_timestamp is not None else None
-                }
-
-
-                data = {
-                    'ticker': m.symbol,
-                    'close_price': m.close,
-                    'high_price': m.high,
-                    'low_price': m.low,
-                    'open_price': m.open,
-                    'volume': m.volume,
-                    'official_open': m.official_open_price,
-                    'accumulated_volume': m.accumulated_volume,
-                    'vwap_price': m.vwap,
-                    'agg_timestamp': datetime.fromtimestamp(m.end_timestamp / 1000.0) if m.end_timestamp is not None else None
-                }
-
-                asyncio.create_task(data_queue.put(data))
-                # if db is not None:
-                #     await db.save_structured_message(data, 'stock_aggs')
-                
-
-
-            elif isinstance(m, EquityTrade):
-
-                data = { 
-                    'type': 'EquityTrade',
-                    'ticker': m.symbol,
-                    'trade_exchange': STOCK_EXCHANGES.get(m.exchange),
-                    'trade_price': m.price,
-                    'trade_size': m.size,
-                    'trade_conditions': [stock_condition_dict.get(condition) for condition in m.conditions] if m.conditions is not None else [],
-                    'trade_timestamp': datetime.fromtimestamp(m.timestamp / 1000.0) if m.timestamp is not None else None
-                }
+def _queue_push(queue: asyncio.Queue):
+    """put_nowait with MessageRing's default overflow: a full queue loses its oldest message, not the batch."""
+    def push(item) -> bool:
+        global queue_dropped
+        try:
+            queue.put_nowait(item)
+            return True
+        except asyncio.QueueFull:
+            queue_dropped += 1
+            queue.get_nowait()
+            queue.task_done()
+            queue.put_nowait(item)
+            return False
+    return push
 
 
-                asyncio.create_task(data_queue.put(data))
-                # if db is not None:
-                #     await db.save_structured_message(data, 'equity_trades')
+async def handle_stock_msg(msgs: List[WebSocketMessage], data_queue=stock_ring, db=None, symbols: frozenset = MOST_ACTIVE_TICKERS):
+    """
+    Converts trades/quotes/aggs into dicts and pushes them onto ``data_queue``
+    (a MessageRing, or a plain asyncio.Queue for older callers) without
+    awaiting or spawning a task per message. ``symbols=None`` keeps every
+    ticker (full-market subscriptions).
+    """
+    push = data_queue.push if isinstance(data_queue, MessageRing) else _queue_push(data_queue)
 
+    for m in msgs:
+        if symbols is not None and m.symbol not in symbols:
+            continue
 
-            elif isinstance(m, EquityQuote):
-                timetamp = datetime.fromtimestamp(m.timestamp / 1000.0).strftime('%Y-%m-%d %H:%M:%S')
-                timestamp_obj = datetime.strptime(timetamp, '%Y-%m-%d %H:%M:%S')
-                data = {
+        if isinstance(m, EquityAgg):
+            push({
+                'type': 'EquityAgg',
+                'ticker': m.symbol,
+                'close_price': m.close,
+                'high_price': m.high,
+                'low_price': m.low,
+                'open_price': m.open,
+                'volume': m.volume,
+                'official_open': m.official_open_price,
+                'accumulated_volume': m.accumulated_volume,
+                'vwap_price': m.vwap,
+                'agg_timestamp': datetime.fromtimestamp(m.end_timestamp / 1000.0) if m.end_timestamp is not None else None
+            })
+            # if db is not None:
+            #     await db.save_structured_message(data, 'stock_aggs')
+
+        elif isinstance(m, EquityTrade):
+            push({
+                'type': 'EquityTrade',
+                'ticker': m.symbol,
+                'trade_exchange': STOCK_EXCHANGES.get(m.exchange),
+                'trade_price': m.price,
+                'trade_size': m.size,
+                'trade_conditions': [stock_condition_dict.get(condition) for condition in m.conditions] if m.conditions is not None else [],
+                'trade_timestamp': datetime.fromtimestamp(m.timestamp / 1000.0) if m.timestamp is not None else None
+            })
+            # if db is not None:
+            #     await db.save_structured_message(data, 'equity_trades')
+
+        elif isinstance(m, EquityQuote):
+            push({
                 'type': 'EquityQuote',
                 'ticker': m.symbol,
                 'ask': m.ask_price,
-                'bid':m.bid_price,
+                'bid': m.bid_price,
                 'ask_size': m.ask_size,
-                'bid_size':m.bid_size,
+                'bid_size': m.bid_size,
                 'indicator': [indicators.get(indicator) for indicator in m.indicators] if m.indicators is not None else [],
-                'condition':quote_conditions.get(m.condition),
-
-                
-                'ask_exchange':STOCK_EXCHANGES.get(m.ask_exchange_id),
-                'bid_exchange':STOCK_EXCHANGES.get(m.bid_exchange_id),
-                
-                'timestamp': timestamp_obj,
-                'tape': TAPES.get(m.tape)}
-                asyncio.create_task(data_queue.put(data))
-
-                # if db is not None:
-                #     await db.insert_equity_quote(data)
-
-
-
-
-
-
-
+                'condition': quote_conditions.get(m.condition),
+                'ask_exchange': STOCK_EXCHANGES.get(m.ask_exchange_id),
+                'bid_exchange': STOCK_EXCHANGES.get(m.bid_exchange_id),
+                # whole seconds, same as the old strftime/strptime round trip
+                'timestamp': datetime.fromtimestamp(m.timestamp // 1000),
+                'tape': TAPES.get(m.tape)
+            })
+            # if db is not None:
+            #     await db.insert_equity_quote(data)
@@ -0,0 +1,127 @@
+import time
+import asyncio
+
+
+DROP_OLDEST = 'drop_oldest'
+DROP_NEWEST = 'drop_newest'
+
+
+class MessageRing:
+    """
+    Fixed-size ring buffer between a websocket handler and its consumers.
+
+    ``push()`` is synchronous and never blocks the handler: when the ring is
+    full it either overwrites the oldest message (``drop_oldest`` - live feeds
+    care about the latest data) or rejects the new one (``drop_newest``), and
+    counts the drop. Consumers ``drain()`` everything available in one go.
+
+    >>> ring = MessageRing(capacity=65536)
+    >>> async for batch in ring.batches(max_items=2048):
+    ...     df = pd.DataFrame(batch)
+    """
+    def __init__(self, capacity: int = 65536, overflow: str = DROP_OLDEST):
+        if overflow not in (DROP_OLDEST, DROP_NEWEST):
+            raise ValueError(f"overflow must be {DROP_OLDEST!r} or {DROP_NEWEST!r}")
+        self.capacity = capacity
+        self.overflow = overflow
+        self._items = [None] * capacity
+        self._stamps = [0.0] * capacity
+        self._head = 0   # next slot to read
+        self._count = 0
+        self._ready = asyncio.Event()
+        self.pushed = 0
+        self.drained = 0
+        self.dropped = 0
+        self.high_water = 0
+        self.last_lag = 0.0
+        self.max_lag = 0.0
+        self.started = time.monotonic()
+
+    def __len__(self):
+        return self._count
+
+    def push(self, item) -> bool:
+        """Add ``item``; False if it (or the oldest message) had to be dropped."""
+        self.pushed += 1
+        capacity = self.capacity
+        if self._count == capacity:
+            self.dropped += 1
+            if self.overflow == DROP_NEWEST:
+                return False
+            # overwrite the oldest slot and move the read position past it
+            slot = self._head
+            self._head = (self._head + 1) % capacity
+            self._items[slot] = item
+            self._stamps[slot] = time.monotonic()
+            return False
+        slot = (self._head + self._count) % capacity
+        self._items[slot] = item
+        self._stamps[slot] = time.monotonic()
+        self._count += 1
+        if self._count > self.high_water:
+            self.high_water = self._count
+        if self._count == 1:
+            self._ready.set()
+        return True
+
+    def drain_nowait(self, max_items: int = None) -> list:
+        """Everything buffered (up to ``max_items``), oldest first."""
+        n = self._count if max_items is None else min(self._count, max_items)
+        if not n:
+            return []
+        capacity = self.capacity
+        head = self._head
+        lag = time.monotonic() - self._stamps[head]
+        self.last_lag = lag
+        if lag > self.max_lag:
+            self.max_lag = lag
+        end = head + n
+        if end <= capacity:
+            batch = self._items[head:end]
+            self._items[head:end] = [None] * n
+        else:
+            wrap = end - capacity
+            batch = self._items[head:] + self._items[:wrap]
+            self._items[head:] = [None] * (capacity - head)
+            self._items[:wrap] = [None] * wrap
+        self._head = end % capacity
+        self._count -= n
+        if not self._count:
+            self._ready.clear()
+        self.drained += n
+        return batch
+
+    async def drain(self, max_items: int = None, timeout: float = None) -> list:
+        """Wait for at least one message (or ``timeout``), then drain."""
+        if not self._count:
+            try:
+                await asyncio.wait_for(self._ready.wait(), timeout)
+            except asyncio.TimeoutError:
+                return []
+        return self.drain_nowait(max_items)
+
+    async def batches(self, max_items: int = 4096, linger: float = 0.0):
+        """Yield batches forever; ``linger`` waits a little so batches fill up."""
+        while True:
+            batch = await self.drain(max_items)
+            if linger and len(batch) < max_items:
+                await asyncio.sleep(linger)
+                batch += self.drain_nowait(max_items - len(batch))
+            if batch:
+                yield batch
+
+    def stats(self) -> dict:
+        elapsed = max(time.monotonic() - self.started, 1e-9)
+        return {
+            'capacity': self.capacity,
+            'depth': self._count,
+            'high_water': self.high_water,
+            'pushed': self.pushed,
+            'drained': self.drained,
+            'dropped': self.dropped,
+            'drop_rate': round(self.dropped / self.pushed, 6) if self.pushed else 0.0,
+            'in_per_sec': round(self.pushed / elapsed, 1),
+            'out_per_sec': round(self.drained / elapsed, 1),
+            'last_lag': round(self.last_lag, 6),
+            'max_lag': round(self.max_lag, 6),
+        }
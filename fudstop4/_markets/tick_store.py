@@ -0,0 +1,288 @@
+import os
+import time
+import atexit
+import shutil
+import asyncio
+import logging
+import itertools
+from pathlib import Path
+from datetime import datetime, timedelta, date
+from collections import defaultdict
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+from pytz import timezone
+
+
+TICK_DIR = os.environ.get('FUDSTOP_TICK_DIR', os.path.join(Path.home(), '.fudstop', 'ticks'))
+EASTERN = timezone('US/Eastern')
+TS = 'ts'  # every stored row gets this column - epoch ms, stored as timestamp[ms, UTC]
+
+
+def session_bounds(day: date):
+    """Epoch-ms [start, end) of the eastern-time calendar day ``day``."""
+    start = EASTERN.localize(datetime(day.year, day.month, day.day))
+    end = EASTERN.localize(datetime(day.year, day.month, day.day) + timedelta(days=1))
+    return int(start.timestamp() * 1000), int(end.timestamp() * 1000)
+
+
+def to_ms(value) -> int:
+    """Epoch ms from ms ints, datetimes (naive = eastern), dates or strings."""
+    if value is None:
+        return None
+    if isinstance(value, (int, float, np.number)):
+        return int(value)
+    ts = pd.Timestamp(value)
+    if ts.tzinfo is None:
+        ts = ts.tz_localize(EASTERN)
+    return int(ts.value // 1_000_000)
+
+
+class TickStore:
+    """
+    Append-only columnar store for websocket ticks.
+
+    Layout is ``<root>/<kind>/<UNDERLYING>/<YYYY-MM-DD>/<file>.arrow`` - one
+    directory per underlying per session (eastern-time day). Rows are
+    buffered per partition and written as uncompressed Arrow IPC segments,
+    each sorted by ``ts`` and named with its min/max timestamp so reads can
+    skip files without opening them. ``compact()`` merges a partition's
+    segments into one sorted file.
+
+    Reads memory-map the files, so a time-range query is a binary search and
+    a slice - no parsing, no copy until pandas needs one.
+
+    >>> tick_store.append('option_trades', 'SPY', m.timestamp, row)
+    >>> df = tick_store.read('option_trades', 'SPY', start='2024-03-01 09:30', end='2024-03-01 10:00')
+    """
+    def __init__(self, root: str = TICK_DIR, flush_rows: int = 20000, flush_age: float = 30.0,
+                 flush_interval: float = 5.0, compact_interval: float = 600.0):
+        self.root = Path(root)
+        self.flush_rows = flush_rows
+        self.flush_age = flush_age
+        self.flush_interval = flush_interval
+        self.compact_interval = compact_interval
+        self._buffers = defaultdict(list)
+        self._first_row = {}
+        self._day = None
+        self._day_bounds = (0, 0)
+        self._seq = itertools.count()
+        self._tasks = []
+        self._loop = None
+        self.appended = 0
+        self.flushed = 0
+        self.segments = 0
+        self.compacted = 0
+        self.flush_errors = 0
+
+    def _ensure_started(self):
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return  # sync caller - flush() by hand
+        if self._loop is loop:
+            return
+        self._loop = loop
+        self._tasks = [loop.create_task(self._flush_loop())]
+        if self.compact_interval:
+            self._tasks.append(loop.create_task(self._compact_loop()))
+
+    def _session(self, ts: int) -> str:
+        start, end = self._day_bounds
+        if not start <= ts < end:
+            day = datetime.fromtimestamp(ts / 1000.0, EASTERN).date()
+            self._day = day.isoformat()
+            self._day_bounds = session_bounds(day)
+        return self._day
+
+    def append(self, kind: str, underlying: str, ts, row: dict):
+        """Buffer one tick; ``ts`` is the exchange timestamp (epoch ms or datetime)."""
+        ts = to_ms(ts)
+        if ts is None:
+            return
+        key = (kind, underlying, self._session(ts))
+        buffer = self._buffers[key]
+        if not buffer:
+            self._first_row[key] = time.monotonic()
+        buffer.append({**row, TS: ts})
+        self.appended += 1
+        self._ensure_started()
+
+    def _take(self, force: bool = False):
+        """Pull the partitions that are due for a write off the buffers."""
+        now = time.monotonic()
+        due = {}
+        for key, rows in list(self._buffers.items()):
+            if force or len(rows) >= self.flush_rows or now - self._first_row.get(key, now) >= self.flush_age:
+                due[key] = self._buffers.pop(key)
+                self._first_row.pop(key, None)
+        return due
+
+    def _partition(self, kind, underlying, day) -> Path:
+        return self.root / kind / underlying.replace('/', '_').replace(':', '_') / day
+
+    def _write(self, due: dict):
+        for (kind, underlying, day), rows in due.items():
+            try:
+                table = pa.Table.from_pylist(rows)
+                index = table.schema.get_field_index(TS)
+                table = table.set_column(index, TS, table[TS].cast(pa.timestamp('ms', tz='UTC'))).sort_by(TS)
+                ts = table[TS].cast(pa.int64())
+                name = f"seg-{pc.min(ts).as_py()}-{pc.max(ts).as_py()}-{os.getpid()}-{next(self._seq)}.arrow"
+                self._write_file(self._partition(kind, underlying, day), name, table)
+                self.flushed += len(rows)
+                self.segments += 1
+            except Exception as e:
+                self.flush_errors += 1
+                logging.error(f"Tick store write failed for {kind}/{underlying}/{day}: {e}")
+
+    @staticmethod
+    def _write_file(directory: Path, name: str, table: pa.Table):
+        directory.mkdir(parents=True, exist_ok=True)
+        tmp = directory / f".{name}.tmp"
+        with pa.OSFile(str(tmp), 'wb') as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+        os.replace(tmp, directory / name)  # readers never see a half-written file
+
+    def flush(self):
+        """Write everything buffered, now."""
+        self._write(self._take(force=True))
+
+    async def _flush_loop(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            due = self._take()
+            if due:
+                await asyncio.to_thread(self._write, due)
+
+    async def _compact_loop(self):
+        while True:
+            await asyncio.sleep(self.compact_interval)
+            try:
+                await asyncio.to_thread(self.compact)
+            except Exception as e:
+                logging.error(f"Tick store compaction failed: {e}")
+
+    @staticmethod
+    def _file_range(path: Path):
+        parts = path.stem.split('-')
+        return int(parts[1]), int(parts[2])
+
+    @staticmethod
+    def _load(path: Path) -> pa.Table:
+        return pa.ipc.open_file(pa.memory_map(str(path), 'r')).read_all()
+
+    def compact(self, kind: str = None, underlying: str = None, min_files: int = 2):
+        """Merge each partition with ``min_files`` or more files into one sorted file."""
+        merged = 0
+        for directory in self._partitions(kind, underlying):
+            files = sorted(directory.glob('*.arrow'))
+            if len(files) < min_files:
+                continue
+            tables = [self._load(path) for path in files]
+            table = pa.concat_tables(tables, promote_options='permissive').sort_by(TS).combine_chunks()
+            ts = table[TS].cast(pa.int64())
+            name = f"day-{pc.min(ts).as_py()}-{pc.max(ts).as_py()}-{os.getpid()}-{next(self._seq)}.arrow"
+            self._write_file(directory, name, table)
+            for path in files:
+                path.unlink(missing_ok=True)
+            merged += len(files)
+        self.compacted += merged
+        return merged
+
+    def _partitions(self, kind=None, underlying=None):
+        kinds = [self.root / kind] if kind else [p for p in self.root.glob('*') if p.is_dir()]
+        for kind_dir in kinds:
+            underlyings = [kind_dir / underlying] if underlying else [p for p in kind_dir.glob('*') if p.is_dir()]
+            for underlying_dir in underlyings:
+                yield from (p for p in sorted(underlying_dir.glob('*')) if p.is_dir())
+
+    def _files(self, kind, underlying, start_ms, end_ms):
+        base = self._partition(kind, underlying, '')
+        if start_ms is None or end_ms is None:
+            days = sorted(p.name for p in base.glob('*') if p.is_dir())
+            if start_ms is not None:
+                days = [d for d in days if d >= datetime.fromtimestamp(start_ms / 1000.0, EASTERN).date().isoformat()]
+            if end_ms is not None:
+                days = [d for d in days if d <= datetime.fromtimestamp(end_ms / 1000.0, EASTERN).date().isoformat()]
+        else:
+            first = datetime.fromtimestamp(start_ms / 1000.0, EASTERN).date()
+            last = datetime.fromtimestamp(end_ms / 1000.0, EASTERN).date()
+            days = [(first + timedelta(days=i)).isoformat() for i in range((last - first).days + 1)]
+        for day in days:
+            for path in sorted((base / day).glob('*.arrow')):
+                lo, hi = self._file_range(path)
+                if (start_ms is None or hi >= start_ms) and (end_ms is None or lo < end_ms):
+                    yield path
+
+    def read_table(self, kind: str, underlying: str, start=None, end=None, columns: list = None) -> pa.Table:
+        """Rows with ``start <= ts < end`` as an Arrow table backed by the mapped files."""
+        start_ms, end_ms = to_ms(start), to_ms(end)
+        slices = []
+        for attempt in range(2):
+            try:
+                for path in self._files(kind, underlying, start_ms, end_ms):
+                    table = self._load(path)
+                    # files are sorted by ts, so the range is a binary search and a zero-copy slice
+                    ts = table[TS].cast(pa.int64()).to_numpy()
+                    lo = 0 if start_ms is None else int(np.searchsorted(ts, start_ms, 'left'))
+                    hi = len(ts) if end_ms is None else int(np.searchsorted(ts, end_ms, 'left'))
+                    if hi > lo:
+                        table = table.slice(lo, hi - lo)
+                        slices.append(table.select(columns) if columns else table)
+                break
+            except FileNotFoundError:
+                slices = []  # compaction swapped the files underneath us - list again
+        if not slices:
+            return pa.table({})
+        table = pa.concat_tables(slices, promote_options='permissive')
+        return table.sort_by(TS) if len(slices) > 1 else table
+
+    def read(self, kind: str, underlying: str, start=None, end=None, columns: list = None) -> pd.DataFrame:
+        """``read_table`` as a DataFrame; numeric columns of a single file convert without copying."""
+        table = self.read_table(kind, underlying, start, end, columns)
+        if not table.num_columns:
+            return pd.DataFrame()
+        return table.to_pandas(split_blocks=True, self_destruct=False)
+
+    def bars(self, kind: str, underlying: str, start=None, end=None, freq: str = '1min',
+             price: str = 'price', size: str = 'size', by: str = None) -> pd.DataFrame:
+        """OHLCV bars resampled from stored ticks (optionally per ``by``, e.g. option_symbol)."""
+        columns = [TS, price, size] + ([by] if by else [])
+        df = self.read(kind, underlying, start, end, columns=columns)
+        if df.empty:
+            return df
+        df = df.set_index(TS)
+        grouped = df.groupby(by) if by else df
+        bars = grouped[price].resample(freq).ohlc()
+        bars['volume'] = grouped[size].resample(freq).sum()
+        return bars.dropna(subset=['open']).reset_index()
+
+    def prune(self, keep_days: int = 30):
+        """Delete sessions older than ``keep_days``."""
+        cutoff = (datetime.now(EASTERN).date() - timedelta(days=keep_days)).isoformat()
+        removed = 0
+        for directory in list(self._partitions()):
+            if directory.name < cutoff:
+                shutil.rmtree(directory, ignore_errors=True)
+                removed += 1
+        return removed
+
+    def stats(self) -> dict:
+        return {
+            'root': str(self.root),
+            'appended': self.appended,
+            'flushed': self.flushed,
+            'buffered': sum(len(rows) for rows in self._buffers.values()),
+            'partitions_buffered': len(self._buffers),
+            'segments_written': self.segments,
+            'files_compacted': self.compacted,
+            'flush_errors': self.flush_errors,
+        }
+
+
+tick_store = TickStore()
+atexit.register(tick_store.flush)
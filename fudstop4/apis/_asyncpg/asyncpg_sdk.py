@@ -1,8 +1,9 @@
 
 import json
 # Add the project directory to the sys.path
-from asyncpg import create_pool
 import asyncpg
+from .pool_registry import pool_registry
+from .statement_cache import statement_cache
 import pandas as pd
 from asyncio import Lock
 import numpy as np
@@ -69,9 +70,9 @@ class AsyncpgSDK:
   
 
     async def connect(self):
-        """Establishes a pooled connection."""
-        self.pool = await create_pool(
-            host=self.host, user=self.user, database=self.database, port=5432, password=self.password, min_size=1, max_size=40
+        """Borrows the shared pool for this database."""
+        self.pool = await pool_registry.get_pool(
+            host=self.host, user=self.user, database=self.database, port=self.port, password=self.password, consumer=type(self).__name__
         )
 
         return self.pool
@@ -184,6 +185,7 @@ class AsyncpgSDK:
                 END $$;
                 """
                 await connection.execute(alter_query)
+            statement_cache.invalidate(table_name)
 
 
 
@@ -278,69 +280,14 @@ class AsyncpgSDK:
             # Debug: Print DataFrame columns after modifications
             #print("Modified DataFrame columns:", df.columns.tolist())
             
-            records = df.to_records(index=False)
-            data = list(records)
-
-
             async with self.pool.acquire() as connection:
-                column_types = await connection.fetch(
-                    f"SELECT column_name, data_type FROM information_schema.columns WHERE table_name = '{table_name}'"
-                )
-                type_mapping = {col: next((item['data_type'] for item in column_types if item['column_name'] == col), None) for col in df.columns}
-
-                async with connection.transaction():
-                    insert_query = f"""
-                    INSERT INTO {table_name} ({', '.join(f'"{col}"' for col in df.columns)}) 
-                    VALUES ({', '.join('$' + str(i) for i in range(1, len(df.columns) + 1))})
-                    ON CONFLICT ({unique_columns})
-                    DO UPDATE SET {', '.join(f'"{col}" = excluded."{col}"' for col in df.columns)}
-                    """
-            
-                    batch_data = []
-                    for record in data:
-                        new_record = []
-                        for col, val in zip(df.columns, record):
-                            pg_type = type_mapping[col]
-
-                            if val is None:
-                                new_record.append(None)
-                            elif pg_type in ['timestamp', 'timestamp without time zone', 'timestamp with time zone']:
-                                if isinstance(val, np.datetime64):
-                                    # Convert numpy datetime64 to Python datetime, ensure UTC and remove tzinfo if needed
-                                    new_record.append(pd.Timestamp(val).to_pydatetime().replace(tzinfo=None))
-                                elif isinstance(val, datetime):
-                                    # Directly use the Python datetime object
-                                    new_record.append(val)
-                            elif pg_type in ['double precision', 'real'] and not isinstance(val, str):
-                                new_record.append(float(val))
-                            elif isinstance(val, np.int64):
-                                new_record.append(int(val))
-                            elif pg_type == 'integer' and not isinstance(val, int):
-                                new_record.append(int(val))
-                            else:
-                                new_record.append(val)
-                    
-                        batch_data.append(new_record)
-
-                        if len(batch_data) == batch_size:
-                            try:
-                                
-                             
-                                await connection.executemany(insert_query, batch_data)
-                                batch_data.clear()
-                            except Exception as e:
-                                print(f"An error occurred while inserting the record: {e}")
-                                await connection.execute('ROLLBACK')
-                    
-                    if batch_data:
-                        # Convert all elements in batch_data to strings
-                        #batch_data = [[str(value) if isinstance(value, float) else value for value in row] for row in batch_data]
-                        
-                        try:
-                            await connection.executemany(insert_query, batch_data)
-                        except Exception as e:
-                            print(f"An error occurred while inserting the record: {e}")
-                            await connection.execute('ROLLBACK')
+                # query text, column converters and the prepared statement are
+                # reused for every call with this (table, columns) shape
+                try:
+                    await statement_cache.upsert(connection, table_name, df, unique_columns, batch_size)
+                except Exception as e:
+                    print(f"An error occurred while inserting the record: {e}")
+                    raise
 
 
     async def save_to_history(self, df, main_table_name, history_table_name):
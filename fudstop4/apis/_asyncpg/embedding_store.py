@@ -0,0 +1,415 @@
+import re
+import json
+import asyncio
+import hashlib
+import inspect
+import logging
+from pathlib import Path
+
+import numpy as np
+
+
+STORE_TABLE = 'embedding_store'
+KEY_BYTES = 16
+ANN_THRESHOLD = 50000   # rows before search switches from brute force to the IVF index
+
+
+def content_hash(text: str, model: str = 'default') -> bytes:
+    """Row key: 16-byte blake2b of model + text, so the same text under two models never collides."""
+    return hashlib.blake2b(f'{model}\0{text}'.encode('utf-8'), digest_size=KEY_BYTES).digest()
+
+
+def _normalize(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def _top_k(scores: np.ndarray, k: int):
+    """Indices of the k highest scores, best first."""
+    if k >= scores.size:
+        return np.argsort(-scores, kind='stable')
+    idx = np.argpartition(-scores, k - 1)[:k]
+    return idx[np.argsort(-scores[idx], kind='stable')]
+
+
+class HashEmbedder:
+    """
+    Deterministic, local-only embedding stand-in for tests and offline runs:
+    signed feature hashing of lowercase word tokens and character trigrams,
+    L2-normalised. Texts sharing words land close together; nothing leaves
+    the machine.
+
+    >>> embed = HashEmbedder(dim=256)
+    >>> embed(['SPY calls ripping', 'spy puts'])   # (2, 256) float32
+    """
+    token = re.compile(r'\w+')
+
+    def __init__(self, dim: int = 256, trigrams: bool = True):
+        self.dim = dim
+        self.trigrams = trigrams
+
+    def _features(self, text: str):
+        words = self.token.findall(text.lower())
+        yield from words
+        if self.trigrams:
+            for word in words:
+                padded = f'#{word}#'
+                for i in range(len(padded) - 2):
+                    yield padded[i:i + 3]
+
+    def __call__(self, texts) -> np.ndarray:
+        if isinstance(texts, str):
+            texts = [texts]
+        out = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for feature in self._features(text):
+                h = int.from_bytes(hashlib.blake2b(feature.encode('utf-8'), digest_size=8).digest(), 'little')
+                out[row, h % self.dim] += 1.0 if (h >> 63) else -1.0
+        return _normalize(out)
+
+
+class IVFIndex:
+    """
+    Approximate nearest-neighbour index: k-means coarse quantiser over the
+    (normalised) rows, one inverted list per centroid, and exact scoring of
+    the rows in the ``nprobe`` closest lists only.
+    """
+    def __init__(self, nlist: int = None, nprobe: int = 8, iterations: int = 10, seed: int = 0):
+        self.nlist = nlist
+        self.nprobe = nprobe
+        self.iterations = iterations
+        self.seed = seed
+        self.centroids = None
+        self.trained_on = 0
+        self._assign = np.empty(0, dtype=np.int32)
+        self._order = None
+        self._bounds = None
+
+    def _nearest(self, rows: np.ndarray, chunk: int = 65536) -> np.ndarray:
+        return np.concatenate([np.argmax(rows[i:i + chunk] @ self.centroids.T, axis=1)
+                               for i in range(0, len(rows), chunk)]).astype(np.int32)
+
+    def train(self, matrix: np.ndarray):
+        n = len(matrix)
+        nlist = min(self.nlist or max(1, int(2 * np.sqrt(n))), n)
+        rng = np.random.default_rng(self.seed)
+        sample = matrix[np.sort(rng.choice(n, min(n, nlist * 32), replace=False))]
+        self.centroids = sample[rng.choice(len(sample), nlist, replace=False)].copy()
+        for _ in range(self.iterations):
+            assign = np.argmax(sample @ self.centroids.T, axis=1)
+            order = np.argsort(assign, kind='stable')
+            filled, starts = np.unique(assign[order], return_index=True)
+            self.centroids[filled] = _normalize(np.add.reduceat(sample[order], starts, axis=0))
+        self._assign = self._nearest(matrix)
+        self._order = None
+        self.trained_on = n
+
+    def add(self, rows: np.ndarray):
+        self._assign = np.concatenate([self._assign, self._nearest(rows)])
+        self._order = None
+
+    def search(self, matrix: np.ndarray, query: np.ndarray, k: int):
+        if self._order is None:
+            self._order = np.argsort(self._assign, kind='stable')
+            self._bounds = np.searchsorted(self._assign[self._order], np.arange(len(self.centroids) + 1))
+        probe = _top_k(self.centroids @ query, self.nprobe)
+        candidates = np.concatenate([self._order[self._bounds[c]:self._bounds[c + 1]] for c in probe])
+        scores = matrix[candidates] @ query
+        best = _top_k(scores, k)
+        return candidates[best], scores[best]
+
+
+class EmbeddingStore:
+    """
+    Embeddings keyed by content hash, with an in-memory float32 matrix for
+    top-k cosine search.
+
+    Rows live in postgres as ``(content_hash bytea PK, model, original_text,
+    dim, embedding bytea)`` - the vector is raw little-endian float32, so a
+    lookup is a primary-key probe and loading is a ``frombuffer``. Writes are
+    buffered and flushed in batches (``ON CONFLICT DO NOTHING``; a hash that
+    is already known is never re-embedded or re-sent). Search is a single
+    matrix-vector product below ``ann_threshold`` rows and an IVF index
+    above it.
+
+    >>> store = EmbeddingStore(pool, embedder=HashEmbedder())
+    >>> await store.load()
+    >>> await store.add_many(headlines)
+    >>> await store.similar('fed cuts rates', k=5)   # [(text, score), ...]
+    """
+    def __init__(self, pool=None, table: str = STORE_TABLE, model: str = 'default', dim: int = None,
+                 embedder=None, batch_size: int = 500, ann_threshold: int = ANN_THRESHOLD, nprobe: int = 8):
+        self.pool = pool
+        self.table = table
+        self.model = model
+        self.embedder = embedder
+        self.dim = dim or getattr(embedder, 'dim', None)
+        self.batch_size = batch_size
+        self.ann_threshold = ann_threshold
+        self.nprobe = nprobe
+        self.keys = {}          # content hash -> row
+        self.texts = []
+        self.size = 0
+        self._matrix = None
+        self._pending = []
+        self._index = None
+        self._lock = asyncio.Lock()
+        self.flushed = 0
+        self.loaded = False     # every stored row is in the matrix (a full load() has run)
+
+    # --- matrix -------------------------------------------------------------
+
+    @property
+    def matrix(self) -> np.ndarray:
+        """Normalised rows, shape (size, dim)."""
+        if self._matrix is None:
+            return np.empty((0, self.dim or 0), dtype=np.float32)
+        return self._matrix[:self.size]
+
+    def _coerce(self, vectors) -> np.ndarray:
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if vectors.ndim == 1:
+            vectors = vectors[None, :]
+        if self.dim is None:
+            self.dim = vectors.shape[1]
+        if vectors.shape[1] != self.dim:
+            raise ValueError(f"Embedding has {vectors.shape[1]} dims, store holds {self.dim}")
+        return vectors
+
+    def _append(self, keys, texts, vectors: np.ndarray):
+        n = len(vectors)
+        if self._matrix is None or self.size + n > len(self._matrix) or not self._matrix.flags.writeable:
+            grown = np.empty((max(1024, (self.size + n) * 2), self.dim), dtype=np.float32)
+            if self.size:
+                grown[:self.size] = self._matrix[:self.size]
+            self._matrix = grown
+        self._matrix[self.size:self.size + n] = _normalize(vectors)
+        for offset, key in enumerate(keys):
+            self.keys[key] = self.size + offset
+        self.texts.extend(texts)
+        self.size += n
+        if self._index is not None:
+            self._index.add(self._matrix[self.size - n:self.size])
+
+    def remember(self, texts, vectors):
+        """Add to the in-memory matrix only (no database write); known hashes are skipped."""
+        vectors = self._coerce(vectors)
+        keys, kept, rows = [], [], []
+        for i, text in enumerate(texts):
+            key = content_hash(text, self.model)
+            if key not in self.keys:
+                keys.append(key)
+                kept.append(text)
+                rows.append(i)
+                self.keys[key] = -1   # reserve against duplicates within this batch
+        if rows:
+            self._append(keys, kept, vectors[rows])
+        return keys, kept, vectors[rows]
+
+    # --- embedding ----------------------------------------------------------
+
+    async def embed(self, texts) -> np.ndarray:
+        if self.embedder is None:
+            raise ValueError("EmbeddingStore has no embedder - pass vectors explicitly")
+        result = self.embedder(texts)
+        if inspect.isawaitable(result):
+            result = await result
+        return self._coerce(result)
+
+    # --- write path ---------------------------------------------------------
+
+    async def add(self, text: str, vector=None):
+        await self.add_many([text], None if vector is None else [vector])
+
+    async def add_many(self, texts, vectors=None):
+        """Buffer new rows; texts whose hash is already known are not embedded again."""
+        if vectors is None:
+            fresh = list(dict.fromkeys(t for t in texts if content_hash(t, self.model) not in self.keys))
+            if not fresh:
+                return
+            texts, vectors = fresh, await self.embed(fresh)
+        keys, kept, vectors = self.remember(texts, vectors)
+        self._pending.extend(zip(keys, kept, vectors))
+        if len(self._pending) >= self.batch_size:
+            await self.flush()
+
+    async def ensure_table(self):
+        async with self.pool.acquire() as conn:
+            await conn.execute(f"""
+                CREATE TABLE IF NOT EXISTS {self.table} (
+                    content_hash bytea PRIMARY KEY,
+                    model text NOT NULL,
+                    original_text text NOT NULL,
+                    dim integer NOT NULL,
+                    embedding bytea NOT NULL,
+                    inserted_at timestamptz NOT NULL DEFAULT now()
+                )""")
+
+    async def flush(self):
+        if self.pool is None or not self._pending:
+            return 0
+        async with self._lock:
+            pending, self._pending = self._pending, []
+            query = f"""
+                INSERT INTO {self.table} (content_hash, model, original_text, dim, embedding)
+                VALUES ($1, $2, $3, $4, $5)
+                ON CONFLICT (content_hash) DO NOTHING"""
+            try:
+                async with self.pool.acquire() as conn:
+                    async with conn.transaction():
+                        for i in range(0, len(pending), self.batch_size):
+                            await conn.executemany(query, [
+                                (key, self.model, text, self.dim, vector.astype('<f4').tobytes())
+                                for key, text, vector in pending[i:i + self.batch_size]
+                            ])
+            except Exception:
+                self._pending[:0] = pending
+                raise
+            self.flushed += len(pending)
+            return len(pending)
+
+    # --- read path ----------------------------------------------------------
+
+    def _decode(self, record) -> np.ndarray:
+        return np.frombuffer(record['embedding'], dtype='<f4').astype(np.float32)
+
+    async def load(self, limit: int = None):
+        """Pull this model's rows into the in-memory matrix."""
+        query = f"SELECT content_hash, original_text, embedding FROM {self.table} WHERE model = $1"
+        query += f" LIMIT {int(limit)}" if limit else ''
+        async with self.pool.acquire() as conn:
+            records = await conn.fetch(query, self.model)
+        records = [r for r in records if bytes(r['content_hash']) not in self.keys]
+        if records:
+            vectors = np.frombuffer(b''.join(r['embedding'] for r in records), dtype='<f4').reshape(len(records), -1)
+            self._append([bytes(r['content_hash']) for r in records], [r['original_text'] for r in records],
+                         self._coerce(vectors))
+        if not limit:
+            self.loaded = True
+        return len(records)
+
+    async def get(self, text: str, normalized: bool = True):
+        """
+        Vector for ``text``, None if unknown. Normalised by default (straight
+        from the matrix when loaded); ``normalized=False`` gives the vector as
+        it was stored, by primary key.
+        """
+        key = content_hash(text, self.model)
+        if normalized:
+            row = self.keys.get(key)
+            if row is not None and row >= 0:
+                return self._matrix[row].copy()
+        else:
+            for pending_key, _, vector in self._pending:
+                if pending_key == key:
+                    return vector.copy()
+        if self.pool is None:
+            return None
+        async with self.pool.acquire() as conn:
+            record = await conn.fetchrow(f"SELECT embedding FROM {self.table} WHERE content_hash = $1", key)
+        if record is None:
+            return None
+        vector = self._decode(record)
+        self.remember([text], vector)
+        return _normalize(vector) if normalized else vector
+
+    # --- search -------------------------------------------------------------
+
+    def build_index(self, nlist: int = None):
+        self._index = IVFIndex(nlist=nlist, nprobe=self.nprobe)
+        self._index.train(self.matrix)
+        return self._index
+
+    def search_vector(self, vector, k: int = 10, exact: bool = False):
+        """Top-k ``(text, score)`` by cosine similarity to ``vector``."""
+        if not self.size:
+            return []
+        query = _normalize(self._coerce(vector))[0]
+        if exact or self.size < self.ann_threshold:
+            scores = self.matrix @ query
+            rows = _top_k(scores, k)
+            scores = scores[rows]
+        else:
+            if self._index is None or self.size > 2 * self._index.trained_on:
+                self.build_index()
+            rows, scores = self._index.search(self.matrix, query, k)
+        return [(self.texts[r], float(s)) for r, s in zip(rows, scores)]
+
+    def search_many(self, vectors, k: int = 10):
+        """Exact top-k for a batch of query vectors in one matrix product."""
+        if not self.size:
+            return [[] for _ in range(len(vectors))]
+        scores = _normalize(self._coerce(vectors)) @ self.matrix.T
+        results = []
+        for row in scores:
+            best = _top_k(row, k)
+            results.append([(self.texts[r], float(row[r])) for r in best])
+        return results
+
+    async def similar(self, query, k: int = 10, exact: bool = False):
+        """Top-k for a text (embedded with the store's embedder) or a vector."""
+        if isinstance(query, str):
+            row = self.keys.get(content_hash(query, self.model), -1)
+            query = self._matrix[row] if row >= 0 else (await self.embed([query]))[0]
+        return self.search_vector(query, k=k, exact=exact)
+
+    # --- persistence --------------------------------------------------------
+
+    def save(self, path: str):
+        """Write ``<path>.vectors.npy`` / ``.keys.npy`` / ``.texts.json`` for a later ``open``."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        keys = np.empty(self.size, dtype=f'S{KEY_BYTES}')
+        for key, row in self.keys.items():
+            if row >= 0:
+                keys[row] = key
+        np.save(f'{path}.vectors.npy', self.matrix)
+        np.save(f'{path}.keys.npy', keys)
+        Path(f'{path}.texts.json').write_text(json.dumps(self.texts))
+
+    @classmethod
+    def open(cls, path: str, mmap: bool = True, **kwargs) -> 'EmbeddingStore':
+        """Load a saved matrix, memory-mapped read-only by default (copied on the first append)."""
+        matrix = np.load(f'{path}.vectors.npy', mmap_mode='r' if mmap else None)
+        keys = np.load(f'{path}.keys.npy')
+        store = cls(dim=matrix.shape[1], **kwargs)
+        store._matrix = matrix
+        store.size = len(matrix)
+        store.keys = {bytes(key): row for row, key in enumerate(keys)}
+        store.texts = json.loads(Path(f'{path}.texts.json').read_text())
+        return store
+
+    async def import_legacy(self, table: str = 'embeddings', if_empty: bool = False):
+        """
+        Copy rows from the old ``(original_text, embedding)`` table into this store.
+        With ``if_empty`` only when the old table exists and this model has no rows yet.
+        """
+        async with self.pool.acquire() as conn:
+            if if_empty:
+                exists = await conn.fetchval("SELECT to_regclass($1) IS NOT NULL", table)
+                if not exists or await conn.fetchval(f"SELECT EXISTS (SELECT 1 FROM {self.table} WHERE model = $1)", self.model):
+                    return 0
+            records = await conn.fetch(f"SELECT original_text, embedding FROM {table}")
+        for i in range(0, len(records), self.batch_size):
+            chunk = records[i:i + self.batch_size]
+            # float8[] comes back as a list, pgvector / text columns as '[0.1, 0.2, ...]'
+            vectors = [json.loads(v) if isinstance(v, str) else list(v) for v in (r['embedding'] for r in chunk)]
+            await self.add_many([r['original_text'] for r in chunk], vectors)
+        await self.flush()
+        logging.info(f"Imported {len(records)} rows from {table} into {self.table}")
+        return len(records)
+
+    def stats(self) -> dict:
+        return {
+            'table': self.table,
+            'model': self.model,
+            'rows': self.size,
+            'dim': self.dim,
+            'pending': len(self._pending),
+            'flushed': self.flushed,
+            'matrix_mb': round(self.matrix.nbytes / 2 ** 20, 2),
+            'memory_mapped': isinstance(self._matrix, np.memmap),
+            'index': {'lists': len(self._index.centroids), 'trained_on': self._index.trained_on,
+                      'nprobe': self.nprobe} if self._index is not None else None,
+        }
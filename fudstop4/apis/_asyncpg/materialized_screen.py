@@ -0,0 +1,179 @@
+import time
+import asyncio
+import logging
+from collections import deque
+
+import numpy as np
+import pandas as pd
+from asyncpg.exceptions import ObjectNotInPrerequisiteStateError
+
+
+class LatencyStats:
+    """Rolling latency samples (seconds) for one operation."""
+    __slots__ = ('count', 'errors', 'samples')
+
+    def __init__(self, window: int = 512):
+        self.count = 0
+        self.errors = 0
+        self.samples = deque(maxlen=window)
+
+    def record(self, elapsed: float):
+        self.count += 1
+        self.samples.append(elapsed)
+
+    def summary(self) -> dict:
+        if not self.samples:
+            return {'count': self.count, 'errors': self.errors, 'last': None, 'p50': None, 'p95': None, 'max': None}
+        arr = np.fromiter(self.samples, dtype=float)
+        return {
+            'count': self.count,
+            'errors': self.errors,
+            'last': round(arr[-1], 6),
+            'p50': round(float(np.percentile(arr, 50)), 6),
+            'p95': round(float(np.percentile(arr, 95)), 6),
+            'max': round(float(arr.max()), 6),
+        }
+
+
+class MaterializedScreen:
+    """
+    A screening query kept as a materialized view and refreshed in the background.
+
+    Reads become a lookup against the view instead of re-running the query per
+    command. The view gets a unique index on ``unique_columns`` so it can be
+    refreshed CONCURRENTLY - readers never block on a refresh.
+
+    The refresh loop runs every ``min_interval`` seconds but only refreshes when
+    the source tables saw writes since the last refresh (pg_stat_user_tables),
+    when ``mark_dirty()`` was called by an in-process ingester, or when
+    ``max_interval`` has elapsed - so refreshes follow ingest cadence.
+
+    >>> screen = MaterializedScreen('screen_option_lows', QUERY, ('ticker', 'strike', 'expiry', 'call_put'),
+    ...                             source_tables=('options_data', 'option_aggs'))
+    >>> screen.start(pool)
+    >>> rows = await screen.fetch(pool)
+    """
+    def __init__(self, name: str, query: str, unique_columns, indexes=(), source_tables=(),
+                 min_interval: float = 15, max_interval: float = 300):
+        self.name = name
+        self.query = query.strip().rstrip(';')
+        self.unique_columns = tuple(unique_columns)
+        self.indexes = [tuple(cols) for cols in indexes]
+        self.source_tables = list(source_tables)
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.refresh_stats = LatencyStats()
+        self.read_stats = LatencyStats()
+        self.last_refresh = 0.0
+        self._dirty = True
+        self._write_marker = None
+        self._ready = False
+        self._refresh_lock = asyncio.Lock()
+        self._task = None
+
+    async def ensure(self, conn):
+        """Create the view and its indexes if they don't exist yet."""
+        if self._ready:
+            return
+        await conn.execute(f"CREATE MATERIALIZED VIEW IF NOT EXISTS {self.name} AS {self.query} WITH DATA")
+        unique = ', '.join(self.unique_columns)
+        await conn.execute(f"CREATE UNIQUE INDEX IF NOT EXISTS {self.name}_uniq ON {self.name} ({unique})")
+        for cols in self.indexes:
+            await conn.execute(f"CREATE INDEX IF NOT EXISTS {self.name}_{'_'.join(cols)}_idx ON {self.name} ({', '.join(cols)})")
+        self._ready = True
+        self.last_refresh = time.monotonic()
+
+    def mark_dirty(self):
+        """Tell the refresh loop the source tables changed."""
+        self._dirty = True
+
+    async def _source_writes(self, conn):
+        if not self.source_tables:
+            return None
+        return await conn.fetchval(
+            "SELECT COALESCE(SUM(n_tup_ins + n_tup_upd + n_tup_del), 0) FROM pg_stat_user_tables WHERE relname = ANY($1)",
+            self.source_tables
+        )
+
+    async def refresh(self, pool, force: bool = False) -> bool:
+        """Refresh the view if anything changed (or ``force``); returns whether it ran."""
+        if self._refresh_lock.locked():
+            return False  # a refresh is already running - it will pick up these writes
+        async with self._refresh_lock:
+            async with pool.acquire() as conn:
+                await self.ensure(conn)
+                marker = await self._source_writes(conn)
+                stale = time.monotonic() - self.last_refresh >= self.max_interval
+                if not (force or stale or self._dirty or marker != self._write_marker):
+                    return False
+                self._dirty = False
+                started = time.perf_counter()
+                try:
+                    try:
+                        await conn.execute(f"REFRESH MATERIALIZED VIEW CONCURRENTLY {self.name}")
+                    except ObjectNotInPrerequisiteStateError:
+                        # CONCURRENTLY needs a populated view
+                        await conn.execute(f"REFRESH MATERIALIZED VIEW {self.name}")
+                except Exception:
+                    self.refresh_stats.errors += 1
+                    self._dirty = True
+                    raise
+                self.refresh_stats.record(time.perf_counter() - started)
+                self._write_marker = marker
+                self.last_refresh = time.monotonic()
+                return True
+
+    async def _refresh_loop(self, pool):
+        while True:
+            try:
+                await self.refresh(pool)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logging.error(f"Refreshing {self.name} failed: {e}")
+            await asyncio.sleep(self.min_interval)
+
+    def start(self, pool):
+        """Start the background refresh loop (idempotent)."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._refresh_loop(pool))
+        return self._task
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def fetch(self, pool, where: str = None, *params, order_by: str = None, limit: int = None):
+        """Read from the view. ``where`` takes ``$n`` placeholders bound to ``params``."""
+        query = f"SELECT * FROM {self.name}"
+        if where:
+            query += f" WHERE {where}"
+        if order_by:
+            query += f" ORDER BY {order_by}"
+        if limit:
+            query += f" LIMIT {int(limit)}"
+        async with pool.acquire() as conn:
+            await self.ensure(conn)
+            started = time.perf_counter()
+            try:
+                rows = await conn.fetch(query, *params)
+            except Exception:
+                self.read_stats.errors += 1
+                raise
+            self.read_stats.record(time.perf_counter() - started)
+        return rows
+
+    def stats(self) -> pd.DataFrame:
+        """Refresh and read latency for this screen."""
+        rows = [
+            {'screen': self.name, 'operation': 'refresh', **self.refresh_stats.summary()},
+            {'screen': self.name, 'operation': 'read', **self.read_stats.summary()},
+        ]
+        df = pd.DataFrame(rows, columns=['screen', 'operation', 'count', 'errors', 'last', 'p50', 'p95', 'max'])
+        df['age'] = round(time.monotonic() - self.last_refresh, 3) if self.last_refresh else None
+        return df
@@ -0,0 +1,160 @@
+import os
+import time
+import asyncio
+from collections import defaultdict
+
+import asyncpg
+import pandas as pd
+from dotenv import load_dotenv
+load_dotenv()
+
+
+# one sizing config for every pooled SDK - override through the environment
+POOL_MIN_SIZE = int(os.environ.get('FUDSTOP_POOL_MIN_SIZE', 1))
+POOL_MAX_SIZE = int(os.environ.get('FUDSTOP_POOL_MAX_SIZE', 20))
+
+
+def make_dsn(host, port, user, database):
+    """Registry key for a database - password deliberately left out so it never shows up in stats."""
+    return f"postgresql://{user}@{host}:{port}/{database}"
+
+
+class CheckoutStats:
+    """Checkout wait times for one consumer of a pool."""
+    __slots__ = ('checkouts', 'total_wait', 'max_wait')
+
+    def __init__(self):
+        self.checkouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def record(self, wait: float):
+        self.checkouts += 1
+        self.total_wait += wait
+        self.max_wait = max(self.max_wait, wait)
+
+
+class _TimedAcquire:
+    """Wraps asyncpg's acquire context so both ``async with`` and ``await`` are timed."""
+    def __init__(self, handle, timeout):
+        self.handle = handle
+        self.timeout = timeout
+        self.conn = None
+
+    async def _acquire(self):
+        started = time.perf_counter()
+        conn = await self.handle.pool.acquire(timeout=self.timeout)
+        self.handle.stats.record(time.perf_counter() - started)
+        return conn
+
+    def __await__(self):
+        return self._acquire().__await__()
+
+    async def __aenter__(self):
+        self.conn = await self._acquire()
+        return self.conn
+
+    async def __aexit__(self, *exc):
+        await self.handle.pool.release(self.conn)
+        self.conn = None
+
+
+class PoolHandle:
+    """
+    A consumer's view of a shared asyncpg pool.
+
+    Behaves like the pool itself (fetch, execute, release, ...), except that
+    ``acquire()`` records how long the consumer waited for a connection and
+    ``close()`` only gives the borrow back - the registry closes the pool once
+    its last borrower is done.
+    """
+    def __init__(self, registry, dsn, pool, consumer):
+        self.registry = registry
+        self.dsn = dsn
+        self.pool = pool
+        self.consumer = consumer
+        self.stats = registry._stats[(dsn, consumer)]
+        self.closed = False
+
+    def acquire(self, *, timeout=None):
+        return _TimedAcquire(self, timeout)
+
+    async def close(self):
+        if not self.closed:
+            self.closed = True
+            await self.registry.release(self.dsn, self.pool)
+
+    def __getattr__(self, name):
+        return getattr(self.pool, name)
+
+
+class PoolRegistry:
+    """
+    Process-wide asyncpg pools keyed by DSN.
+
+    Every SDK that points at the same database borrows the same pool instead of
+    opening its own, so the process holds at most POOL_MAX_SIZE connections per
+    database no matter how many SDK objects are alive.
+
+    >>> pool = await pool_registry.get_pool(host='localhost', port=5432, user='chuck',
+    ...                                     password='fud', database='fudstop3', consumer='PolygonOptions')
+    """
+    def __init__(self, min_size: int = POOL_MIN_SIZE, max_size: int = POOL_MAX_SIZE):
+        self.min_size = min_size
+        self.max_size = max_size
+        self._pools = {}
+        self._borrowers = defaultdict(int)
+        self._locks = defaultdict(asyncio.Lock)
+        self._stats = defaultdict(CheckoutStats)
+
+    async def get_pool(self, host='localhost', port=5432, user='chuck', password='fud', database='fudstop3', consumer: str = 'default') -> PoolHandle:
+        dsn = make_dsn(host, port, user, database)
+        async with self._locks[dsn]:
+            entry = self._pools.get(dsn)
+            loop = asyncio.get_running_loop()
+            # pools are bound to the loop that created them (asyncio.run per script)
+            if entry is None or entry[1] is not loop or entry[0].is_closing():
+                pool = await asyncpg.create_pool(
+                    host=host, port=port, user=user, password=password, database=database,
+                    min_size=self.min_size, max_size=self.max_size,
+                )
+                entry = (pool, loop)
+                self._pools[dsn] = entry
+                self._borrowers[dsn] = 0
+            self._borrowers[dsn] += 1
+        return PoolHandle(self, dsn, entry[0], consumer)
+
+    async def release(self, dsn: str, pool):
+        async with self._locks[dsn]:
+            entry = self._pools.get(dsn)
+            # borrows of a pool that was already replaced don't count against the new one
+            if entry is None or entry[0] is not pool:
+                return
+            self._borrowers[dsn] -= 1
+            if self._borrowers[dsn] <= 0:
+                self._pools.pop(dsn)
+                await pool.close()
+
+    async def close_all(self):
+        for dsn in list(self._pools):
+            pool, _ = self._pools.pop(dsn)
+            self._borrowers[dsn] = 0
+            await pool.close()
+
+    def stats(self) -> pd.DataFrame:
+        """Checkout wait times per (dsn, consumer)."""
+        rows = [
+            {
+                'dsn': dsn,
+                'consumer': consumer,
+                'checkouts': s.checkouts,
+                'avg_wait': round(s.total_wait / s.checkouts, 6) if s.checkouts else 0.0,
+                'max_wait': round(s.max_wait, 6),
+                'total_wait': round(s.total_wait, 6),
+            }
+            for (dsn, consumer), s in self._stats.items()
+        ]
+        return pd.DataFrame(rows, columns=['dsn', 'consumer', 'checkouts', 'avg_wait', 'max_wait', 'total_wait'])
+
+
+pool_registry = PoolRegistry()
@@ -0,0 +1,243 @@
+from decimal import Decimal
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+import numpy as np
+import pandas as pd
+from asyncpg.exceptions import InvalidCachedStatementError
+
+from .pool_registry import make_dsn
+
+
+TIMESTAMP_TYPES = ('timestamp', 'timestamp without time zone')
+TIMESTAMPTZ_TYPES = ('timestamp with time zone', 'timestamptz')
+FLOAT_TYPES = ('double precision', 'real', 'float')
+NUMERIC_TYPES = ('numeric', 'decimal')
+INTEGER_TYPES = ('integer', 'bigint', 'smallint')
+
+# naive timestamp columns hold Eastern wall time (see batch_upsert_dataframe's insertion_timestamp)
+NAIVE_TIMEZONE = ZoneInfo('America/New_York')
+
+
+def _to_datetime(val):
+    if isinstance(val, (np.datetime64, pd.Timestamp)):
+        return pd.Timestamp(val).to_pydatetime()
+    return val
+
+
+def _to_timestamp(val):
+    """timestamp without time zone: aware values are converted to Eastern before tzinfo is dropped."""
+    val = _to_datetime(val)
+    if isinstance(val, datetime) and val.tzinfo is not None:
+        return val.astimezone(NAIVE_TIMEZONE).replace(tzinfo=None)
+    return val
+
+
+def _to_timestamptz(val):
+    """timestamp with time zone: aware values pass through, asyncpg stores the instant."""
+    return _to_datetime(val)
+
+
+def _to_float(val):
+    return val if isinstance(val, str) else float(val)
+
+
+def _to_decimal(val):
+    # numeric keeps its precision - floats go through repr so 0.1 stays 0.1
+    if isinstance(val, (str, Decimal)):
+        return val
+    if isinstance(val, (float, np.floating)):
+        return Decimal(repr(float(val)))
+    return Decimal(int(val))
+
+
+def _to_int(val):
+    return val if isinstance(val, str) else int(val)
+
+
+def _to_native(val):
+    if isinstance(val, np.integer):
+        return int(val)
+    if isinstance(val, np.floating):
+        return float(val)
+    if isinstance(val, np.bool_):
+        return bool(val)
+    return val
+
+
+def converter_for(pg_type):
+    """Value converter for a postgres column type (NaN/None always map to None)."""
+    if pg_type in TIMESTAMP_TYPES:
+        return _to_timestamp
+    if pg_type in TIMESTAMPTZ_TYPES:
+        return _to_timestamptz
+    if pg_type in FLOAT_TYPES:
+        return _to_float
+    if pg_type in NUMERIC_TYPES:
+        return _to_decimal
+    if pg_type in INTEGER_TYPES:
+        return _to_int
+    return _to_native
+
+
+class UpsertPlan:
+    """Everything about an upsert that only depends on (table, columns, conflict target)."""
+    __slots__ = ('table', 'columns', 'query', 'converters')
+
+    def __init__(self, table, columns, query, converters):
+        self.table = table
+        self.columns = columns
+        self.query = query
+        self.converters = converters
+
+    def rows(self, df: pd.DataFrame):
+        """Convert ``df`` column by column and return the rows as tuples."""
+        converted = []
+        for col, convert in zip(self.columns, self.converters):
+            values = df[col].to_numpy(dtype=object)
+            missing = pd.isna(values)
+            converted.append([None if m else convert(v) for v, m in zip(values, missing)])
+        return list(zip(*converted))
+
+
+def _raw(conn):
+    return getattr(conn, '_con', conn)  # unwrap pool proxies - the server session is what matters
+
+
+def database_key(conn) -> str:
+    """The database a connection points at, in pool_registry's DSN form."""
+    raw = _raw(conn)
+    addr = raw._addr
+    host, port = addr if isinstance(addr, tuple) else (addr, None)
+    return make_dsn(host, port, raw._params.user, raw._params.database)
+
+
+class StatementCache:
+    """
+    Caches upsert plans per (database, table, column set) and prepared statements per connection.
+
+    Column types are read from information_schema once per table; the query
+    text and per-column converters are built once per shape; each pooled
+    connection prepares a given statement once and drops them when it closes.
+    Tables are told apart by database, so SDKs on different databases with
+    the same table name never share types or plans. ``invalidate(table)``
+    drops all of it for a table and is called whenever the schema changes
+    (create_table / add_column_to_table).
+    """
+    def __init__(self):
+        self._column_types = {}
+        self._plans = {}
+        self._prepared = {}
+        self.hits = 0
+        self.misses = 0
+
+    async def column_types(self, conn, table: str) -> dict:
+        key = (database_key(conn), table)
+        types = self._column_types.get(key)
+        if types is None:
+            rows = await conn.fetch(
+                "SELECT column_name, data_type FROM information_schema.columns WHERE table_name = $1",
+                table
+            )
+            types = {r['column_name']: r['data_type'] for r in rows}
+            self._column_types[key] = types
+        return types
+
+    async def plan(self, conn, table: str, columns, unique_columns, update_columns=None) -> UpsertPlan:
+        """
+        Plan for ``INSERT INTO table (columns) ... ON CONFLICT (unique_columns) DO UPDATE``.
+        ``update_columns`` defaults to every non-unique column; without
+        ``unique_columns`` the plan is a plain INSERT.
+        """
+        if not unique_columns:
+            unique_columns = ()
+        elif isinstance(unique_columns, str):
+            unique_columns = [uc.strip() for uc in unique_columns.split(',')]
+        columns = tuple(columns)
+        unique_columns = tuple(unique_columns)
+        if update_columns is None:
+            update_columns = tuple(c for c in columns if c not in unique_columns)
+        key = (database_key(conn), table, columns, unique_columns, tuple(update_columns))
+        plan = self._plans.get(key)
+        if plan is not None:
+            self.hits += 1
+            return plan
+
+        self.misses += 1
+        types = await self.column_types(conn, table)
+        conflict_clause = ''
+        if unique_columns:
+            target = ', '.join(f'"{col}"' for col in unique_columns)
+            assignments = ', '.join(f'"{col}" = EXCLUDED."{col}"' for col in update_columns)
+            action = f"DO UPDATE SET {assignments}" if assignments else "DO NOTHING"
+            conflict_clause = f"ON CONFLICT ({target}) {action}"
+        query = f"""
+        INSERT INTO {table} ({', '.join(f'"{col}"' for col in columns)})
+        VALUES ({', '.join(f'${i}' for i in range(1, len(columns) + 1))})
+        {conflict_clause}
+        """
+        plan = UpsertPlan(table, columns, query, [converter_for(types.get(col)) for col in columns])
+        self._plans[key] = plan
+        return plan
+
+    async def prepare(self, conn, plan: UpsertPlan):
+        """Prepared statement for ``plan`` on this connection, preparing it on first use."""
+        raw = _raw(conn)
+        statements = self._prepared.get(raw)
+        if statements is None:
+            statements = self._prepared[raw] = {}
+            # the statements die with the session - so does their entry here
+            raw.add_termination_listener(lambda _: self._prepared.pop(raw, None))
+        stmt = statements.get(plan.query)
+        if stmt is None:
+            stmt = await conn.prepare(plan.query)
+            statements[plan.query] = stmt
+        return stmt
+
+    async def executemany(self, conn, plan: UpsertPlan, rows):
+        stmt = await self.prepare(conn, plan)
+        try:
+            await stmt.executemany(rows)
+        except InvalidCachedStatementError:
+            # schema changed underneath us (outside create_table/add_column_to_table)
+            self.invalidate(plan.table)
+            if conn.is_in_transaction():
+                raise  # the transaction is aborted - it has to be redone as a whole (see upsert)
+            await conn.executemany(plan.query, rows)
+
+    async def upsert(self, conn, table: str, df: pd.DataFrame, unique_columns, batch_size: int = 250):
+        """
+        Write ``df`` in ``batch_size`` batches inside one transaction. If the
+        schema moved under a cached statement, that transaction is rolled back
+        and the whole write is redone once in a fresh transaction with a fresh plan.
+        """
+        for attempt in range(2):
+            plan = await self.plan(conn, table, df.columns, unique_columns)
+            rows = plan.rows(df)
+            try:
+                async with conn.transaction():
+                    for start in range(0, len(rows), batch_size):
+                        await self.executemany(conn, plan, rows[start:start + batch_size])
+                return
+            except InvalidCachedStatementError:
+                if attempt:
+                    raise
+
+    def invalidate(self, table: str = None):
+        """Forget column types, plans and prepared statements for ``table`` (or everything)."""
+        if table is None:
+            self._column_types.clear()
+            self._plans.clear()
+            for statements in self._prepared.values():
+                statements.clear()
+            return
+        for key in [key for key in self._column_types if key[1] == table]:
+            del self._column_types[key]
+        stale = [key for key in self._plans if key[1] == table]
+        queries = {self._plans.pop(key).query for key in stale}
+        for statements in self._prepared.values():
+            for query in queries:
+                statements.pop(query, None)
+
+
+statement_cache = StatementCache()
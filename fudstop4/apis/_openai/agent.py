@@ -108,7 +108,7 @@ class Agent():
         Converse with AI about short volume
         """
 
-        short_vol = ss.short_volume(ticker, date_from=self.eight_days_ago, date_to=self.today)
+        short_vol = await ss.short_volume(ticker, date_from=self.eight_days_ago, date_to=self.today)
         print(short_vol)
 
         response = self.conversation({"question": f"You are viewing data from the latest 5 news articles about {ticker}. Based on the data in this list: {short_vol}.. what has the short percentage trend been for {ticker}?"})
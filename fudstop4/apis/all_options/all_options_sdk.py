@@ -423,48 +423,25 @@ class AllOptionsSDK:
 ]
 
 
-    async def query(self, conditions: str):
-        """Query the database using SQL and return a DataFrame."""
+    async def query(self, conditions: str, *params):
+        """Query the database using SQL and return a DataFrame.
+
+        Pass values as ``$1, $2 ...`` placeholders in ``conditions`` plus ``params``
+        so repeated queries reuse the prepared statement:
+
+        >>> await sdk.query("ticker = $1 AND call_volume > $2", 'SPY', 1000)
+        """
         await db.connect()
-        # Ensure the database connection is established (assuming db.connect() is handled outside)
-        # Define the base query
-        base_query = "SELECT * FROM master_all_two"
-        
-        # Construct the full query by appending user conditions
-        query = f"{base_query} WHERE {conditions}"
-        
-        print("Constructed SQL query:", query)
-        
+        query = f"SELECT * FROM master_all_two WHERE {conditions}"
+
         try:
-            # Fetch results from the database
-            results = await db.fetch(query)
-            
-            # Fetch all column names from the table in the correct order
-            column_query = """
-            SELECT column_name
-            FROM information_schema.columns
-            WHERE table_name = 'master_all_two'
-            ORDER BY ordinal_position
-            """
-            column_rows = await db.fetch(column_query)
-            all_columns = [row['column_name'] for row in column_rows]
-            
-            # Debugging: print the number of columns and data returned
-            print("Number of columns expected:", len(all_columns))
-            if results:
-                print("Number of columns in data:", len(results[0]))
-            else:
-                print("No data returned")
-            
-            # Ensure the number of columns matches the data
-            if results and len(all_columns) != len(results[0]):
-                raise ValueError(f"Mismatch between extracted columns ({len(all_columns)}) and data columns ({len(results[0])}).")
-            
-            # Create a DataFrame from the results
-            df = pd.DataFrame(results, columns=all_columns)
-            await db.disconnect()
-            return df
-        
+            async with db.pool.acquire() as conn:
+                results = await conn.fetch(query, *params)
+            if not results:
+                return pd.DataFrame()
+            # column order comes straight from the result's row description
+            return pd.DataFrame(results, columns=list(results[0].keys()))
+
         except Exception as e:
             print(f"An error occurred during the query: {str(e)}")
             return None
\ No newline at end of file
@@ -1,2 +1,106 @@
 def clean_string(s: str) -> str:
-    return s.replace("ù", "-")  # Replace 'ù' with '
\ No newline at end of file
+    return s.replace("ù", "-")  # Replace 'ù' with '
+
+
+try:
+    from lxml.etree import iterparse
+except ImportError:
+    from xml.etree.ElementTree import iterparse
+
+
+# DIV levels that become rows, by table
+_DIV_TABLES = {'DIV1': 'titles', 'DIV3': 'chapters', 'DIV5': 'parts', 'DIV8': 'sections'}
+_NAME_COLUMNS = {'titles': 'title_name', 'chapters': 'chapter_name', 'parts': 'part_name', 'sections': 'section_name'}
+# first AUTH / SOURCE under a part -> (flag, table, column)
+_PART_NOTES = {'AUTH': ('auth', 'authorities', 'authority_text'), 'SOURCE': ('source', 'sources', 'source_text')}
+# flush order keeps foreign keys satisfied (titles before chapters before parts ...)
+TITLE_TABLES = ('titles', 'chapters', 'parts', 'authorities', 'sources', 'sections')
+
+
+class _Div:
+    __slots__ = ('table', 'record', 'named', 'auth', 'source')
+
+    def __init__(self, table, record):
+        self.table = table
+        self.record = record
+        self.named = False
+        self.auth = False
+        self.source = False
+
+
+def iter_title_batches(file_path: str, batch_size: int = 1000, sections: bool = False):
+    """
+    Stream an eCFR title XML file and yield ``{table: [records]}`` batches
+    (the same shape ``CFRManager.parse_title_12_xml`` returns) of roughly
+    ``batch_size`` records.
+
+    Same records as the tree parser - a DIV's name is its first HEAD
+    descendant, a part's authority / source its first AUTH / SOURCE - but
+    built from iterparse events in one pass. Every element is dropped from
+    its parent once it has been read, so memory stays flat however large the
+    title is. Batches are cut on DIV boundaries with every open ancestor
+    already named, and list parents before children, so each one can be
+    bulk-inserted as it arrives. ``sections=True`` also emits DIV8 rows.
+    """
+    ids = dict.fromkeys(TITLE_TABLES, 0)
+    batch = {table: [] for table in TITLE_TABLES if sections or table != 'sections'}
+    pending = 0
+    elements, divs = [], []
+    in_note = 0   # inside an AUTH / SOURCE, whose text is read from its children at the end
+
+    def parent_id(table):
+        for div in reversed(divs):
+            if div.table == table:
+                return div.record['id']
+        return None
+
+    for event, elem in iterparse(file_path, events=('start', 'end')):
+        tag = elem.tag
+        if event == 'start':
+            elements.append(elem)
+            in_note += tag in _PART_NOTES
+            table = _DIV_TABLES.get(tag)
+            if table is not None and (sections or table != 'sections'):
+                ids[table] += 1
+                record = {'id': ids[table], _NAME_COLUMNS[table]: ''}
+                if table == 'chapters':
+                    record['title_id'] = parent_id('titles')
+                elif table == 'parts':
+                    record['chapter_id'] = parent_id('chapters')
+                elif table == 'sections':
+                    record['section_number'] = elem.get('N', '')
+                    record['part_id'] = parent_id('parts')
+                divs.append(_Div(table, record))
+                batch[table].append(record)
+                pending += 1
+            continue
+
+        elements.pop()
+        if tag == 'HEAD':
+            name = clean_string(elem.text or '')
+            for div in divs:
+                if not div.named:
+                    div.record[_NAME_COLUMNS[div.table]] = name
+                    div.named = True
+        elif tag in _PART_NOTES:
+            in_note -= 1
+            part = next((div for div in reversed(divs) if div.table == 'parts'), None)
+            flag, table, column = _PART_NOTES[tag]
+            if part is not None and not getattr(part, flag):
+                setattr(part, flag, True)
+                ids[table] += 1
+                batch[table].append({'id': ids[table], column: clean_string(''.join(elem.itertext())),
+                                     'part_id': part.record['id']})
+                pending += 1
+        elif divs and tag in _DIV_TABLES and divs[-1].table == _DIV_TABLES[tag]:
+            divs.pop()
+            if pending >= batch_size and all(div.named for div in divs):
+                yield batch
+                batch = {table: [] for table in batch}
+                pending = 0
+        # everything under this element has been read - let it go
+        if elements and not in_note:
+            del elements[-1][:]
+
+    if pending:
+        yield batch
@@ -3,7 +3,8 @@ from asyncpg import create_pool
 import os
 import xml.etree.ElementTree as ET
 from xml.etree.ElementTree import ElementTree, Element
-from .cfr_helpers import clean_string
+import asyncio
+from .cfr_helpers import clean_string, iter_title_batches
 from typing import List, Dict, Any
 
 import os
@@ -88,6 +89,17 @@ class CFRManager:
                     part_id INTEGER REFERENCES cfr_part(id)
                 );
             ''')
+
+    async def create_section_table(self):
+        async with self.pool.acquire() as conn:
+            await conn.execute('''
+                CREATE TABLE IF NOT EXISTS cfr_section (
+                    id SERIAL PRIMARY KEY,
+                    section_name TEXT NOT NULL,
+                    section_number TEXT,
+                    part_id INTEGER REFERENCES cfr_part(id)
+                );
+            ''')
     async def batch_insert(self, table_name: str, records: List[Dict[str, Any]]):
         if not records:
             return
@@ -111,62 +123,39 @@ class CFRManager:
 
 
     def parse_title_12_xml(self, file_path: str) -> Dict[str, List[Dict]]:
-        # Initialize data structures to hold parsed data
-        titles = []
-        chapters = []
-        parts = []
-        authorities = []
-        sources = []
-        
-        # Parse the XML file
-        tree = ElementTree()
-        tree.parse(file_path)
-        
-        title_id = 1  # Initialize title_id
-        chapter_id = 1  # Initialize chapter_id
-        part_id = 1  # Initialize part_id
-        
-        for div1 in tree.findall(".//DIV1"):
-            title_name = div1.find(".//HEAD").text if div1.find(".//HEAD") is not None else ""
-            title_name = clean_string(title_name)
-            titles.append({"id": title_id, "title_name": title_name})
-            
-            for div3 in div1.findall(".//DIV3"):
-                chapter_name = div3.find(".//HEAD").text if div3.find(".//HEAD") is not None else ""
-                chapter_name = clean_string(chapter_name)  # Clean the string here
-                chapters.append({"id": chapter_id, "chapter_name": chapter_name, "title_id": title_id})
-                
-                
-                for div5 in div3.findall(".//DIV5"):
-                    part_name = div5.find(".//HEAD").text if div5.find(".//HEAD") is not None else ""
-                    part_name = clean_string(part_name)
-                    parts.append({"id": part_id, "part_name": part_name, "chapter_id": chapter_id})
-                    
-                    authority = div5.find(".//AUTH")
-                    if authority is not None:
-                        authority_text = "".join(authority.itertext())
-                        authority_text = clean_string(authority_text)
-                        authorities.append({"id": len(authorities) + 1, "authority_text": authority_text, "part_id": part_id})
-                    
-                    source = div5.find(".//SOURCE")
-                    if source is not None:
-                        source_text = "".join(source.itertext())
-                        source_text = clean_string(source_text)
-                        sources.append({"id": len(sources) + 1, "source_text": source_text, "part_id": part_id})
-                    
-                    part_id += 1  # Increment part_id for the next part
-                chapter_id += 1  # Increment chapter_id for the next chapter
-            title_id += 1  # Increment title_id for the next title
-    
-        return {
-            "titles": titles,
-            "chapters": chapters,
-            "parts": parts,
-            "authorities": authorities,
-            "sources": sources
-        }
-
-            
+        """
+        Parse a whole title into lists of records. Built on the streaming
+        parser, so only the records themselves are held in memory - use
+        iter_title_xml / insert_title_xml to avoid even that.
+        """
+        parsed = {"titles": [], "chapters": [], "parts": [], "authorities": [], "sources": []}
+        for batch in iter_title_batches(file_path, batch_size=10000):
+            for table, records in batch.items():
+                parsed[table].extend(records)
+        return parsed
+
+    def iter_title_xml(self, file_path: str, batch_size: int = 1000, sections: bool = False):
+        """Yield parse_title_12_xml-shaped batches as the file is read (see cfr_helpers.iter_title_batches)."""
+        return iter_title_batches(file_path, batch_size=batch_size, sections=sections)
+
+    async def insert_title_xml(self, file_path: str, batch_size: int = 2000, sections: bool = False):
+        """
+        Stream a title XML file into the cfr_* tables batch by batch. The next
+        batch is parsed in a worker thread while the current one is inserted.
+        """
+        batches = iter_title_batches(file_path, batch_size=batch_size, sections=sections)
+        counts = {}
+        upcoming = asyncio.ensure_future(asyncio.to_thread(next, batches, None))
+        while True:
+            batch = await upcoming
+            if batch is None:
+                break
+            upcoming = asyncio.ensure_future(asyncio.to_thread(next, batches, None))
+            await self.insert_parsed_data(batch)
+            for table, records in batch.items():
+                counts[table] = counts.get(table, 0) + len(records)
+        return counts
+
     # Add the batch_insert method to the DatabaseManager class
     async def insert_parsed_data(self, parsed_data: Dict[str, List[Dict]]):
         # Insert titles
@@ -184,6 +173,10 @@ class CFRManager:
         # Insert sources
         await self.batch_insert("cfr_source", parsed_data['sources'])
 
+        # Insert sections (streaming parser with sections=True)
+        if parsed_data.get('sections'):
+            await self.batch_insert("cfr_section", parsed_data['sections'])
+
 
     def get_xml_document(self, url, filename):
         r = requests.get(url)
@@ -0,0 +1,244 @@
+import io
+import time
+import pickle
+import struct
+import asyncio
+import logging
+from collections import OrderedDict
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.ipc as ipc
+
+from fudstop4.apis.singleflight import SingleFlight, _share, _worth_holding
+
+
+# envelope: magic (4) + stored_at, fresh_until, stale_until (3 x float64) + payload
+ARROW_MAGIC = b'FDA1'
+PICKLE_MAGIC = b'FDP1'
+_HEADER = struct.Struct('<4sddd')
+
+try:
+    _WRITE_OPTIONS = ipc.IpcWriteOptions(compression='lz4')
+except (pa.ArrowInvalid, pa.ArrowNotImplementedError):
+    _WRITE_OPTIONS = ipc.IpcWriteOptions()
+
+
+def encode_frame(df: pd.DataFrame) -> bytes:
+    """DataFrame -> Arrow IPC stream bytes (dtypes and index kept via the pandas schema metadata)."""
+    table = pa.Table.from_pandas(df, preserve_index=True)
+    sink = pa.BufferOutputStream()
+    with ipc.new_stream(sink, table.schema, options=_WRITE_OPTIONS) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def decode_frame(payload) -> pd.DataFrame:
+    return ipc.open_stream(pa.py_buffer(payload)).read_all().to_pandas()
+
+
+def encode(value, fresh_until: float, stale_until: float) -> bytes:
+    """Envelope a value: Arrow IPC for DataFrames, pickle for anything else."""
+    if isinstance(value, pd.DataFrame):
+        magic, payload = ARROW_MAGIC, encode_frame(value)
+    else:
+        magic, payload = PICKLE_MAGIC, pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+    return _HEADER.pack(magic, time.time(), fresh_until, stale_until) + payload
+
+
+def decode(blob: bytes):
+    """-> (value, fresh_until, stale_until). Legacy JSON (to_json orient='split') entries carry no lifetime: (df, None, None)."""
+    if isinstance(blob, str):
+        blob = blob.encode('utf-8')
+    magic = blob[:4]
+    if magic == ARROW_MAGIC or magic == PICKLE_MAGIC:
+        _, _, fresh_until, stale_until = _HEADER.unpack_from(blob)
+        payload = memoryview(blob)[_HEADER.size:]
+        value = decode_frame(payload) if magic == ARROW_MAGIC else pickle.loads(payload)
+        return value, fresh_until, stale_until
+    df = pd.read_json(io.StringIO(blob.decode('utf-8')), orient='split')
+    return df, None, None
+
+
+class MemoryBackend:
+    """In-process stand-in for the remote tier (tests, or running without redis)."""
+    def __init__(self):
+        self._data = {}
+
+    async def get(self, key: str):
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        if entry[0] is not None and entry[0] <= time.monotonic():
+            del self._data[key]
+            return None
+        return entry[1]
+
+    async def set(self, key: str, blob: bytes, ex: int = None):
+        self._data[key] = (time.monotonic() + ex if ex else None, blob)
+
+    async def delete(self, key: str):
+        self._data.pop(key, None)
+
+    async def close(self):
+        self._data.clear()
+
+
+class RedisBackend:
+    """redis.asyncio client speaking bytes (no decode_responses - payloads are binary)."""
+    def __init__(self, redis_url: str = 'redis://localhost:6379'):
+        import redis.asyncio as redis
+        self._redis = redis.from_url(redis_url, decode_responses=False)
+
+    async def get(self, key: str):
+        return await self._redis.get(key)
+
+    async def set(self, key: str, blob: bytes, ex: int = None):
+        await self._redis.set(key, blob, ex=ex)
+
+    async def delete(self, key: str):
+        await self._redis.delete(key)
+
+    async def close(self):
+        close = getattr(self._redis, 'aclose', None) or self._redis.close
+        await close()
+
+
+class FrameCache:
+    """
+    Two-tier cache for DataFrames (and other picklable results): an
+    in-process LRU (L1) in front of a remote backend (L2, redis), with
+    per-key TTLs and stale-while-revalidate.
+
+    An entry is fresh for ``ttl`` seconds, then servable-but-stale for
+    ``stale_ttl`` more: a stale hit returns immediately and refreshes the key
+    in the background (once, however many callers hit it). Concurrent misses
+    for one key share a single fetch. Empty frames / falsy results - what
+    the fetch helpers return on errors - are never stored.
+
+    >>> cache = FrameCache(RedisBackend(), default_ttl=60, stale_ttl=240)
+    >>> df = await cache.get_or_fetch(f'candles:{ticker}:m5:800', fetch, ttl=30)
+    """
+    def __init__(self, backend=None, l1_size: int = 512, default_ttl: int = 300, stale_ttl: int = 0):
+        self.backend = backend if backend is not None else MemoryBackend()
+        self.l1_size = l1_size
+        self.default_ttl = default_ttl
+        self.stale_ttl = stale_ttl
+        self._l1 = OrderedDict()          # key -> (fresh_until, stale_until, value)
+        self._flight = SingleFlight(ttl=0)
+        self._refreshing = {}
+        self.counts = {'l1_hits': 0, 'l2_hits': 0, 'misses': 0, 'stale_served': 0, 'refreshes': 0,
+                       'errors': 0, 'bytes_out': 0, 'bytes_in': 0}
+
+    def _remember(self, key, fresh_until, stale_until, value):
+        self._l1[key] = (fresh_until, stale_until, value)
+        self._l1.move_to_end(key)
+        while len(self._l1) > self.l1_size:
+            self._l1.popitem(last=False)
+
+    async def _lookup(self, key):
+        """-> (value, fresh_until, stale_until) from L1 then L2, or None."""
+        entry = self._l1.get(key)
+        now = time.time()
+        if entry is not None:
+            if entry[1] > now:
+                self._l1.move_to_end(key)
+                self.counts['l1_hits'] += 1
+                return entry[2], entry[0], entry[1]
+            del self._l1[key]
+        try:
+            blob = await self.backend.get(key)
+        except Exception as e:
+            self.counts['errors'] += 1
+            logging.warning(f"Cache backend get failed for {key}: {e}")
+            return None
+        if blob is None:
+            return None
+        try:
+            value, fresh_until, stale_until = decode(blob)
+        except Exception as e:
+            self.counts['errors'] += 1
+            logging.warning(f"Undecodable cache entry {key}: {e}")
+            return None
+        if fresh_until is None:
+            # pre-envelope entry: give it the default lifetime so L1 doesn't pin it for good
+            fresh_until = stale_until = now + self.default_ttl
+        if stale_until <= now:
+            return None
+        self.counts['l2_hits'] += 1
+        self.counts['bytes_in'] += len(blob)
+        self._remember(key, fresh_until, stale_until, value)
+        return value, fresh_until, stale_until
+
+    async def get(self, key: str, allow_stale: bool = True):
+        found = await self._lookup(key)
+        if found is None or (not allow_stale and found[1] <= time.time()):
+            return None
+        return _share(found[0])
+
+    async def set(self, key: str, value, ttl: int = None, stale_ttl: int = None):
+        if not _worth_holding(value):
+            return
+        ttl = self.default_ttl if ttl is None else ttl
+        stale_ttl = self.stale_ttl if stale_ttl is None else stale_ttl
+        now = time.time()
+        fresh_until, stale_until = now + ttl, now + ttl + stale_ttl
+        self._remember(key, fresh_until, stale_until, _share(value))  # callers keep mutating what they passed in
+        try:
+            blob = encode(value, fresh_until, stale_until)
+            await self.backend.set(key, blob, ex=max(1, int(ttl + stale_ttl)))
+            self.counts['bytes_out'] += len(blob)
+        except Exception as e:
+            self.counts['errors'] += 1
+            logging.warning(f"Cache backend set failed for {key}: {e}")
+
+    async def delete(self, key: str):
+        self._l1.pop(key, None)
+        await self.backend.delete(key)
+
+    async def _fill(self, key, fetch, ttl, stale_ttl):
+        value = await fetch()
+        await self.set(key, value, ttl=ttl, stale_ttl=stale_ttl)
+        return value
+
+    def _refresh(self, key, fetch, ttl, stale_ttl):
+        if key in self._refreshing:
+            return
+        self.counts['refreshes'] += 1
+        task = asyncio.ensure_future(self._fill(key, fetch, ttl, stale_ttl))
+        self._refreshing[key] = task
+
+        def done(t):
+            self._refreshing.pop(key, None)
+            if not t.cancelled() and t.exception() is not None:
+                self.counts['errors'] += 1
+                logging.warning(f"Background refresh failed for {key}: {t.exception()}")
+        task.add_done_callback(done)
+
+    async def get_or_fetch(self, key: str, fetch, ttl: int = None, stale_ttl: int = None):
+        """Cached value for ``key``, else ``await fetch()`` (a zero-arg coroutine function) and cache it."""
+        found = await self._lookup(key)
+        if found is not None:
+            value, fresh_until, _ = found
+            if fresh_until <= time.time():
+                self.counts['stale_served'] += 1
+                self._refresh(key, fetch, ttl, stale_ttl)
+            return _share(value)
+        self.counts['misses'] += 1
+        return await self._flight.do(key, self._fill, key, fetch, ttl, stale_ttl)
+
+    async def close(self):
+        for task in list(self._refreshing.values()):
+            task.cancel()
+        self._l1.clear()
+        await self.backend.close()
+
+    def stats(self) -> dict:
+        lookups = self.counts['l1_hits'] + self.counts['l2_hits'] + self.counts['misses']
+        return {
+            **self.counts,
+            'hit_rate': round((lookups - self.counts['misses']) / lookups, 4) if lookups else None,
+            'l1_entries': len(self._l1),
+            'refreshing': len(self._refreshing),
+            'backend': type(self.backend).__name__,
+        }
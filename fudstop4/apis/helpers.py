@@ -22,6 +22,9 @@ from typing import List, Union, Any, Tuple, Dict, Callable
 from datetime import datetime, timezone
 import pytz
 import pandas as pd
+from fudstop4.apis.singleflight import coalesced
+from fudstop4.apis.rate_limiter import rate_limiter, limited_get_json
+from fudstop4.apis.metrics import timed
 
 # Function to format selected columns in a DataFrame
 headers_sec = {'User-Agent': 'Fudstop https://discord.gg/fudstop', 'Content-Type': 'application/json'}
@@ -2288,6 +2291,8 @@ ta = WebullTA()
 
 
 # ─── UTILITY: RETRY AIOHTTP REQUESTS ─────────────────────────────────────────
+@timed()
+@coalesced('url', 'headers')
 async def fetch_with_retries(
     session: aiohttp.ClientSession,
     url: str,
@@ -2300,9 +2305,7 @@ async def fetch_with_retries(
     """
     for attempt in range(retries):
         try:
-            async with session.get(url, headers=headers, timeout=aiohttp.ClientTimeout(total=10)) as response:
-                response.raise_for_status()
-                return await response.json()
+            return await limited_get_json(session, url, headers=headers, timeout=aiohttp.ClientTimeout(total=10))
         except Exception as e:
             logging.warning(
                 "Attempt %d/%d failed for URL %s: %s",
@@ -11,6 +11,9 @@ load_dotenv()
 import json
 import inspect
 from .tools import fudstop_tools
+from .scheduler import TaskScheduler
+from fudstop4.apis.rate_limiter import rate_limiter, BACKFILL
+from contextvars import ContextVar
 import pandas as pd
 from fudstop4._markets.list_sets.dicts import healthcare,energy,etfs,real_estate,financial_services,communication_services,consumer_cyclical,consumer_defensive,utilities,industrials,basic_materials,technology
 all_tickers = healthcare+energy+etfs+real_estate+financial_services+communication_services+consumer_cyclical+consumer_defensive+utilities+industrials+basic_materials+technology
@@ -41,6 +44,52 @@ class CustomJSONEncoder(json.JSONEncoder):
         # Let the base class default method raise the TypeError
         return super().default(obj)
 
+# while set, batch_insert_dataset queues frames here instead of writing them
+_insert_buffer: ContextVar = ContextVar('master_insert_buffer', default=None)
+
+# concurrent calls allowed per upstream
+UPSTREAM_LIMITS = {
+    'polygon': 10,
+    'webull': 10,
+    'occ': 4,
+    'fed': 2,
+    'earnings_whisper': 2,
+}
+
+# seconds a result stays fresh - market-wide datasets change slowly,
+# quotes/flow do not
+FUNCTION_TTLS = {
+    'fed_ambs': 3600,
+    'fed_securities_lending': 3600,
+    'fed_treasury': 3600,
+    'fed_liquidity_swaps': 3600,
+    'fed_repo': 3600,
+    'fed_soma': 3600,
+    'fed_research': 3600,
+    'fed_marketshare': 3600,
+    'ew_pivots': 900,
+    'ew_sentiment': 900,
+    'ew_upcoming_russell': 900,
+    'ew_upcoming_sector': 900,
+    'ew_today_results': 900,
+    'ew_calendar': 900,
+    'occ_trending': 300,
+    'webull_highs_lows': 60,
+    'webull_top_active': 60,
+    'webull_top_gainers': 60,
+    'webull_top_losers': 60,
+    'webull_top_options': 60,
+    'webull_company_brief': 3600,
+    'webull_financials': 3600,
+    'webull_analysts': 3600,
+    'webull_etf_holdings': 3600,
+    'webull_institutions': 300,
+    'webull_short_interest': 300,
+    'all_poly_options': 5,
+    'all_webull_options': 5,
+    'occ_options': 5,
+}
+
 def custom_json_dumps(data):
     return json.dumps(data, cls=CustomJSONEncoder)
 
@@ -73,6 +122,7 @@ class MasterSDK:
         self.fifteen_days_from_now = (datetime.now() + timedelta(days=15)).strftime('%Y-%m-%d')
         self.eight_days_from_now = (datetime.now() + timedelta(days=8)).strftime('%Y-%m-%d')
         self.eight_days_ago = (datetime.now() - timedelta(days=8)).strftime('%Y-%m-%d') 
+        self.scheduler = TaskScheduler(limits=UPSTREAM_LIMITS, ttls=FUNCTION_TTLS)
            
         self.available_functions = {
             'all_poly_options': self.all_poly_options,
@@ -120,10 +170,27 @@ class MasterSDK:
             # For any other type, return it as is or handle serialization differently
             return record
     async def batch_insert_dataset(self, dataset: pd.DataFrame, table_name, unique_columns) -> None:
-        """Auto batch inserts the dataframe into postgres SQL database."""
+        """Auto batch inserts the dataframe into postgres SQL database.
+
+        Inside run_all_ticker_funcs the frame is queued and written with the
+        rest of its table in flush_inserts instead.
+        """
+        buffer = _insert_buffer.get()
+        if buffer is not None:
+            buffer.setdefault((table_name, unique_columns), []).append(dataset)
+            return
 
         await self.db.batch_insert_dataframe(dataset, table_name=table_name, unique_columns=unique_columns)
 
+    async def flush_inserts(self, buffer: dict) -> None:
+        """Write queued frames - one batch insert per (table, unique columns)."""
+        for (table_name, unique_columns), frames in buffer.items():
+            df = pd.concat(frames, ignore_index=True)
+            subset = [c.strip() for c in unique_columns.split(',') if c.strip() in df.columns]
+            if subset:
+                df = df.drop_duplicates(subset=subset, keep='last')
+            await self.db.batch_insert_dataframe(df, table_name=table_name, unique_columns=unique_columns)
+
 
 
     async def webull_short_interest(self, ticker, limit:int=20, insert:bool=False):
@@ -411,7 +478,7 @@ class MasterSDK:
     async def fed_ambs(self, limit:int=25, insert:bool=False):
         """Get fed agency mortgage backed security data"""
         try:
-            data = self.fed.all_agency_mortgage_backed_securities()
+            data = await self.fed.all_agency_mortgage_backed_securities()
 
             data = data.rename(columns={'operationDate': 'operation_date'})
             if insert == True:
@@ -425,7 +492,7 @@ class MasterSDK:
     async def fed_liquidity_swaps(self, limit:int=25, insert:bool=False):
         """Get fed central liquidity swap data."""
 
-        data = self.fed.central_bank_liquidity_swaps()
+        data = await self.fed.central_bank_liquidity_swaps()
         data = pd.DataFrame(data)
         data = data.rename(columns={'settlementDate': 'settlement_date'})
         if insert == True:
@@ -437,7 +504,7 @@ class MasterSDK:
     async def fed_securities_lending(self, limit:int=25, insert:bool=False):
         """Get fed securities lending operations."""
 
-        data = self.fed.securities_lending_operations()
+        data = await self.fed.securities_lending_operations()
         data = data.rename(columns={'operationDate': 'operation_date'})
         if insert == True:
             await self.batch_insert_dataset(data, table_name='fed_lending', unique_columns='operation_date')
@@ -448,7 +515,7 @@ class MasterSDK:
     async def fed_repo(self, limit:int=25, insert:bool=False):
         """Get fed repo operations data."""
 
-        data = self.fed.reverse_repo()
+        data, _ = await self.fed.reverse_repo()
         data = data.rename(columns={'operationDate': 'operation_date'})
         if insert == True:
             await self.batch_insert_dataset(data, table_name='fed_repo', unique_columns='operation_date')
@@ -460,7 +527,7 @@ class MasterSDK:
     async def fed_treasury(self, limit:int=25, insert:bool=False):
         """Get fed treasury data"""
 
-        data = self.fed.treasury_holdings()
+        data = await self.fed.treasury_holdings()
         data = data.rename(columns={'operationDate': 'operation_date'})
 
         if insert == True:
@@ -473,7 +540,7 @@ class MasterSDK:
     async def fed_marketshare(self, limit:int=25, insert:bool=False):
         """Get market share information from the fed."""
 
-        data = self.fed.market_share()
+        data = await self.fed.market_share()
 
 
         if insert == True:
@@ -485,7 +552,7 @@ class MasterSDK:
     async def fed_soma(self, limit:int=25, insert:bool=False):
         """Get federal reserve system open market account holdings.."""
 
-        data = self.fed.soma_holdings()
+        data = await self.fed.soma_holdings()
         data = data.rename(columns={'asOfDate': 'operation_date'})
         if insert == True:
             await self.batch_insert_dataset(data, table_name='fed_soma', unique_columns='operation_date')
@@ -696,50 +763,72 @@ class MasterSDK:
 
 
     async def run_all_ticker_funcs(self, ticker, high_low_type:str='newHigh', top_option_type:str='volume', most_active_type:str='rvol10d', top_gainer_type:str='preMarket', top_loser_type:str='afterMarket'):
+        """Runs every source for a ticker through the scheduler.
 
-        tasks = [ 
-            self.all_poly_options(ticker=ticker),
-            self.all_webull_options(ticker=ticker),
-            self.occ_options(ticker=ticker),
-            self.webull_analysts(ticker=ticker),
-            self.webull_financials(ticker=ticker),
-            #self.webull_earnings(date=self.eight_days_from_now),
-            self.webull_capital_flow(ticker=ticker),
-            self.webull_etf_holdings(ticker=ticker),
-            self.webull_highs_lows(type=high_low_type),
-            self.webull_institutions(ticker=ticker),
-            self.webull_news(ticker=ticker),
-            self.webull_short_interest(ticker=ticker),
-            self.webull_top_active(most_active_type),
-            self.webull_top_gainers(top_gainer_type),
-            self.webull_top_losers(top_loser_type),
-            self.webull_top_options(top_option_type),
-            self.webull_cost_distribution(ticker=ticker, insert=True),
-            self.webull_company_brief(ticker=ticker),
-            self.webull_vol_anal(ticker=ticker),
-            self.fed_ambs(insert=True),
-            self.fed_securities_lending(insert=True),
-            self.fed_treasury(insert=True),
-            self.fed_liquidity_swaps(insert=True),
-            self.fed_repo(insert=True),
-            self.fed_liquidity_swaps(insert=True),
-            self.fed_soma(insert=True),
-            self.fed_research(insert=True),
-            self.fed_marketshare(insert=True),
-            self.ew_pivots(insert=True),
-            self.ew_sentiment(insert=True),
-            self.ew_upcoming_russell(insert=True),
-            self.ew_upcoming_sector(insert=True),
-            self.ew_today_results(insert=True),
-            self.ew_calendar(insert=True),
-            self.occ_stock_info(ticker=ticker, insert=True),
-            self.occ_monitor(ticker=ticker, insert=True),
-            self.occ_trending(insert=True),
-            
-        ]
-
-
-        await asyncio.gather(*tasks)
+        Market-wide sources (fed, earnings whisper, top lists) are shared across
+        tickers via the scheduler's in-flight dedup + TTL cache, and all
+        insert=True writes are flushed together once the run finishes.
+        Per-source timings: self.scheduler.stats()
+        """
+        run = self.scheduler.run
+        buffer = {}
+        token = _insert_buffer.set(buffer)
+        tasks = []
+        try:
+            sources = [ 
+                run('polygon', self.all_poly_options, ticker=ticker),
+                run('webull', self.all_webull_options, ticker=ticker),
+                run('occ', self.occ_options, ticker=ticker),
+                run('webull', self.webull_analysts, ticker=ticker),
+                run('webull', self.webull_financials, ticker=ticker),
+                #self.webull_earnings(date=self.eight_days_from_now),
+                run('webull', self.webull_capital_flow, ticker=ticker),
+                run('webull', self.webull_etf_holdings, ticker=ticker),
+                run('webull', self.webull_highs_lows, type=high_low_type),
+                run('webull', self.webull_institutions, ticker=ticker),
+                run('webull', self.webull_news, ticker=ticker),
+                run('webull', self.webull_short_interest, ticker=ticker),
+                run('webull', self.webull_top_active, most_active_type),
+                run('webull', self.webull_top_gainers, top_gainer_type),
+                run('webull', self.webull_top_losers, top_loser_type),
+                run('webull', self.webull_top_options, top_option_type),
+                run('webull', self.webull_cost_distribution, ticker=ticker, insert=True),
+                run('webull', self.webull_company_brief, ticker=ticker),
+                run('webull', self.webull_vol_anal, ticker=ticker),
+                run('fed', self.fed_ambs, insert=True),
+                run('fed', self.fed_securities_lending, insert=True),
+                run('fed', self.fed_treasury, insert=True),
+                run('fed', self.fed_liquidity_swaps, insert=True),
+                run('fed', self.fed_repo, insert=True),
+                run('fed', self.fed_soma, insert=True),
+                run('fed', self.fed_research, insert=True),
+                run('fed', self.fed_marketshare, insert=True),
+                run('earnings_whisper', self.ew_pivots, insert=True),
+                run('earnings_whisper', self.ew_sentiment, insert=True),
+                run('earnings_whisper', self.ew_upcoming_russell, insert=True),
+                run('earnings_whisper', self.ew_upcoming_sector, insert=True),
+                run('earnings_whisper', self.ew_today_results, insert=True),
+                run('earnings_whisper', self.ew_calendar, insert=True),
+                run('occ', self.occ_stock_info, ticker=ticker, insert=True),
+                run('occ', self.occ_monitor, ticker=ticker, insert=True),
+                run('occ', self.occ_trending, insert=True),
+                
+            ]
+
+            # bulk ingest - live alerts get served first by the shared limiter
+            with rate_limiter.priority(BACKFILL):
+                tasks = [asyncio.ensure_future(source) for source in sources]
+                results = await asyncio.gather(*tasks, return_exceptions=True)
+        finally:
+            # nothing may still be appending to the buffer once it is flushed
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            _insert_buffer.reset(token)
+            await self.flush_inserts(buffer)
+        errors = [r for r in results if isinstance(r, BaseException)]
+        if errors:
+            raise errors[0]
 
     async def run_technical_funcs(self, rsi_timespan:str='day'):
         tasks = [
@@ -0,0 +1,132 @@
+import asyncio
+import time
+from collections import OrderedDict, defaultdict
+
+import pandas as pd
+
+
+class TaskStats:
+    """Running counters for one scheduled function."""
+    __slots__ = ('calls', 'cache_hits', 'joined', 'errors', 'wait_time', 'run_time', 'max_run_time')
+
+    def __init__(self):
+        self.calls = 0
+        self.cache_hits = 0
+        self.joined = 0
+        self.errors = 0
+        self.wait_time = 0.0
+        self.run_time = 0.0
+        self.max_run_time = 0.0
+
+
+class TaskScheduler:
+    """
+    Runs SDK coroutines with per-upstream concurrency limits, in-flight
+    deduplication of identical calls and a per-function TTL result cache.
+
+    >>> scheduler = TaskScheduler(limits={'fed': 2}, ttls={'fed_ambs': 3600})
+    >>> await scheduler.run('fed', sdk.fed_ambs, insert=True)
+
+    Identical calls (same function + arguments) that arrive while one is already
+    running await that call's result instead of hitting the upstream again; once
+    it completes the result is served from cache until its TTL lapses. At most
+    ``maxsize`` results are held; the least recently stored go first.
+    """
+    def __init__(self, limits: dict = None, ttls: dict = None, default_limit: int = 8, default_ttl: float = 0,
+                 maxsize: int = 1024):
+        self.limits = limits or {}
+        self.ttls = ttls or {}
+        self.default_limit = default_limit
+        self.default_ttl = default_ttl
+        self.maxsize = maxsize
+        self._semaphores = {}
+        self._inflight = {}
+        self._cache = OrderedDict()
+        self._stats = defaultdict(TaskStats)
+
+    def _semaphore(self, group: str) -> asyncio.Semaphore:
+        if group not in self._semaphores:
+            self._semaphores[group] = asyncio.Semaphore(self.limits.get(group, self.default_limit))
+        return self._semaphores[group]
+
+    @staticmethod
+    def _key(func, args, kwargs):
+        return (func.__qualname__, args, tuple(sorted(kwargs.items())))
+
+    async def run(self, group: str, func, *args, **kwargs):
+        """Await ``func(*args, **kwargs)`` under ``group``'s limit, deduplicated and cached."""
+        name = func.__name__
+        stats = self._stats[name]
+        stats.calls += 1
+        key = self._key(func, args, kwargs)
+
+        cached = self._cache.get(key)
+        if cached is not None:
+            if cached[0] > time.monotonic():
+                stats.cache_hits += 1
+                return cached[1]
+            del self._cache[key]
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            stats.joined += 1
+            return await asyncio.shield(inflight)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            queued = time.perf_counter()
+            async with self._semaphore(group):
+                started = time.perf_counter()
+                stats.wait_time += started - queued
+                try:
+                    result = await func(*args, **kwargs)
+                finally:
+                    elapsed = time.perf_counter() - started
+                    stats.run_time += elapsed
+                    stats.max_run_time = max(stats.max_run_time, elapsed)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            stats.errors += 1
+            future.set_exception(e)
+            # mark retrieved so an un-joined failure doesn't warn on gc
+            future.exception()
+            raise
+        else:
+            ttl = self.ttls.get(name, self.default_ttl)
+            if ttl > 0:
+                self._cache[key] = (time.monotonic() + ttl, result)
+                self._cache.move_to_end(key)
+                while len(self._cache) > self.maxsize:
+                    self._cache.popitem(last=False)
+            future.set_result(result)
+            return result
+        finally:
+            self._inflight.pop(key, None)
+
+    def invalidate(self, name: str = None):
+        """Drop cached results for one function name, or everything."""
+        if name is None:
+            self._cache.clear()
+        else:
+            self._cache = OrderedDict((k, v) for k, v in self._cache.items() if k[0].split('.')[-1] != name)
+
+    def stats(self) -> pd.DataFrame:
+        """Per-function timing, sorted by total execution time."""
+        rows = [
+            {
+                'function': name,
+                'calls': s.calls,
+                'cache_hits': s.cache_hits,
+                'joined': s.joined,
+                'errors': s.errors,
+                'wait_time': round(s.wait_time, 4),
+                'run_time': round(s.run_time, 4),
+                'max_run_time': round(s.max_run_time, 4),
+            }
+            for name, s in self._stats.items()
+        ]
+        df = pd.DataFrame(rows, columns=['function', 'calls', 'cache_hits', 'joined', 'errors', 'wait_time', 'run_time', 'max_run_time'])
+        return df.sort_values('run_time', ascending=False, ignore_index=True)
@@ -0,0 +1,288 @@
+import sys
+import time
+import asyncio
+import bisect
+import functools
+import threading
+from collections import defaultdict, Counter
+from contextvars import ContextVar
+from urllib.parse import urlsplit
+
+import pandas as pd
+from aiohttp import web
+
+
+# seconds - prometheus-style upper bounds, +Inf is implied
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+METRICS_PORT = 9464
+
+
+class Histogram:
+    """Fixed-bucket latency histogram (cumulative on export, like prometheus)."""
+    __slots__ = ('bounds', 'counts', 'sum', 'count', 'max')
+
+    def __init__(self, bounds=LATENCY_BUCKETS):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+        self.max = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+        if value > self.max:
+            self.max = value
+
+    def quantile(self, q: float):
+        """Upper bound of the bucket holding the q-th observation (max for the +Inf bucket)."""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for bound, n in zip(self.bounds, self.counts):
+            seen += n
+            if seen >= rank:
+                return min(bound, self.max)
+        return self.max
+
+
+def _labels(**labels):
+    def escape(value):
+        return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+    return '{' + ','.join(f'{k}="{escape(v)}"' for k, v in labels.items()) + '}'
+
+
+# keys already being tracked further up this task's call chain (e.g. timed_safe around a @timed method)
+_active = ContextVar('fudstop_metrics_active', default=frozenset())
+
+
+class _Track:
+    __slots__ = ('registry', 'key', 'start', 'token')
+
+    def __init__(self, registry, key):
+        self.registry = registry
+        self.key = key
+        self.token = None
+
+    def __enter__(self):
+        active = _active.get()
+        if self.key in active:
+            return self  # the outer track owns this call
+        self.token = _active.set(active | {self.key})
+        self.registry.inflight[self.key] += 1
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if self.token is None:
+            return False
+        _active.reset(self.token)
+        registry = self.registry
+        registry.inflight[self.key] -= 1
+        registry.latency[self.key].observe(time.perf_counter() - self.start)
+        if exc_type is not None:
+            registry.errors[(self.key[0], exc_type.__name__)] += 1
+        return False
+
+
+class MetricsRegistry:
+    """
+    In-process metrics for the SDKs: per-function latency histograms (split
+    into ``wait`` - e.g. queued on a semaphore - and ``exec`` phases),
+    in-flight gauges, errors by exception type, and per-host HTTP status
+    counts, latency and bytes.
+
+    >>> @timed()
+    ... async def fetch_page(self, url): ...
+    >>> with metrics.track('PolygonOptions.get_price'):
+    ...     ...
+    >>> await metrics.serve(port=9464)   # /metrics (prometheus text) and /debug/profile
+    """
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.latency = defaultdict(lambda: Histogram(self.buckets))   # (fn, phase)
+        self.inflight = defaultdict(int)                              # (fn, phase)
+        self.errors = Counter()                                       # (fn, exception type)
+        self.http_latency = defaultdict(lambda: Histogram(self.buckets))  # host
+        self.http_status = Counter()                                  # (host, status)
+        self.http_bytes = Counter()                                   # host
+        self.started = time.time()
+        self._runner = None
+        self._loop_thread = None
+
+    def track(self, name: str, phase: str = 'exec') -> _Track:
+        """Context manager: in-flight gauge + latency + error type for one call."""
+        return _Track(self, (name, phase))
+
+    def observe(self, name: str, elapsed: float, phase: str = 'exec'):
+        self.latency[(name, phase)].observe(elapsed)
+
+    def error(self, name: str, exc: BaseException):
+        self.errors[(name, type(exc).__name__)] += 1
+
+    def observe_http(self, url: str, status: int, elapsed: float = None, nbytes: int = None):
+        """Record one HTTP response (status, latency, body size) against its host."""
+        host = urlsplit(url).netloc or url
+        self.http_status[(host, int(status))] += 1
+        if elapsed is not None:
+            self.http_latency[host].observe(elapsed)
+        if nbytes:
+            self.http_bytes[host] += nbytes
+
+    def reset(self):
+        self.latency.clear()
+        self.errors.clear()
+        self.http_latency.clear()
+        self.http_status.clear()
+        self.http_bytes.clear()
+        self.started = time.time()
+
+    def stats(self) -> pd.DataFrame:
+        """Latency summary per function and phase (quantiles are bucket upper bounds)."""
+        errors = Counter()
+        for (name, _), n in self.errors.items():
+            errors[name] += n
+        rows = [
+            {
+                'function': name,
+                'phase': phase,
+                'count': h.count,
+                'inflight': self.inflight.get((name, phase), 0),
+                'errors': errors.get(name, 0) if phase == 'exec' else 0,
+                'total_s': round(h.sum, 4),
+                'mean_ms': round(h.sum / h.count * 1000, 3) if h.count else None,
+                'p50_ms': round(h.quantile(0.5) * 1000, 3) if h.count else None,
+                'p95_ms': round(h.quantile(0.95) * 1000, 3) if h.count else None,
+                'p99_ms': round(h.quantile(0.99) * 1000, 3) if h.count else None,
+                'max_ms': round(h.max * 1000, 3),
+            }
+            for (name, phase), h in list(self.latency.items())
+        ]
+        columns = ['function', 'phase', 'count', 'inflight', 'errors', 'total_s', 'mean_ms', 'p50_ms', 'p95_ms', 'p99_ms', 'max_ms']
+        return pd.DataFrame(rows, columns=columns).sort_values('total_s', ascending=False, ignore_index=True)
+
+    def http_stats(self) -> pd.DataFrame:
+        statuses = defaultdict(dict)
+        for (host, status), n in self.http_status.items():
+            statuses[host][status] = n
+        rows = [
+            {
+                'host': host,
+                'requests': h.count,
+                'mean_ms': round(h.sum / h.count * 1000, 3) if h.count else None,
+                'p95_ms': round(h.quantile(0.95) * 1000, 3) if h.count else None,
+                'bytes': self.http_bytes.get(host, 0),
+                'statuses': dict(sorted(statuses.get(host, {}).items())),
+            }
+            for host, h in list(self.http_latency.items())
+        ]
+        return pd.DataFrame(rows, columns=['host', 'requests', 'mean_ms', 'p95_ms', 'bytes', 'statuses'])
+
+    def _histogram_lines(self, metric, labels, h):
+        lines, cumulative = [], 0
+        for bound, n in zip(h.bounds, h.counts):
+            cumulative += n
+            lines.append(f'{metric}_bucket{_labels(**labels, le=bound)} {cumulative}')
+        lines.append(f'{metric}_bucket{_labels(**labels, le="+Inf")} {h.count}')
+        lines.append(f'{metric}_sum{_labels(**labels)} {h.sum:.6f}')
+        lines.append(f'{metric}_count{_labels(**labels)} {h.count}')
+        return lines
+
+    def render_prometheus(self) -> str:
+        """Prometheus text exposition format (0.0.4)."""
+        lines = [
+            '# HELP fudstop_call_seconds Call latency by function and phase (wait = queued on a semaphore).',
+            '# TYPE fudstop_call_seconds histogram',
+        ]
+        for (name, phase), h in sorted(self.latency.items()):
+            lines += self._histogram_lines('fudstop_call_seconds', {'fn': name, 'phase': phase}, h)
+        lines += ['# HELP fudstop_inflight Calls currently running (or waiting) by function and phase.',
+                  '# TYPE fudstop_inflight gauge']
+        lines += [f'fudstop_inflight{_labels(fn=name, phase=phase)} {n}' for (name, phase), n in sorted(self.inflight.items())]
+        lines += ['# HELP fudstop_errors_total Exceptions raised by function and exception type.',
+                  '# TYPE fudstop_errors_total counter']
+        lines += [f'fudstop_errors_total{_labels(fn=name, type=kind)} {n}' for (name, kind), n in sorted(self.errors.items())]
+        lines += ['# HELP fudstop_http_responses_total HTTP responses by host and status.',
+                  '# TYPE fudstop_http_responses_total counter']
+        lines += [f'fudstop_http_responses_total{_labels(host=host, status=status)} {n}'
+                  for (host, status), n in sorted(self.http_status.items())]
+        lines += ['# HELP fudstop_http_seconds HTTP request latency by host.', '# TYPE fudstop_http_seconds histogram']
+        for host, h in sorted(self.http_latency.items()):
+            lines += self._histogram_lines('fudstop_http_seconds', {'host': host}, h)
+        lines += ['# HELP fudstop_http_bytes_total Response bytes received by host.', '# TYPE fudstop_http_bytes_total counter']
+        lines += [f'fudstop_http_bytes_total{_labels(host=host)} {n}' for host, n in sorted(self.http_bytes.items())]
+        lines += ['# HELP fudstop_metrics_start_time_seconds When this registry started counting.',
+                  '# TYPE fudstop_metrics_start_time_seconds gauge', f'fudstop_metrics_start_time_seconds {self.started:.3f}']
+        return '\n'.join(lines) + '\n'
+
+    def profile(self, seconds: float = 5.0, interval: float = 0.005, thread_id: int = None, top: int = 40) -> str:
+        """
+        Sample one thread's stack every ``interval`` for ``seconds`` (blocking -
+        run it in a worker thread) and return collapsed stacks, flamegraph.pl
+        style, preceded by the hottest leaf functions.
+        """
+        thread_id = thread_id or self._loop_thread or threading.main_thread().ident
+        stacks, leaves = Counter(), Counter()
+        samples = 0
+        deadline = time.perf_counter() + seconds
+        while time.perf_counter() < deadline:
+            frame = sys._current_frames().get(thread_id)
+            if frame is not None:
+                names = []
+                while frame is not None:
+                    code = frame.f_code
+                    names.append(f'{code.co_filename.rsplit("/", 1)[-1]}:{code.co_name}:{frame.f_lineno}')
+                    frame = frame.f_back
+                stacks[';'.join(reversed(names))] += 1
+                leaves[names[0].rsplit(':', 1)[0]] += 1
+                samples += 1
+            time.sleep(interval)
+        lines = [f'# {samples} samples over {seconds}s every {interval * 1000:.1f}ms (thread {thread_id})', '# hottest frames:']
+        lines += [f'#   {n / samples:6.1%}  {name}' for name, n in leaves.most_common(top)] if samples else []
+        lines += [f'{stack} {n}' for stack, n in stacks.most_common()]
+        return '\n'.join(lines) + '\n'
+
+    async def _metrics_handler(self, request):
+        return web.Response(text=self.render_prometheus(), content_type='text/plain', charset='utf-8',
+                            headers={'X-Content-Type-Options': 'nosniff'})
+
+    async def _profile_handler(self, request):
+        seconds = min(float(request.query.get('seconds', 5)), 60.0)
+        interval = max(float(request.query.get('interval', 0.005)), 0.001)
+        text = await asyncio.to_thread(self.profile, seconds, interval)
+        return web.Response(text=text, content_type='text/plain')
+
+    async def serve(self, host: str = '127.0.0.1', port: int = METRICS_PORT):
+        """Expose ``/metrics`` and ``/debug/profile?seconds=5`` from this event loop."""
+        self._loop_thread = threading.get_ident()
+        app = web.Application()
+        app.router.add_get('/metrics', self._metrics_handler)
+        app.router.add_get('/debug/profile', self._profile_handler)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        return site._server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+
+metrics = MetricsRegistry()
+
+
+def timed(name: str = None, registry: MetricsRegistry = None):
+    """Decorator for async functions: latency, in-flight gauge and error types under ``name`` (default: qualname)."""
+    def decorate(func):
+        label = name or func.__qualname__
+
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            with (registry or metrics).track(label):
+                return await func(*args, **kwargs)
+        return wrapper
+    return decorate
@@ -3,15 +3,42 @@ import sys
 import os
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
-import requests
-
 import re
+import time
+import asyncio
 from io import StringIO
 
+import aiohttp
 import pandas as pd
 from .models import AuctionResult, FXSwaps, TimeSeries, AsOfDates, TimeSeriesData, SecuredReferenceRates, RepoOperations, SecuritiesLending
-session = requests.session()
+from fudstop4.apis.metrics import metrics, timed
+from fudstop4.apis.rate_limiter import limited_get_json, rate_limiter
+from fudstop4.apis.singleflight import coalesced
+from fudstop4.apis.treasury.fiscaldata import fiscal_data
 from datetime import datetime, timedelta
+
+# the markets API publishes once or twice a day - a response answers identical calls for this long
+NYFED_TTL = 900
+
+
+@timed()
+@coalesced('url', ttl=NYFED_TTL)
+async def fetch_json(session, url):
+    return await limited_get_json(session, url)
+
+
+@timed()
+@coalesced('url', ttl=NYFED_TTL)
+async def fetch_text(session, url):
+    await rate_limiter.acquire(url)
+    started = time.perf_counter()
+    async with session.get(url) as response:
+        rate_limiter.observe(url, response.status, response.headers.get('Retry-After'))
+        body = await response.read()
+        metrics.observe_http(url, response.status, time.perf_counter() - started, len(body))
+        response.raise_for_status()
+        return body.decode(response.get_encoding())
+
 today_str = datetime.now().strftime('%Y-%m-%d')
 thirty_days_ago = (datetime.now() - timedelta(days=30)).strftime('%Y-%m-%d')
 class FedNewyork:
@@ -19,10 +46,27 @@ class FedNewyork:
         self.base_url = "https://markets.newyorkfed.org/api/"
         self.thirty_days_ago = (datetime.now() - timedelta(days=30)).strftime('%Y-%m-%d')
         self.today = datetime.now().strftime('%Y-%m-%d')
-    def agency_mbs_search(self, start_date=thirty_days_ago, end_date=today_str):
+        self.session = None
+
+    async def get_session(self):
+        if self.session is None or self.session.closed or self.session._loop is not asyncio.get_running_loop():
+            self.session = aiohttp.ClientSession()
+        return self.session
+
+    async def close_session(self):
+        if self.session and not self.session.closed:
+            await self.session.close()
+
+    async def _get(self, url):
+        return await fetch_json(await self.get_session(), url)
+
+    async def _get_text(self, url):
+        return await fetch_text(await self.get_session(), url)
+
+    async def agency_mbs_search(self, start_date=thirty_days_ago, end_date=today_str):
         """Search for AMBS operations out of the Federal Reserve of New York"""
 
-        r = session.get(self.base_url + f"ambs/all/results/summary/search.json?startDate={start_date}&endDate={today_str}").json()
+        r = await self._get(self.base_url + f"ambs/all/results/summary/search.json?startDate={start_date}&endDate={today_str}")
         ambs = r['ambs']
         auctions = ambs['auctions']
         if auctions is not None:
@@ -32,9 +76,9 @@ class FedNewyork:
             return None
     
 
-    def agency_mbs_count(self, number=10):
+    async def agency_mbs_count(self, number=10):
         """Return AMBS transactions by count."""
-        r = session.get(self.base_url + f"ambs/all/results/details/last/{number}.json").json()
+        r = await self._get(self.base_url + f"ambs/all/results/details/last/{number}.json")
         ambs = r['ambs']
         auctions = ambs['auctions']
         if auctions is not None:
@@ -44,16 +88,16 @@ class FedNewyork:
             return None
         
 
-    def soma_holdings(self):
+    async def soma_holdings(self):
         url = f"https://markets.newyorkfed.org/api/soma/summary.json"
-        r = requests.get(url).json()
+        r = await self._get(url)
         soma = r['soma']
         summary = soma['summary'] if 'summary' in soma else None
         if summary is not None:
             return summary
-    def liquidity_swaps_latest(self):
+    async def liquidity_swaps_latest(self):
         """Get the latest central bank liquidity swap data."""
-        r = session.get(self.base_url + f"fxs/all/latest.json").json()
+        r = await self._get(self.base_url + f"fxs/all/latest.json")
         fxSwaps = r['fxSwaps']
         operations = fxSwaps['operations']
         if operations is not None:
@@ -62,9 +106,9 @@ class FedNewyork:
         else:
             return "No recent data found."
         
-    def liquidity_swaps_count(self, number=50):
+    async def liquidity_swaps_count(self, number=50):
         """Get the latest central bank liquidity swap data."""
-        r = session.get(self.base_url + f"fxs/usdollar/last/{number}.json").json()
+        r = await self._get(self.base_url + f"fxs/usdollar/last/{number}.json")
         fxSwaps = r['fxSwaps']
         operations = fxSwaps['operations']
         if operations is not None:
@@ -74,7 +118,7 @@ class FedNewyork:
             return "No recent data found."
         
 
-    def liquidity_swaps_search(self, start_date = "2023-01-01", end_date = today_str, type="trade", counterparties='japan,europe'):
+    async def liquidity_swaps_search(self, start_date = "2023-01-01", end_date = today_str, type="trade", counterparties='japan,europe'):
         """Search for liquidity swaps between a custom date range.
         
         Arguments:
@@ -86,7 +130,7 @@ class FedNewyork:
 
         
 
-        r = session.get(self.base_url + f"fxs/all/search.json?startDate={start_date}&endDate={end_date}&dateType={type}&counterparties={counterparties}").json()
+        r = await self._get(self.base_url + f"fxs/all/search.json?startDate={start_date}&endDate={end_date}&dateType={type}&counterparties={counterparties}")
         fxSwaps = r['fxSwaps']
         operations = fxSwaps['operations']
         if operations is not None:
@@ -96,18 +140,18 @@ class FedNewyork:
             return None
         
 
-    def get_fed_counterparties(self):
+    async def get_fed_counterparties(self):
         """Returns the current counterparties to the Federal Reserve."""
-        r = session.get(self.base_url + "fxs/list/counterparties.json").json()
+        r = await self._get(self.base_url + "fxs/list/counterparties.json")
         fxSwaps = r['fxSwaps']
         counterparties = fxSwaps['counterparties']
         if counterparties is not None:
             return counterparties
 
 
-    def get_as_of_dates(self):
+    async def get_as_of_dates(self):
         """Returns a list of dates to query the FED API with."""
-        r = session.get("https://markets.newyorkfed.org/api/pd/list/asof.json").json()
+        r = await self._get("https://markets.newyorkfed.org/api/pd/list/asof.json")
         pdd = r['pd']
         as_of_dates = pdd['asofdates']
         if as_of_dates is not None:
@@ -116,10 +160,10 @@ class FedNewyork:
         else:
             return None
         
-    def get_timeseries(self):
+    async def get_timeseries(self):
         """Returns the timeseries data to query the FED API"""
 
-        r = requests.get("https://markets.newyorkfed.org/api/pd/list/timeseries.json").json()
+        r = await self._get("https://markets.newyorkfed.org/api/pd/list/timeseries.json")
         pdd = r['pd']
         timeseries = pdd['timeseries']
         if timeseries is not None:
@@ -131,10 +175,10 @@ class FedNewyork:
             return None
 
 
-    def get_timeseries_data(self, timeseries):
+    async def get_timeseries_data(self, timeseries):
         """Use timeseries codes to query the FED API."""
         
-        timeseries_data = requests.get(f"https://markets.newyorkfed.org/api/pd/get/{timeseries}.json").json()
+        timeseries_data = await self._get(f"https://markets.newyorkfed.org/api/pd/get/{timeseries}.json")
         pdd = timeseries_data['pd']
         timeseries = pdd['timeseries']
         if timeseries is not None:
@@ -143,13 +187,13 @@ class FedNewyork:
         else:
             return None
     
-    def reference_rates(self, type):
+    async def reference_rates(self, type):
         """Returns all unsecured central bank rates globally.
         
         Arguments:
         >>> rate_type: secured or unsecured
         """
-        r = session.get(f"https://markets.newyorkfed.org/api/rates/{type}/all/latest.json").json()
+        r = await self._get(f"https://markets.newyorkfed.org/api/rates/{type}/all/latest.json")
         refrates = r['refRates']
 
         if refrates is not None:
@@ -158,23 +202,23 @@ class FedNewyork:
 
         
 
-    def rates_search(self, start_date:str=None, end_date:str=None):
+    async def rates_search(self, start_date:str=None, end_date:str=None):
         """Search reference rates between a given time range."""
         if start_date == None:
             start_date = self.thirty_days_ago
         if end_date == None:
             end_date = self.today
-        r = session.get(self.base_url + f"rates/all/search.json?startDate={start_date}&endDate={end_date}").json()
+        r = await self._get(self.base_url + f"rates/all/search.json?startDate={start_date}&endDate={end_date}")
         refrates = r['refRates']
         if refrates is not None:
             data = SecuredReferenceRates(refrates)
             return data
    
-    def repo_operations_search(self, start_date=None, end_date=today_str):
+    async def repo_operations_search(self, start_date=None, end_date=today_str):
         """Search by date for repo operations out of the FED."""
         if start_date == None:
             start_date = self.thirty_days_ago
-        r = session.get(f"https://markets.newyorkfed.org/api/rp/results/search.json?startDate={start_date}&endDate={end_date}&securityType=mb").json()
+        r = await self._get(f"https://markets.newyorkfed.org/api/rp/results/search.json?startDate={start_date}&endDate={end_date}&securityType=mb")
         repo = r['repo']
         operations = repo['operations']
         if operations is not None:
@@ -183,10 +227,10 @@ class FedNewyork:
 
         
 
-    def repo_latest(self):
+    async def repo_latest(self):
         """Get the latest repo operations from the FED's discount window."""
 
-        r = session.get("https://markets.newyorkfed.org/api/rp/all/all/results/latest.json").json()
+        r = await self._get("https://markets.newyorkfed.org/api/rp/all/all/results/latest.json")
 
         repo = r['repo']
         operations = repo['operations']
@@ -196,9 +240,9 @@ class FedNewyork:
             return data
   
 
-    def repo_propositions(self):
+    async def repo_propositions(self):
         """Check all repo & reverse repo operations out of the FED."""
-        propositions = session.get("https://markets.newyorkfed.org/api/rp/reverserepo/propositions/search.json").json()
+        propositions = await self._get("https://markets.newyorkfed.org/api/rp/reverserepo/propositions/search.json")
 
         repo = propositions['repo']
         operations = repo['operations']
@@ -222,11 +266,11 @@ class FedNewyork:
         return df
 
 
-    def securities_lending_search(self, start_date=None, end_date=today_str):
+    async def securities_lending_search(self, start_date=None, end_date=today_str):
         """Search securities lending operations out of the FED."""
         if start_date == None:
             start_date = self.thirty_days_ago
-        sec_lending = session.get(f"https://markets.newyorkfed.org/api/seclending/all/results/summary/search.json?startDate={start_date}&endDate={end_date}").json()
+        sec_lending = await self._get(f"https://markets.newyorkfed.org/api/seclending/all/results/summary/search.json?startDate={start_date}&endDate={end_date}")
 
         seclending = sec_lending.get('seclending')
         operations = seclending['operations']
@@ -238,7 +282,7 @@ class FedNewyork:
 
 
 
-    def all_agency_mortgage_backed_securities(self):
+    async def all_agency_mortgage_backed_securities(self):
         """Returns Agency Mortgage Backed Securities from the New York Fed API
         
         PARAMS:
@@ -273,7 +317,7 @@ class FedNewyork:
         """
         url = f"https://markets.newyorkfed.org/beta/api/ambs/all/results/details/search.json?startDate={self.thirty_days_ago}&endDate={today_str}"
         print(url)
-        r = requests.get(url).json()
+        r = await self._get(url)
         ambs = r['ambs'] if 'ambs' in r else None
 
         all_data_dicts = []
@@ -316,9 +360,9 @@ class FedNewyork:
 
 
 
-    def securities_lending_operations(self):
+    async def securities_lending_operations(self):
         url="https://markets.newyorkfed.org/api/seclending/all/results/summary/lastTwoWeeks.json"
-        r = requests.get(url).json()
+        r = await self._get(url)
 
         seclending = r['seclending'] if 'seclending' in r else None
         if seclending is not None:
@@ -328,35 +372,34 @@ class FedNewyork:
 
                 return df
 
-    def treasury_holdings(self):
+    async def treasury_holdings(self):
         url = f"https://markets.newyorkfed.org/api/tsy/all/results/summary/last/10.json"
-        r = requests.get(url).json()
+        r = await self._get(url)
         treasury = r['treasury']
         auctions = treasury['auctions'] if 'auctions' in treasury else None
         df = pd.DataFrame(auctions)
         return df
-    def data_act_compliance(self):
-        base_url = "https://api.fiscaldata.treasury.gov/services/api/fiscal_service/"
-        url=base_url+f"/v2/debt/tror/data_act_compliance?filter=record_date:gte:{self.thirty_days_ago},record_date:lte:{today_str}&sort=-record_date,agency_nm,agency_bureau_indicator,bureau_nm"
-        r = requests.get(url).json()
-        data = r['data']
-        df = pd.DataFrame(data)
+    async def data_act_compliance(self):
+        df = await fiscal_data.dataset('v2/debt/tror/data_act_compliance')
+        df = df[(df['record_date'] >= self.thirty_days_ago) & (df['record_date'] <= today_str)]
+        df = df.sort_values(['record_date', 'agency_nm', 'agency_bureau_indicator', 'bureau_nm'],
+                            ascending=[False, True, True, True], ignore_index=True)
 
         return df
 
 
-    def soma_holdings(self):
+    async def soma_holdings(self):
         url = f"https://markets.newyorkfed.org/api/soma/summary.json"
-        r = requests.get(url).json()
+        r = await self._get(url)
         soma = r['soma']
         summary = soma['summary'] if 'summary' in soma else None
 
         df = pd.DataFrame(summary)
         return df        
 
-    def market_share(self):
+    async def market_share(self):
         url="https://markets.newyorkfed.org/api/marketshare/qtrly/latest.json"
-        r = requests.get(url).text
+        r = await self._get_text(url)
 
 
         securityType = re.compile(r'"securityType": "(.*?)"')
@@ -463,7 +506,7 @@ class FedNewyork:
         return df
 
 
-    def central_bank_liquidity_swaps(self):
+    async def central_bank_liquidity_swaps(self):
         """Returns operations out of the fed for central bank liquidity swaps
         
         ARGS:
@@ -477,25 +520,23 @@ class FedNewyork:
 
         url = f"https://markets.newyorkfed.org/api/fxs/usdollar/last/100.json"
 
-        r = requests.get(url).json()
+        r = await self._get(url)
         fxswaps = r["fxSwaps"]
         ops = fxswaps["operations"] if "operations" in fxswaps else None
         if ops is not None:
             return pd.DataFrame(ops)
     
 
-    def primary_dealer_timeseries():
+    async def primary_dealer_timeseries(self):
 
 
         metadata_url = "https://markets.newyorkfed.org/api/pd/list/timeseries.csv"
-        metadata_response = requests.get(metadata_url)
-        metadata_csv = StringIO(metadata_response.text)
+        metadata_csv = StringIO(await self._get_text(metadata_url))
         metadata_df = pd.read_csv(metadata_csv)
 
         # Download timeseries data in CSV format and load it into a DataFrame
         timeseries_url = "https://markets.newyorkfed.org/api/pd/get/all/timeseries.csv"
-        timeseries_response = requests.get(timeseries_url)
-        timeseries_csv = StringIO(timeseries_response.text)
+        timeseries_csv = StringIO(await self._get_text(timeseries_url))
         timeseries_df = pd.read_csv(timeseries_csv)
 
         # Merge the two DataFrames on the common column (assuming it's called 'keyid' in both DataFrames)
@@ -512,11 +553,10 @@ class FedNewyork:
 
 
 
-    def reverse_repo(self):
+    async def reverse_repo(self):
         url = f"https://markets.newyorkfed.org/api/rp/all/all/results/last/10.json"
-        r = requests.get(url)
-        r.raise_for_status()  # This will raise an exception if the request failed
-        repo_data = r.json().get('repo', {})
+        r = await self._get(url)  # raises if the request failed
+        repo_data = r.get('repo', {})
         operations = repo_data.get('operations', [])
 
         all_operations = []
@@ -24,7 +24,7 @@ from .occ_models import flatten_json
 from fudstop4.apis.helpers import format_large_numbers_in_dataframe
 import math
 from typing import List, Dict
-from asyncpg import create_pool
+from fudstop4.apis._asyncpg.pool_registry import pool_registry
 webull_id_df = pd.read_csv('files/ticker_csv.csv')
 ticker_df = pd.read_csv('files/occ_tickers.csv')
 def make_unique(columns):
@@ -122,8 +122,8 @@ class occSDK:
             await self.session.close()
 
     async def connect(self):
-        self.pool = await create_pool(
-            host=self.host, pool=self.pool, password=self.password, database=self.database, port=self.port, min_size=1, max_size=40
+        self.pool = await pool_registry.get_pool(
+            host=self.host, user=self.user, password=self.password, database=self.database, port=self.port, consumer=type(self).__name__
         )
 
         return self.pool
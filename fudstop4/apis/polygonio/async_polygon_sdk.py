@@ -12,7 +12,7 @@ import requests
 import pandas as pd
 from dotenv import load_dotenv
 import aiohttp
-from asyncpg import create_pool
+from fudstop4.apis._asyncpg.pool_registry import pool_registry
 from asyncpg.exceptions import UniqueViolationError
 from urllib.parse import unquote, urlencode
 from aiohttp.client_exceptions import ClientConnectorError, ClientOSError, ClientConnectionError, ContentTypeError
@@ -28,6 +28,9 @@ from .models.gainers_losers import GainersLosers
 from .models.ticker_snapshot import StockSnapshot, SingleStockSnapshot
 from .models.trades import TradeData, LastTradeData
 from .models.daily_open_close import DailyOpenClose
+from fudstop4.apis.singleflight import coalesced
+from fudstop4.apis.rate_limiter import rate_limiter, limited_get_json
+from fudstop4.apis.metrics import metrics, timed
 
 # Load environment variables from .env file
 load_dotenv()
@@ -171,24 +174,22 @@ class Polygon:
             The created asyncpg pool.
         """
         if connection_string:
-            self.pool = await create_pool(
+            self.pool = await pool_registry.get_pool(
                 host=self.host,
                 database=self.database,
                 password=self.password,
                 user=self.user,
                 port=self.port,
-                min_size=1,
-                max_size=30
+                consumer=type(self).__name__
             )
         else:
-            self.pool = await create_pool(
+            self.pool = await pool_registry.get_pool(
                 host=os.environ.get('DB_HOST'),
                 port=os.environ.get('DB_PORT'),
                 user=os.environ.get('DB_USER'),
                 password=os.environ.get('DB_PASSWORD'),
                 database='fudstop3',
-                min_size=1,
-                max_size=10
+                consumer=type(self).__name__
             )
         logger.debug("Database connection pool created.")
         return self.pool
@@ -215,6 +216,8 @@ class Polygon:
 
 
 
+    @timed()
+    @coalesced('url')
     async def fetch_page(self, url: str) -> Optional[dict]:
         """
         Fetch a single page of data from the provided URL.
@@ -229,7 +232,10 @@ class Polygon:
             await self.create_session()
 
         try:
+            await rate_limiter.acquire(url)
             response = await self.session.get(url)
+            rate_limiter.observe(url, response.status_code, response.headers.get('Retry-After'))
+            metrics.observe_http(url, response.status_code, response.elapsed.total_seconds(), len(response.content))
             response.raise_for_status()
             return response.json()
         except httpx.HTTPError as e:
@@ -690,17 +696,15 @@ class Polygon:
             logger.error("Error fetching market news: %s", e, exc_info=True)
             raise
 
+    @timed()
+    @coalesced('url')
     async def fetch_endpoint(self, url: str, session: aiohttp.ClientSession = None) -> dict:
         try:
             if session is None:
                 async with aiohttp.ClientSession() as new_session:
-                    async with new_session.get(url) as response:
-                        response.raise_for_status()
-                        return await response.json()
+                    return await limited_get_json(new_session, url)
             else:
-                async with session.get(url) as response:
-                    response.raise_for_status()
-                    return await response.json()
+                return await limited_get_json(session, url)
         except Exception as e:
             logger.error("Error fetching endpoint: %s", e, exc_info=True)
             raise
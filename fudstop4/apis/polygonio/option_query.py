@@ -0,0 +1,228 @@
+import json
+import math
+import time
+from collections import OrderedDict
+from decimal import Decimal
+from datetime import date, datetime, timedelta
+
+import pandas as pd
+
+from fudstop4.apis._asyncpg.statement_cache import statement_cache, database_key, INTEGER_TYPES, FLOAT_TYPES, NUMERIC_TYPES
+
+
+# filter keyword -> column; ``<column>_min`` / ``<column>_max`` are the bounds
+FILTER_COLUMNS = [
+    'ticker', 'strike', 'expiry', 'open', 'high', 'low', 'close', 'oi', 'vol', 'delta', 'vega',
+    'iv', 'dte', 'gamma', 'theta', 'sensitivity', 'bid', 'ask', 'cp', 'time_value', 'moneyness',
+    'exercise_style', 'option_symbol', 'theta_decay_rate', 'delta_theta_ratio', 'gamma_risk',
+    'vega_impact', 'intrinsic_value', 'extrinsic_value', 'leverage_ratio', 'vwap', 'price',
+    'trade_size', 'spread', 'spread_pct', 'bid_size', 'ask_size', 'mid', 'change_to_breakeven',
+    'underlying_price', 'return_on_risk', 'velocity', 'greeks_balance', 'opp', 'liquidity_score',
+]
+_COLUMN_SET = frozenset(FILTER_COLUMNS)
+
+_OPERATORS = {'min': '>=', 'max': '<=', 'eq': '='}
+
+
+def parse_filter_key(key: str):
+    """``'delta_min'`` -> ``('delta', 'min')``; ``None`` for keys that aren't filters."""
+    if key in _COLUMN_SET:
+        return key, 'eq'
+    column, _, bound = key.rpartition('_')
+    if bound in ('min', 'max') and column in _COLUMN_SET:
+        return column, bound
+    return None
+
+
+def _to_date(value):
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    if isinstance(value, pd.Timestamp):
+        return value.date()
+    try:
+        return datetime.strptime(str(value), '%Y-%m-%d').date()
+    except ValueError:
+        raise ValueError(f"Invalid date format: {value}")
+
+
+def coerce_param(value, pg_type: str, bound: str):
+    """
+    Convert a filter value to what asyncpg expects for ``pg_type``.
+
+    Integer columns round bounds inward (``oi_min=10.5`` -> ``oi >= 11``) so
+    the parameter keeps the column's type and the comparison stays indexable.
+    """
+    if pg_type in INTEGER_TYPES:
+        value = float(value)
+        if bound == 'min':
+            return int(math.ceil(value))
+        if bound == 'max':
+            return int(math.floor(value))
+        return int(value)
+    if pg_type in FLOAT_TYPES:
+        return float(value)
+    if pg_type in NUMERIC_TYPES:
+        return Decimal(str(value))
+    if pg_type == 'date':
+        return _to_date(value)
+    if pg_type and pg_type.startswith('timestamp'):
+        return datetime.combine(_to_date(value), datetime.min.time())
+    return str(value)
+
+
+class OptionFilter:
+    """
+    Typed filter over the options snapshot table.
+
+    Predicates are emitted in a fixed order with bound ``$n`` parameters, so
+    every call with the same set of filter keys produces the same query text
+    and reuses the connection's prepared statement regardless of the values.
+
+    >>> f = OptionFilter(ticker='SPY', delta_min=0.3, delta_max=0.6, expiry_max='2026-12-18')
+    >>> query, params = await f.build(conn)
+    """
+    def __init__(self, table: str = 'opts', select_columns: str = None, base_condition: str = 'oi > 0', **kwargs):
+        self.table = table
+        self.select_columns = select_columns
+        self.base_condition = base_condition
+        self.predicates = {}
+        for key, value in kwargs.items():
+            parsed = parse_filter_key(key)
+            if parsed is not None and value is not None:
+                self.predicates[parsed] = value
+
+    def columns(self):
+        return sorted({column for column, _ in self.predicates})
+
+    def _select(self):
+        if self.select_columns is None:
+            return f"SELECT * FROM {self.table}"
+        return f"SELECT ticker, strike, cp, expiry, {self.select_columns} FROM {self.table}"
+
+    def render(self, column_types: dict):
+        """Query text and parameters given the table's ``{column: data_type}``."""
+        clauses = [self.base_condition] if self.base_condition else []
+        params = []
+        for column, bound in sorted(self.predicates):
+            value = self.predicates[(column, bound)]
+            pg_type = column_types.get(column)
+            position = len(params) + 1
+            if bound == 'eq' and isinstance(value, (list, tuple, set)):
+                params.append([coerce_param(v, pg_type, bound) for v in value])
+                clauses.append(f"{column} = ANY(${position})")
+            else:
+                params.append(coerce_param(value, pg_type, bound))
+                clauses.append(f"{column} {_OPERATORS[bound]} ${position}")
+        query = self._select()
+        if clauses:
+            query += " WHERE " + " AND ".join(clauses)
+        return query, params
+
+    async def build(self, conn):
+        """Render against the live column types (read once per table via the statement cache)."""
+        return self.render(await statement_cache.column_types(conn, self.table))
+
+
+class ResultCache:
+    """Short-lived cache of query results keyed by (database, query, params) - one cache serves every pool."""
+    def __init__(self, ttl: float = 5.0, maxsize: int = 256):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(conn, query, params):
+        return database_key(conn), query, tuple(tuple(p) if isinstance(p, list) else p for p in params)
+
+    def get(self, key):
+        entry = self._entries.get(key)
+        if entry is None or entry[0] <= time.monotonic():
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def put(self, key, value, ttl: float = None):
+        ttl = self.ttl if ttl is None else ttl
+        if ttl <= 0:
+            return
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        self._entries.clear()
+
+
+screen_cache = ResultCache()
+
+
+def _index_shapes():
+    today = date.today()
+    month_out = (today + timedelta(days=30)).isoformat()
+    return {
+        'ticker': (('ticker',), dict(ticker='SPY')),
+        'ticker_expiry_range': (('ticker', 'expiry'), dict(ticker='SPY', expiry_min=today.isoformat(), expiry_max=month_out)),
+        'expiry_range': (('expiry',), dict(expiry_min=today.isoformat(), expiry_max=month_out)),
+        'delta_band': (('delta',), dict(delta_min=0.3, delta_max=0.7)),
+        'iv_band': (('iv',), dict(iv_min=0.2, iv_max=0.6)),
+        'vol_floor': (('vol',), dict(vol_min=1000)),
+        'oi_floor': (('oi',), dict(oi_min=5000)),
+    }
+
+
+def _walk_plan(node):
+    yield node
+    for child in node.get('Plans', ()):
+        yield from _walk_plan(child)
+
+
+def _leading_column(indexdef: str):
+    columns = indexdef[indexdef.rfind('(') + 1:].split(')')[0]
+    return columns.split(',')[0].strip().strip('"')
+
+
+async def advise_indexes(conn, table: str = 'opts') -> pd.DataFrame:
+    """
+    EXPLAIN the common screener shapes against ``table`` and suggest an index
+    for every shape the planner answers with a sequential scan.
+
+    Uses plain EXPLAIN (no ANALYZE) so nothing is executed; on a tiny table
+    the planner prefers seq scans anyway, so read this against production data.
+    """
+    column_types = await statement_cache.column_types(conn, table)
+    indexes = await conn.fetch("SELECT indexname, indexdef FROM pg_indexes WHERE tablename = $1", table)
+    leading = {}
+    for row in indexes:
+        leading.setdefault(_leading_column(row['indexdef']), row['indexname'])
+
+    rows = []
+    for shape, (columns, kwargs) in _index_shapes().items():
+        if any(column not in column_types for column in columns):
+            continue
+        query, params = OptionFilter(table=table, **kwargs).render(column_types)
+        explained = await conn.fetchval(f"EXPLAIN (FORMAT JSON) {query}", *params)
+        plan = (json.loads(explained) if isinstance(explained, str) else explained)[0]['Plan']
+        nodes = [node['Node Type'] for node in _walk_plan(plan)]
+        uses_index = any('Index' in node for node in nodes)
+        existing = leading.get(columns[0])
+        suggestion = None
+        if not uses_index:
+            name = f"idx_{table}_{'_'.join(columns)}"
+            suggestion = f"CREATE INDEX IF NOT EXISTS {name} ON {table} ({', '.join(columns)});"
+        rows.append({
+            'shape': shape,
+            'columns': ', '.join(columns),
+            'plan': ' > '.join(nodes),
+            'uses_index': uses_index,
+            'total_cost': plan.get('Total Cost'),
+            'existing_index': existing,
+            'suggestion': suggestion,
+        })
+    return pd.DataFrame(rows, columns=['shape', 'columns', 'plan', 'uses_index', 'total_cost', 'existing_index', 'suggestion'])
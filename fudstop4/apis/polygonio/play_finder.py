@@ -0,0 +1,118 @@
+import asyncio
+import logging
+
+import numpy as np
+import pandas as pd
+
+
+# every rule is a DataFrame.eval expression over the concatenated chain frame
+PLAY_RULES = {
+    'theta': 'theta >= -0.03',
+    'volume_over_oi': 'volume > oi',
+    'bid': '0.25 <= bid <= 1.75',
+    'ask': '0.25 <= ask <= 1.75',
+}
+
+# RSI status -> the side we look for plays on
+STATUS_CONTRACT_TYPE = {'overbought': 'put', 'oversold': 'call'}
+
+PLAY_COLUMNS = ['ticker', 'status', 'option_symbol', 'strike', 'call_put', 'expiry', 'bid', 'ask',
+                'volume', 'oi', 'theta', 'iv', 'delta', 'vol_oi_ratio', 'score']
+
+
+def score_plays(df: pd.DataFrame, rules: dict = None) -> pd.DataFrame:
+    """
+    Apply ``rules`` to ``df`` in one vectorized pass and rank what survives.
+
+    Score is volume/OI (fresh positioning) discounted by the quoted spread, so
+    tight, active contracts float to the top.
+    """
+    rules = PLAY_RULES if rules is None else rules
+    if df.empty:
+        return pd.DataFrame(columns=PLAY_COLUMNS)
+    mask = np.ones(len(df), dtype=bool)
+    for expression in rules.values():
+        # NaN comparisons are False, so contracts missing a field drop out like before
+        mask &= df.eval(expression).to_numpy(dtype=bool)
+    plays = df.loc[mask].copy()
+    oi = plays['oi'].to_numpy(dtype=float)
+    volume = plays['volume'].to_numpy(dtype=float)
+    bid = plays['bid'].to_numpy(dtype=float)
+    ask = plays['ask'].to_numpy(dtype=float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ratio = np.where(oi > 0, volume / oi, volume)
+        spread = np.where(ask + bid > 0, (ask - bid) / ((ask + bid) / 2), 1.0)
+    plays['vol_oi_ratio'] = np.round(ratio, 3)
+    plays['score'] = np.round(ratio * (1 - np.clip(spread, 0, 1)), 4)
+    plays = plays.sort_values('score', ascending=False, ignore_index=True)
+    return plays.reindex(columns=PLAY_COLUMNS)
+
+
+class PlayFinder:
+    """
+    Finds option plays for a watchlist of (ticker, rsi status) pairs.
+
+    Chains are pulled concurrently - at most ``concurrency`` tickers at once -
+    over the PolygonOptions' shared aiohttp session, and scored with
+    ``score_plays``.
+
+    >>> finder = PlayFinder(opts)
+    >>> async for ticker, plays in finder.stream(extreme_tickers_with_status):
+    ...     await post(plays)
+    """
+    def __init__(self, opts, concurrency: int = 8, rules: dict = None, expiry_gte: str = None, expiry_lte: str = None):
+        self.opts = opts
+        self.concurrency = concurrency
+        self.rules = PLAY_RULES if rules is None else rules
+        self.expiry_gte = expiry_gte or opts.today
+        self.expiry_lte = expiry_lte or opts._90_days_drom_now
+
+    async def _chain(self, semaphore, ticker: str, status: str) -> pd.DataFrame:
+        contract_type = STATUS_CONTRACT_TYPE.get(status)
+        if contract_type is None:
+            return pd.DataFrame()
+        async with semaphore:
+            try:
+                chain = await self.opts.get_option_chain_all(
+                    ticker,
+                    expiration_date_gte=self.expiry_gte,
+                    expiration_date_lte=self.expiry_lte,
+                    contract_type=contract_type,
+                )
+            except Exception as e:
+                logging.error(f"Error fetching chain for {ticker}: {e}")
+                return pd.DataFrame()
+        if chain is None or chain.df.empty:
+            return pd.DataFrame()
+        df = chain.df
+        df['ticker'] = ticker
+        df['status'] = status
+        return df
+
+    async def stream(self, tickers_with_status):
+        """Yield ``(ticker, ranked plays)`` as each chain finishes loading."""
+        semaphore = asyncio.Semaphore(self.concurrency)
+        await self.opts.get_http_session()
+        tasks = [asyncio.ensure_future(self._chain(semaphore, ticker, status))
+                 for ticker, status in tickers_with_status]
+        try:
+            for finished in asyncio.as_completed(tasks):
+                chain = await finished
+                if chain.empty:
+                    continue
+                plays = score_plays(chain, self.rules)
+                if not plays.empty:
+                    yield chain['ticker'].iat[0], plays
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def find(self, tickers_with_status) -> pd.DataFrame:
+        """All chains concatenated and scored once; ranked across the whole watchlist."""
+        semaphore = asyncio.Semaphore(self.concurrency)
+        await self.opts.get_http_session()
+        chains = await asyncio.gather(*(self._chain(semaphore, ticker, status) for ticker, status in tickers_with_status))
+        chains = [chain for chain in chains if not chain.empty]
+        if not chains:
+            return pd.DataFrame(columns=PLAY_COLUMNS)
+        return score_plays(pd.concat(chains, ignore_index=True), self.rules)
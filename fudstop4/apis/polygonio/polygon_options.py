@@ -26,6 +26,12 @@ from fudstop4.apis.helpers import convert_to_eastern_time
 from fudstop4.apis.polygonio.mapping import OPTIONS_EXCHANGES
 from fudstop4._markets.list_sets.dicts import option_conditions
 from fudstop4.all_helpers import chunk_string
+from fudstop4.apis._asyncpg.pool_registry import pool_registry
+from fudstop4.apis._asyncpg.statement_cache import statement_cache
+from fudstop4.apis.polygonio.option_query import OptionFilter, screen_cache, advise_indexes
+from fudstop4.apis.singleflight import coalesced
+from fudstop4.apis.rate_limiter import rate_limiter, limited_get_json
+from fudstop4.apis.metrics import metrics, timed
 
 # Models
 from .models.technicals import RSI
@@ -77,11 +83,14 @@ def convert_ns_to_est(ns_timestamp):
     return est_time.strftime("%Y-%m-%d %H:%M:%S")
 # ---------------------------------------------------------------------------
 # Helper coroutine that runs a coroutine with a timeout and returns a tuple (result, elapsed, error)
+# (recorded in the metrics registry under ``name``, default the coroutine's qualname)
 # ---------------------------------------------------------------------------
-async def timed_safe(coro, timeout: int = 10) -> Tuple[Any, float, Optional[Exception]]:
+async def timed_safe(coro, timeout: int = 10, name: str = None) -> Tuple[Any, float, Optional[Exception]]:
+    name = name or getattr(coro, '__qualname__', 'coroutine')
     start = time.perf_counter()
     try:
-        result = await asyncio.wait_for(coro, timeout=timeout)
+        with metrics.track(name):
+            result = await asyncio.wait_for(coro, timeout=timeout)
         elapsed = time.perf_counter() - start
         return result, elapsed, None
     except Exception as e:
@@ -89,11 +98,17 @@ async def timed_safe(coro, timeout: int = 10) -> Tuple[Any, float, Optional[Exce
         return None, elapsed, e
 
 # ---------------------------------------------------------------------------
-# Helper to run a coroutine under a semaphore with timeout.
+# Helper to run a coroutine under a semaphore with timeout. Time spent queued
+# on the semaphore is recorded separately (phase='wait') from execution.
 # ---------------------------------------------------------------------------
-async def sem_timed(coro, semaphore: asyncio.Semaphore, timeout: int = 10) -> Tuple[Any, float, Optional[Exception]]:
-    async with semaphore:
-        return await timed_safe(coro, timeout=timeout)
+async def sem_timed(coro, semaphore: asyncio.Semaphore, timeout: int = 10, name: str = None) -> Tuple[Any, float, Optional[Exception]]:
+    name = name or getattr(coro, '__qualname__', 'coroutine')
+    with metrics.track(name, phase='wait'):
+        await semaphore.acquire()
+    try:
+        return await timed_safe(coro, timeout=timeout, name=name)
+    finally:
+        semaphore.release()
 
 # ---------------------------------------------------------------------------
 # Helper to inspect an object's attributes.
@@ -228,17 +243,16 @@ class PolygonOptions:
 
     async def connect(self):
         """
-        Initializes the connection pool if it doesn't already exist.
+        Borrows the shared pool for this database if not already holding it.
         """
         if not self.pool:
-            self.pool = await asyncpg.create_pool(
+            self.pool = await pool_registry.get_pool(
                 host=self.host,
                 user=self.user,
                 port=self.port,
                 database=self.database,
                 password=self.password,
-                min_size=1,  # Minimum number of connections in the pool
-                max_size=10  # Adjust based on workload and DB limits
+                consumer=type(self).__name__
             )
         return self.pool
     async def add_column_to_table(self, table_name: str, column_name: str, column_type: str, default_value=None):
@@ -273,6 +287,7 @@ class PolygonOptions:
                     {"DEFAULT " + str(default_value) if default_value is not None else ""};
                 """
                 await conn.execute(alter_query)
+                statement_cache.invalidate(table_name)
                 logging.info(f"✅ Successfully added column '{column_name}' to '{table_name}'.")
                 return True
 
@@ -342,15 +357,15 @@ class PolygonOptions:
     # HTTP / Data Fetching Utilities
     ########################################################################
 
+    @timed()
+    @coalesced('url')
     async def fetch_page(self, url: str) -> dict:
         """
         Fetch a single page of data from a given URL using aiohttp.
         """
         session = await self.get_http_session()
         try:
-            async with session.get(url) as response:
-                response.raise_for_status()
-                return await response.json()
+            return await limited_get_json(session, url)
         except Exception as e:
             logging.error(f"Error fetching {url} - {e}")
             return {}
@@ -547,6 +562,7 @@ class PolygonOptions:
                 END $$;
                 """
                 await connection.execute(alter_query)
+            statement_cache.invalidate(table_name)
 
     def sanitize_value(self, value, col_type):
         """
@@ -586,83 +602,17 @@ class PolygonOptions:
                         [datetime.now() for _ in range(len(df))]
                     )
 
-                    records = df.to_dict(orient='records')
-
                     async with self.pool.acquire() as connection:
-                        column_types = await connection.fetch(
-                            f"""
-                            SELECT column_name, data_type
-                            FROM information_schema.columns
-                            WHERE table_name = '{table_name}'
-                            """
-                        )
-                        type_mapping = {
-                            col['column_name']: col['data_type'] for col in column_types
-                        }
-
-                        # Convert unique_columns to a list if it's a string
-                        if isinstance(unique_columns, str):
-                            unique_columns = [
-                                uc.strip() for uc in unique_columns.split(",")
-                            ]
-
-                        # Build insert query
-                        insert_query = f"""
-                        INSERT INTO {table_name} (
-                            {', '.join(f'"{col}"' for col in df.columns)}
-                        ) 
-                        VALUES (
-                            {', '.join('$' + str(i) for i in range(1, len(df.columns) + 1))}
-                        )
-                        ON CONFLICT ({', '.join(unique_columns)})
-                        DO UPDATE SET {', '.join(f'"{col}" = excluded."{col}"'
-                        for col in df.columns if col not in unique_columns)}
-                        """
-                        batch_data = []
-                        for record in records:
-                            new_record = []
-                            for col, val in record.items():
-                                pg_type = type_mapping.get(col)
-
-                                if pd.isna(val):
-                                    new_record.append(None)
-                                elif pg_type in [
-                                    'timestamp',
-                                    'timestamp without time zone',
-                                    'timestamp with time zone'
-                                ]:
-                                    if isinstance(val, np.datetime64):
-                                        # Convert numpy datetime64 to Python datetime
-                                        new_record.append(
-                                            pd.Timestamp(val).to_pydatetime().replace(tzinfo=None)
-                                        )
-                                    elif isinstance(val, datetime):
-                                        new_record.append(val)
-                                elif pg_type in ['double precision', 'real'] and not isinstance(val, str):
-                                    new_record.append(float(val))
-                                elif isinstance(val, np.int64):
-                                    new_record.append(int(val))
-                                elif pg_type == 'integer' and not isinstance(val, int):
-                                    new_record.append(int(val))
-                                else:
-                                    new_record.append(val)
+                        # query text, column converters and the prepared statement
+                        # are reused for every call with this (table, columns) shape
+                        plan = await statement_cache.plan(connection, table_name, df.columns, unique_columns)
+                        rows = plan.rows(df)
 
-                            batch_data.append(tuple(new_record))
-
-                            if len(batch_data) == batch_size:
-                                try:
-                                    await connection.executemany(insert_query, batch_data)
-                                    batch_data.clear()
-                                except Exception as e:
-                                    logging.error(f"An error occurred while inserting batch: {e}")
-                                    await connection.execute('ROLLBACK')
-
-                        # Insert any leftover data
-                        if batch_data:
+                        for start in range(0, len(rows), batch_size):
                             try:
-                                await connection.executemany(insert_query, batch_data)
+                                await statement_cache.executemany(connection, plan, rows[start:start + batch_size])
                             except Exception as e:
-                                logging.error(f"An error occurred while inserting the record: {e}")
+                                logging.error(f"An error occurred while inserting batch: {e}")
                                 await connection.execute('ROLLBACK')
                 except Exception as e:
                     logging.error(e)
@@ -695,90 +645,15 @@ class PolygonOptions:
                     datetime.now(tz=eastern).replace(tzinfo=None) for _ in range(len(df))
                 ]
 
-                records = df.to_dict(orient='records')
-
-                if isinstance(unique_columns, str):
-                    unique_columns = [uc.strip() for uc in unique_columns.split(",")]
-
                 async with self.pool.acquire() as connection:
-                    # Fetch column types from the DB
-                    column_types = await connection.fetch(
-                        f"""
-                        SELECT column_name, data_type
-                        FROM information_schema.columns
-                        WHERE table_name = '{table_name}'
-                        """
-                    )
-                    type_mapping = {
-                        col['column_name']: col['data_type'] for col in column_types
-                    }
-
-                    # Prepare INSERT ... ON CONFLICT query
-                    insert_query = f"""
-                    INSERT INTO {table_name} (
-                        {', '.join(f'"{col}"' for col in df.columns)}
-                    )
-                    VALUES (
-                        {', '.join(f'${i}' for i in range(1, len(df.columns) + 1))}
-                    )
-                    ON CONFLICT ({', '.join(f'"{col}"' for col in unique_columns)})
-                    DO UPDATE SET {', '.join(
-                        f'"{col}" = EXCLUDED."{col}"'
-                        for col in df.columns if col not in unique_columns
-                    )}
-                    """
-
-                    batch_data = []
-                    for record in records:
-                        new_record = []
-                        for col, val in record.items():
-                            pg_type = type_mapping.get(col)
-                            if pd.isna(val):
-                                new_record.append(None)
-                            elif pg_type in [
-                                'timestamp', 
-                                'timestamp without time zone',
-                                'timestamp with time zone'
-                            ]:
-                                # Force to naive if it might have a tz
-                                if isinstance(val, datetime):
-                                    # strip tz to avoid “Cannot subtract tz-naive and tz-aware” issues
-                                    val = val.replace(tzinfo=None)
-                                    new_record.append(val)
-                                elif isinstance(val, np.datetime64):
-                                    dt_val = pd.Timestamp(val).to_pydatetime()
-                                    dt_val = dt_val.replace(tzinfo=None)
-                                    new_record.append(dt_val)
-                                else:
-                                    new_record.append(val)
-                            elif pg_type in ['double precision', 'real', 'float']:
-                                if not isinstance(val, str):
-                                    new_record.append(float(val))
-                                else:
-                                    new_record.append(val)
-                            elif isinstance(val, np.int64):
-                                new_record.append(int(val))
-                            elif pg_type == 'integer' and not isinstance(val, int):
-                                new_record.append(int(val))
-                            else:
-                                new_record.append(val)
-
-                        batch_data.append(tuple(new_record))
-
-                        if len(batch_data) == batch_size:
-                            try:
-                                await connection.executemany(insert_query, batch_data)
-                                batch_data.clear()
-                            except Exception as e:
-                                logging.error(f"Error during batch insert: {e}")
-                                await connection.execute('ROLLBACK')
+                    plan = await statement_cache.plan(connection, table_name, df.columns, unique_columns)
+                    rows = plan.rows(df)
 
-                    # Insert remaining batch
-                    if batch_data:
+                    for start in range(0, len(rows), batch_size):
                         try:
-                            await connection.executemany(insert_query, batch_data)
+                            await statement_cache.executemany(connection, plan, rows[start:start + batch_size])
                         except Exception as e:
-                            logging.error(f"Error during final batch insert: {e}")
+                            logging.error(f"Error during batch insert: {e}")
                             error_msg = str(e).lower()
 
                             # Specifically handle missing column errors in PostgreSQL
@@ -842,6 +717,8 @@ class PolygonOptions:
             records = await conn.fetch(select_sql)
             return records
 
+    @timed()
+    @coalesced('endpoint', 'params')
     async def fetch_endpoint(self, endpoint: str, params: dict = None):
         """
         Uses endpoint/parameter combos to fetch from the Polygon API. Automatically
@@ -877,167 +754,38 @@ class PolygonOptions:
     # Filtering Methods
     ########################################################################
 
-    async def filter_options(self, select_columns: str = None, **kwargs):
+    async def filter_options(self, select_columns: str = None, cache_ttl: float = None, **kwargs):
         """
         Filters the 'opts' table based on provided keyword arguments (min/max constraints).
         Returns records from the DB.
-        """
-        if select_columns is None:
-            # Return full columns but default to 'oi > 0'
-            query = "SELECT * FROM opts WHERE oi > 0"
-        else:
-            query = (
-                f"SELECT ticker, strike, cp, expiry, {select_columns} FROM opts WHERE oi > 0"
-            )
-
-        column_types = {
-            'ticker': ('ticker', 'string'),
-            'strike': ('strike', 'float'),
-            'strike_min': ('strike', 'float'),
-            'strike_max': ('strike', 'float'),
-            'expiry': ('expiry', 'date'),
-            'expiry_min': ('expiry', 'date'),
-            'expiry_max': ('expiry', 'date'),
-            'open': ('open', 'float'),
-            'open_min': ('open', 'float'),
-            'open_max': ('open', 'float'),
-            'high': ('high', 'float'),
-            'high_min': ('high', 'float'),
-            'high_max': ('high', 'float'),
-            'low': ('low', 'float'),
-            'low_min': ('low', 'float'),
-            'low_max': ('low', 'float'),
-            'oi': ('oi', 'float'),
-            'oi_min': ('oi', 'float'),
-            'oi_max': ('oi', 'float'),
-            'vol': ('vol', 'float'),
-            'vol_min': ('vol', 'float'),
-            'vol_max': ('vol', 'float'),
-            'delta': ('delta', 'float'),
-            'delta_min': ('delta', 'float'),
-            'delta_max': ('delta', 'float'),
-            'vega': ('vega', 'float'),
-            'vega_min': ('vega', 'float'),
-            'vega_max': ('vega', 'float'),
-            'iv': ('iv', 'float'),
-            'iv_min': ('iv', 'float'),
-            'iv_max': ('iv', 'float'),
-            'dte': ('dte', 'string'),
-            'dte_min': ('dte', 'string'),
-            'dte_max': ('dte', 'string'),
-            'gamma': ('gamma', 'float'),
-            'gamma_min': ('gamma', 'float'),
-            'gamma_max': ('gamma', 'float'),
-            'theta': ('theta', 'float'),
-            'theta_min': ('theta', 'float'),
-            'theta_max': ('theta', 'float'),
-            'sensitivity': ('sensitivity', 'float'),
-            'sensitivity_max': ('sensitivity', 'float'),
-            'sensitivity_min': ('sensitivity', 'float'),
-            'bid': ('bid', 'float'),
-            'bid_min': ('bid', 'float'),
-            'bid_max': ('bid', 'float'),
-            'ask': ('ask', 'float'),
-            'ask_min': ('ask', 'float'),
-            'ask_max': ('ask', 'float'),
-            'close': ('close', 'float'),
-            'close_min': ('close', 'float'),
-            'close_max': ('close', 'float'),
-            'cp': ('cp', 'string'),
-            'time_value': ('time_value', 'float'),
-            'time_value_min': ('time_value', 'float'),
-            'time_value_max': ('time_value', 'float'),
-            'moneyness': ('moneyness', 'string'),
-            'exercise_style': ('exercise_style', 'string'),
-            'option_symbol': ('option_symbol', 'string'),
-            'theta_decay_rate': ('theta_decay_rate', 'float'),
-            'theta_decay_rate_min': ('theta_decay_rate', 'float'),
-            'theta_decay_rate_max': ('theta_decay_rate', 'float'),
-            'delta_theta_ratio': ('delta_theta_ratio', 'float'),
-            'delta_theta_ratio_min': ('delta_theta_ratio', 'float'),
-            'delta_theta_ratio_max': ('delta_theta_ratio', 'float'),
-            'gamma_risk': ('gamma_risk', 'float'),
-            'gamma_risk_min': ('gamma_risk', 'float'),
-            'gamma_risk_max': ('gamma_risk', 'float'),
-            'vega_impact': ('vega_impact', 'float'),
-            'vega_impact_min': ('vega_impact', 'float'),
-            'vega_impact_max': ('vega_impact', 'float'),
-            'intrinsic_value_min': ('intrinsic_value', 'float'),
-            'intrinsic_value_max': ('intrinsic_value', 'float'),
-            'intrinsic_value': ('intrinsic_value', 'float'),
-            'extrinsic_value': ('extrinsic_value', 'float'),
-            'extrinsic_value_min': ('extrinsic_value', 'float'),
-            'extrinsic_value_max': ('extrinsic_value', 'float'),
-            'leverage_ratio': ('leverage_ratio', 'float'),
-            'leverage_ratio_min': ('leverage_ratio', 'float'),
-            'leverage_ratio_max': ('leverage_ratio', 'float'),
-            'vwap': ('vwap', 'float'),
-            'vwap_min': ('vwap', 'float'),
-            'vwap_max': ('vwap', 'float'),
-            'price': ('price', 'float'),
-            'price_min': ('price', 'float'),
-            'price_max': ('price', 'float'),
-            'trade_size': ('trade_size', 'float'),
-            'trade_size_min': ('trade_size', 'float'),
-            'trade_size_max': ('trade_size', 'float'),
-            'spread': ('spread', 'float'),
-            'spread_min': ('spread', 'float'),
-            'spread_max': ('spread', 'float'),
-            'spread_pct': ('spread_pct', 'float'),
-            'spread_pct_min': ('spread_pct', 'float'),
-            'spread_pct_max': ('spread_pct', 'float'),
-            'bid_size': ('bid_size', 'float'),
-            'bid_size_min': ('bid_size', 'float'),
-            'bid_size_max': ('bid_size', 'float'),
-            'ask_size': ('ask_size', 'float'),
-            'ask_size_min': ('ask_size', 'float'),
-            'ask_size_max': ('ask_size', 'float'),
-            'mid': ('mid', 'float'),
-            'mid_min': ('mid', 'float'),
-            'mid_max': ('mid', 'float'),
-            'change_to_breakeven': ('change_to_breakeven', 'float'),
-            'change_to_breakeven_min': ('change_to_breakeven', 'float'),
-            'change_to_breakeven_max': ('change_to_breakeven', 'float'),
-            'underlying_price': ('underlying_price', 'float'),
-            'underlying_price_min': ('underlying_price', 'float'),
-            'underlying_price_max': ('underlying_price', 'float'),
-            'return_on_risk': ('return_on_risk', 'float'),
-            'return_on_risk_min': ('return_on_risk', 'float'),
-            'return_on_risk_max': ('return_on_risk', 'float'),
-            'velocity': ('velocity', 'float'),
-            'velocity_min': ('velocity', 'float'),
-            'velocity_max': ('velocity', 'float'),
-            'greeks_balance': ('greeks_balance', 'float'),
-            'greeks_balance_min': ('greeks_balance', 'float'),
-            'greeks_balance_max': ('greeks_balance', 'float'),
-            'opp': ('opp', 'float'),
-            'opp_min': ('opp', 'float'),
-            'opp_max': ('opp', 'float'),
-            'liquidity_score': ('liquidity_score', 'float'),
-            'liquidity_score_min': ('liquidity_score', 'float'),
-            'liquidity_score_max': ('liquidity_score', 'float')
-        }
-
-        # Build the query with min/max or exact matching
-        for key, value in kwargs.items():
-            if key in column_types and value is not None:
-                column, col_type = column_types[key]
-                sanitized_value = self.sanitize_value(value, col_type)
-
-                if 'min' in key:
-                    query += f" AND {column} >= {sanitized_value}"
-                elif 'max' in key:
-                    query += f" AND {column} <= {sanitized_value}"
-                else:
-                    query += f" AND {column} = {sanitized_value}"
 
+        Values are sent as bound parameters (see option_query.OptionFilter) and
+        identical screens against the same database within ``cache_ttl``
+        seconds (default 5) are served from screen_cache.
+        """
+        option_filter = OptionFilter(select_columns=select_columns, **kwargs)
         try:
             async with self.pool.acquire() as conn:
-                return await conn.fetch(query)
+                query, params = await option_filter.build(conn)
+                key = screen_cache.key(conn, query, params)
+                records = screen_cache.get(key)
+                if records is None:
+                    records = await conn.fetch(query, *params)
+                    screen_cache.put(key, records, cache_ttl)
+                return records
         except Exception as e:
             logging.error(f"Error during query: {e}")
             return []
 
+    async def advise_indexes(self, table: str = 'opts') -> pd.DataFrame:
+        """
+        Reports which common screener predicates on ``table`` fall back to a
+        sequential scan, with a CREATE INDEX suggestion for each.
+        """
+        await self.connect()
+        async with self.pool.acquire() as conn:
+            return await advise_indexes(conn, table)
+
     ########################################################################
     # Higher-Level Methods for Option Data
     ########################################################################
@@ -1201,8 +949,11 @@ class PolygonOptions:
             if ticker in ['SPX', 'NDX', 'XSP', 'RUT', 'VIX']:
                 ticker = f"I:{ticker}"
             url = f"https://api.polygon.io/v3/snapshot?ticker.any_of={ticker}&limit=1&apiKey={self.api_key}"
+            await rate_limiter.acquire(url)
             async with httpx.AsyncClient() as client:
                 r = await client.get(url)
+                rate_limiter.observe(url, r.status_code, r.headers.get('Retry-After'))
+                metrics.observe_http(url, r.status_code, r.elapsed.total_seconds(), len(r.content))
                 if r.status_code == 200:
                     resp_data = r.json()
                     results = resp_data.get('results', [])
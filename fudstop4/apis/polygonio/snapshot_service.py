@@ -0,0 +1,222 @@
+import time
+import asyncio
+import logging
+
+import numpy as np
+import pandas as pd
+
+from fudstop4.apis.rate_limiter import rate_limiter, LIVE
+
+
+# columns compared between consecutive snapshots to decide what changed
+DIFF_COLUMNS = ['price', 'bid', 'ask', 'mid', 'volume', 'oi', 'iv', 'delta', 'gamma', 'theta', 'vega', 'change_percent', 'underlying_price']
+
+
+class Snapshot:
+    """
+    One fetch of an option chain. ``df`` is shared by every subscriber - filter
+    or ``.copy()`` before mutating it.
+    """
+    __slots__ = ('underlying', 'df', 'changed', 'sequence', 'fetched_at')
+
+    def __init__(self, underlying, df, changed, sequence, fetched_at):
+        self.underlying = underlying
+        self.df = df
+        self.changed = changed
+        self.sequence = sequence
+        self.fetched_at = fetched_at
+
+    @property
+    def age(self):
+        return time.monotonic() - self.fetched_at
+
+
+def diff_snapshots(previous: pd.DataFrame, current: pd.DataFrame, key: str = 'option_symbol') -> pd.DataFrame:
+    """Rows of ``current`` that are new or whose DIFF_COLUMNS moved since ``previous``."""
+    if previous is None or previous.empty or key not in current.columns:
+        return current
+    columns = [c for c in DIFF_COLUMNS if c in current.columns and c in previous.columns]
+    prev = previous.drop_duplicates(key).set_index(key)[columns]
+    curr = current.drop_duplicates(key).set_index(key)[columns]
+    aligned = prev.reindex(curr.index)
+    new = aligned.isna().all(axis=1).to_numpy() & ~curr.isna().all(axis=1).to_numpy()
+    a = curr.to_numpy(dtype=float, na_value=np.nan)
+    b = aligned.to_numpy(dtype=float, na_value=np.nan)
+    moved = ((a != b) & ~(np.isnan(a) & np.isnan(b))).any(axis=1)
+    changed = set(curr.index[new | moved])
+    return current[current[key].isin(changed)]
+
+
+class Subscription:
+    """
+    A subscriber's bounded queue on a SnapshotFeed.
+
+    When the consumer falls behind, the oldest queued snapshot is dropped in
+    favour of the newest (``dropped`` counts them) - a chain snapshot is state,
+    so only the latest one matters.
+
+    >>> async with snapshot_service.subscribe('SPY', interval=5) as sub:
+    ...     async for snapshot in sub:
+    ...         ...
+    """
+    def __init__(self, feed, maxsize: int = 2):
+        self.feed = feed
+        self.queue = asyncio.Queue(maxsize=maxsize)
+        self.dropped = 0
+
+    def _offer(self, snapshot):
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+        self.queue.put_nowait(snapshot)
+
+    async def get(self) -> Snapshot:
+        return await self.queue.get()
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        return await self.queue.get()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.feed.unsubscribe(self)
+
+
+class SnapshotFeed:
+    """Polls one (underlying, interval, params) chain while anybody is subscribed."""
+    def __init__(self, service, underlying: str, interval: float, params: dict):
+        self.service = service
+        self.underlying = underlying
+        self.interval = interval
+        self.params = params
+        self.subscribers = set()
+        self.latest = None
+        self.fetches = 0
+        self.errors = 0
+        self._sequence = 0
+        self._task = None
+        self._inflight = None
+
+    async def fetch(self) -> Snapshot:
+        """Fetch now; concurrent callers share the same request."""
+        if self._inflight is None:
+            self._inflight = asyncio.ensure_future(self._fetch())
+            self._inflight.add_done_callback(self._clear_inflight)
+        return await asyncio.shield(self._inflight)
+
+    def _clear_inflight(self, future):
+        if self._inflight is future:
+            self._inflight = None
+        if not future.cancelled():
+            future.exception()  # retrieved, even if every awaiting caller was cancelled
+
+    async def _fetch(self) -> Snapshot:
+        self.fetches += 1
+        opts = self.service.get_opts()
+        with rate_limiter.priority(LIVE):
+            chain = await opts.get_option_chain_all(self.underlying, **self.params)
+        if chain is None:
+            self.errors += 1
+            raise RuntimeError(f"No chain returned for {self.underlying}")
+        previous = self.latest.df if self.latest is not None else None
+        self._sequence += 1
+        snapshot = Snapshot(self.underlying, chain.df, diff_snapshots(previous, chain.df), self._sequence, time.monotonic())
+        self.latest = snapshot
+        for subscriber in list(self.subscribers):
+            subscriber._offer(snapshot)
+        return snapshot
+
+    async def _poll(self):
+        while self.subscribers:
+            started = time.monotonic()
+            try:
+                await self.fetch()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logging.error(f"Snapshot feed {self.underlying} failed: {e}")
+            await asyncio.sleep(max(0.0, self.interval - (time.monotonic() - started)))
+
+    def subscribe(self, maxsize: int = 2) -> Subscription:
+        subscription = Subscription(self, maxsize)
+        self.subscribers.add(subscription)
+        if self.latest is not None:
+            subscription._offer(self.latest)
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._poll())
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        self.subscribers.discard(subscription)
+        if not self.subscribers and self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+
+class SnapshotService:
+    """
+    One background poller per (underlying, interval, chain params), fanned out
+    to any number of in-process subscribers - upstream requests scale with the
+    distinct chains being watched, not with the cogs watching them.
+
+    One-off readers (plots, slash commands) use ``snapshot()``, which serves
+    the latest polled snapshot if it is fresh enough and otherwise joins or
+    starts a fetch.
+    """
+    def __init__(self, opts=None):
+        self.opts = opts
+        self.feeds = {}
+
+    def get_opts(self):
+        if self.opts is None:
+            from fudstop4.apis.polygonio.polygon_options import PolygonOptions
+            self.opts = PolygonOptions()
+        return self.opts
+
+    def feed(self, underlying: str, interval: float = 5, **params) -> SnapshotFeed:
+        params = {k: v for k, v in params.items() if v is not None}
+        key = (underlying, interval, tuple(sorted(params.items())))
+        feed = self.feeds.get(key)
+        if feed is None:
+            feed = self.feeds[key] = SnapshotFeed(self, underlying, interval, params)
+        return feed
+
+    def subscribe(self, underlying: str, interval: float = 5, maxsize: int = 2, **params) -> Subscription:
+        return self.feed(underlying, interval, **params).subscribe(maxsize)
+
+    async def snapshot(self, underlying: str, max_age: float = 5, **params) -> Snapshot:
+        """Latest snapshot of any feed for these params no older than ``max_age`` seconds."""
+        params = {k: v for k, v in params.items() if v is not None}
+        wanted = tuple(sorted(params.items()))
+        candidates = [f for (u, _, p), f in self.feeds.items() if u == underlying and p == wanted and f.latest is not None]
+        fresh = [f.latest for f in candidates if f.latest.age <= max_age]
+        if fresh:
+            return min(fresh, key=lambda s: s.age)
+        feed = min(candidates, key=lambda f: f.interval) if candidates else self.feed(underlying, max_age, **params)
+        return await feed.fetch()
+
+    def stats(self) -> pd.DataFrame:
+        rows = [
+            {
+                'underlying': feed.underlying,
+                'interval': feed.interval,
+                'params': feed.params,
+                'subscribers': len(feed.subscribers),
+                'fetches': feed.fetches,
+                'errors': feed.errors,
+                'dropped': sum(s.dropped for s in feed.subscribers),
+                'age': round(feed.latest.age, 3) if feed.latest is not None else None,
+            }
+            for feed in self.feeds.values()
+        ]
+        return pd.DataFrame(rows, columns=['underlying', 'interval', 'params', 'subscribers', 'fetches', 'errors', 'dropped', 'age'])
+
+
+snapshot_service = SnapshotService()
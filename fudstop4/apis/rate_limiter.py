@@ -0,0 +1,245 @@
+import time
+import heapq
+import asyncio
+import itertools
+from contextlib import contextmanager
+from contextvars import ContextVar
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+
+import pandas as pd
+
+from fudstop4.apis.metrics import metrics
+
+
+# priority classes - lower is served first
+LIVE = 0
+DEFAULT = 1
+BACKFILL = 2
+
+# starting / ceiling requests per second per host; everything else uses DEFAULT_RATE
+HOST_RATES = {
+    'api.polygon.io': (50, 200),
+    'quotes-gw.webullfintech.com': (20, 60),
+    'quotes-gw.webullbroker.com': (20, 60),
+    'u1sweb.webullfintech.com': (10, 40),
+    # SEC fair access: 10 requests/sec, fixed
+    'www.sec.gov': (10, 10),
+    'data.sec.gov': (10, 10),
+    'efts.sec.gov': (10, 10),
+    # single hosted app - keep well under what it falls over at
+    'stocksera.pythonanywhere.com': (5, 20),
+}
+DEFAULT_RATE = (10, 100)
+
+THROTTLE_STATUSES = (429, 503)
+
+_priority = ContextVar('fudstop_request_priority', default=DEFAULT)
+
+
+def parse_retry_after(value):
+    """Seconds from a Retry-After header (delta-seconds or HTTP-date); None if absent/garbled."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class HostLimiter:
+    """
+    Token bucket for one upstream host with AIMD rate control.
+
+    Successful responses grow the rate by ``increase`` requests/sec roughly once
+    per second of traffic; a 429/503 halves it (at most once per second, so a
+    burst of throttled in-flight requests counts once) and pauses the bucket for
+    ``Retry-After``. Waiters are granted tokens in priority order. ``max_burst``
+    caps how many tokens an idle bucket banks (hosts that police a sliding
+    window want 1).
+    """
+    def __init__(self, host: str, rate: float, max_rate: float, min_rate: float = 1.0,
+                 increase: float = 1.0, decrease: float = 0.5, max_burst: float = float('inf')):
+        self.host = host
+        self.rate = float(rate)
+        self.max_rate = float(max_rate)
+        self.min_rate = float(min_rate)
+        self.max_burst = float(max_burst)
+        self.increase = increase
+        self.decrease = decrease
+        self.tokens = self.burst
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self.last_decrease = 0.0
+        self.granted = 0
+        self.throttled = 0
+        self.wait_time = 0.0
+        self._waiters = []
+        self._seq = itertools.count()
+        self._wakeup = None
+        self._loop = None
+
+    @property
+    def burst(self):
+        return max(1.0, min(self.rate, self.max_burst))
+
+    @property
+    def queue_depth(self):
+        return sum(1 for _, _, fut in self._waiters if not fut.done())
+
+    def _refill(self, now):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self, priority: int = None):
+        priority = _priority.get() if priority is None else priority
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            # bound to the loop that's running now (asyncio.run per script)
+            self._loop = loop
+            self._wakeup = None
+            self._waiters = []
+        now = time.monotonic()
+        self._refill(now)
+        if not self._waiters and now >= self.blocked_until and self.tokens >= 1:
+            self.tokens -= 1
+            self.granted += 1
+            return
+
+        future = loop.create_future()
+        heapq.heappush(self._waiters, (priority, next(self._seq), future))
+        self._schedule()
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                self.tokens += 1  # granted just as we were cancelled - give it back
+            raise
+        self.wait_time += time.monotonic() - now
+
+    def _schedule(self):
+        if self._wakeup is not None or not self._waiters:
+            return
+        now = time.monotonic()
+        delay = self.blocked_until - now
+        if self.tokens < 1:
+            delay = max(delay, (1 - self.tokens) / self.rate)
+        self._wakeup = self._loop.call_later(max(0.0, delay), self._dispatch)
+
+    def _dispatch(self):
+        self._wakeup = None
+        now = time.monotonic()
+        self._refill(now)
+        if now >= self.blocked_until:
+            while self._waiters and self.tokens >= 1:
+                _, _, future = heapq.heappop(self._waiters)
+                if future.done():
+                    continue
+                self.tokens -= 1
+                self.granted += 1
+                future.set_result(None)
+        while self._waiters and self._waiters[0][2].done():
+            heapq.heappop(self._waiters)
+        self._schedule()
+
+    def observe(self, status: int, retry_after=None):
+        """Feed a response status (and Retry-After header) back into the rate."""
+        now = time.monotonic()
+        if status in THROTTLE_STATUSES:
+            self.throttled += 1
+            if now - self.last_decrease >= 1.0:
+                self.last_decrease = now
+                self.rate = max(self.min_rate, self.rate * self.decrease)
+            self.tokens = min(self.tokens, 0.0)
+            pause = parse_retry_after(retry_after)
+            self.blocked_until = max(self.blocked_until, now + (pause if pause is not None else 1.0 / self.rate))
+        elif status < 400:
+            self.rate = min(self.max_rate, self.rate + self.increase / self.rate)
+
+
+class RateLimiter:
+    """
+    Process-wide limiter - one HostLimiter per upstream host, shared by every SDK.
+
+    >>> await rate_limiter.acquire(url)                 # before the request
+    >>> rate_limiter.observe(url, resp.status, resp.headers.get('Retry-After'))
+    >>> with rate_limiter.priority(LIVE):               # alerts jump the queue
+    ...     await opts.get_price('SPY')
+    """
+    def __init__(self, host_rates: dict = None, default_rate=DEFAULT_RATE):
+        self.host_rates = HOST_RATES if host_rates is None else host_rates
+        self.default_rate = default_rate
+        self.hosts = {}
+
+    def host(self, url: str) -> HostLimiter:
+        host = urlsplit(url).netloc or url
+        limiter = self.hosts.get(host)
+        if limiter is None:
+            rate, max_rate = self.host_rates.get(host.split(':')[0], self.default_rate)
+            limiter = self.hosts[host] = HostLimiter(host, rate, max_rate)
+        return limiter
+
+    async def acquire(self, url: str, priority: int = None):
+        await self.host(url).acquire(priority)
+
+    def observe(self, url: str, status: int, retry_after=None):
+        self.host(url).observe(status, retry_after)
+
+    @staticmethod
+    @contextmanager
+    def priority(level: int):
+        """Requests made inside this block (and tasks it spawns) use ``level``."""
+        token = _priority.set(level)
+        try:
+            yield
+        finally:
+            _priority.reset(token)
+
+    def stats(self) -> pd.DataFrame:
+        """Current rate, queue depth and throttling per host."""
+        now = time.monotonic()
+        rows = [
+            {
+                'host': limiter.host,
+                'rate': round(limiter.rate, 2),
+                'max_rate': limiter.max_rate,
+                'tokens': round(limiter.tokens, 2),
+                'queue_depth': limiter.queue_depth,
+                'granted': limiter.granted,
+                'throttled': limiter.throttled,
+                'blocked_for': round(max(0.0, limiter.blocked_until - now), 3),
+                'wait_time': round(limiter.wait_time, 4),
+            }
+            for limiter in self.hosts.values()
+        ]
+        return pd.DataFrame(rows, columns=['host', 'rate', 'max_rate', 'tokens', 'queue_depth', 'granted', 'throttled', 'blocked_for', 'wait_time'])
+
+
+rate_limiter = RateLimiter()
+
+
+async def limited_get_json(session, url: str, priority: int = None, retries: int = 3, raise_for_status: bool = True, **kwargs):
+    """
+    aiohttp GET through the shared limiter. Throttled responses are retried up
+    to ``retries`` times; the retry waits in the queue behind Retry-After
+    instead of hammering the host. Other error statuses raise, unless
+    ``raise_for_status=False``, in which case their JSON body is returned.
+    """
+    for attempt in range(retries + 1):
+        await rate_limiter.acquire(url, priority)
+        started = time.perf_counter()
+        async with session.get(url, **kwargs) as response:
+            rate_limiter.observe(url, response.status, response.headers.get('Retry-After'))
+            if response.status in THROTTLE_STATUSES and attempt < retries:
+                metrics.observe_http(url, response.status, time.perf_counter() - started)
+                continue
+            if response.status >= 400 and raise_for_status:
+                metrics.observe_http(url, response.status, time.perf_counter() - started)
+                response.raise_for_status()
+            body = await response.read()
+            metrics.observe_http(url, response.status, time.perf_counter() - started, len(body))
+            return await response.json()
@@ -0,0 +1,409 @@
+import os
+import math
+import time
+import heapq
+import random
+import sqlite3
+import asyncio
+import hashlib
+import logging
+import itertools
+import statistics
+from collections import deque
+from datetime import datetime
+from email.utils import parsedate_to_datetime
+from typing import Callable, Optional
+
+import aiohttp
+import pandas as pd
+
+from fudstop4.apis.metrics import metrics
+from fudstop4.apis.rate_limiter import rate_limiter
+from fudstop4.apis.rss.rss_helpers import iter_feed_items
+
+
+RSS_SEEN_INDEX = os.environ.get('FUDSTOP_RSS_INDEX', os.path.join(os.path.expanduser('~'), '.fudstop', 'rss_seen.sqlite'))
+USER_AGENT = os.environ.get('SEC_USER_AGENT', 'fudstop/1.0 (chuckdustin12@gmail.com)')
+
+_ID_FIELDS = ('guid', 'id')
+_TIME_FIELDS = ('published', 'pubDate', 'updated', 'date')
+
+
+def item_id(item: dict) -> str:
+    """guid / Atom id, else the link, else title + timestamp."""
+    for name in _ID_FIELDS:
+        value = item.get(name)
+        if isinstance(value, str):
+            return value
+    link = item.get('link')
+    if isinstance(link, list):
+        link = link[0]
+    if isinstance(link, dict):
+        link = link.get('href')
+    if link:
+        return link
+    return f"{item.get('title')}|{item_time(item)}"
+
+
+def item_time(item: dict) -> Optional[float]:
+    """Epoch seconds of an item's publish / update time (RFC 822 or ISO 8601), None if absent."""
+    for name in _TIME_FIELDS:
+        value = item.get(name)
+        if not isinstance(value, str):
+            continue
+        try:
+            return parsedate_to_datetime(value).timestamp()
+        except (TypeError, ValueError):
+            pass
+        try:
+            return datetime.fromisoformat(value.replace('Z', '+00:00')).timestamp()
+        except ValueError:
+            pass
+    return None
+
+
+class BloomFilter:
+    """Fixed-size bloom filter over 64-bit keys (double hashing on the two 32-bit halves)."""
+    def __init__(self, capacity: int = 1_000_000, error_rate: float = 0.001, bits: bytes = None):
+        self.size = max(64, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray(bits) if bits is not None and len(bits) == (self.size + 7) // 8 else bytearray((self.size + 7) // 8)
+
+    def _positions(self, key: int):
+        low, high = key & 0xFFFFFFFF, (key >> 32) | 1
+        return [(low + i * high) % self.size for i in range(self.hashes)]
+
+    def add(self, key: int):
+        for p in self._positions(key):
+            self.bits[p >> 3] |= 1 << (p & 7)
+
+    def __contains__(self, key: int) -> bool:
+        return all(self.bits[p >> 3] & (1 << (p & 7)) for p in self._positions(key))
+
+
+class SeenIndex:
+    """
+    Persistent record of item ids already delivered: a bloom filter in front
+    of an exact hash set (sqlite, keyed on a 64-bit blake2b of feed + id).
+    Nearly every item on a repeat poll is answered by the bloom filter's
+    "definitely new" or confirmed with one indexed lookup; only true
+    positives ever touch disk. Per-feed ETag / Last-Modified live here too,
+    so a restarted poller keeps sending conditional requests.
+    """
+    def __init__(self, path: str = RSS_SEEN_INDEX, capacity: int = 1_000_000, error_rate: float = 0.001):
+        self.path = path
+        if path != ':memory:':
+            os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self._db = sqlite3.connect(path)
+        self._db.executescript(
+            'CREATE TABLE IF NOT EXISTS seen (hash INTEGER PRIMARY KEY, first_seen REAL NOT NULL);'
+            'CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value BLOB);'
+            'CREATE TABLE IF NOT EXISTS feeds (url TEXT PRIMARY KEY, etag TEXT, last_modified TEXT, body_hash BLOB, interval REAL);')
+        self.count = self._db.execute('SELECT COUNT(*) FROM seen').fetchone()[0]
+        stored = dict(self._db.execute('SELECT key, value FROM meta'))
+        self.bloom = BloomFilter(capacity, error_rate, stored.get('bloom'))
+        if stored.get('bloom') is None or int(stored.get('count', -1)) != self.count or len(self.bloom.bits) != len(stored['bloom']):
+            self.bloom = BloomFilter(capacity, error_rate)
+            for (key,) in self._db.execute('SELECT hash FROM seen'):
+                self.bloom.add(key & 0xFFFFFFFFFFFFFFFF)
+        self.lookups = 0
+        self.bloom_negatives = 0
+
+    @staticmethod
+    def key(feed: str, ident: str) -> int:
+        return int.from_bytes(hashlib.blake2b(f'{feed}\0{ident}'.encode(), digest_size=8).digest(), 'little')
+
+    def filter_new(self, feed: str, idents) -> list:
+        """The idents not seen before (first occurrence wins), recording them as seen."""
+        keys, fresh = {}, []
+        for ident in idents:
+            keys.setdefault(self.key(feed, ident), ident)
+        candidates = []
+        for key in keys:
+            self.lookups += 1
+            if key in self.bloom:
+                candidates.append(key)
+            else:
+                self.bloom_negatives += 1
+        known = set()
+        for i in range(0, len(candidates), 900):
+            chunk = [k - (1 << 64) if k >= 1 << 63 else k for k in candidates[i:i + 900]]
+            rows = self._db.execute(f"SELECT hash FROM seen WHERE hash IN ({','.join('?' * len(chunk))})", chunk)
+            known.update(h & 0xFFFFFFFFFFFFFFFF for (h,) in rows)
+        now = time.time()
+        new_rows = []
+        for key, ident in keys.items():
+            if key in known:
+                continue
+            fresh.append(ident)
+            self.bloom.add(key)
+            new_rows.append((key - (1 << 64) if key >= 1 << 63 else key, now))
+        if new_rows:
+            self._db.executemany('INSERT OR IGNORE INTO seen VALUES (?, ?)', new_rows)
+            self._db.commit()
+            self.count += len(new_rows)
+        return fresh
+
+    def feed_state(self, url: str) -> dict:
+        row = self._db.execute('SELECT etag, last_modified, body_hash, interval FROM feeds WHERE url = ?', (url,)).fetchone()
+        return dict(zip(('etag', 'last_modified', 'body_hash', 'interval'), row)) if row else {}
+
+    def save_feed(self, url: str, etag, last_modified, body_hash, interval):
+        self._db.execute('INSERT OR REPLACE INTO feeds VALUES (?, ?, ?, ?, ?)', (url, etag, last_modified, body_hash, interval))
+        self._db.commit()
+
+    def save(self):
+        self._db.executemany('INSERT OR REPLACE INTO meta VALUES (?, ?)',
+                             [('bloom', bytes(self.bloom.bits)), ('count', str(self.count))])
+        self._db.commit()
+
+    def __len__(self):
+        return self.count
+
+    def close(self):
+        self.save()
+        self._db.close()
+
+
+class FeedState:
+    __slots__ = ('url', 'handler', 'interval', 'due', 'etag', 'last_modified', 'body_hash', 'post_times',
+                 'last_poll', 'backlog', 'polls', 'not_modified', 'unchanged', 'new_items', 'errors', 'bytes')
+
+    def __init__(self, url, handler, interval, backlog):
+        self.url = url
+        self.handler = handler
+        self.interval = interval
+        self.due = 0.0
+        self.etag = self.last_modified = self.body_hash = None
+        self.post_times = deque(maxlen=20)
+        self.last_poll = None
+        self.backlog = backlog
+        self.polls = self.not_modified = self.unchanged = self.new_items = self.errors = self.bytes = 0
+
+    def typical_gap(self) -> Optional[float]:
+        """Median seconds between recent posts, None until there are a few."""
+        times = sorted(self.post_times)
+        gaps = [b - a for a, b in zip(times, times[1:]) if b > a]
+        return statistics.median(gaps) if len(gaps) >= 2 else None
+
+
+class FeedPoller:
+    """
+    One service polling any number of RSS / Atom feeds over a single pooled
+    session.
+
+    Every request is conditional (``If-None-Match`` / ``If-Modified-Since``),
+    so an unchanged feed costs a bodiless 304; servers that ignore those are
+    caught by a body hash and skip the parse. Each feed's interval adapts to
+    how often it posts - half the typical gap between recent items (or
+    between the items the last poll found, if shorter), backing off by
+    ``backoff`` per quiet poll up to twice that gap - clamped to
+    ``[min_interval, max_interval]``. New items (per the persistent
+    SeenIndex) go to the feed's handler, or to ``updates()`` if it has none.
+    Requests share the process rate limiter, so many feeds on one host
+    stay within that host's budget.
+
+    >>> poller = FeedPoller()
+    >>> poller.add('https://www.sec.gov/cgi-bin/browse-edgar?action=getcurrent&type=4&output=atom')
+    >>> asyncio.create_task(poller.run())
+    >>> async for url, items in poller.updates():
+    ...     print(url, len(items))
+    """
+    def __init__(self, seen: SeenIndex = None, min_interval: float = 30, max_interval: float = 3600,
+                 backoff: float = 1.5, concurrency: int = 16, timeout: float = 30, jitter: float = 0.1,
+                 headers: dict = None):
+        self.seen = seen if seen is not None else SeenIndex()
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.jitter = jitter
+        self.headers = {'User-Agent': USER_AGENT, 'Accept-Encoding': 'gzip, deflate', **(headers or {})}
+        self.feeds = {}
+        self._heap = []
+        self._seq = itertools.count()
+        self._updates = asyncio.Queue()
+        self._session = None
+        self._wake = None
+        self._running = False
+
+    def add(self, url: str, handler: Callable = None, interval: float = None, backlog: bool = False):
+        """
+        Start polling ``url``. ``handler(url, items)`` (sync or async) gets each
+        batch of new items. Items already in the feed the first time it's seen
+        are recorded but not delivered unless ``backlog``.
+        """
+        if url in self.feeds:
+            self.feeds[url].handler = handler
+            return self.feeds[url]
+        state = self.seen.feed_state(url)
+        feed = FeedState(url, handler, interval or state.get('interval') or self.min_interval, backlog or bool(state))
+        feed.etag, feed.last_modified, feed.body_hash = state.get('etag'), state.get('last_modified'), state.get('body_hash')
+        self.feeds[url] = feed
+        heapq.heappush(self._heap, (feed.due, next(self._seq), url))
+        if self._wake is not None:
+            self._wake.set()
+        return feed
+
+    def remove(self, url: str):
+        self.feeds.pop(url, None)
+
+    def _session_for_loop(self):
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                headers=self.headers, timeout=aiohttp.ClientTimeout(total=self.timeout),
+                connector=aiohttp.TCPConnector(limit=self.concurrency, ttl_dns_cache=300))
+        return self._session
+
+    def _reschedule(self, feed: FeedState, interval: float):
+        feed.interval = min(self.max_interval, max(self.min_interval, interval))
+        spread = feed.interval * self.jitter
+        feed.due = time.monotonic() + feed.interval + random.uniform(-spread, spread)
+        heapq.heappush(self._heap, (feed.due, next(self._seq), feed.url))
+        if self._wake is not None:
+            self._wake.set()
+
+    def _next_interval(self, feed: FeedState, fresh: int, since_last: Optional[float]) -> float:
+        gap = feed.typical_gap()
+        if fresh:
+            # a burst shows up in this poll long before it moves the median
+            if since_last:
+                gap = min(gap or float('inf'), since_last / fresh)
+            return gap / 2 if gap else feed.interval
+        ceiling = 2 * gap if gap else self.max_interval
+        return min(max(feed.interval, min(ceiling, feed.interval * self.backoff)), max(ceiling, self.min_interval))
+
+    async def poll(self, url: str) -> list:
+        """Fetch one feed now; returns (and dispatches) its new items."""
+        feed = self.feeds[url]
+        session = self._session_for_loop()
+        headers = {}
+        if feed.etag:
+            headers['If-None-Match'] = feed.etag
+        if feed.last_modified:
+            headers['If-Modified-Since'] = feed.last_modified
+        feed.polls += 1
+        now = time.monotonic()
+        since_last, feed.last_poll = (now - feed.last_poll if feed.last_poll else None), now
+        first = feed.body_hash is None and not feed.backlog
+        fresh = []
+        try:
+            await rate_limiter.acquire(url)
+            started = time.perf_counter()
+            async with session.get(url, headers=headers) as response:
+                rate_limiter.observe(url, response.status, response.headers.get('Retry-After'))
+                body = await response.read()
+                metrics.observe_http(url, response.status, time.perf_counter() - started, len(body))
+                feed.bytes += len(body)
+                if response.status == 304:
+                    feed.not_modified += 1
+                elif response.status != 200:
+                    raise aiohttp.ClientResponseError(response.request_info, (), status=response.status)
+                else:
+                    feed.etag = response.headers.get('ETag') or feed.etag
+                    feed.last_modified = response.headers.get('Last-Modified') or feed.last_modified
+                    digest = hashlib.blake2b(body, digest_size=16).digest()
+                    if digest == feed.body_hash:
+                        feed.unchanged += 1
+                    else:
+                        feed.body_hash = digest
+                        fresh = self._new_items(feed, body)
+        except (aiohttp.ClientError, asyncio.TimeoutError, SyntaxError) as e:
+            # ParseError is a SyntaxError; a broken feed backs off like an unreachable one
+            feed.errors += 1
+            logging.warning(f"Feed poll failed for {url}: {e}")
+            self._reschedule(feed, feed.interval * 2)
+            return []
+        self._reschedule(feed, self._next_interval(feed, 0 if first else len(fresh), since_last))
+        self.seen.save_feed(url, feed.etag, feed.last_modified, feed.body_hash, feed.interval)
+        if fresh and not first:
+            feed.new_items += len(fresh)
+            await self._dispatch(feed, fresh)
+            return fresh
+        return []
+
+    def _new_items(self, feed: FeedState, body: bytes) -> list:
+        items = [item for batch in iter_feed_items(body) for item in batch]
+        by_id = {item_id(item): item for item in reversed(items)}
+        fresh_ids = self.seen.filter_new(feed.url, list(by_id))
+        now = time.time()
+        fresh = []
+        for ident in fresh_ids:
+            item = by_id[ident]
+            stamp = item_time(item)
+            feed.post_times.append(stamp if stamp is not None and stamp <= now else now)
+            fresh.append(item)
+        return fresh
+
+    async def _dispatch(self, feed: FeedState, items: list):
+        if feed.handler is None:
+            await self._updates.put((feed.url, items))
+            return
+        try:
+            result = feed.handler(feed.url, items)
+            if asyncio.iscoroutine(result):
+                await result
+        except Exception as e:
+            logging.warning(f"Feed handler failed for {feed.url}: {e}")
+
+    async def updates(self):
+        """(url, new items) for feeds without a handler, as they arrive."""
+        while True:
+            yield await self._updates.get()
+
+    async def run(self):
+        """Poll every due feed (at most ``concurrency`` at a time) until stop()."""
+        self._running = True
+        self._wake = asyncio.Event()
+        semaphore = asyncio.Semaphore(self.concurrency)
+        tasks = set()
+
+        async def poll_one(url):
+            async with semaphore:
+                await self.poll(url)
+
+        try:
+            while self._running:
+                now = time.monotonic()
+                while self._heap and self._heap[0][0] <= now:
+                    due, _, url = heapq.heappop(self._heap)
+                    feed = self.feeds.get(url)
+                    if feed is None or feed.due != due:
+                        continue  # removed, or superseded by a later reschedule
+                    feed.due = float('inf')
+                    task = asyncio.create_task(poll_one(url))
+                    tasks.add(task)
+                    task.add_done_callback(tasks.discard)
+                delay = self._heap[0][0] - now if self._heap else self.max_interval
+                self._wake.clear()
+                try:
+                    await asyncio.wait_for(self._wake.wait(), timeout=max(0.0, delay))
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    def stop(self):
+        self._running = False
+        if self._wake is not None:
+            self._wake.set()
+
+    async def close(self):
+        self.stop()
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+        self.seen.save()
+
+    def stats(self) -> pd.DataFrame:
+        """Per-feed polls, 304s, new items, current interval and seconds until the next poll."""
+        now = time.monotonic()
+        return pd.DataFrame([{
+            'url': f.url, 'polls': f.polls, 'not_modified': f.not_modified, 'unchanged': f.unchanged,
+            'new_items': f.new_items, 'errors': f.errors, 'bytes': f.bytes, 'interval': round(f.interval, 1),
+            'typical_gap': round(f.typical_gap(), 1) if f.typical_gap() else None,
+            'next_poll_in': round(max(0.0, f.due - now), 1) if f.due != float('inf') else 0.0,
+        } for f in self.feeds.values()])
@@ -1,3 +1,4 @@
+import io
 import re
 import requests
 from lxml import etree
@@ -12,12 +13,85 @@ def fix_xml_attributes(xml_content):
     return fixed_xml
 
 
+def _local(tag):
+    return tag.rsplit('}', 1)[-1] if isinstance(tag, str) else tag
+
+
 def xml_to_dataframe(xml_file):
-    tree = ET.parse(xml_file)
-    root = tree.getroot()
-    data = extract_xml_data(root)
-    df = pd.DataFrame([data])
-    return df
+    """
+    One-row frame of every non-blank element text under the root (same
+    result as extract_xml_data: later tags of the same name win, in document
+    order). Streamed with iterparse - elements are dropped as soon as their
+    text has been read.
+    """
+    fields, slots, elements = [], [], []
+    for event, elem in ET.iterparse(xml_file, events=('start', 'end')):
+        if event == 'start':
+            # slots are taken at start so the overwrite order matches a pre-order walk
+            slots.append(len(fields) if elements else None)
+            if elements:
+                fields.append([elem.tag, None])
+            elements.append(elem)
+            continue
+        slot = slots.pop()
+        elements.pop()
+        if slot is not None and elem.text and elem.text.strip():
+            fields[slot][1] = elem.text.strip()
+        if elements:
+            del elements[-1][:]
+    data = {tag: text for tag, text in fields if text is not None}
+    return pd.DataFrame([data])
+
+
+def iter_feed_items(source, batch_size: int = 500):
+    """
+    Stream an RSS (``<item>``) or Atom (``<entry>``) feed and yield lists of
+    up to ``batch_size`` flat dicts - namespace-free child tag -> text (or
+    the attributes for empty elements like Atom ``<link href>`` and
+    ``<category term>``; repeated tags become lists). ``source`` is a path,
+    a file object or the raw bytes.
+    """
+    if isinstance(source, (bytes, bytearray)):
+        source = io.BytesIO(source)
+    batch, elements = [], []
+    in_item = 0
+    for event, elem in ET.iterparse(source, events=('start', 'end')):
+        is_item = _local(elem.tag) in ('item', 'entry')
+        if event == 'start':
+            elements.append(elem)
+            in_item += is_item
+            continue
+        elements.pop()
+        if is_item:
+            in_item -= 1
+            record = {}
+            for child in elem.iter():
+                if child is elem:
+                    continue
+                text = child.text.strip() if child.text else ''
+                if not text and not child.attrib:
+                    continue
+                name = _local(child.tag)
+                value = text or dict(child.attrib)
+                if name in record:
+                    existing = record[name]
+                    record[name] = existing + [value] if isinstance(existing, list) else [existing, value]
+                else:
+                    record[name] = value
+            batch.append(record)
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+        # an item's children are needed until the item ends; everything else goes once read
+        if elements and not in_item:
+            del elements[-1][:]
+    if batch:
+        yield batch
+
+
+def feed_to_dataframe(source) -> pd.DataFrame:
+    """All items of a feed as a frame (see iter_feed_items)."""
+    return pd.DataFrame([record for batch in iter_feed_items(source) for record in batch])
 
 
 def extract_xml_data(element, parent_name=''):
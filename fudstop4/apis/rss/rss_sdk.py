@@ -46,27 +46,46 @@ class RSSSDK:
         self.fifteen_days_from_now = (datetime.now() + timedelta(days=15)).strftime('%Y-%m-%d')
         self.eight_days_from_now = (datetime.now() + timedelta(days=8)).strftime('%Y-%m-%d')
         self.eight_days_ago = (datetime.now() - timedelta(days=8)).strftime('%Y-%m-%d')
+        self._session = None
+        self._feed_cache = {}  # url -> (conditional request headers, last body)
 
     
 
     async def fetch_new_posts(self,url):
+        """
+        Newest post of a JSON feed. One session is kept across calls and each
+        request is conditional on the last ETag / Last-Modified, so an unchanged
+        feed is a 304 answered from the cached body. To watch many RSS / Atom
+        feeds use feed_poller.FeedPoller.
+        """
         last_update_time = None
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(headers=self.headers)
 
         while True:
-            async with aiohttp.ClientSession(headers=self.headers) as session:
-                async with session.get(url) as resp:
-         
-
+            validators, cached = self._feed_cache.get(url, ({}, None))
+            async with self._session.get(url, headers=validators) as resp:
+                if resp.status == 304 and cached is not None:
+                    feed_data = cached
+                else:
                     feed_data = await resp.json()
+                    validators = {header: resp.headers[source] for header, source in
+                                  (('If-None-Match', 'ETag'), ('If-Modified-Since', 'Last-Modified')) if source in resp.headers}
+                    self._feed_cache[url] = (validators, feed_data)
 
-                    for post in feed_data:
-                        post_time = post['date']
-                        if post_time != last_update_time:
-                            last_update_time = post_time
-                            return post
+            for post in feed_data:
+                post_time = post['date']
+                if post_time != last_update_time:
+                    last_update_time = post_time
+                    return post
 
             await asyncio.sleep(60)  # Wait for 60 seconds before fetching the feed again
 
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
 
 
     async def company_filings(self, ticker, as_dataframe:bool=False, limit:str='100'):
@@ -0,0 +1,402 @@
+import io
+import os
+import time
+import sqlite3
+import asyncio
+import logging
+from datetime import date, datetime
+from dataclasses import dataclass, fields, astuple
+from typing import List, Optional
+
+import aiohttp
+
+from fudstop4.apis.metrics import metrics
+from fudstop4.apis.rate_limiter import rate_limiter
+from fudstop4.apis._asyncpg.pool_registry import pool_registry
+
+try:
+    from lxml.etree import iterparse
+except ImportError:
+    from xml.etree.ElementTree import iterparse
+
+
+SEC_BASE = 'https://www.sec.gov'
+SEC_RATE = 10   # requests/sec - SEC's fair access limit, shared by every caller in the process
+USER_AGENT = os.environ.get('SEC_USER_AGENT', 'fudstop/1.0 (chuckdustin12@gmail.com)')
+FORM4_INDEX = os.environ.get('FUDSTOP_FORM4_INDEX', os.path.join(os.path.expanduser('~'), '.fudstop', 'form4_index.sqlite'))
+FORM4_TYPES = ('4', '4/A')
+
+
+@dataclass
+class Form4Filing:
+    accession: str
+    filed: Optional[date]
+    document_type: Optional[str]
+    period: Optional[date]
+    issuer_cik: Optional[str]
+    issuer_name: Optional[str]
+    ticker: Optional[str]
+    owner_cik: Optional[str]
+    owner_name: Optional[str]
+    owner_count: int
+    is_director: bool
+    is_officer: bool
+    is_ten_pct: bool
+    is_other: bool
+    officer_title: Optional[str]
+    aff10b5one: Optional[bool]
+
+
+@dataclass
+class Form4Transaction:
+    accession: str
+    line: int
+    kind: str                       # non_derivative / derivative, _holding for rows without a transaction
+    security_title: Optional[str]
+    transaction_date: Optional[date]
+    code: Optional[str]
+    shares: Optional[float]
+    price: Optional[float]
+    acquired_disposed: Optional[str]
+    shares_after: Optional[float]
+    ownership: Optional[str]
+    exercise_price: Optional[float]
+    expiration_date: Optional[date]
+    underlying_title: Optional[str]
+    underlying_shares: Optional[float]
+
+
+def _date(text):
+    try:
+        return datetime.strptime(text[:10], '%Y-%m-%d').date()
+    except (TypeError, ValueError):
+        return None
+
+
+def _float(text):
+    try:
+        return float(text.replace(',', ''))
+    except (AttributeError, ValueError):
+        return None
+
+
+def _flag(text):
+    return None if text is None else text.strip().lower() in ('1', 'true')
+
+
+_TXN_TAGS = {'nonDerivativeTransaction': 'non_derivative', 'derivativeTransaction': 'derivative',
+             'nonDerivativeHolding': 'non_derivative_holding', 'derivativeHolding': 'derivative_holding'}
+# element (or the element wrapping <value>) -> (field, converter)
+_TXN_FIELDS = {
+    'securityTitle': ('security_title', str), 'transactionDate': ('transaction_date', _date),
+    'transactionCode': ('code', str), 'transactionShares': ('shares', _float),
+    'transactionPricePerShare': ('price', _float), 'transactionAcquiredDisposedCode': ('acquired_disposed', str),
+    'sharesOwnedFollowingTransaction': ('shares_after', _float), 'directOrIndirectOwnership': ('ownership', str),
+    'conversionOrExercisePrice': ('exercise_price', _float), 'expirationDate': ('expiration_date', _date),
+    'underlyingSecurityTitle': ('underlying_title', str), 'underlyingSecurityShares': ('underlying_shares', _float),
+}
+_FILING_FIELDS = {
+    'documentType': ('document_type', str), 'periodOfReport': ('period', _date), 'issuerCik': ('issuer_cik', str),
+    'issuerName': ('issuer_name', str), 'issuerTradingSymbol': ('ticker', str), 'rptOwnerCik': ('owner_cik', str),
+    'rptOwnerName': ('owner_name', str), 'isDirector': ('is_director', _flag), 'isOfficer': ('is_officer', _flag),
+    'isTenPercentOwner': ('is_ten_pct', _flag), 'isOther': ('is_other', _flag),
+    'officerTitle': ('officer_title', str), 'aff10b5One': ('aff10b5one', _flag),
+}
+
+
+def ownership_xml(document: bytes) -> Optional[bytes]:
+    """The <ownershipDocument> out of a full submission .txt (or a bare XML file)."""
+    start = document.find(b'<ownershipDocument')
+    end = document.rfind(b'</ownershipDocument>')
+    if start < 0 or end < 0:
+        return None
+    return document[start:end + len(b'</ownershipDocument>')]
+
+
+def parse_form4(document: bytes, accession: str, filed: date = None):
+    """
+    Form 4 / 4/A ownership XML -> (Form4Filing, [Form4Transaction]) in one
+    iterparse pass - no BeautifulSoup, no xsl-rendered HTML. Issuer / owner
+    fields come from the first reporting owner; flags a later owner sets are
+    OR-ed in and ``owner_count`` says how many there were.
+    """
+    xml = ownership_xml(document)
+    if xml is None:
+        return None, []
+    filing = {'owner_count': 0}
+    flags = {'is_director': False, 'is_officer': False, 'is_ten_pct': False, 'is_other': False}
+    transactions, current, line = [], None, 0
+    parents = []
+    for event, elem in iterparse(io.BytesIO(xml), events=('start', 'end')):
+        tag = elem.tag
+        if event == 'start':
+            parents.append(tag)
+            if tag in _TXN_TAGS:
+                line += 1
+                current = {'kind': _TXN_TAGS[tag]}
+            elif tag == 'reportingOwner':
+                filing['owner_count'] += 1
+            continue
+        parents.pop()
+        if tag in _TXN_TAGS:
+            transactions.append(Form4Transaction(accession=accession, line=line, **{
+                name: current.get(name) for name in Form4Transaction.__dataclass_fields__ if name not in ('accession', 'line')}))
+            current = None
+        else:
+            text = elem.text.strip() if elem.text and elem.text.strip() else None
+            # most values are wrapped: <transactionShares><value>100</value></transactionShares>
+            key = parents[-1] if tag == 'value' and parents else tag
+            if text is not None:
+                if current is not None and key in _TXN_FIELDS:
+                    name, convert = _TXN_FIELDS[key]
+                    current.setdefault(name, convert(text))
+                elif current is None and key in _FILING_FIELDS:
+                    name, convert = _FILING_FIELDS[key]
+                    if name in flags:
+                        flags[name] = flags[name] or convert(text)
+                    else:
+                        filing.setdefault(name, convert(text))
+        elem.clear()
+    record = Form4Filing(accession=accession, filed=filed, **flags, **{
+        name: filing.get(name) for name in Form4Filing.__dataclass_fields__ if name not in flags and name not in ('accession', 'filed')})
+    return record, transactions
+
+
+@dataclass
+class IndexEntry:
+    cik: str
+    company: str
+    form: str
+    filed: Optional[date]
+    path: str
+
+    @property
+    def accession(self) -> str:
+        return self.path.rsplit('/', 1)[-1].removesuffix('.txt')
+
+
+def parse_master_index(text: str, forms=FORM4_TYPES) -> List[IndexEntry]:
+    """EDGAR master.idx (``CIK|Company Name|Form Type|Date Filed|Filename``) -> entries, one per accession."""
+    entries, seen, body = [], set(), False
+    for line in text.splitlines():
+        if not body:
+            body = line.startswith('---')
+            continue
+        parts = line.split('|')
+        if len(parts) != 5 or (forms and parts[2] not in forms):
+            continue
+        entry = IndexEntry(parts[0], parts[1], parts[2], _date(parts[3]), parts[4])
+        # form 4s are listed under the issuer and again under each reporting owner
+        if entry.accession not in seen:
+            seen.add(entry.accession)
+            entries.append(entry)
+    return entries
+
+
+class Form4Index:
+    """Local sqlite record of accession numbers already loaded, so reruns only fetch what's new."""
+    def __init__(self, path: str = FORM4_INDEX):
+        self.path = path
+        if path != ':memory:':
+            os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self._db = sqlite3.connect(path)
+        self._db.execute('CREATE TABLE IF NOT EXISTS ingested (accession TEXT PRIMARY KEY, loaded_at REAL NOT NULL)')
+        self._db.commit()
+
+    def seen(self, accessions) -> set:
+        found = set()
+        accessions = list(accessions)
+        for i in range(0, len(accessions), 900):
+            chunk = accessions[i:i + 900]
+            rows = self._db.execute(f"SELECT accession FROM ingested WHERE accession IN ({','.join('?' * len(chunk))})", chunk)
+            found.update(row[0] for row in rows)
+        return found
+
+    def mark(self, accessions):
+        now = time.time()
+        self._db.executemany('INSERT OR IGNORE INTO ingested VALUES (?, ?)', [(a, now) for a in accessions])
+        self._db.commit()
+
+    def __len__(self):
+        return self._db.execute('SELECT COUNT(*) FROM ingested').fetchone()[0]
+
+    def close(self):
+        self._db.close()
+
+
+_PG_TYPES = {str: 'TEXT', int: 'INTEGER', float: 'DOUBLE PRECISION', bool: 'BOOLEAN', date: 'DATE'}
+
+
+def _ddl(table, cls, key):
+    columns = []
+    for f in fields(cls):
+        kind = getattr(f.type, '__args__', (f.type,))[0]
+        columns.append(f"{f.name} {_PG_TYPES[kind]}")
+    return f"CREATE TABLE IF NOT EXISTS {table} ({', '.join(columns)}, PRIMARY KEY ({key}))"
+
+
+class Form4Loader:
+    """Bulk-loads parsed filings: COPY into a temp table, then INSERT ... ON CONFLICT DO NOTHING."""
+    tables = (('form4_filings', Form4Filing, 'accession'), ('form4_transactions', Form4Transaction, 'accession, line'))
+
+    def __init__(self, host='localhost', port=5432, user='chuck', password='fud', database='fudstop3'):
+        self.db_params = {'host': host, 'port': port, 'user': user, 'password': password, 'database': database}
+        self.pool = None
+
+    async def connect(self):
+        if self.pool is None:
+            self.pool = await pool_registry.get_pool(consumer=type(self).__name__, **self.db_params)
+            async with self.pool.acquire() as conn:
+                for table, cls, key in self.tables:
+                    await conn.execute(_ddl(table, cls, key))
+
+    async def load(self, filings: List[Form4Filing], transactions: List[Form4Transaction]):
+        await self.connect()
+        async with self.pool.acquire() as conn:
+            async with conn.transaction():
+                for (table, cls, _), rows in zip(self.tables, (filings, transactions)):
+                    if not rows:
+                        continue
+                    staging = f'{table}_staging'
+                    await conn.execute(f'CREATE TEMP TABLE {staging} (LIKE {table}) ON COMMIT DROP')
+                    await conn.copy_records_to_table(staging, records=[astuple(r) for r in rows],
+                                                     columns=[f.name for f in fields(cls)])
+                    await conn.execute(f'INSERT INTO {table} SELECT * FROM {staging} ON CONFLICT DO NOTHING')
+
+    async def close(self):
+        if self.pool is not None:
+            await self.pool.close()
+            self.pool = None
+
+
+class Form4Pipeline:
+    """
+    Concurrent Form 4 backfill: EDGAR index -> full submission .txt -> parse
+    -> bulk load.
+
+    Every request goes through the shared rate limiter with the SEC host
+    pinned at ``rate`` requests/sec (SEC's fair-access cap is 10) and a
+    ``burst`` of 1, so no one-second window ever sees more than ``rate``
+    requests while ``concurrency`` workers keep that budget saturated.
+    Accessions already in the local index are never fetched; an accession
+    is only marked once its batch has been loaded, so a crash just means a
+    rerun picks it up again.
+
+    >>> pipeline = Form4Pipeline(loader=Form4Loader())
+    >>> await pipeline.backfill(2024, 1)
+    """
+    def __init__(self, loader=None, index: Form4Index = None, base_url: str = SEC_BASE, rate: float = SEC_RATE,
+                 burst: float = 1, concurrency: int = 32, batch_size: int = 500, retries: int = 3,
+                 user_agent: str = USER_AGENT):
+        self.loader = loader if loader is not None else Form4Loader()
+        self.index = index if index is not None else Form4Index()
+        self.base_url = base_url.rstrip('/')
+        self.concurrency = concurrency
+        self.batch_size = batch_size
+        self.retries = retries
+        self.headers = {'User-Agent': user_agent, 'Accept-Encoding': 'gzip, deflate'}
+        self.limiter = rate_limiter.host(self.base_url)
+        self.limiter.rate = min(self.limiter.rate, float(rate))
+        self.limiter.max_rate = min(self.limiter.max_rate, float(rate))
+        self.limiter.max_burst = min(self.limiter.max_burst, float(burst))
+        self.limiter.tokens = min(self.limiter.tokens, self.limiter.burst)
+        self.counts = dict.fromkeys(('requests', 'bytes', 'skipped', 'unparsed', 'loaded', 'transactions'), 0)
+        self.failures = []
+        self._filings, self._transactions = [], []
+        self._flush_lock = asyncio.Lock()
+
+    async def _get(self, session, url) -> Optional[bytes]:
+        for attempt in range(self.retries + 1):
+            await rate_limiter.acquire(url)
+            self.counts['requests'] += 1
+            started = time.perf_counter()
+            async with session.get(url) as response:
+                status = response.status
+                # SEC answers an exceeded rate with 403 "Request Rate Threshold Exceeded"
+                rate_limiter.observe(url, 429 if status == 403 else status, response.headers.get('Retry-After'))
+                body = await response.read()
+                metrics.observe_http(url, status, time.perf_counter() - started, len(body))
+                if status == 200:
+                    self.counts['bytes'] += len(body)
+                    return body
+                if status == 404:
+                    return None
+            if attempt < self.retries:
+                await asyncio.sleep(0.5 * 2 ** attempt)
+        raise aiohttp.ClientResponseError(None, (), status=status, message=f'giving up on {url}')
+
+    async def list_quarter(self, session, year: int, quarter: int, forms=FORM4_TYPES) -> List[IndexEntry]:
+        body = await self._get(session, f'{self.base_url}/Archives/edgar/full-index/{year}/QTR{quarter}/master.idx')
+        return parse_master_index(body.decode('latin-1'), forms) if body else []
+
+    async def list_day(self, session, day: date, forms=FORM4_TYPES) -> List[IndexEntry]:
+        quarter = (day.month - 1) // 3 + 1
+        url = f'{self.base_url}/Archives/edgar/daily-index/{day.year}/QTR{quarter}/master.{day:%Y%m%d}.idx'
+        body = await self._get(session, url)
+        return parse_master_index(body.decode('latin-1'), forms) if body else []
+
+    async def _flush(self, force: bool = False):
+        async with self._flush_lock:
+            if not self._filings or (not force and len(self._filings) < self.batch_size):
+                return
+            filings, transactions = self._filings, self._transactions
+            self._filings, self._transactions = [], []
+            await self.loader.load(filings, transactions)
+            self.index.mark(f.accession for f in filings)
+            self.counts['loaded'] += len(filings)
+            self.counts['transactions'] += len(transactions)
+
+    async def _worker(self, session, queue):
+        while True:
+            entry = await queue.get()
+            try:
+                if entry is None:
+                    return
+                body = await self._get(session, f'{self.base_url}/Archives/{entry.path}')
+                filing, transactions = parse_form4(body, entry.accession, entry.filed) if body else (None, [])
+                if filing is None:
+                    self.counts['unparsed'] += 1
+                    continue
+                self._filings.append(filing)
+                self._transactions.extend(transactions)
+                await self._flush()
+            except Exception as e:
+                self.failures.append((entry.accession, repr(e)))
+                logging.warning(f"Form 4 {entry.accession} failed: {e}")
+            finally:
+                queue.task_done()
+
+    async def run(self, entries: List[IndexEntry], session: aiohttp.ClientSession = None) -> dict:
+        """Fetch, parse and load every entry not already in the index. Counts are cumulative per pipeline."""
+        seen = self.index.seen(e.accession for e in entries)
+        todo = [e for e in entries if e.accession not in seen]
+        self.counts['skipped'] += len(entries) - len(todo)
+        requests_before = self.counts['requests']
+        started = time.perf_counter()
+        own_session = session is None
+        session = session or aiohttp.ClientSession(headers=self.headers)
+        try:
+            queue = asyncio.Queue()
+            for entry in todo:
+                queue.put_nowait(entry)
+            workers = max(1, min(self.concurrency, len(todo)))
+            for _ in range(workers):
+                queue.put_nowait(None)
+            await asyncio.gather(*(self._worker(session, queue) for _ in range(workers)))
+            await self._flush(force=True)
+        finally:
+            if own_session:
+                await session.close()
+        elapsed = time.perf_counter() - started
+        return {**self.counts, 'failed': len(self.failures), 'elapsed': round(elapsed, 2),
+                'requests_per_sec': round((self.counts['requests'] - requests_before) / elapsed, 2) if elapsed else None}
+
+    async def backfill(self, year: int, quarter: int) -> dict:
+        async with aiohttp.ClientSession(headers=self.headers) as session:
+            entries = await self.list_quarter(session, year, quarter)
+            return await self.run(entries, session=session)
+
+    async def ingest_day(self, day: date) -> dict:
+        async with aiohttp.ClientSession(headers=self.headers) as session:
+            entries = await self.list_day(session, day)
+            return await self.run(entries, session=session)
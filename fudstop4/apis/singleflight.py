@@ -0,0 +1,131 @@
+import os
+import time
+import asyncio
+import inspect
+import functools
+from collections import OrderedDict
+
+import pandas as pd
+
+
+# how long a finished response keeps answering identical requests (seconds, 0 = in-flight only)
+HTTP_MICRO_TTL = float(os.environ.get('FUDSTOP_HTTP_MICRO_TTL', 0))
+
+
+def _freeze(value):
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple, set)):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+
+def _share(result):
+    # frames get mutated by callers (indicators, renames) - everybody gets their own
+    if isinstance(result, pd.DataFrame):
+        return result.copy()
+    return result
+
+
+def _worth_holding(result):
+    if isinstance(result, pd.DataFrame):
+        return not result.empty
+    if isinstance(result, (dict, list)):
+        return bool(result)
+    return result is not None
+
+
+class SingleFlight:
+    """
+    Collapses identical concurrent calls into one.
+
+    The first caller for a key runs the coroutine; callers that arrive while it
+    is running await the same result (or exception). With ``ttl`` the result
+    keeps answering for that many seconds after it lands. Falsy results
+    (the ``{}`` / ``None`` the fetch helpers return on errors) are never held.
+
+    JSON results are shared as-is between callers - treat them as read-only.
+    DataFrames are copied per caller.
+    """
+    def __init__(self, ttl: float = HTTP_MICRO_TTL, maxsize: int = 1024):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._inflight = {}
+        self._cache = OrderedDict()
+        self.hits = 0
+        self.joined = 0
+        self.misses = 0
+        self.errors = 0
+
+    async def do(self, key, fn, *args, ttl: float = None, **kwargs):
+        ttl = self.ttl if ttl is None else ttl
+        cached = self._cache.get(key)
+        if cached is not None:
+            if cached[0] > time.monotonic():
+                self.hits += 1
+                return _share(cached[1])
+            del self._cache[key]
+
+        future = self._inflight.get(key)
+        if future is not None:
+            self.joined += 1
+        else:
+            self.misses += 1
+            future = asyncio.ensure_future(fn(*args, **kwargs))
+            self._inflight[key] = future
+            future.add_done_callback(functools.partial(self._landed, key, ttl))
+        # shielded: one caller giving up doesn't cancel the request for the others
+        return _share(await asyncio.shield(future))
+
+    def _landed(self, key, ttl, future):
+        if self._inflight.get(key) is future:
+            del self._inflight[key]
+        if future.cancelled():
+            return
+        if future.exception() is not None:
+            self.errors += 1
+            return
+        result = future.result()
+        if ttl > 0 and _worth_holding(result):
+            self._cache[key] = (time.monotonic() + ttl, result)
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.maxsize:
+                self._cache.popitem(last=False)
+
+    def clear(self):
+        self._cache.clear()
+
+    def stats(self) -> dict:
+        return {
+            'hits': self.hits,
+            'joined': self.joined,
+            'misses': self.misses,
+            'errors': self.errors,
+            'inflight': len(self._inflight),
+            'cached': len(self._cache),
+        }
+
+
+http_flight = SingleFlight()
+
+
+def coalesced(*key_params, flight: SingleFlight = None, ttl: float = None):
+    """
+    Route an async fetch helper through a SingleFlight, keyed on the named
+    arguments (sessions, clients and ``self`` are deliberately left out so
+    different SDK instances share requests).
+
+    >>> @coalesced('url', 'headers')
+    ... async def fetch_with_retries(session, url, headers, retries=3, delay=1.0): ...
+    """
+    def decorator(fn):
+        signature = inspect.signature(fn)
+
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            key = (fn.__qualname__,) + tuple(_freeze(bound.arguments.get(p)) for p in key_params)
+            return await (flight or http_flight).do(key, fn, *args, ttl=ttl, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,187 @@
+import os
+import time
+import asyncio
+import logging
+from datetime import date, datetime, timedelta
+
+import aiohttp
+import pandas as pd
+
+from fudstop4.apis.rate_limiter import limited_get_json
+from fudstop4.apis.singleflight import SingleFlight, _share, _freeze
+from fudstop4.apis.treasury.fiscaldata import DatasetCache
+
+
+STOCKSERA_BASE = 'https://stocksera.pythonanywhere.com/api/'
+STOCKSERA_CACHE = os.environ.get('FUDSTOP_STOCKSERA_CACHE', os.path.join(os.path.expanduser('~'), '.fudstop', 'stocksera'))
+STOCKSERA_CONCURRENCY = int(os.environ.get('FUDSTOP_STOCKSERA_CONCURRENCY', 8))
+
+# per-ticker snapshot endpoints (borrow fees, filings, sentiment) answer identical calls for this long
+SNAPSHOT_TTL = 300
+
+
+class StockseraError(Exception):
+    """The API answered with an error payload (bad / missing key, unknown ticker)."""
+
+
+def snake_columns(df: pd.DataFrame) -> pd.DataFrame:
+    """'Short Exempt Vol' -> short_exempt_vol, '% Shorted' -> percent_shorted."""
+    df.columns = (df.columns.str.strip().str.lower()
+                  .str.replace('% ', 'percent_', regex=False).str.replace('%', 'percent', regex=False)
+                  .str.replace(' ', '_', regex=False))
+    return df
+
+
+def to_frame(records, ticker: str = None, dates=(), floats=(), ints=(), strings=()) -> pd.DataFrame:
+    """API records straight into a typed frame - one vectorised cast per column, no per-row objects."""
+    df = snake_columns(pd.DataFrame.from_records(records or []))
+    if ticker is not None:
+        df['ticker'] = ticker
+    for column in dates:
+        if column in df.columns:
+            df[column] = pd.to_datetime(df[column], errors='coerce')
+    for column in floats:
+        if column in df.columns:
+            df[column] = pd.to_numeric(df[column], errors='coerce').astype('float64')
+    for column in ints:
+        if column in df.columns:
+            df[column] = pd.to_numeric(df[column], errors='coerce').astype('Int64')
+    for column in strings:
+        if column in df.columns:
+            df[column] = df[column].astype(str)
+    return df
+
+
+def _day(value) -> date:
+    if value is None:
+        return datetime.now().date()
+    return value if isinstance(value, date) else pd.Timestamp(value).date()
+
+
+class StockseraClient:
+    """
+    Async Stocksera API client: one pooled session, one concurrency bound.
+
+    ``fan_out`` runs a per-ticker fetch for many tickers at once - at most
+    ``concurrency`` requests in flight for the whole client, however many
+    fan-outs overlap - and concatenates the frames; a ticker that fails is
+    logged and left out. ``window`` serves dated history (short volume,
+    FTDs) from the local cache: the covered span is extended whenever a
+    request reaches before or past it, and days inside it that had no rows
+    yet (not published when asked) are re-checked at most once per
+    ``refresh_every`` seconds.
+
+    >>> client = StockseraClient(os.environ['YOUR_STOCKSERA_KEY'])
+    >>> df = await client.fan_out(lambda t: client.window('short_volume', t, '2024-01-02'), ['GME', 'AMC'])
+    """
+    def __init__(self, api_key: str = None, base_url: str = STOCKSERA_BASE, concurrency: int = STOCKSERA_CONCURRENCY,
+                 cache: DatasetCache = None, refresh_every: float = 3600):
+        self.api_key = api_key if api_key is not None else os.environ.get('YOUR_STOCKSERA_KEY')
+        self.base_url = base_url.rstrip('/') + '/'
+        self.concurrency = concurrency
+        self.cache = cache if cache is not None else DatasetCache(STOCKSERA_CACHE)
+        self.refresh_every = refresh_every
+        self.session = None
+        self._semaphore = None
+        self._flight = SingleFlight(ttl=0)
+        self.counts = {'requests': 0, 'served': 0, 'extended': 0, 'failed': 0, 'rows_fetched': 0}
+
+    async def get_session(self):
+        # session and semaphore belong to the loop they were made on (asyncio.run per script)
+        if self.session is None or self.session.closed or self.session._loop is not asyncio.get_running_loop():
+            headers = {'accept': 'application/json', 'Authorization': f'Token {self.api_key}'}
+            self.session = aiohttp.ClientSession(headers=headers, connector=aiohttp.TCPConnector(limit=self.concurrency))
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+        return self.session
+
+    async def close(self):
+        if self.session is not None and not self.session.closed:
+            await self.session.close()
+
+    async def get(self, path: str, ttl: float = 0, **params):
+        """GET ``base_url + path`` as JSON; identical calls in flight (or within ``ttl``) share one request."""
+        params = {k: str(v) for k, v in params.items() if v is not None}
+        key = (path, _freeze(params))
+        return await self._flight.do(key, self._get, path, params, ttl=ttl)
+
+    async def _get(self, path: str, params: dict):
+        session = await self.get_session()
+        async with self._semaphore:
+            self.counts['requests'] += 1
+            data = await limited_get_json(session, self.base_url + path.lstrip('/'), params=params)
+        if isinstance(data, dict) and 'Error' in data:
+            raise StockseraError(data['Error'])
+        return data
+
+    async def fan_out(self, fetch, tickers) -> pd.DataFrame:
+        """``fetch(ticker)`` for every ticker concurrently (bounded by the client), concatenated."""
+        tickers = [tickers] if isinstance(tickers, str) else list(dict.fromkeys(tickers))
+        results = await asyncio.gather(*(fetch(ticker) for ticker in tickers), return_exceptions=True)
+        frames = []
+        for ticker, result in zip(tickers, results):
+            if isinstance(result, BaseException):
+                self.counts['failed'] += 1
+                logging.warning(f"Stocksera fetch for {ticker} failed: {result!r}")
+            elif result is not None and not result.empty:
+                frames.append(result)
+        return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+
+    async def window(self, kind: str, ticker: str, date_from, date_to=None, parse=None, date_column: str = 'date') -> pd.DataFrame:
+        """
+        ``kind/<ticker>/?date_from=&date_to=`` rows between the two dates (inclusive,
+        ``date_to`` defaults to today), newest first, fetching only what the cache lacks.
+        """
+        ticker = ticker.upper()
+        start, end = _day(date_from), _day(date_to)
+        key = f'{kind}/{ticker}'
+        df = _share(await self._flight.do(('window', key, start, end), self._window, kind, ticker, key, start, end, parse, date_column))
+        if df.empty:
+            return df
+        days = df[date_column].dt.date
+        return df[(days >= start) & (days <= end)].reset_index(drop=True)
+
+    async def _window(self, kind, ticker, key, start, end, parse, date_column):
+        parse = parse or (lambda records: to_frame(records, ticker, dates=(date_column,)))
+        df, meta = self.cache.load(key)
+        covered_from = date.fromisoformat(meta['covered_from']) if df is not None else None
+        newest = date.fromisoformat(meta['newest']) if df is not None and meta.get('newest') else None
+        spans = []
+        if df is None:
+            spans.append((start, end))
+        else:
+            covered_to = (date.fromisoformat(meta['covered_to']) if meta.get('covered_to')
+                          else newest or covered_from - timedelta(days=1))
+            if start < covered_from:
+                spans.append((start, covered_from - timedelta(days=1)))
+            # days already asked for but not published yet (past the newest row) are
+            # re-checked at most once per refresh_every; days never asked for always are
+            tail = newest + timedelta(days=1) if newest else covered_from
+            recheck = tail <= min(end, covered_to) and time.time() - meta.get('checked_at', 0) >= self.refresh_every
+            if recheck:
+                spans.append((tail, end))
+            elif end > covered_to:
+                spans.append((covered_to + timedelta(days=1), end))
+        if not spans:
+            self.counts['served'] += 1
+            return df
+        fetched = await asyncio.gather(*(self.get(f'{kind}/{ticker}/', date_from=a.isoformat(), date_to=b.isoformat()) for a, b in spans))
+        frames = [f for f in [df, *(parse(records) for records in fetched if records)] if f is not None and not f.empty]
+        if df is not None:
+            self.counts['extended'] += 1
+        self.counts['rows_fetched'] += sum(len(f) for f in frames[1 if df is not None and not df.empty else 0:])
+        merged = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=[date_column, 'ticker'])
+        merged[date_column] = pd.to_datetime(merged[date_column])
+        # a re-published day replaces the cached one
+        merged = (merged.drop_duplicates(subset=[date_column], keep='last')
+                  .sort_values(date_column, ascending=False, ignore_index=True))
+        covered_to = max(end, date.fromisoformat(meta['covered_to'])) if meta.get('covered_to') else end
+        meta = {**meta, 'covered_from': min(start, covered_from or start).isoformat(),
+                'covered_to': covered_to.isoformat(), 'checked_at': time.time()}
+        if not merged.empty:
+            meta['newest'] = merged[date_column].max().date().isoformat()
+        meta['rows'] = len(merged)
+        self.cache.store(key, merged, meta)
+        return merged
+
+    def stats(self) -> dict:
+        return {**self.counts, **self._flight.stats()}
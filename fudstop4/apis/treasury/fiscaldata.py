@@ -0,0 +1,182 @@
+import os
+import json
+import time
+import asyncio
+import hashlib
+import logging
+
+import aiohttp
+import pandas as pd
+
+from fudstop4.apis.frame_cache import encode_frame, decode_frame
+from fudstop4.apis.rate_limiter import limited_get_json
+from fudstop4.apis.singleflight import SingleFlight, _share
+
+
+FISCALDATA_BASE = 'https://api.fiscaldata.treasury.gov/services/api/fiscal_service/'
+FISCALDATA_CACHE = os.environ.get('FUDSTOP_FISCALDATA_CACHE', os.path.join(os.path.expanduser('~'), '.fudstop', 'fiscaldata'))
+
+
+class DatasetCache:
+    """
+    Fiscal Data datasets on local disk: one Arrow IPC file per dataset plus
+    a small JSON sidecar (newest record_date, when upstream was last asked).
+    Loaded frames stay in memory, so repeat reads don't touch disk either.
+    """
+    def __init__(self, directory: str = FISCALDATA_CACHE):
+        self.directory = directory
+        self._memory = {}
+
+    def _paths(self, key: str):
+        slug = key.strip('/').replace('/', '__')
+        if len(slug) > 120 or not slug.replace('__', '').replace('_', '').isalnum():
+            slug = slug[:60] + '_' + hashlib.blake2b(key.encode(), digest_size=8).hexdigest()
+        base = os.path.join(self.directory, slug)
+        return base + '.arrow', base + '.json'
+
+    def load(self, key: str):
+        """-> (frame, meta) or (None, {})."""
+        if key in self._memory:
+            return self._memory[key]
+        data_path, meta_path = self._paths(key)
+        try:
+            with open(meta_path) as f:
+                meta = json.load(f)
+            with open(data_path, 'rb') as f:
+                df = decode_frame(f.read())
+        except (OSError, ValueError) as e:
+            if not isinstance(e, FileNotFoundError):
+                logging.warning(f"Discarding unreadable cached dataset {key}: {e}")
+            return None, {}
+        self._memory[key] = (df, meta)
+        return df, meta
+
+    def store(self, key: str, df: pd.DataFrame, meta: dict):
+        os.makedirs(self.directory, exist_ok=True)
+        data_path, meta_path = self._paths(key)
+        # data first, sidecar last: a crash in between leaves the old sidecar, which just means a re-fetch
+        for path, payload, mode in ((data_path, encode_frame(df), 'wb'), (meta_path, json.dumps(meta), 'w')):
+            with open(path + '.tmp', mode) as f:
+                f.write(payload)
+            os.replace(path + '.tmp', path)
+        self._memory[key] = (df, meta)
+
+    def touch(self, key: str, meta: dict):
+        df, _ = self.load(key)
+        _, meta_path = self._paths(key)
+        with open(meta_path + '.tmp', 'w') as f:
+            json.dump(meta, f)
+        os.replace(meta_path + '.tmp', meta_path)
+        self._memory[key] = (df, meta)
+
+    def clear(self, key: str = None):
+        keys = [key] if key else [k for k in self._memory]
+        for k in keys:
+            self._memory.pop(k, None)
+            for path in self._paths(k):
+                if os.path.exists(path):
+                    os.remove(path)
+
+
+class FiscalDataClient:
+    """
+    Async Fiscal Data API client over one pooled session.
+
+    ``fetch`` follows the API's pagination (``page[number]`` / ``page[size]``,
+    ``meta.total-pages``), pulling pages after the first concurrently.
+    ``dataset`` keeps a whole dataset in the local DatasetCache: within
+    ``refresh_every`` seconds it is served without any request at all; after
+    that only rows with ``record_date`` past the newest cached one are
+    fetched and prepended. Published rows are not revised in place by these
+    datasets - pass ``full=True`` to rebuild one from scratch anyway.
+
+    >>> fiscal = FiscalDataClient()
+    >>> df = await fiscal.dataset('v2/accounting/od/debt_to_penny')
+    """
+    def __init__(self, cache: DatasetCache = None, base_url: str = FISCALDATA_BASE, refresh_every: float = 3600,
+                 page_size: int = 10000, concurrency: int = 4):
+        self.cache = cache if cache is not None else DatasetCache()
+        self.base_url = base_url.rstrip('/') + '/'
+        self.refresh_every = refresh_every
+        self.page_size = page_size
+        self.concurrency = concurrency
+        self.session = None
+        self._flight = SingleFlight(ttl=0)
+        self.counts = {'served': 0, 'incremental': 0, 'full': 0, 'rows_fetched': 0, 'stale_served': 0}
+
+    async def get_session(self):
+        # a session belongs to the loop it was made on (asyncio.run per script)
+        if self.session is None or self.session.closed or self.session._loop is not asyncio.get_running_loop():
+            self.session = aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=self.concurrency * 2))
+        return self.session
+
+    async def close(self):
+        if self.session is not None and not self.session.closed:
+            await self.session.close()
+
+    async def fetch(self, endpoint: str, filter: str = None, sort: str = '-record_date', fields: str = None) -> list:
+        """Every record of ``endpoint`` matching ``filter``, across all pages."""
+        session = await self.get_session()
+        url = self.base_url + endpoint.lstrip('/')
+        params = {'sort': sort, 'page[size]': self.page_size}
+        if filter:
+            params['filter'] = filter
+        if fields:
+            params['fields'] = fields
+        first = await limited_get_json(session, url, params={**params, 'page[number]': 1})
+        records = list(first.get('data') or [])
+        pages = int((first.get('meta') or {}).get('total-pages') or 1)
+        if pages > 1:
+            semaphore = asyncio.Semaphore(self.concurrency)
+
+            async def page(number):
+                async with semaphore:
+                    return await limited_get_json(session, url, params={**params, 'page[number]': number})
+
+            for result in await asyncio.gather(*(page(n) for n in range(2, pages + 1))):
+                records.extend(result.get('data') or [])
+        self.counts['rows_fetched'] += len(records)
+        return records
+
+    async def dataset(self, endpoint: str, full: bool = False) -> pd.DataFrame:
+        """The whole dataset, newest record_date first (see class docs for when it hits the network)."""
+        endpoint = endpoint.strip('/')
+        return _share(await self._flight.do(endpoint, self._dataset, endpoint, full))
+
+    async def _dataset(self, endpoint: str, full: bool) -> pd.DataFrame:
+        df, meta = self.cache.load(endpoint)
+        now = time.time()
+        if df is not None and not full and now - meta.get('checked_at', 0) < self.refresh_every:
+            self.counts['served'] += 1
+            return df
+        last = meta.get('last_record_date') if df is not None and not full else None
+        try:
+            if last:
+                records = await self.fetch(endpoint, filter=f'record_date:gt:{last}')
+                self.counts['incremental'] += 1
+            else:
+                records = await self.fetch(endpoint)
+                self.counts['full'] += 1
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            if df is None:
+                raise
+            logging.warning(f"Fiscal Data refresh failed for {endpoint}, serving cached copy: {e}")
+            self.counts['stale_served'] += 1
+            return df
+        meta = {**meta, 'checked_at': now}
+        if last and not records:
+            self.cache.touch(endpoint, meta)
+            return df
+        fresh = pd.DataFrame(records)
+        df = fresh if not last else pd.concat([fresh, df], ignore_index=True)
+        if 'record_date' in df.columns and len(df):
+            meta['last_record_date'] = df['record_date'].max()
+        meta['rows'] = len(df)
+        self.cache.store(endpoint, df, meta)
+        return df
+
+    def stats(self) -> dict:
+        return {**self.counts, **self._flight.stats()}
+
+
+fiscal_data = FiscalDataClient()
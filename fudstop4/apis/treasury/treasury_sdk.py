@@ -2,8 +2,7 @@ import sys
 import os
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
-from asyncpg import create_pool
-import requests
+from fudstop4.apis._asyncpg.pool_registry import pool_registry
 import matplotlib.pyplot as plt
 from decimal import Decimal
 import matplotlib.dates as mdates
@@ -11,6 +10,7 @@ import matplotlib.dates as mdates
 import aiohttp
 import asyncio
 from .treasury_models import AvgInterestRates, RecordSettingAuctions, DebtToPenny, FRN, UpcomingAuctions, TreasuryGold
+from .fiscaldata import fiscal_data
 from asyncpg.exceptions import UndefinedTableError
 from datetime import datetime, timedelta
 import pandas as pd
@@ -47,6 +47,7 @@ class Treasury:
 
 
         self.base_url = "https://api.fiscaldata.treasury.gov/services/api/fiscal_service/"
+        self.fiscal = fiscal_data  # pooled session + local dataset cache, shared by every Treasury
         self.conn = None
         self.pool = None
         self.host = host
@@ -75,8 +76,8 @@ class Treasury:
 
 
     async def connect(self):
-        self.pool = await create_pool(
-            host=self.host,user=self.user,database=self.database,port=self.port,password=self.password, min_size=1, max_size=50
+        self.pool = await pool_registry.get_pool(
+            host=self.host,user=self.user,database=self.database,port=self.port,password=self.password, consumer=type(self).__name__
         )
 
         return self.pool
@@ -133,65 +134,70 @@ class Treasury:
 
 
         
-    def data_act_compliance(self):
-        url=self.base_url+f"/v2/debt/tror/data_act_compliance?filter=record_date:gte:2018-07-01,record_date:lte:{self.today}&sort=-record_date,agency_nm,agency_bureau_indicator,bureau_nm"
-        r = requests.get(url).json()
-        data = r['data']
-        df = pd.DataFrame(data)
-
-        return df
+    async def data_act_compliance(self):
+        df = await self.fiscal.dataset('v2/debt/tror/data_act_compliance')
+        df = df[(df['record_date'] >= '2018-07-01') & (df['record_date'] <= self.today)]
+        return df.sort_values(['record_date', 'agency_nm', 'agency_bureau_indicator', 'bureau_nm'],
+                              ascending=[False, True, True, True], ignore_index=True)
 
 
 
     async def query_treasury(self, endpoint):
+        """Refresh ``endpoint`` from Fiscal Data and append rows newer than the table's last record_date."""
         await self.connect()
-        
 
-        url = self.base_url + endpoint + f"?sort=-record_date" #f"?filter=record_date:gte:{two_years_ago_str}"
-        
-        print(url)
-        
         table_name = self.endpoint_to_table.get(endpoint, None)
-        
-        async with aiohttp.ClientSession() as session:
-            try:
-                async with session.get(url) as resp:
-                    r = await resp.json()
-                    data = r['data']
-                    print(data)
 
-                    if table_name:
-                        for record in data:
-                            await self.insert_treasury_data(table_name, record)
-                    else:
-                        print(f"Table name not found for endpoint: {endpoint}")
+        try:
+            df = await self.fiscal.dataset(endpoint)
+
+            if table_name:
+                await self.insert_treasury_data(table_name, df)
+            else:
+                print(f"Table name not found for endpoint: {endpoint}")
+            return df
+
+        except aiohttp.ClientError as e:
+            print(f"Error fetching data from {endpoint}: {e}")
+        except Exception as e:
+            print(f"Error: {e}")
+
+
+    async def insert_treasury_data(self, table_name, df):
+        async with self.pool.acquire() as conn:
+            await conn.execute(f"CREATE TABLE IF NOT EXISTS {table_name} ({', '.join(f'{c} TEXT' for c in df.columns)})")
+            last = await conn.fetchval(f"SELECT MAX(record_date) FROM {table_name}")
+            if last is not None:
+                df = df[df['record_date'] > last]
+            if df.empty:
+                return
+            records = [tuple(None if v is None or v == 'null' else str(v) for v in row) for row in df.itertuples(index=False)]
+            await conn.copy_records_to_table(table_name, records=records, columns=list(df.columns))
+
 
-            except aiohttp.ClientError as e:
-                print(f"Error fetching data from {url}: {e}")
-            except Exception as e:
-                print(f"Error: {e}")
 
+    async def _latest(self, endpoint, limit):
+        df = await self.fiscal.dataset(endpoint)
+        return df if limit is None else df.head(limit)
 
 
-    def avg_interest_rates(self):
+    async def avg_interest_rates(self, limit:int=100):
         """Gets avg. interest rates for US treasury"""
 
-        r = requests.get("https://api.fiscaldata.treasury.gov/services/api/fiscal_service/v2/accounting/od/avg_interest_rates?sort=-record_date").json()
-        data = r['data']
+        data = await self._latest('v2/accounting/od/avg_interest_rates', limit)
 
 
-        return AvgInterestRates(data)
+        return AvgInterestRates(data.to_dict('records'))
 
 
-    def daily_amounts(self, as_dataframe:bool=True):
+    async def daily_amounts(self, as_dataframe:bool=True):
         """Returns fed daily debt activity
         
         ARGS:
 
         >>> as_dataframe: bool (default= True)
         """
-        r = requests.get("https://api.fiscaldata.treasury.gov/services/api/fiscal_service/v1/accounting/od/schedules_fed_debt_daily_activity?sort=-record_date").json()
-        data = r['data']
+        data = (await self._latest('v1/accounting/od/schedules_fed_debt_daily_activity', 2)).to_dict('records')
         latest = data[0]
         total = data[1]
         data_dict = {
@@ -223,45 +229,35 @@ class Treasury:
             return df
         
 
-    def record_setting_auctions(self):
-        endpoint = f"https://api.fiscaldata.treasury.gov/services/api/fiscal_service/v2/accounting/od/record_setting_auction?sort=-record_date"
-        r = requests.get(endpoint).json()
-        data= r['data']
+    async def record_setting_auctions(self, limit:int=100):
+        data = await self._latest('v2/accounting/od/record_setting_auction', limit)
 
-        return RecordSettingAuctions(data)
+        return RecordSettingAuctions(data.to_dict('records'))
     
 
-    def debt_to_penny(self):
-        endpoint=f"https://api.fiscaldata.treasury.gov/services/api/fiscal_service/v2/accounting/od/debt_to_penny?sort=-record_date"
-        r = requests.get(endpoint).json()
-        data = r['data']
+    async def debt_to_penny(self, limit:int=100):
+        data = await self._latest('v2/accounting/od/debt_to_penny', limit)
 
-        return DebtToPenny(data)
+        return DebtToPenny(data.to_dict('records'))
     
 
-    def federal_reserve_notes(self):
-        endpoint=f"https://api.fiscaldata.treasury.gov/services/api/fiscal_service/v1/accounting/od/frn_daily_indexes?sort=-record_date"
-        r = requests.get(endpoint).json()
-        data = r['data']
+    async def federal_reserve_notes(self, limit:int=100):
+        data = await self._latest('v1/accounting/od/frn_daily_indexes', limit)
 
-        return FRN(data)
+        return FRN(data.to_dict('records'))
     
 
-    def upcoming_auctions(self):
-        endpoint = f"https://api.fiscaldata.treasury.gov/services/api/fiscal_service/v1/accounting/od/upcoming_auctions?sort=-record_date"
-        r = requests.get(endpoint).json()
-        data = r['data']
+    async def upcoming_auctions(self, limit:int=100):
+        data = await self._latest('v1/accounting/od/upcoming_auctions', limit)
 
 
-        return UpcomingAuctions(data)
+        return UpcomingAuctions(data.to_dict('records'))
 
 
-    def treasury_owned_gold(self):
-        endpoint = f"https://api.fiscaldata.treasury.gov/services/api/fiscal_service/v2/accounting/od/gold_reserve?sort=-record_date"
-        r = requests.get(endpoint).json()
-        data = r['data']
+    async def treasury_owned_gold(self, limit:int=100):
+        data = await self._latest('v2/accounting/od/gold_reserve', limit)
 
-        return TreasuryGold(data)
+        return TreasuryGold(data.to_dict('records'))
 
 
 
@@ -47,91 +47,79 @@ poly = Polygon()
 load_dotenv()
 ta = WebullTA()
 db = PolygonOptions(database='fudstop3')
-import redis.asyncio as redis
+from fudstop4.apis.frame_cache import FrameCache, RedisBackend
+from fudstop4.apis.singleflight import coalesced
+from fudstop4.apis.rate_limiter import rate_limiter, limited_get_json
+from fudstop4.apis.metrics import timed
+
 class RedisCacheManager:
     """
-    Manages async Redis connections and provides simple
-    methods to get/set candle data with a TTL.
+    Manages the async Redis connection behind a two-tier FrameCache:
+    candle frames are stored as Arrow IPC (dtypes intact, a fraction of the
+    JSON size) with an in-process LRU in front, per-key TTLs and optional
+    stale-while-revalidate. Pass ``backend=MemoryBackend()`` to run without
+    Redis.
     """
-    def __init__(self, redis_url: str = "redis://localhost:6379", default_ttl: int = 300):
+    def __init__(self, redis_url: str = "redis://localhost:6379", default_ttl: int = 300,
+                 stale_ttl: int = 0, l1_size: int = 512, backend=None):
         """
         :param redis_url: Redis connection string.
         :param default_ttl: Default TTL in seconds for cached items.
+        :param stale_ttl: Seconds past the TTL an entry may still be served while it refreshes.
+        :param l1_size: Entries kept in the in-process LRU.
+        :param backend: Remote tier override (e.g. MemoryBackend for tests).
         """
         self.redis_url = redis_url
         self.default_ttl = default_ttl
-        self._redis = None
+        self.stale_ttl = stale_ttl
+        self.l1_size = l1_size
+        self._backend = backend
+        self.cache = None
 
     async def connect(self):
         """
-        Establish a connection to Redis (call once).
-        Using redis.asyncio, from_url() returns an
-        asyncio-compatible Redis client.
+        Establish the connection (call once). The Redis client is binary
+        (no decode_responses) since payloads are Arrow, not JSON.
         """
-        self._redis = redis.from_url(
-            self.redis_url,
-            encoding="utf-8",
-            decode_responses=True
-        )
+        backend = self._backend if self._backend is not None else RedisBackend(self.redis_url)
+        self.cache = FrameCache(backend, l1_size=self.l1_size, default_ttl=self.default_ttl, stale_ttl=self.stale_ttl)
 
     async def close(self):
         """
         Close the Redis connection gracefully.
-        In redis.asyncio, we do:
-           self._redis.close()
-           await self._redis.wait_closed()
         """
-        if self._redis:
-            self._redis.close()
-            await self._redis.wait_closed()
+        if self.cache:
+            await self.cache.close()
+            self.cache = None
 
     async def get_cached_candles(self, key: str) -> Optional[pd.DataFrame]:
         """
-        Retrieve candle data from Redis by key.
-        We store the DataFrame in a serialized form (e.g., JSON).
+        Retrieve candle data by key (L1 first, then Redis). Entries written
+        by the old JSON serializer are still readable.
         """
-        if not self._redis:
+        if not self.cache:
             raise RuntimeError("Redis connection not established. Call connect() first.")
-
-        cached_data = await self._redis.get(key)
-        if cached_data:
-            try:
-                # Reconstruct a DataFrame
-                df = pd.read_json(cached_data, orient='split')
-                return df
-            except Exception as e:
-                print(f"Failed to load cached DataFrame for key={key}: {e}")
-                return None
-        return None
+        return await self.cache.get(key)
 
     async def set_cached_candles(self, key: str, df: pd.DataFrame, ttl: Optional[int] = None):
         """
-        Store candle DataFrame in Redis for the given key.
+        Store candle DataFrame for the given key.
         By default uses self.default_ttl for expiration.
         """
-        if not self._redis:
+        if not self.cache:
             raise RuntimeError("Redis connection not established. Call connect() first.")
+        await self.cache.set(key, df, ttl=ttl)
 
-        if ttl is None:
-            ttl = self.default_ttl
-
-        try:
-            # Convert DataFrame to JSON (orient='split' preserves columns, index, data)
-            serialized = df.to_json(orient='split')
-            await self._redis.set(key, serialized, ex=ttl)
-        except Exception as e:
-            print(f"Failed to set cached DataFrame for key={key}: {e}")
-
-
-
-
-
-
-
-
-
+    async def get_or_fetch(self, key: str, fetch, ttl: Optional[int] = None):
+        """Cached frame for ``key`` or the result of ``await fetch()``, cached."""
+        if not self.cache:
+            await self.connect()
+        return await self.cache.get_or_fetch(key, fetch, ttl=ttl)
 
 
+# candle cache lifetimes by interval (seconds) - roughly how long until the last bar changes materially
+CANDLE_TTLS = {'m1': 20, 'm5': 60, 'm10': 90, 'm15': 120, 'm20': 120, 'm30': 180, 'm60': 300,
+               'm120': 600, 'm240': 900, 'd': 900, 'd1': 900, 'w': 3600, 'm': 3600}
 
 
 class UltimateSDK:
@@ -1110,11 +1098,11 @@ class UltimateSDK:
         """Split a list into smaller chunks."""
         for i in range(0, len(data), chunk_size):
             yield data[i:i + chunk_size]
+    @timed()
+    @coalesced('url')
     async def fetch_page(self, url):
         async with aiohttp.ClientSession() as session:
-            async with session.get(url) as response:
-                response.raise_for_status()
-                return await response.json()
+            return await limited_get_json(session, url)
 
     # ------------------------------------------------
     #  NEW: Multi-ticker concurrency
@@ -1435,6 +1423,16 @@ class UltimateSDK:
         :param headers: optional HTTP headers
         :return: pandas DataFrame with columns: Timestamp, Open, Close, High, Low, Volume, etc.
         """
+        if self.redis_cache is not None and timestamp is None:
+            # only "latest N bars" requests are shareable; explicit timestamps are one-offs
+            return await self.redis_cache.get_or_fetch(
+                f"candles:{ticker}:{interval}:{count}",
+                lambda: self._get_candle_data(ticker, interval, count, None, client, headers),
+                ttl=CANDLE_TTLS.get(interval),
+            )
+        return await self._get_candle_data(ticker, interval, count, timestamp, client, headers)
+
+    async def _get_candle_data(self, ticker, interval, count, timestamp, client, headers) -> pd.DataFrame:
         async with self.semaphore:
             try:
                 # Adjust ticker if needed
@@ -5,6 +5,7 @@ import pandas as pd
 from datetime import datetime
 import numpy as np
 from dateutil.parser import parse
+from fudstop4.apis._asyncpg.pool_registry import pool_registry
 
 lock = Lock()
 
@@ -20,8 +21,8 @@ class DatabaseManager:
         self.chat_memory = []  # In-memory list to store chat messages
 
     async def connect(self):
-        self.pool = await asyncpg.create_pool(
-            host=self.host,user=self.user,password=self.password,port=self.port,database=self.database, min_size=1, max_size=75
+        self.pool = await pool_registry.get_pool(
+            host=self.host,user=self.user,password=self.password,port=self.port,database=self.database, consumer=type(self).__name__
         )
 
         return self.pool
@@ -25,6 +25,9 @@ from .futures import WBFutures, IndividualFutures
 from .toprank_models import EarningSurprise, Dividend, MicroFutures
 from .newmodels import EarningsData
 from .webull_helpers import parse_most_active, parse_total_top_options, parse_contract_top_options, parse_ticker_values, parse_ipo_data, parse_etfs
+from fudstop4.apis.singleflight import coalesced
+from fudstop4.apis.rate_limiter import rate_limiter, limited_get_json
+from fudstop4.apis.metrics import timed
 screen = WebullOptionScreener()
 class WebullMarkets(DatabaseManager):
     """General market data from webull"""
@@ -161,10 +164,12 @@ class WebullMarkets(DatabaseManager):
 
 
 
+    @timed()
+    @coalesced('endpoint', 'headers')
     async def fetch_endpoint(self, endpoint, headers=None):
+        # webull's error payloads ({'code': ..., 'msg': ...}) come back to the caller as before
         async with aiohttp.ClientSession(headers=headers) as session:
-            async with session.get(endpoint) as resp:
-                return await resp.json()
+            return await limited_get_json(session, endpoint, raise_for_status=False)
             
     
 
@@ -7,6 +7,9 @@ lock = Lock()
 import uuid
 from pytz import timezone
 from asyncpg.exceptions import UniqueViolationError
+from fudstop4.apis._asyncpg.pool_registry import pool_registry
+from fudstop4.apis._asyncpg.statement_cache import statement_cache
+from fudstop4.apis._asyncpg.embedding_store import EmbeddingStore
 class DBManager:
     def __init__(self, host='localhost', user='chuck', password='fud', database='fudstop3', port=5432):
         self.db_params = {
@@ -17,18 +20,16 @@ class DBManager:
             'port': port
         }
         self.pool = None
+        self._embedding_store = None
     async def fetch(self, query):
         async with self.pool.acquire() as conn:
             records = await conn.fetch(query)
             return records
-    async def create_pool(self, min_size=10, max_size=50):
+    async def create_pool(self):
+        """Borrows the shared pool for this database (sized by the pool registry)."""
         if self.pool is None:
             try:
-                self.pool = await asyncpg.create_pool(
-                    min_size=min_size, 
-                    max_size=max_size, 
-                    **self.db_params
-                )
+                self.pool = await pool_registry.get_pool(consumer=type(self).__name__, **self.db_params)
             except Exception as e:
                 print(f"Error creating connection pool: {e}")
                 raise
@@ -36,6 +37,7 @@ class DBManager:
     async def close_pool(self):
         if self.pool:
             await self.pool.close()
+            self.pool = None
 
     async def get_connection(self):
         if self.pool is None:
@@ -353,6 +355,7 @@ class DBManager:
                     END $$;
                     """
                     await connection.execute(alter_query)
+                statement_cache.invalidate(table_name)
     async def batch_insert_dataframe(self, df, table_name, unique_columns, batch_size=250):
         """
         WORKS - Creates table - inserts data based on DTYPES.
@@ -370,72 +373,14 @@ class DBManager:
             df.dropna(inplace=True)
             df['insertion_timestamp'] = [datetime.now() for _ in range(len(df))]  # Adjust format here if needed
 
-            records = df.to_records(index=False)
-            data = list(records)
-
-
             async with self.pool.acquire() as connection:
-                column_types = await connection.fetch(
-                    f"SELECT column_name, data_type FROM information_schema.columns WHERE table_name = '{table_name}'"
-                )
-                type_mapping = {col: next((item['data_type'] for item in column_types if item['column_name'] == col), None) for col in df.columns}
-
-                async with connection.transaction():
-                    insert_query = f"""
-                    INSERT INTO {table_name} ({', '.join(f'"{col}"' for col in df.columns)}) 
-                    VALUES ({', '.join('$' + str(i) for i in range(1, len(df.columns) + 1))})
-                    ON CONFLICT ({unique_columns})
-                    DO UPDATE SET {', '.join(f'"{col}" = excluded."{col}"' for col in df.columns)}
-                    """
-            
-                    batch_data = []
-                    for record in data:
-                        new_record = []
-                        for col, val in zip(df.columns, record):
-                
-                            pg_type = type_mapping[col]
-
-                            if val is None:
-                                new_record.append(None)
-                            elif pg_type == 'timestamp' and isinstance(val, np.datetime64):
-                                new_record.append(pd.Timestamp(val).to_pydatetime().replace(tzinfo=None))
-
-            
-                            elif isinstance(val, datetime):
-
-                                new_record.append(pd.Timestamp(val).to_pydatetime())
-                            elif pg_type in ['timestamp', 'timestamp without time zone', 'timestamp with time zone'] and isinstance(val, np.datetime64):
-                                new_record.append(pd.Timestamp(val).to_pydatetime().replace(tzinfo=None))  # Modified line
-                            elif pg_type in ['double precision', 'real'] and not isinstance(val, str):
-                                new_record.append(float(val))
-                            elif isinstance(val, np.int64):  # Add this line to handle numpy.int64
-                                new_record.append(int(val))
-                            elif pg_type == 'integer' and not isinstance(val, int):
-                                new_record.append(int(val))
-                            else:
-                                new_record.append(val)
-                    
-                        batch_data.append(new_record)
-
-                        if len(batch_data) == batch_size:
-                            try:
-                                
-                            
-                                await connection.executemany(insert_query, batch_data)
-                                batch_data.clear()
-                            except Exception as e:
-                                print(f"An error occurred while inserting the record: {e}")
-                                await connection.execute('ROLLBACK')
-                                raise
-                if batch_data:  # Don't forget the last batch
-                    # Use datetime objects directly
-                    df['insertion_timestamp'] = [datetime.now() for _ in range(len(df))]
-                    try:
-                        await connection.executemany(insert_query, batch_data)
-                    except Exception as e:
-                        print(f"An error occurred while inserting the record: {e}")
-                        await connection.execute('ROLLBACK')
-                        raise
+                # query text, column converters and the prepared statement are
+                # reused for every call with this (table, columns) shape
+                try:
+                    await statement_cache.upsert(connection, table_name, df, unique_columns, batch_size)
+                except Exception as e:
+                    print(f"An error occurred while inserting the record: {e}")
+                    raise
     def dataframe_to_tuples(self, df):
         """
         Converts a Pandas DataFrame to a list of tuples, each tuple representing a row.
@@ -731,18 +676,37 @@ class DBManager:
             await connection.execute(create_view_query)
 
 
+    async def embedding_store(self, **kwargs) -> EmbeddingStore:
+        """The content-hash keyed embedding store on this pool (created on first use)."""
+        if self._embedding_store is None:
+            await self.create_pool()
+            store = EmbeddingStore(self.pool, **kwargs)
+            await store.ensure_table()
+            # first use against a database that still has the old embeddings table: carry its rows over
+            await store.import_legacy(if_empty=True)
+            self._embedding_store = store
+        return self._embedding_store
+
     async def insert_embedding(self, original_text, embedding):
-        query = """
-        INSERT INTO embeddings (original_text, embedding)
-        VALUES ($1, $2);
-        """
-        async with self.pool.acquire() as connection:
-            await connection.execute(query, original_text, embedding)
+        store = await self.embedding_store()
+        await store.add(original_text, embedding)
+        await store.flush()
+
+    async def insert_embeddings(self, original_texts, embeddings=None):
+        """Batched insert; with no embeddings the store's embedder fills in the ones it hasn't seen."""
+        store = await self.embedding_store()
+        await store.add_many(original_texts, embeddings)
+        await store.flush()
 
     async def get_embedding(self, original_text):
-        query = """
-        SELECT embedding FROM embeddings
-        WHERE original_text = $1;
-        """
-        async with self.pool.acquire() as connection:
-            return await connection.fetchval(query, original_text)
\ No newline at end of file
+        """Looks the text up by content hash - a primary key probe instead of a full-text comparison."""
+        store = await self.embedding_store()
+        vector = await store.get(original_text, normalized=False)
+        return None if vector is None else vector.tolist()
+
+    async def similar_embeddings(self, query, k=10):
+        """Top-k (text, cosine score) for a text or vector; loads the stored rows on first call."""
+        store = await self.embedding_store()
+        if not store.loaded:
+            await store.load()
+        return await store.similar(query, k=k)
@@ -2,6 +2,74 @@ import pandas as pd
 from datetime import datetime, date
 import numpy as np
 from scipy.stats import norm
+
+
+# Fields pulled from each Webull derivative record. Numeric fields land in one
+# preallocated float64 block (row per contract) so every derived metric below
+# can be computed column-wise instead of through per-field list comprehensions.
+_OPTION_FLOAT_FIELDS = (
+    'open', 'high', 'low', 'strikePrice', 'preClose', 'openInterest', 'volume',
+    'latestPriceVol', 'delta', 'vega', 'impVol', 'gamma', 'theta', 'rho', 'close',
+    'change', 'changeRatio', 'openIntChange', 'activeLevel', 'cycle',
+)
+_OPTION_OBJECT_FIELDS = ('expireDate', 'tickerId', 'belongTickerId', 'direction', 'symbol', 'unSymbol')
+_MULTI_FLOAT_FIELDS = _OPTION_FLOAT_FIELDS[:-1]
+_MULTI_OBJECT_FIELDS = _OPTION_OBJECT_FIELDS + ('tradeTime', 'tradeStamp')
+
+
+def _extract_columns(rows, float_fields, object_fields, fill=0.0, fills=None, books=()):
+    """Single pass over ``rows`` -> ({field: float64 array}, {field: object array}).
+
+    Missing numeric values are written as ``fill`` (or the per-field override in
+    ``fills``); missing object values stay None. For each list field named in
+    ``books`` (e.g. ``askList``) the top level's price/volume is captured too and
+    returned as a third dict of ``(price, volume)`` arrays, NaN where a side is empty.
+    """
+    n = len(rows)
+    defaults = [(f, (fills or {}).get(f, fill)) for f in float_fields]
+    block = np.empty((n, len(float_fields)), dtype=np.float64)
+    objects = np.empty((len(object_fields), n), dtype=object)
+    levels = np.full((len(books), 2, n), np.nan)
+    for j, row in enumerate(rows):
+        get = row.get
+        block[j] = [d if (v := get(f)) is None else float(v) for f, d in defaults]
+        objects[:, j] = [get(f) for f in object_fields]
+        for k, book in enumerate(books):
+            side = get(book)
+            if side:
+                top = side[0]
+                if (price := top.get('price')) is not None:
+                    levels[k, 0, j] = float(price)
+                if (volume := top.get('volume')) is not None:
+                    levels[k, 1, j] = float(volume)
+    floats = {f: block[:, k] for k, f in enumerate(float_fields)}
+    if books:
+        return floats, dict(zip(object_fields, objects)), {b: (levels[k, 0], levels[k, 1]) for k, b in enumerate(books)}
+    return floats, dict(zip(object_fields, objects))
+
+
+def _parse_expiries(expiries):
+    """Map 'YYYY-MM-DD' strings to ``date`` objects, parsing each distinct expiry once."""
+    parsed = {e: datetime.strptime(e, '%Y-%m-%d').date() for e in set(expiries) if e is not None}
+    parsed[None] = None
+    return np.array([parsed[e] for e in expiries], dtype=object)
+
+
+def _days_to_expiry(expiries):
+    """Whole days from now until each expiry (floored, NaN where the expiry is unknown)."""
+    expiry = np.array([np.datetime64(e, 'ns') if e is not None else np.datetime64('NaT') for e in expiries],
+                      dtype='datetime64[ns]')
+    days = np.floor((expiry - np.datetime64(datetime.now(), 'ns')) / np.timedelta64(1, 'D'))
+    return days.astype(np.int64) if not np.isnan(days).any() else days
+
+
+def _safe_divide(num, den, fill):
+    """Element-wise ``num / den`` with ``fill`` wherever ``den`` is zero."""
+    out = np.full(np.broadcast(num, den).shape, fill, dtype=np.float64)
+    np.divide(num, den, out=out, where=den != 0)
+    return out
+
+
 class From_:
     def __init__(self, from_):
         self.date = [i.get('date') for i in from_]
@@ -91,32 +159,37 @@ class OptionData:
         self.data = [i.get('data') for i in self.data if i.get('data') is not None]
 
         self.data = [item for sublist in self.data for item in sublist]
-        self.open = [float(i.get('open')) if i.get('open') is not None else 0 for i in self.data]
-        self.high = [float(i.get('high')) if i.get('high') is not None else 0 for i in self.data]
-        self.low = [float(i.get('low')) if i.get('low') is not None else 0 for i in self.data]
-        self.strikePrice = [int(float(i.get('strikePrice'))) if i.get('strikePrice') is not None else None for i in self.data]
-        self.preClose = [float(i.get('preClose')) if i.get('preClose') is not None else 0 for i in self.data]
-        self.openInterest = [float(i.get('openInterest')) if i.get('openInterest') is not None else 0 for i in self.data]
-        self.volume = [float(i.get('volume')) if i.get('volume') is not None else 0 for i in self.data]
-        self.latestPriceVol = [float(i.get('latestPriceVol')) if i.get('latestPriceVol') is not None else 0 for i in self.data]
-        self.delta = [round(float(i.get('delta')),4) if i.get('delta') is not None else 0 for i in self.data]
-        self.vega = [round(float(i.get('vega')),4) if i.get('vega') is not None else 0 for i in self.data]
-        self.impVol = [round(float(i.get('impVol')),4) if i.get('impVol') is not None else 0 for i in self.data]
-        self.gamma = [round(float(i.get('gamma')),4) if i.get('gamma') is not None else 0 for i in self.data]
-        self.theta = [round(float(i.get('theta')),4) if i.get('theta') is not None else 0 for i in self.data]
-        self.rho = [round(float(i.get('rho')),4) if i.get('rho') is not None else 0 for i in self.data]
-        self.close = [float(i.get('close')) if i.get('close') is not None else 0 for i in self.data]
-        self.change = [float(i.get('change')) if i.get('change') is not None else 0 for i in self.data]
-        self.changeRatio = [round(float(i.get('changeRatio')),2) if i.get('changeRatio') is not None else 0 for i in self.data]
-        self.expireDate = [datetime.strptime(i.get('expireDate'), '%Y-%m-%d').date() if i.get('expireDate') is not None else None for i in self.data]
-        self.tickerId = [i.get('tickerId') for i in self.data]
-        self.belongTickerId = [i.get('belongTickerId') for i in self.data]
-        self.openIntChange = [float(i.get('openIntChange')) if i.get('openIntChange') is not None else 0 for i in self.data]
-        self.activeLevel = [float(i.get('activeLevel')) if i.get('activeLevel') is not None else 0 for i in self.data]
-        self.cycle = [float(int(i.get('cycle'))) for i in self.data]
-        self.direction = [i.get('direction') for i in self.data]
-        self.symbol = ['O:' + i.get('symbol') for i in self.data]
-        self.unSymbol = [i.get('unSymbol') for i in self.data]
+
+        # one pass over the chain -> columnar arrays
+        floats, objects = _extract_columns(self.data, _OPTION_FLOAT_FIELDS, _OPTION_OBJECT_FIELDS,
+                                           fills={'strikePrice': np.nan})
+        self.open = floats['open']
+        self.high = floats['high']
+        self.low = floats['low']
+        strikes = np.trunc(floats['strikePrice'])
+        self.strikePrice = strikes.astype(np.int64) if not np.isnan(strikes).any() else strikes
+        self.preClose = floats['preClose']
+        self.openInterest = floats['openInterest']
+        self.volume = floats['volume']
+        self.latestPriceVol = floats['latestPriceVol']
+        self.delta = np.round(floats['delta'], 4)
+        self.vega = np.round(floats['vega'], 4)
+        self.impVol = np.round(floats['impVol'], 4)
+        self.gamma = np.round(floats['gamma'], 4)
+        self.theta = np.round(floats['theta'], 4)
+        self.rho = np.round(floats['rho'], 4)
+        self.close = floats['close']
+        self.change = floats['change']
+        self.changeRatio = np.round(floats['changeRatio'], 2)
+        self.expireDate = _parse_expiries(objects['expireDate'])
+        self.tickerId = objects['tickerId']
+        self.belongTickerId = objects['belongTickerId']
+        self.openIntChange = floats['openIntChange']
+        self.activeLevel = floats['activeLevel']
+        self.cycle = floats['cycle']
+        self.direction = objects['direction']
+        self.symbol = np.array(['O:' + s for s in objects['symbol']], dtype=object)
+        self.unSymbol = objects['unSymbol']
         self.oi_weighted_delta = self.option_open_interest_weighted_delta(deltas=self.delta, ois=self.openInterest)
         self.iv_spread = self.option_implied_volatility_spread(self.impVol,self.vol1y)
         self.avg_iv = self.average_implied_volatility()
@@ -131,24 +204,17 @@ class OptionData:
         self.liquidity_indicator = self.options_liquidity_indicator(self.volume, self.openInterest)
         self.weighted_avg_moneyness = self.weighted_average_moneyness(self.strikePrice, self.under_close, self.openInterest)
         self.vega_weighted_maturity = self.get_vega_weighted_maturity(expirys=self.expireDate, vegas=self.vega)
-   
-        self.option_velocity = [float(delta) / float(p) if delta is not None and p not in [None, 0] else 0.0 for delta, p in zip(self.delta, self.close)]
-
-        self.option_velocity =[round(item, 3) if item is not None else None for item in self.option_velocity]
-        self.gamma_risk = [float(g) * float(self.under_close) if g is not None and self.under_close is not None else None for g in self.gamma]
-
-        self.gamma_risk =[round(item, 3) if item is not None else None for item in self.gamma_risk]
-        self.theta_decay_rate = [float(t) / float(p) if t is not None and p not in [None,0] else 0.0 for t, p in zip(self.theta, self.close)]
-        self.theta_decay_rate = [round(item, 3) if item is not None else None for item in self.theta_decay_rate]
-
 
-        self.delta_to_theta_ratio = [float(d) / float(t) if d is not None and t is not None and t != 0 else None for d, t in zip(self.delta, self.theta)]
-        self.delta_to_theta_ratio = [round(item, 3) if item is not None else None for item in self.delta_to_theta_ratio]
+        self.option_velocity = np.round(_safe_divide(self.delta, self.close, 0.0), 3)
+        under_close = np.nan if self.under_close is None else self.under_close
+        self.gamma_risk = np.round(self.gamma * under_close, 3)
+        self.theta_decay_rate = np.round(_safe_divide(self.theta, self.close, 0.0), 3)
+        self.delta_to_theta_ratio = np.round(_safe_divide(self.delta, self.theta, np.nan), 3)
 
-        self.oss = [(float(delta) if delta is not None else 0) + (0.5 * float(gamma) if gamma is not None else 0) + (0.1 * float(vega) if vega is not None else 0) - (0.5 * float(theta) if theta is not None else 0) for delta, gamma, vega, theta in zip(self.delta, self.gamma, self.vega, self.theta)]
-        self.oss = [round(item, 3) for item in self.oss]
+        self.oss = np.round(self.delta + 0.5 * self.gamma + 0.1 * self.vega - 0.5 * self.theta, 3)
         #liquidity-theta ratio - curated - finished
-        self.ltr = [self.liquidity_indicator / abs(theta) if self.liquidity_indicator is not None and theta not in [None, 0] else None for theta in self.theta]
+        liquidity = np.nan if self.liquidity_indicator is None else self.liquidity_indicator
+        self.ltr = _safe_divide(liquidity, np.abs(self.theta), np.nan)
 
         # self.intrinsic_value = [float(self.under_close) - float(s) if ct == 'call' and self.under_close is not None and s is not None and float(self.under_close) > s 
         #                         else float(s) - float(self.under_close) if ct == 'put' and self.under_close is not None and s is not None and s > float(self.under_close) 
@@ -164,45 +230,39 @@ class OptionData:
 
         
 
-        today = pd.Timestamp(datetime.today())
-        
-        expiry_series = pd.Series(self.expireDate)
-        expiry_series = pd.to_datetime(expiry_series)
-        self.days_to_expiry = (expiry_series - today).dt.days
-        self.time_value = [float(p) - float(self.under_close) + float(k) if p is not None and self.under_close is not None and k is not None else None for p, k in zip(self.close, self.strikePrice)]
-        self.time_value = [round(item, 3) if item is not None else None for item in self.time_value]
-
-        self.moneyness = [
-            'Unknown' if self.under_close is None else (
-                'ITM' if (ct == 'call' and s < float(self.under_close)) or (ct == 'put' and s > float(self.under_close)) else (
-                    'OTM' if (ct == 'call' and s > float(self.under_close)) or (ct == 'put' and s < float(self.under_close)) else 'ATM'
-                )
-            ) for ct, s in zip(self.direction, self.strikePrice)
-        ]
-        self.vol_to_under_vol_ratio = self.option_volume_to_underlying_volume_ratio(volumes=self.volume, underlying_vol=self.under_volume),
-        self.open_interest_weighted_delta = self.option_open_interest_weighted_delta(deltas=self.delta, ois=self.openInterest)
-
-        expiry_series = pd.to_datetime(self.expireDate)
-        today = pd.to_datetime(datetime.now())
+        self.days_to_expiry = _days_to_expiry(self.expireDate)
+        self.time_value = np.round(self.close - under_close + self.strikePrice, 3)
+
+        calls = self.direction == 'call'
+        puts = self.direction == 'put'
+        self.moneyness = np.select(
+            [
+                np.isnan(np.full(len(self.data), under_close)),
+                (calls & (self.strikePrice < under_close)) | (puts & (self.strikePrice > under_close)),
+                (calls & (self.strikePrice > under_close)) | (puts & (self.strikePrice < under_close)),
+            ],
+            ['Unknown', 'ITM', 'OTM'],
+            default='ATM',
+        ).astype(object)
+        self.vol_to_under_vol_ratio = self.optvol_to_underlying_vol_ratio
+        self.open_interest_weighted_delta = self.oi_weighted_delta
 
         # Calculate days to expiry for each date in the series
-        self.days_to_expiry_series = (expiry_series - today).days
-        # Add additional second and third order Greeks
+        self.days_to_expiry_series = self.days_to_expiry
         # Add additional second and third order Greeks
-        self.vanna = [(v * d) / 100 if v is not None and d is not None else None for v, d in zip(self.vega, self.delta)]
-        self.vomma = [(v * (d * (1 - d))) / 10000 if v is not None and d is not None else None for v, d in zip(self.vega, self.delta)]
-        self.charm = [(d * t) / 365 if d is not None and t is not None else None for d, t in zip(self.delta, self.days_to_expiry_series)]
-        self.veta = [(v * (d - 0.5)) if v is not None and d is not None else None for v, d in zip(self.vega, self.delta)]
-        self.speed = [(g * d) / 100 if g is not None and d is not None else None for g, d in zip(self.gamma, self.delta)]
-        self.zomma = [(g * (d - 0.5)) if g is not None and d is not None else None for g, d in zip(self.gamma, self.delta)]
-        self.color = [(g * t) / 365 if g is not None and t is not None else None for g, t in zip(self.gamma, self.days_to_expiry_series)]
-        self.ultima = [(v * (3 * d ** 2 - 2 * d + 1)) / 1000000 if v is not None and d is not None else None for v, d in zip(self.vega, self.delta)]
+        self.vanna = (self.vega * self.delta) / 100
+        self.vomma = (self.vega * (self.delta * (1 - self.delta))) / 10000
+        self.charm = (self.delta * self.days_to_expiry_series) / 365
+        self.veta = self.vega * (self.delta - 0.5)
+        self.speed = (self.gamma * self.delta) / 100
+        self.zomma = self.gamma * (self.delta - 0.5)
+        self.color = (self.gamma * self.days_to_expiry_series) / 365
+        self.ultima = (self.vega * (3 * self.delta ** 2 - 2 * self.delta + 1)) / 1000000
 
 
         # #options profit potential: FINAL - finished
         # self.opp = [moneyness_score*oss*ltr*rrs if moneyness_score and oss and ltr and rrs else None for moneyness_score, oss, ltr, rrs in zip([1 if m == 'ITM' else 0.5 if m == 'ATM' else 0.2 for m in self.moneyness], self.oss, self.ltr, self.rrs)]
         # self.opp = [round(float(item), 3) if item is not None else None for item in self.opp]
-
         self.data_dict = {
             'open': self.open,
             'high': self.high,
@@ -275,14 +335,14 @@ class OptionData:
         }
 
 
-        self.as_dataframe = pd.DataFrame(self.data_dict)
+        self.as_dataframe = pd.DataFrame(self.data_dict, copy=False)
 
     def option_open_interest_weighted_delta(self, deltas, ois):
-        # Replace None with 0 for both deltas and ois
-        cleaned_deltas = [0 if delta is None else delta for delta in deltas]
-        cleaned_ois = [0 if oi is None else oi for oi in ois]
+        # Replace None/NaN with 0 for both deltas and ois
+        deltas = np.nan_to_num(np.asarray(deltas, dtype=np.float64))
+        ois = np.nan_to_num(np.asarray(ois, dtype=np.float64))
 
-        return [delta * oi for delta, oi in zip(cleaned_deltas, cleaned_ois)]
+        return deltas * ois
 
 
     def option_volume_to_underlying_volume_ratio(self, volumes, underlying_vol):
@@ -290,54 +350,52 @@ class OptionData:
             # Avoid division by zero or None
             return 0
 
-        # Replace None with 0 in volumes
-        cleaned_volumes = [0 if volume is None else volume for volume in volumes]
-        total_option_volume = sum(cleaned_volumes)
+        total_option_volume = np.nansum(np.asarray(volumes, dtype=np.float64))
 
         return total_option_volume / underlying_vol
 
 
     def option_implied_volatility_spread(self, ivs, underlying_vol_1y):
+        ivs = np.asarray(ivs, dtype=np.float64)
         if underlying_vol_1y is None:
             # If underlying_vol_1y is None, we can't calculate the spread.
-            # You might want to return None or some default value for each item in ivs
-            return [None for _ in ivs]
+            return np.full(len(ivs), np.nan)
 
-        # If iv is None, the spread can't be calculated for that specific item, so return None for that item
-        return [iv - underlying_vol_1y if iv is not None else 0 for iv in ivs]
+        return ivs - underlying_vol_1y
 
     def average_option_strike_distance(self, strike_prices, underlying_close):
-        if strike_prices is not None and underlying_close is not None and strike_prices != 0 and underlying_close != 0:
-            return sum([abs(underlying_close - strike) for strike in strike_prices]) / len(strike_prices)
+        if strike_prices is not None and underlying_close is not None and len(strike_prices) and underlying_close != 0:
+            return np.abs(underlying_close - np.asarray(strike_prices, dtype=np.float64)).mean()
 
     def put_call_open_interest_ratio(self, ois, call_puts):
-        puts = [oi for oi, cp in zip(ois, call_puts) if cp.lower() == 'put']
-        calls = [oi for oi, cp in zip(ois, call_puts) if cp.lower() == 'call']
-        total_puts = sum(puts)
-        total_calls = sum(calls)
+        ois = np.asarray(ois, dtype=np.float64)
+        call_puts = np.asarray(call_puts, dtype=object)
+        total_puts = ois[call_puts == 'put'].sum()
+        total_calls = ois[call_puts == 'call'].sum()
         return total_puts / total_calls if total_calls != 0 else 0
 
     def put_call_volume_ratio(self, volumes, call_puts):
-        puts_volume = [vol for vol, cp in zip(volumes, call_puts) if cp.lower() == 'put']
-        calls_volume = [vol for vol, cp in zip(volumes, call_puts) if cp.lower() == 'call']
-        total_puts_volume = sum(puts_volume)
-        total_calls_volume = sum(calls_volume)
+        volumes = np.asarray(volumes, dtype=np.float64)
+        call_puts = np.asarray(call_puts, dtype=object)
+        total_puts_volume = volumes[call_puts == 'put'].sum()
+        total_calls_volume = volumes[call_puts == 'call'].sum()
         return total_puts_volume / total_calls_volume if total_calls_volume != 0 else 0
 
     def weighted_average_moneyness(self, strike_prices, underlying_close, ois):
         if strike_prices is not None and underlying_close is not None and ois is not None:
-            weighted_moneyness = [(underlying_close - strike) / underlying_close * oi for strike, oi in zip(strike_prices, ois)]
-            total_oi = sum(ois)
-            return sum(weighted_moneyness) / total_oi if total_oi != 0 else 0
+            ois = np.asarray(ois, dtype=np.float64)
+            weighted_moneyness = (underlying_close - np.asarray(strike_prices, dtype=np.float64)) / underlying_close * ois
+            total_oi = ois.sum()
+            return np.nansum(weighted_moneyness) / total_oi if total_oi != 0 else 0
 
     def change_in_open_interest_adjusted_for_volume(self, oi_changes, volumes):
         if oi_changes is not None and volumes is not None:
-            return [oi_change / vol if vol != 0 else 0 for oi_change, vol in zip(oi_changes, volumes)]
+            return _safe_divide(np.asarray(oi_changes, dtype=np.float64), np.asarray(volumes, dtype=np.float64), 0.0)
 
     def options_liquidity_indicator(self, volumes, ois):
         if volumes is not None and ois is not None:
-            total_volume = sum(volumes)
-            total_open_interest = sum(ois)
+            total_volume = np.sum(volumes)
+            total_open_interest = np.sum(ois)
             return total_volume / total_open_interest if total_open_interest != 0 else 0
 
 
@@ -347,14 +405,13 @@ class OptionData:
     # Function to calculate the rho exposure for interest rate changes.
     def portfolio_rho(self, rhos, ois):
         if rhos is not None and ois is not None:
-            weighted_rhos = [rho * oi for rho, oi in zip(rhos, ois)]
-            return sum(weighted_rhos)
+            return np.dot(np.asarray(rhos, dtype=np.float64), np.asarray(ois, dtype=np.float64))
 
     # Function to calculate the weighted average implied volatility of all options.
     def average_implied_volatility(self):
         # Convert lists to numpy arrays if they aren't already
-        ivs = np.array(self.impVol)
-        ois = np.array(self.openInterest)
+        ivs = np.asarray(self.impVol, dtype=np.float64)
+        ois = np.asarray(self.openInterest, dtype=np.float64)
         
 
 
@@ -380,17 +437,19 @@ class OptionData:
     # Function to measure the sensitivity of the delta to changes in the underlying price.
     def get_delta_sensitivity(self, deltas, gammas, underlying_change):
         if deltas is not None and gammas is not None and underlying_change is not None:
-            return [delta + gamma * underlying_change for delta, gamma in zip(deltas, gammas)]
+            return np.asarray(deltas, dtype=np.float64) + np.asarray(gammas, dtype=np.float64) * underlying_change
 
     # Function to calculate the vega-weighted average maturity of the options.
     def get_vega_weighted_maturity(self, expirys, vegas):
         current_date = datetime.today().date()  # Ensure current_date is a datetime.date object
 
         # Make sure expirys list contains datetime.date objects
-        days_to_expiry = [(expiry - current_date).days if expiry and isinstance(expiry, date) else 0 for expiry in expirys]
+        days_to_expiry = np.array([(expiry - current_date).days if expiry and isinstance(expiry, date) else 0 for expiry in expirys],
+                                  dtype=np.float64)
+        vegas = np.asarray(vegas, dtype=np.float64)
 
-        total_vega = sum(vegas)
-        vega_weighted_days = sum([days * vega for days, vega in zip(days_to_expiry, vegas)])
+        total_vega = vegas.sum()
+        vega_weighted_days = np.dot(days_to_expiry, vegas)
         return vega_weighted_days / total_vega if total_vega != 0 else 0
 
 
@@ -398,8 +457,8 @@ class OptionData:
     # Function to calculate the gamma-weighted range of the option.
     def get_gamma_weighted_range(self, highs, lows, gammas):
         if highs is not None and lows is not None and gammas is not None:
-            ranges = [high - low for high, low in zip(highs, lows)]
-            total_gamma = sum(gammas)
+            ranges = np.asarray(highs, dtype=np.float64) - np.asarray(lows, dtype=np.float64)
+            total_gamma = np.sum(gammas)
             return np.dot(gammas, ranges) / total_gamma if total_gamma != 0 else 0
 
 
@@ -496,40 +555,41 @@ class GroupData:
 class MultiOptions:
     def __init__(self, derivativeList):
 
-        self.open = [float(i.get('open')) if i.get('open') is not None else 0.0 for i in derivativeList]
-        self.high = [float(i.get('high')) if i.get('high') is not None else 0.0 for i in derivativeList]
-        self.low = [float(i.get('low')) if i.get('low') is not None else 0.0 for i in derivativeList]
-        self.strikePrice = [float(i.get('strikePrice')) if i.get('strikePrice') is not None else 0.0 for i in derivativeList]
-        self.openInterest = [float(i.get('openInterest')) if i.get('openInterest') is not None else 0.0 for i in derivativeList]
-        self.volume = [float(i.get('volume')) if i.get('volume') is not None else 0.0 for i in derivativeList]
-        self.latestPriceVol = [float(i.get('latestPriceVol')) if i.get('latestPriceVol') is not None else 0.0 for i in derivativeList]
-        self.delta = [float(i.get('delta')) if i.get('delta') is not None else 0.0 for i in derivativeList]
-        self.vega = [float(i.get('vega')) if i.get('vega') is not None else 0.0 for i in derivativeList]
-        self.impVol = [float(i.get('impVol')) if i.get('impVol') is not None else 0.0 for i in derivativeList]
-        self.gamma = [float(i.get('gamma')) if i.get('gamma') is not None else 0.0 for i in derivativeList]
-        self.theta = [float(i.get('theta')) if i.get('theta') is not None else 0.0 for i in derivativeList]
-        self.rho = [float(i.get('rho')) if i.get('rho') is not None else 0.0 for i in derivativeList]
-        self.close = [float(i.get('close')) if i.get('close') is not None else 0.0 for i in derivativeList]
-        self.change = [float(i.get('change')) if i.get('change') is not None else 0.0 for i in derivativeList]
-        self.changeRatio = [float(i.get('changeRatio')) if i.get('changeRatio') is not None else 0.0 for i in derivativeList]
-        self.expireDate = [i.get('expireDate') if i.get('expireDate') is not None else 'N/A' for i in derivativeList]
-        self.tickerId = [i.get('tickerId') if i.get('tickerId') is not None else -1 for i in derivativeList]
-        self.belongTickerId = [i.get('belongTickerId') if i.get('belongTickerId') is not None else -1 for i in derivativeList]
-        self.openIntChange = [float(i.get('openIntChange')) if i.get('openIntChange') is not None else 0.0 for i in derivativeList]
-        self.activeLevel = [float(i.get('activeLevel')) if i.get('activeLevel') is not None else 0.0 for i in derivativeList]
-        self.direction = [i.get('direction') for i in derivativeList]
-        self.symbol = [i.get('symbol') for i in derivativeList]
-        self.unSymbol = [i.get('unSymbol') for i in derivativeList]
-        askList = [i.get('askList') for i in derivativeList]
-        askList = [item for sublist in askList for item in sublist]
-        self.ask_price = [float(i.get('price')) for i in askList]
-        self.ask_volume = [float(i.get('volume')) for i in askList]
-        bidList = [i.get('bidList') for i in derivativeList]
-        bidList = [item for sublist in bidList for item in sublist]
-        self.bid_price = [float(i.get('price')) for i in bidList]
-        self.bid_volume = [float(i.get('volume')) for i in bidList]
-        self.tradeTime = [i.get('tradeTime') for i in derivativeList]
-        self.tradeStamp = [i.get('tradeStamp') for i in derivativeList]
+        floats, objects, books = _extract_columns(derivativeList, _MULTI_FLOAT_FIELDS, _MULTI_OBJECT_FIELDS,
+                                                  books=('askList', 'bidList'))
+        self.open = floats['open']
+        self.high = floats['high']
+        self.low = floats['low']
+        self.strikePrice = floats['strikePrice']
+        self.openInterest = floats['openInterest']
+        self.volume = floats['volume']
+        self.latestPriceVol = floats['latestPriceVol']
+        self.delta = floats['delta']
+        self.vega = floats['vega']
+        self.impVol = floats['impVol']
+        self.gamma = floats['gamma']
+        self.theta = floats['theta']
+        self.rho = floats['rho']
+        self.close = floats['close']
+        self.change = floats['change']
+        self.changeRatio = floats['changeRatio']
+        self.expireDate = objects['expireDate']
+        self.expireDate[np.equal(self.expireDate, None)] = 'N/A'
+        self.tickerId = objects['tickerId']
+        self.tickerId[np.equal(self.tickerId, None)] = -1
+        self.belongTickerId = objects['belongTickerId']
+        self.belongTickerId[np.equal(self.belongTickerId, None)] = -1
+        self.openIntChange = floats['openIntChange']
+        self.activeLevel = floats['activeLevel']
+        self.direction = objects['direction']
+        self.symbol = objects['symbol']
+        self.unSymbol = objects['unSymbol']
+        # top of book only, so quotes stay aligned with their contract even when
+        # a contract has zero or several levels on a side
+        self.ask_price, self.ask_volume = books['askList']
+        self.bid_price, self.bid_volume = books['bidList']
+        self.tradeTime = objects['tradeTime']
+        self.tradeStamp = objects['tradeStamp']
 
         self.data_dict=  { 
             'option_symbol': self.symbol,
@@ -567,7 +627,7 @@ class MultiOptions:
         }
 
 
-        self.as_dataframe = pd.DataFrame(self.data_dict)
+        self.as_dataframe = pd.DataFrame(self.data_dict, copy=False)
 
     def compute_high_order_greeks(self):
         S = np.array(self.data_dict['spot'])        # underlying price array
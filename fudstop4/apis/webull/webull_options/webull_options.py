@@ -39,6 +39,9 @@ class WebullOptions:
         self.conn = None
         self.pool = None
         self.user=user
+        # underlying -> {option_symbol: derivative_id}, filled by get_option_ids
+        # so id lookups don't go back to postgres every time
+        self.option_id_index: Dict[str, Dict[str, int]] = {}
         self.api_key = os.environ.get('YOUR_POLYGON_KEY')
         self.today = datetime.now().strftime('%Y-%m-%d')
         self.yesterday = (datetime.now() - timedelta(days=1)).strftime('%Y-%m-%d')
@@ -596,21 +599,28 @@ class WebullOptions:
         
 
     async def yield_batch_ids(self, ticker_symbol):
-        conn = await self.db_manager.get_connection()
-
-        # We will fetch all derivative IDs associated with the ticker symbol
-        derivative_ids = await conn.fetch(
-            'SELECT ticker_id FROM wb_opts WHERE underlying_symbol = $1',
-            ticker_symbol
-        )
-        
-        # Convert the records to a list of IDs
-        derivative_id_list = [str(record['ticker_id']) for record in derivative_ids]
+        derivative_id_list = [str(i) for i in await self.get_option_id_for_symbol(ticker_symbol)]
 
         # Yield batches of 55 IDs at a time as a comma-separated string
         for i in range(0, len(derivative_id_list), 55):
             yield ','.join(derivative_id_list[i:i+55])
 
+    @staticmethod
+    def extract_option_ids(response_json, ticker):
+        """Pull unique (option_symbol, derivative_id, underlying) triples out of a strategy/list response."""
+        triples = set()
+        for expiry in response_json.get('expireDateList') or []:
+            for item in (expiry or {}).get('data') or []:
+                symbol, derivative_id = item.get('symbol'), item.get('tickerId')
+                if symbol is not None and derivative_id is not None:
+                    triples.add((str(symbol), int(derivative_id), str(ticker)))
+        return triples
+
+    def index_option_ids(self, triples):
+        """Merge (option_symbol, derivative_id, underlying) triples into the local id index."""
+        for symbol, derivative_id, underlying in triples:
+            self.option_id_index.setdefault(underlying, {})[symbol] = derivative_id
+
     async def get_option_ids(self, ticker):
         ticker_id = await trading.get_webull_id(ticker)
         params = {
@@ -631,64 +641,23 @@ class WebullOptions:
 
         # Headers you may need to include, like authentication tokens, etc.
         headers = trading.headers
-        # The body of your POST request as a Python dictionary
-        import pandas as pd
-        # Make the POST request
-        # Make the POST request
         async with aiohttp.ClientSession(headers=headers) as session:
             async with session.post(url, data=data) as resp:
-                response_json = await resp.json()
-             
-                # Extract the 'expireDateList' from the response
-                expireDateList = response_json.get('expireDateList')
-
-                # Flatten the nested 'data' from each item in 'expireDateList'
-            try:
-                data_flat = [item for sublist in expireDateList if sublist and sublist.get('data') for item in sublist['data']]
-
-
-
-                # Create a DataFrame from the flattened data
-                df_cleaned = pd.DataFrame(data_flat)
-
-                # Drop the 'askList' and 'bidList' columns if they exist
-                df_cleaned.drop(columns=['askList', 'bidList'], errors='ignore', inplace=True)
-                # Existing DataFrame columns
-                df_columns = df_cleaned.columns
-
-                # Original list of columns you want to convert to numeric
-                numeric_cols = ['open', 'high', 'low', 'strikePrice', 'isStdSettle', 'quoteMultiplier', 'quoteLotSize']
-
-                # Filter the list to include only columns that exist in the DataFrame
-                existing_numeric_cols = [col for col in numeric_cols if col in df_columns]
-
-                # Now apply the to_numeric conversion only to the existing columns
-                df_cleaned[existing_numeric_cols] = df_cleaned[existing_numeric_cols].apply(pd.to_numeric, errors='coerce')
-
-      
-   
-                df_cleaned.to_csv('test.csv', index=False)
-
-
-                # Load the data from the CSV file
-                df = pd.read_csv('test.csv')
-
-                # Extract 'tickerId' column values in batches of 55
-                ticker_ids = df['tickerId'].unique()  # Assuming 'tickerId' is a column in your DataFrame
-                symbol_list = df['symbol'].unique().tolist()
-            # Pair up 'tickerId' and 'symbol'
-                # Before you call batch_insert_options, make sure pairs contain the correct types
-                pairs = [(str(symbol), int(ticker_id), str(ticker)) for ticker_id, symbol in zip(ticker_ids, symbol_list)]
+                try:
+                    response_json = await resp.json()
+                except ContentTypeError:
+                    print(f'Error for {ticker}')
+                    return []
 
-                
-                await self.batch_insert_options(pairs)
+        triples = self.extract_option_ids(response_json, ticker)
+        if not triples:
+            return []
 
-                return ticker_ids
+        self.index_option_ids(triples)
+        await self.batch_insert_options(triples)
 
+        return sorted(triples)
 
-               
-            except (ContentTypeError, TypeError):
-                print(f'Error for {ticker}')
     async def update_and_insert_options(self, ticker):
 
         data, _, options = await self.all_options(ticker)
@@ -722,35 +691,35 @@ class WebullOptions:
             return await self.get_option_ids(ticker)
 
 
-    async def batch_insert_options(self, pairs):
-        try:
-            conn = await self.db_manager.get_connection()  # Acquire a connection from the pool
-
-            async with conn.transaction():  # Start a transaction
-                # Prepare the statement to insert data
-                insert_query = 'INSERT INTO wb_opts (underlying_symbol, ticker_id, option_symbol) VALUES ($1, $2, $3)'
-                # Perform the batch insert
-                await conn.executemany(insert_query, pairs)
-                print("Batch insert completed.")
-        except asyncpg.exceptions.UniqueViolationError:
-            print(f'Duplicate found - skipping.')
+    async def batch_insert_options(self, triples):
+        """Bulk-load (option_symbol, derivative_id, underlying) triples into wb_opts with one COPY."""
+        pool = await self.db.connect()
+        async with pool.acquire() as conn:
+            async with conn.transaction():
+                await conn.execute(
+                    'CREATE TEMP TABLE wb_option_ids_stage '
+                    '(option_symbol TEXT, ticker_id BIGINT, underlying_symbol TEXT) ON COMMIT DROP'
+                )
+                await conn.copy_records_to_table('wb_option_ids_stage', records=list(triples))
+                await conn.execute(
+                    'INSERT INTO wb_opts (option_symbol, ticker_id, underlying_symbol) '
+                    'SELECT option_symbol, ticker_id, underlying_symbol FROM wb_option_ids_stage '
+                    'ON CONFLICT DO NOTHING'
+                )
 
 
     async def get_option_id_for_symbol(self, ticker_symbol):
-        async with self.pool.acquire() as conn:
-            # Start a transaction
-            async with conn.transaction():
-                # Execute the query to get the option_id for a given ticker_symbol
-                # This assumes 'symbol' column exists in 'options_data' table and 
-                # is used to store the ticker symbol
-                query = f'''
-                    SELECT ticker_id FROM wb_opts
-                    WHERE ticker = '{ticker_symbol}';
-                '''
-                # Fetch the result
-                result = await conn.fetch(query)
-                # Return a list of option_ids or an empty list if none were found
-                return [record['ticker_id'] for record in result]
+        """Derivative ids for an underlying - served from the local index, postgres only on a miss."""
+        if ticker_symbol not in self.option_id_index:
+            pool = await self.db.connect()
+            async with pool.acquire() as conn:
+                records = await conn.fetch(
+                    'SELECT option_symbol, ticker_id FROM wb_opts WHERE underlying_symbol = $1',
+                    ticker_symbol
+                )
+            # only a hit is remembered - an empty answer is asked again once an ingest may have filled wb_opts
+            self.index_option_ids((r['option_symbol'], r['ticker_id'], ticker_symbol) for r in records)
+        return list(self.option_id_index.get(ticker_symbol, {}).values())
 
 
     async def get_option_symbols_by_ticker_id(self, ticker_id):
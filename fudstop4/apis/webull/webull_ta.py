@@ -25,6 +25,9 @@ import hashlib
 import random
 import string
 import time
+from fudstop4.apis.singleflight import coalesced
+from fudstop4.apis.rate_limiter import rate_limiter, limited_get_json
+from fudstop4.apis.metrics import metrics, timed
 
 class WebullTA:
     def __init__(self):
@@ -738,6 +741,8 @@ class WebullTA:
     async def get_webull_ids(self, symbols):
         """Fetch ticker IDs for a list of symbols in one go."""
         return {symbol: self.ticker_to_id_map.get(symbol) for symbol in symbols}
+    @timed()
+    @coalesced('ticker', 'interval', 'count')
     async def get_candle_data(self, ticker, interval, headers, count:str='200'):
         try:
             timeStamp = None
@@ -774,8 +779,11 @@ class WebullTA:
 
             timespan = interval_mapping.get(interval)
 
+            await rate_limiter.acquire(base_fintech_gw_url)
             async with httpx.AsyncClient(headers=headers) as client:
                 data = await client.get(base_fintech_gw_url)
+                rate_limiter.observe(base_fintech_gw_url, data.status_code, data.headers.get('Retry-After'))
+                metrics.observe_http(base_fintech_gw_url, data.status_code, data.elapsed.total_seconds(), len(data.content))
                 r = data.json()
                 if r and isinstance(r, list) and 'data' in r[0]:
                     data = r[0]['data']
@@ -2241,6 +2249,8 @@ class WebullTA:
 
 
     # ─── UTILITY: RETRY AIOHTTP REQUESTS ─────────────────────────────────────────
+    @timed()
+    @coalesced('url', 'headers')
     async def fetch_with_retries(
         self,
         session: aiohttp.ClientSession,
@@ -2254,9 +2264,7 @@ class WebullTA:
         """
         for attempt in range(retries):
             try:
-                async with session.get(url, headers=headers, timeout=aiohttp.ClientTimeout(total=10)) as response:
-                    response.raise_for_status()
-                    return await response.json()
+                return await limited_get_json(session, url, headers=headers, timeout=aiohttp.ClientTimeout(total=10))
             except Exception as e:
                 logging.warning(
                     "Attempt %d/%d failed for URL %s: %s",
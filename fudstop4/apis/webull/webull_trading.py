@@ -38,6 +38,9 @@ import asyncio
 
 from datetime import datetime, timedelta, timezone
 from fudstop4.apis.helpers import generate_webull_headers
+from fudstop4.apis.singleflight import coalesced
+from fudstop4.apis.rate_limiter import rate_limiter, limited_get_json
+from fudstop4.apis.metrics import timed
 screen = WebullOptionScreener()
 webull = wb()
 class WebullTrading:
@@ -166,10 +169,12 @@ class WebullTrading:
     def is_etf(self, symbol):
         """Check if a symbol is an ETF."""
         return symbol in self.etf_list['Symbol'].values
+    @timed()
+    @coalesced('endpoint', 'headers')
     async def fetch_endpoint(self, endpoint, headers=None):
+        # webull's error payloads ({'code': ..., 'msg': ...}) come back to the caller as before
         async with aiohttp.ClientSession(headers=headers) as session:
-            async with session.get(endpoint) as resp:
-                return await resp.json()
+            return await limited_get_json(session, endpoint, raise_for_status=False)
 
     async def search_ticker(self, keyword, page_size:str='1'):
 
@@ -0,0 +1,170 @@
+import os
+import time
+import asyncio
+import functools
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+from fudstop4.apis.metrics import metrics
+from fudstop4.apis.singleflight import SingleFlight, _freeze
+
+
+YF_WORKERS = int(os.environ.get('FUDSTOP_YF_WORKERS', 8))
+
+
+def _seconds_until_midnight():
+    now = datetime.now()
+    return (datetime.combine(now.date() + timedelta(days=1), datetime.min.time()) - now).total_seconds()
+
+
+def _copy(result):
+    # SingleFlight already hands out frame copies; series get mutated by callers just the same
+    if isinstance(result, pd.Series):
+        return result.copy()
+    return result
+
+
+def _resolve(ticker, name, args, kwargs):
+    """ticker.<name>(*args, **kwargs) for methods, ticker.<name> for properties (which fetch on access)."""
+    value = getattr(ticker, name)
+    return value(*args, **kwargs) if callable(value) else value
+
+
+def split_download(frame: pd.DataFrame, symbol: str) -> pd.DataFrame:
+    """One symbol's OHLCV out of a multi-ticker ``download(group_by='ticker')`` frame."""
+    if isinstance(frame.columns, pd.MultiIndex):
+        if symbol not in frame.columns.get_level_values(0):
+            return pd.DataFrame()
+        frame = frame[symbol]
+    return frame.dropna(how='all')
+
+
+class YfOffload:
+    """
+    Runs blocking yfinance calls off the event loop.
+
+    Every call goes to one bounded thread pool (``max_workers`` yfinance
+    requests at most, process-wide), so websocket handlers and cogs sharing
+    the loop keep running while Yahoo answers. One ``Ticker`` per symbol is
+    reused for ``ticker_ttl`` seconds (its cookie / crumb and lazily loaded
+    data come with it). ``daily`` calls - statements, holders, estimates -
+    are cached until midnight; identical calls in flight are shared either
+    way. ``candles`` requests landing within ``batch_window`` seconds of each
+    other become a single ``download`` for all their symbols.
+
+    >>> sheet = await yf_offload.call('AAPL', 'get_balance_sheet', freq='quarterly', daily=True)
+    >>> spy, qqq = await asyncio.gather(yf_offload.candles('SPY', period='5d'), yf_offload.candles('QQQ', period='5d'))
+    """
+    def __init__(self, backend=None, max_workers: int = YF_WORKERS, ticker_ttl: float = 600,
+                 batch_window: float = 0.05, max_batch: int = 200, max_tickers: int = 2048):
+        self._backend = backend
+        self.max_workers = max_workers
+        self.ticker_ttl = ticker_ttl
+        self.batch_window = batch_window
+        self.max_batch = max_batch
+        self.max_tickers = max_tickers
+        self._executor = None
+        self._tickers = OrderedDict()      # symbol -> (expires, Ticker)
+        self._flight = SingleFlight(ttl=0, maxsize=4096)
+        self._pending = {}                 # frozen download kwargs -> {symbol: future}
+        self.counts = {'calls': 0, 'tickers_created': 0, 'downloads': 0, 'symbols_downloaded': 0}
+
+    @property
+    def backend(self):
+        if self._backend is None:
+            import yfinance
+            self._backend = yfinance
+        return self._backend
+
+    @property
+    def executor(self):
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='yfinance')
+        return self._executor
+
+    async def run(self, fn, *args, name: str = None, **kwargs):
+        """``fn(*args, **kwargs)`` on the yfinance pool."""
+        self.counts['calls'] += 1
+        with metrics.track(f"yfinance.{name or getattr(fn, '__name__', 'call')}"):
+            return await asyncio.get_running_loop().run_in_executor(self.executor, functools.partial(fn, *args, **kwargs))
+
+    def ticker(self, symbol: str):
+        symbol = symbol.upper()
+        now = time.monotonic()
+        entry = self._tickers.get(symbol)
+        if entry is not None and entry[0] > now:
+            self._tickers.move_to_end(symbol)
+            return entry[1]
+        ticker = self.backend.Ticker(symbol)
+        self.counts['tickers_created'] += 1
+        self._tickers[symbol] = (now + self.ticker_ttl, ticker)
+        self._tickers.move_to_end(symbol)
+        while len(self._tickers) > self.max_tickers:
+            self._tickers.popitem(last=False)
+        return ticker
+
+    async def call(self, symbol: str, name: str, *args, daily: bool = False, ttl: float = 0, **kwargs):
+        """
+        ``Ticker(symbol).<name>`` - a method called with ``args`` / ``kwargs``,
+        or a property read - on the pool. ``daily`` results are held until
+        midnight, others for ``ttl`` seconds.
+        """
+        symbol = symbol.upper()
+        key = (symbol, name, _freeze(args), _freeze(kwargs))
+        if daily:
+            key, ttl = key + (datetime.now().date(),), _seconds_until_midnight()
+        result = await self._flight.do(key, self.run, _resolve, self.ticker(symbol), name, args, kwargs, name=name, ttl=ttl)
+        return _copy(result)
+
+    async def download(self, symbols, **kwargs) -> pd.DataFrame:
+        """One ``yf.download`` for ``symbols`` (grouped by ticker), on the pool."""
+        symbols = list(dict.fromkeys(s.upper() for s in symbols))
+        self.counts['downloads'] += 1
+        self.counts['symbols_downloaded'] += len(symbols)
+        return await self.run(self.backend.download, symbols, name='download',
+                              **{'group_by': 'ticker', 'progress': False, 'auto_adjust': False, **kwargs})
+
+    async def candles(self, symbol: str, **kwargs) -> pd.DataFrame:
+        """OHLCV for one symbol, batched with whatever other symbols are requested alongside it."""
+        symbol = symbol.upper()
+        key = _freeze(kwargs)
+        loop = asyncio.get_running_loop()
+        batch = self._pending.get(key)
+        if batch is None:
+            batch = self._pending[key] = {}
+            loop.call_later(self.batch_window, lambda: asyncio.ensure_future(self._flush(key, batch, kwargs)))
+        future = batch.get(symbol)
+        if future is None:
+            future = batch[symbol] = loop.create_future()
+            if len(batch) >= self.max_batch:
+                asyncio.ensure_future(self._flush(key, batch, kwargs))
+        return (await asyncio.shield(future)).copy()
+
+    async def _flush(self, key, batch, kwargs):
+        if self._pending.get(key) is not batch:
+            return  # already flushed (full batch) - the timer is a no-op
+        del self._pending[key]
+        try:
+            frame = await self.download(list(batch), **kwargs)
+        except Exception as e:
+            for future in batch.values():
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for symbol, future in batch.items():
+            if not future.done():
+                future.set_result(split_download(frame, symbol))
+
+    def shutdown(self, wait: bool = True):
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait)
+            self._executor = None
+
+    def stats(self) -> dict:
+        return {**self.counts, 'tickers_cached': len(self._tickers), **self._flight.stats()}
+
+
+yf_offload = YfOffload()
@@ -19,8 +19,8 @@ DATABASE CONNECTION AND USAGE INSTRUCTIONS:
     - To use any async method, ensure you're running them within an asyncio event loop.
 """
 from fudstop4.apis.helpers import camel_to_snake, is_etf
+import asyncio
 import logging
-import yfinance as yf
 import pandas as pd
 import numpy as np
 from datetime import datetime
@@ -31,6 +31,7 @@ logger = logging.getLogger(__name__)
 
 from ..._markets.list_sets.ticker_lists import all_tickers
 from fudstop4.apis.polygonio.polygon_options import PolygonOptions
+from fudstop4.apis.y_finance.yf_offload import yf_offload
 from ..helpers import lowercase_columns, format_large_numbers_in_dataframe
 
 
@@ -62,6 +63,8 @@ class YfSDK:
             password='fud',
             port=5432
         )
+        # yfinance blocks - every call goes through the shared thread pool / ticker + daily caches
+        self.yf = yf_offload
 
     async def balance_sheet(
         self, ticker: str, frequency: str = 'quarterly', pretty: bool = False, as_dict: bool = False
@@ -80,8 +83,7 @@ class YfSDK:
             - Establishes a connection with `await self.db.connect()`.
             - Inserts data into the 'balance_sheet' table using a unique constraint on 'ticker'.
         """
-        data = yf.Ticker(ticker)
-        balance_sheet = data.get_balance_sheet(freq=frequency, pretty=pretty, as_dict=as_dict)
+        balance_sheet = await self.yf.call(ticker, 'get_balance_sheet', freq=frequency, pretty=pretty, as_dict=as_dict, daily=True)
 
         df = balance_sheet.transpose()
         df = lowercase_columns(df)
@@ -106,7 +108,7 @@ class YfSDK:
             - Establishes a connection using `await self.db.connect()`.
             - Inserts data into the 'cash_flow' table with 'ticker' as a unique column.
         """
-        data = yf.Ticker(ticker).get_cash_flow(freq=frequency, pretty=pretty, as_dict=as_dict)
+        data = await self.yf.call(ticker, 'get_cash_flow', freq=frequency, pretty=pretty, as_dict=as_dict, daily=True)
         logger.info("Cash flow data columns: %s", data.columns)
 
 
@@ -116,23 +118,32 @@ class YfSDK:
 
         return df
 
-    async def get_all_candles(self, tickers: str):
+    async def get_all_candles(self, tickers: str, period: str = 'max', interval: str = '1d'):
         """
         Gets OHLC, adjusted close, and volume data for all dates for the provided tickers.
 
         Arguments:
             tickers (str): A comma-separated list of ticker symbols.
 
+        Returns:
+            One long frame - date, ohlc, adj close, volume and ticker per row. All the
+            symbols (and any requested concurrently) come from a single download.
+
         Database Usage:
             - Optionally, the returned DataFrame can be inserted into a 'candles' table.
             - Establishes a connection with `await self.db.connect()` before processing data.
         """
         try:
-            chart_data = yf.download(tickers)
-            chart_data = pd.DataFrame(chart_data).reset_index()
-            df = lowercase_columns(chart_data)
-            df['ticker'] = tickers
-            return chart_data
+            symbols = [t for t in tickers.replace(',', ' ').split() if t]
+            frames = await asyncio.gather(*(self.yf.candles(s, period=period, interval=interval) for s in symbols))
+            parts = []
+            for symbol, frame in zip(symbols, frames):
+                if frame.empty:
+                    continue
+                frame = lowercase_columns(frame.reset_index())
+                frame['ticker'] = symbol.upper()
+                parts.append(frame)
+            return pd.concat(parts, ignore_index=True) if parts else pd.DataFrame()
         except Exception as e:
             logger.error("Error processing candle data for %s: %s", tickers, e)
             return pd.DataFrame()
@@ -148,7 +159,7 @@ class YfSDK:
             Dividend data or an error message.
         """
         try:
-            data = yf.Ticker(ticker).get_dividends()
+            data = await self.yf.call(ticker, 'get_dividends', daily=True)
             return data
         except Exception as e:
             logger.error("No dividends found for %s: %s", ticker, e)
@@ -160,14 +171,9 @@ class YfSDK:
         Returns fast info for a ticker as a single-row DataFrame where 
         the dictionary keys become the column names.
         """
-        # Get the fast info from yfinance.
-        info = yf.Ticker(ticker).get_fast_info()  # this is a lazy-loading dict
-
-        # Convert it to a standard dictionary.
-        # Option 1: Using dict() on info.items()
-        info_dict = dict(info.items())
-        # Option 2 (if Option 1 doesn't work reliably):
-        # info_dict = {key: info[key] for key in info.keys()}
+        # Get the fast info from yfinance - a lazy-loading dict, so it is read
+        # into a standard dictionary on the yfinance pool too (each key can fetch).
+        info_dict = await self.yf.run(lambda t: dict(t.get_fast_info().items()), self.yf.ticker(ticker), name='get_fast_info')
 
         # Create a DataFrame with one row by wrapping the dictionary in a list.
         df = pd.DataFrame([info_dict])
@@ -188,7 +194,7 @@ class YfSDK:
         Returns:
             A formatted DataFrame containing financial data.
         """
-        data = yf.Ticker(ticker).get_financials(freq=frequency, as_dict=as_dict, pretty=pretty)
+        data = await self.yf.call(ticker, 'get_financials', freq=frequency, as_dict=as_dict, pretty=pretty, daily=True)
         formatted_data = format_large_numbers_in_dataframe(data)
         return formatted_data
 
@@ -209,7 +215,7 @@ class YfSDK:
             - Connects to the database with `await self.db.connect()`.
             - Inserts data into the 'income_statement' table using a unique 'ticker' column.
         """
-        data = yf.Ticker(ticker).get_income_stmt(freq=frequency, as_dict=as_dict, pretty=pretty)
+        data = await self.yf.call(ticker, 'get_income_stmt', freq=frequency, as_dict=as_dict, pretty=pretty, daily=True)
         await self.db.connect()
         df = data.transpose()
         df = lowercase_columns(df)
@@ -231,7 +237,7 @@ class YfSDK:
             - Cleans and processes the data before inserting into the 'info' table.
             - Uses `await self.db.connect()` to establish a connection prior to insertion.
         """
-        data = yf.Ticker(ticker).get_info()
+        data = await self.yf.call(ticker, 'get_info', ttl=300)
         df = pd.DataFrame([data])
         await self.db.connect()
         df = lowercase_columns(df)
@@ -254,7 +260,7 @@ class YfSDK:
             - Connects to the database using `await self.db.connect()`.
             - Inserts the data into the 'institutions' table, with 'ticker' as the unique column.
         """
-        data = yf.Ticker(ticker).get_institutional_holders()
+        data = await self.yf.call(ticker, 'get_institutional_holders', daily=True)
         await self.db.connect()
         df = lowercase_columns(data)
         df['ticker'] = ticker
@@ -278,7 +284,7 @@ class YfSDK:
             - Uses `await self.db.connect()` to ensure a database connection.
             - Inserts the data into the 'mf_holders' table.
         """
-        data = yf.Ticker(ticker).get_mutualfund_holders()
+        data = await self.yf.call(ticker, 'get_mutualfund_holders', daily=True)
         await self.db.connect()
         df = lowercase_columns(data)
         df['ticker'] = ticker
@@ -302,7 +308,7 @@ class YfSDK:
             - Establishes a database connection using `await self.db.connect()`.
             - Inserts the data into the 'atm_calls' table using 'option_symbol' as the unique column.
         """
-        calls_data = yf.Ticker(ticker)._download_options()
+        calls_data = await self.yf.call(ticker, '_download_options')
         call_options = calls_data.get('calls', [])
         df = pd.DataFrame(call_options)
 
@@ -327,7 +333,7 @@ class YfSDK:
             - Establishes a database connection via `await self.db.connect()`.
             - Inserts the data into the 'atm_puts' table with 'option_symbol' as the unique column.
         """
-        puts_data = yf.Ticker(ticker)._download_options()
+        puts_data = await self.yf.call(ticker, '_download_options')
         put_options = puts_data.get('puts', [])
         df = pd.DataFrame(put_options)
 
@@ -344,9 +350,7 @@ class YfSDK:
 
     async def analyst_price_targets(self, ticker):
 
-        analysts = yf.Ticker(ticker)
-
-        analysts = analysts.analyst_price_targets
+        analysts = await self.yf.call(ticker, 'analyst_price_targets', daily=True)
         
         df = pd.DataFrame(analysts, index=[0])
         df['ticker'] = ticker
@@ -357,8 +361,7 @@ class YfSDK:
 
     async def splits_and_dividends(self, ticker):
 
-        sad = yf.Ticker(ticker)
-        sad = sad.actions
+        sad = await self.yf.call(ticker, 'actions', daily=True)
 
         sad['ticker'] = ticker
         sad.columns = [camel_to_snake(col) for col in sad.columns]
@@ -368,9 +371,7 @@ class YfSDK:
 
     async def calendar(self, ticker):
 
-        data = yf.Ticker(ticker)
-
-        data = data.calendar
+        data = await self.yf.call(ticker, 'calendar', daily=True)
         df = pd.DataFrame(data)
         df['ticker'] = ticker
         df.columns = [camel_to_snake(col) for col in df.columns]
@@ -379,9 +380,7 @@ class YfSDK:
 
     async def earnings_estimates(self, ticker):
 
-        data = yf.Ticker(ticker)
-
-        data = data.earnings_estimate
+        data = await self.yf.call(ticker, 'earnings_estimate', daily=True)
         data['ticker'] = ticker
         data.columns = [camel_to_snake(col) for col in data.columns]
         data.reset_index(inplace=True)
@@ -389,9 +388,7 @@ class YfSDK:
 
     async def eps_trend(self, ticker):
 
-        data = yf.Ticker(ticker)
-
-        data = data.eps_trend
+        data = await self.yf.call(ticker, 'eps_trend', daily=True)
         data['ticker'] = ticker
         data.columns = [camel_to_snake(col) for col in data.columns]
         data.reset_index(inplace=True)
@@ -399,9 +396,7 @@ class YfSDK:
 
     async def eps_revisions(self, ticker):
 
-        data = yf.Ticker(ticker)
-
-        data = data.eps_revisions
+        data = await self.yf.call(ticker, 'eps_revisions', daily=True)
         data['ticker'] = ticker
         data.columns = [camel_to_snake(col) for col in data.columns]
         data.reset_index(inplace=True)
@@ -409,9 +404,7 @@ class YfSDK:
     
     async def growth_estimates(self, ticker):
 
-        data = yf.Ticker(ticker)
-
-        data = data.growth_estimates
+        data = await self.yf.call(ticker, 'growth_estimates', daily=True)
         data['ticker'] = ticker
         data.columns = [camel_to_snake(col) for col in data.columns]
         data.reset_index(inplace=True)
@@ -419,9 +412,7 @@ class YfSDK:
 
     async def insider_purchases(self, ticker):
 
-        data = yf.Ticker(ticker)
-
-        data = data.insider_purchases
+        data = await self.yf.call(ticker, 'insider_purchases', daily=True)
         data['ticker'] = ticker
         data.columns = [camel_to_snake(col) for col in data.columns]
         return data
@@ -429,9 +420,7 @@ class YfSDK:
 
     async def executive_holdings(self, ticker):
 
-        data = yf.Ticker(ticker)
-
-        data = data.insider_roster_holders
+        data = await self.yf.call(ticker, 'insider_roster_holders', daily=True)
         data['ticker'] = ticker
         data.columns = [camel_to_snake(col) for col in data.columns]
         return data
@@ -439,9 +428,7 @@ class YfSDK:
 
     async def insider_transactions(self, ticker):
 
-        data = yf.Ticker(ticker)
-
-        data = data.insider_transactions
+        data = await self.yf.call(ticker, 'insider_transactions', daily=True)
         data['ticker'] = ticker
         data.columns = [camel_to_snake(col) for col in data.columns]
         return data
@@ -449,23 +436,20 @@ class YfSDK:
 
     async def institutional_holders(self, ticker):
 
-        data = yf.Ticker(ticker)
-
-        data = data.institutional_holders
+        data = await self.yf.call(ticker, 'institutional_holders', daily=True)
         data['ticker'] = ticker
         data.columns = [camel_to_snake(col) for col in data.columns]
         return data
 
     async def major_holders(self, ticker):
 
-        data = yf.Ticker(ticker)
         index = [
             'insidersPercentHeld',
             'institutionsPercentHeld',
             'institutionsFloatPercentHeld',
             'institutionsCount'
         ]
-        data = data.major_holders
+        data = await self.yf.call(ticker, 'major_holders', daily=True)
         data['ticker'] = ticker
         data.columns = [camel_to_snake(col) for col in data.columns]
         df = pd.DataFrame(data, index=index)
@@ -475,15 +459,13 @@ class YfSDK:
 
     async def mutual_fund_holders(self, ticker):
 
-        data = yf.Ticker(ticker)
-        data = data.mutualfund_holders
+        data = await self.yf.call(ticker, 'mutualfund_holders', daily=True)
         data['ticker'] = ticker
         return data
 
     async def news(self, ticker):
 
-        data = yf.Ticker(ticker)
-        data = data.news
+        data = await self.yf.call(ticker, 'news')
         content = [i.get('content') for i in data]
         title = [i.get('title') for i in content]
         description = [i.get('description') for i in content]
@@ -526,16 +508,14 @@ class YfSDK:
 
     async def recommendations(self, ticker):
 
-        data = yf.Ticker(ticker)
-        data = data.recommendations
+        data = await self.yf.call(ticker, 'recommendations', daily=True)
         data['ticker'] = ticker
         return data
 
 
     async def revenue_estimate(self, ticker):
 
-        data = yf.Ticker(ticker)
-        data = data.revenue_estimate
+        data = await self.yf.call(ticker, 'revenue_estimate', daily=True)
         data.columns = [camel_to_snake(col) for col in data.columns]
 
         data['ticker'] = ticker
@@ -545,8 +525,7 @@ class YfSDK:
 
     async def sec_filings(self, ticker):
 
-        data = yf.Ticker(ticker)
-        data = data.sec_filings
+        data = await self.yf.call(ticker, 'sec_filings', daily=True)
 
         date = [i.get('date') for i in data]
         type = [i.get('type') for i in data]
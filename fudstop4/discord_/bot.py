@@ -44,6 +44,9 @@ from apis.polygonio.polygon_options import PolygonOptions
 from apis.webull.opt_modal import OptionModal, SQLQueryModal
 from apis.y_finance.yf_sdk import yfSDK
 from apis.gexbot.gexbot import GEXBot
+from fudstop4.apis._asyncpg.pool_registry import pool_registry
+from fudstop4.apis._asyncpg.materialized_screen import MaterializedScreen
+from fudstop4.apis.polygonio.play_finder import PlayFinder
 SEC_FILINGS=[1153827348454584443, 1153827546706747455, 1153828102389104771, 1153828288372949062, 1153828427342807110, 1153828752183283752, 1153828753756135424, 1153829229943865344, 1153829615874355240, 1153833634097278976, 1156987190400786452, 1157034088310509568, 1157038070156234843, 1157038883184320624, 1157107615994761236, 1157107859688013866, 1174774750741020752, 1175108609751916606, 1175109001390866473, 1175109208987947108, 1175109603126693958, 1175110342884462604, 1175111342861058099, 1175112249061421207, 1175112431228424262, 1175112609222119467, 1175113168993923082, 1175113782083727504, 1175115817722073168, 1178053558239756288]
 
 
@@ -961,9 +964,9 @@ timeframe_choices = [
 
 
 
-async def fetch_options():
-    conn = await asyncpg.connect(user=os.environ.get('DB_USER'), password=os.environ.get('DB_PASSWORD'), database=os.environ.get('DB_NAME'), host=os.environ.get('DB_HOST'))
-    rows = await conn.fetch("""WITH LatestPrices AS (
+option_lows_screen = MaterializedScreen(
+    name='screen_option_lows',
+    query="""WITH LatestPrices AS (
     SELECT 
         a.ticker, 
         a.strike, 
@@ -1017,9 +1020,34 @@ INNER JOIN
                  AND l.call_put = a.call_put
                  AND l.current_price = a.all_time_low
 WHERE 
-    l.rn = 1;""")
-    await conn.close()
-    return rows
+    l.rn = 1;""",
+    unique_columns=('ticker', 'strike', 'expiry', 'call_put'),
+    indexes=[('ticker',), ('expiry',)],
+    source_tables=('options_data', 'option_aggs'),
+)
+screen_pool = None
+
+
+async def get_screen_pool():
+    global screen_pool
+    if screen_pool is None:
+        screen_pool = await pool_registry.get_pool(**db_config, consumer='bot')
+        option_lows_screen.start(screen_pool)
+    return screen_pool
+
+
+async def fetch_options():
+    """Options trading at their all-time low - served from the materialized screen."""
+    pool = await get_screen_pool()
+    return await option_lows_screen.fetch(pool)
+
+
+@commands.is_owner()
+@bot.command()
+async def screen_stats(ctx: commands.Context):
+    """Refresh / read latency of the materialized screens."""
+    df = option_lows_screen.stats()
+    await ctx.send(f"```py\n{tabulate(df, headers='keys', tablefmt='fancy', showindex=False)}```")
 
 @commands.is_owner()
 @bot.command()
@@ -1161,69 +1189,40 @@ async def find_extreme_tickers(pool):
         records = await conn.fetch(query_sql)
         return [(record['ticker'], record['status']) for record in records]
 
+play_db_config = {
+    'user': 'postgres',
+    'password': 'fud',
+    'database': 'opts',
+    'host': '127.0.0.1',
+    'port': 5432
+}
+play_finder = PlayFinder(opts)
+
+
+play_pool = None
+
+
+async def get_play_pool():
+    # borrowed once and held for the bot's lifetime - giving it back per /play tore the pool down each time
+    global play_pool
+    if play_pool is None:
+        play_pool = await pool_registry.get_pool(**play_db_config, consumer='bot')
+    return play_pool
+
+
+async def get_extreme_tickers():
+    return await find_extreme_tickers(await get_play_pool())
+
+
 async def find_plays():
-    db_config = {
-        'user': 'postgres',
-        'password': 'fud',
-        'database': 'opts',
-        'host': '127.0.0.1',
-        'port': 5432
-    }
-
-    async with asyncpg.create_pool(**db_config) as pool:
-        extreme_tickers_with_status = await find_extreme_tickers(pool)
-
-        # To separate the tickers and statuses, you can use list comprehension
-        extreme_tickers = [ticker for ticker, status in extreme_tickers_with_status]
-        statuses = [status for ticker, status in extreme_tickers_with_status]
-        all_options_df_calls =[]
-        all_options_df_puts = []
-        for ticker, status in extreme_tickers_with_status:
-            if status == 'overbought':
-                print(f"Ticker {ticker} is overbought.")
-                all_options = await opts.get_option_chain_all(ticker, expiration_date_gte='2024-03-01', expiration_date_lite='2024-06-30', contract_type='put')
-                
-                for i in range(len(all_options.theta)):  # Assuming all lists are of the same length
-                    theta_value = all_options.theta[i]
-                    volume = all_options.volume[i]
-                    open_interest = all_options.open_interest[i]
-                    ask = all_options.ask[i]
-                    bid = all_options.bid[i]
-
-                    # Conditions
-                    theta_condition = theta_value is not None and theta_value >= -0.03
-                    volume_condition = volume is not None and open_interest is not None and volume > open_interest
-                    price_condition = ask is not None and bid is not None and 0.25 <= bid <= 1.75 and 0.25 <= ask <= 1.75
-
-                    if theta_condition and volume_condition and price_condition:
-                        df = pd.DataFrame([all_options.ticker, all_options.underlying_ticker, all_options.strike, all_options.contract_type, all_options.expiry])
-                        all_options_df_puts.append(df)  #
-
-            if status == 'oversold':
-                print(f"Ticker {ticker} is oversold.")
-                all_options = await opts.get_option_chain_all(ticker, expiration_date_gte='2024-03-01', expiration_date_lite='2024-11-30', contract_type='call')
-                
-                for i in range(len(all_options.theta)):  # Assuming all lists are of the same length
-                    theta_value = all_options.theta[i]
-                    volume = all_options.volume[i]
-                    open_interest = all_options.open_interest[i]
-                    ask = all_options.ask[i]
-                    bid = all_options.bid[i]
-
-                    # Conditions
-                    theta_condition = theta_value is not None and theta_value >= -0.03
-                    volume_condition = volume is not None and open_interest is not None and volume > open_interest
-                    price_condition = ask is not None and bid is not None and 0.25 <= bid <= 1.75 and 0.25 <= ask <= 1.75
-
-                    if theta_condition and volume_condition and price_condition:
-                        # Assuming all_options.df is a DataFrame containing the current option data
-                        df = pd.DataFrame([all_options.ticker, all_options.strike, all_options.contract_type, all_options.expiry])
-                        all_options_df_calls.append(df)  #
-        # Concatenate all the dataframes
-        final_df_calls = pd.concat(all_options_df_calls, ignore_index=True)
-        final_df_puts = pd.concat(all_options_df_puts, ignore_index=True)
-        print(final_df_calls, final_df_puts)
-        return final_df_calls, final_df_puts, extreme_tickers, statuses
+    extreme_tickers_with_status = await get_extreme_tickers()
+    extreme_tickers = [ticker for ticker, status in extreme_tickers_with_status]
+    statuses = [status for ticker, status in extreme_tickers_with_status]
+
+    plays = await play_finder.find(extreme_tickers_with_status)
+    final_df_calls = plays[plays['call_put'] == 'call'].reset_index(drop=True)
+    final_df_puts = plays[plays['call_put'] == 'put'].reset_index(drop=True)
+    return final_df_calls, final_df_puts, extreme_tickers, statuses
 
 
 class CallResults(disnake.ui.Select):
@@ -1254,26 +1253,25 @@ async def play(inter:disnake.AppCmdInter, type:str=commands.Param(choices=['call
     await inter.response.defer()
     await inter.edit_original_message(f'Finding plays for {type}..')
 
+    status = 'oversold' if type == 'calls' else 'overbought'
+    extreme_tickers_with_status = [(t, s) for t, s in await get_extreme_tickers() if s == status]
 
-    calls, puts, extreme_tickers, statuses = await find_plays()
+    # post the best plays per ticker as each chain lands
+    found = []
+    async for ticker, plays in play_finder.stream(extreme_tickers_with_status):
+        found.append(plays)
+        top = tabulate(plays[['ticker', 'strike', 'expiry', 'bid', 'ask', 'vol_oi_ratio']].head(5), headers='keys', tablefmt='fancy', showindex=False)
+        await inter.edit_original_message(f"Finding plays for {type}.. plays on {len(found)} of {len(extreme_tickers_with_status)} tickers so far\n```py\n{top}```")
 
+    results = pd.concat(found, ignore_index=True).sort_values('score', ascending=False, ignore_index=True) if found else pd.DataFrame()
+    filename = f'{type}.csv'
+    results.to_csv(filename, index=False)
 
     view = disnake.ui.View()
-    if type == 'calls':
-        options = []
-        
-        for ticker, status in zip(extreme_tickers, statuses):
-            if status == 'oversold':
-                
-                options.append(disnake.SelectOption(label=ticker, description=status))
-        await inter.edit_original_message(file=disnake.File('calls.csv'), view=view.add_item(CallResults(options,calls)))
-    elif type == 'puts':
-        options = []
-        
-        for ticker, status in zip(extreme_tickers, statuses):
-            if status == 'overbought':
-                options.append(disnake.SelectOption(label=ticker, description=status))
-        await inter.edit_original_message(file=disnake.File('puts.csv'), view=view.add_item(CallResults(options,puts)))
+    options = [disnake.SelectOption(label=ticker, description=s) for ticker, s in extreme_tickers_with_status][:25]
+    if options:
+        view.add_item(CallResults(options, results))
+    await inter.edit_original_message(file=disnake.File(filename), view=view)
 
     
 
@@ -0,0 +1,187 @@
+"""
+Rebuilds the checked-in benchmark fixtures in ./fixtures.
+
+The data is synthetic but shaped like the real payloads (field names,
+nesting, value ranges, chain layout) - no account ids, real ticker ids or
+captured quotes. Seeded, so re-running produces identical files.
+
+    python fudstop4/examples/benchmarks/make_fixtures.py
+"""
+import gzip
+import json
+import math
+import random
+from pathlib import Path
+from datetime import date, timedelta
+
+FIXTURES = Path(__file__).resolve().parent / 'fixtures'
+SEED = 4
+UNDERLYING_PRICE = 512.37
+AS_OF = date(2024, 3, 1)
+
+
+def _dump(name, payload):
+    FIXTURES.mkdir(exist_ok=True)
+    with gzip.GzipFile(FIXTURES / name, 'wb', mtime=0) as f:
+        f.write(json.dumps(payload, separators=(',', ':')).encode())
+
+
+def _expiries():
+    """Dailies for six weeks, then monthlies out a year - a full SPY-style chain."""
+    days = [AS_OF + timedelta(days=i) for i in range(0, 42) if (AS_OF + timedelta(days=i)).weekday() < 5]
+    months = [date(AS_OF.year + (AS_OF.month + i - 1) // 12, (AS_OF.month + i - 1) % 12 + 1, 15) for i in range(2, 14)]
+    return days + months
+
+
+def _chain(rng):
+    contracts = []
+    for expiry in _expiries():
+        dte = max((expiry - AS_OF).days, 0.5)
+        width = 0.08 + 0.25 * math.sqrt(dte / 365)
+        lo, hi = UNDERLYING_PRICE * (1 - width), UNDERLYING_PRICE * (1 + width)
+        step = 1 if dte < 60 else 5
+        for strike in range(int(lo) // step * step, int(hi) + step, step):
+            for cp in ('call', 'put'):
+                moneyness = math.log(UNDERLYING_PRICE / strike)
+                iv = 0.12 + 0.6 * moneyness ** 2 + rng.uniform(-0.01, 0.01)
+                t = dte / 365
+                d1 = (moneyness + 0.5 * iv * iv * t) / (iv * math.sqrt(t))
+                delta = 0.5 * (1 + math.erf(d1 / math.sqrt(2)))
+                delta = delta if cp == 'call' else delta - 1
+                intrinsic = max(0.0, UNDERLYING_PRICE - strike) if cp == 'call' else max(0.0, strike - UNDERLYING_PRICE)
+                price = round(intrinsic + UNDERLYING_PRICE * iv * math.sqrt(t) * 0.4 * math.exp(-d1 * d1 / 2) + 0.01, 2)
+                spread = max(0.01, round(price * rng.uniform(0.002, 0.03), 2))
+                contracts.append({
+                    'expiry': expiry.isoformat(), 'strike': strike, 'cp': cp, 'iv': round(iv, 4),
+                    'delta': round(delta, 4), 'gamma': round(rng.uniform(0, 0.05) / math.sqrt(t + 0.01), 4),
+                    'theta': round(-price / (dte + 1) * rng.uniform(0.3, 1.2), 4), 'vega': round(rng.uniform(0.01, 1.5), 4),
+                    'price': price, 'bid': round(max(0.0, price - spread / 2), 2), 'ask': round(price + spread / 2, 2),
+                    'oi': int(rng.paretovariate(1.2) * 50), 'volume': int(rng.paretovariate(1.1) * 20),
+                })
+    return contracts
+
+
+def polygon_chain(contracts, rng):
+    results = []
+    for c in contracts:
+        symbol = f"O:SPY{c['expiry'][2:].replace('-', '')}{c['cp'][0].upper()}{int(c['strike'] * 1000):08d}"
+        low = round(c['price'] * rng.uniform(0.8, 1.0), 2)
+        high = round(c['price'] * rng.uniform(1.0, 1.25), 2)
+        results.append({
+            'break_even_price': round(c['strike'] + c['price'] if c['cp'] == 'call' else c['strike'] - c['price'], 2),
+            'day': {'change': round(rng.uniform(-1, 1), 2), 'change_percent': round(rng.uniform(-30, 30), 2),
+                    'close': c['price'], 'high': high, 'last_updated': 1709326800000000000, 'low': low,
+                    'open': round(rng.uniform(low, high), 2), 'previous_close': round(c['price'] * rng.uniform(0.8, 1.2), 2),
+                    'volume': c['volume'], 'vwap': round((low + high) / 2, 4)},
+            'details': {'contract_type': c['cp'], 'exercise_style': 'american', 'expiration_date': c['expiry'],
+                        'shares_per_contract': 100, 'strike_price': c['strike'], 'ticker': symbol},
+            'greeks': {'delta': c['delta'], 'gamma': c['gamma'], 'theta': c['theta'], 'vega': c['vega']},
+            'implied_volatility': c['iv'],
+            'last_quote': {'ask': c['ask'], 'ask_size': rng.randint(1, 500), 'bid': c['bid'], 'bid_size': rng.randint(1, 500),
+                           'last_updated': 1709326799000000000, 'midpoint': round((c['ask'] + c['bid']) / 2, 3), 'timeframe': 'REAL-TIME'},
+            'last_trade': {'sip_timestamp': 1709326700000000000 + rng.randint(0, 10 ** 11), 'conditions': [rng.choice([209, 219, 227, 232])],
+                           'price': c['price'], 'size': rng.randint(1, 200), 'exchange': rng.choice([300, 302, 303, 309, 312, 313]),
+                           'timeframe': 'REAL-TIME'},
+            'open_interest': c['oi'],
+            'underlying_asset': {'change_to_break_even': round(rng.uniform(-20, 20), 2), 'last_updated': 1709326800000000000,
+                                 'price': UNDERLYING_PRICE, 'ticker': 'SPY', 'timeframe': 'REAL-TIME'},
+        })
+    return results
+
+
+def _webull_contract(c, rng, ticker_id):
+    return {
+        'open': str(c['price']), 'high': str(round(c['price'] * 1.1, 2)), 'low': str(round(c['price'] * 0.9, 2)),
+        'strikePrice': str(c['strike']), 'preClose': str(round(c['price'] * rng.uniform(0.8, 1.2), 2)),
+        'openInterest': c['oi'], 'volume': str(c['volume']), 'latestPriceVol': str(rng.randint(1, 50)),
+        'delta': str(c['delta']), 'vega': str(c['vega']), 'impVol': str(c['iv']), 'gamma': str(c['gamma']),
+        'theta': str(c['theta']), 'rho': str(round(rng.uniform(-0.5, 0.5), 4)), 'close': str(c['price']),
+        'change': str(round(rng.uniform(-1, 1), 2)), 'changeRatio': str(round(rng.uniform(-0.3, 0.3), 4)),
+        'expireDate': c['expiry'], 'tickerId': ticker_id, 'belongTickerId': 900000001, 'openIntChange': rng.randint(-500, 500),
+        'activeLevel': rng.randint(0, 100), 'cycle': 1, 'direction': c['cp'],
+        'symbol': f"SPY{c['expiry'][2:].replace('-', '')}{c['cp'][0].upper()}{int(c['strike'] * 1000):08d}", 'unSymbol': 'SPY',
+    }
+
+
+def webull_chain(contracts, rng):
+    by_expiry = {}
+    for i, c in enumerate(contracts):
+        by_expiry.setdefault(c['expiry'], []).append(_webull_contract(c, rng, 1000000000 + i))
+    return {
+        'tickerId': 900000001, 'name': 'SPDR S&P 500 ETF', 'disSymbol': 'SPY', 'close': str(UNDERLYING_PRICE),
+        'preClose': '508.08', 'volume': '76805861', 'open': '508.98', 'high': '513.29', 'low': '508.56',
+        'change': '4.29', 'changeRatio': '0.0084', 'vol1y': '0.1302',
+        'expireDateList': [{'from': {'date': e, 'days': (date.fromisoformat(e) - AS_OF).days}, 'data': rows}
+                           for e, rows in by_expiry.items()],
+    }
+
+
+def webull_derivatives(contracts, rng, n=2000):
+    rows = []
+    for i, c in enumerate(rng.sample(contracts, n)):
+        row = _webull_contract(c, rng, 1100000000 + i)
+        row['askList'] = [{'price': str(c['ask']), 'volume': str(rng.randint(1, 500))}] if rng.random() > 0.02 else []
+        row['bidList'] = [{'price': str(c['bid']), 'volume': str(rng.randint(1, 500))}] if rng.random() > 0.02 else []
+        row['tradeTime'] = '2024-03-01T20:59:58.000+0000'
+        row['tradeStamp'] = 1709326798000
+        rows.append(row)
+    return rows
+
+
+def candles(rng, n=5000):
+    """Minute bars for ~13 sessions, polygon aggs shape."""
+    bars, price, t = [], UNDERLYING_PRICE, 1708093800000
+    for i in range(n):
+        if i and i % 390 == 0:
+            t += 17.5 * 3600 * 1000
+        o = price
+        c = round(o * (1 + rng.gauss(0, 0.0008)), 2)
+        h = round(max(o, c) * (1 + abs(rng.gauss(0, 0.0004))), 2)
+        low = round(min(o, c) * (1 - abs(rng.gauss(0, 0.0004))), 2)
+        v = int(rng.paretovariate(2.5) * 40000)
+        bars.append({'v': v, 'vw': round((h + low + c) / 3, 4), 'o': o, 'c': c, 'h': h, 'l': low, 't': int(t), 'n': max(1, v // 90)})
+        price, t = c, t + 60000
+    return bars
+
+
+def multi_quotes(rng, n=400):
+    quotes = []
+    for i in range(n):
+        close = round(rng.lognormvariate(4, 1), 2)
+        pre = round(close * rng.uniform(0.95, 1.05), 2)
+        quotes.append({
+            'tickerId': 910000000 + i, 'name': f'Company {i:03d}', 'symbol': f'TK{i:03d}', 'mkTradeTime': 1709326800000,
+            'close': str(close), 'change': str(round(close - pre, 2)), 'changeRatio': str(round(close / pre - 1, 4)),
+            'marketValue': str(round(close * rng.randint(10 ** 7, 10 ** 10), 2)), 'volume': str(rng.randint(10 ** 4, 10 ** 8)),
+            'turnoverRate': str(round(rng.uniform(0, 0.05), 4)), 'overnight': '0', 'preClose': str(pre),
+            'open': str(pre), 'high': str(round(close * 1.02, 2)), 'low': str(round(close * 0.98, 2)),
+            'vibrateRatio': str(round(rng.uniform(0, 0.08), 4)), 'avgVol10D': str(rng.randint(10 ** 4, 10 ** 8)),
+            'avgVol3M': str(rng.randint(10 ** 4, 10 ** 8)), 'negMarketValue': str(round(close * rng.randint(10 ** 7, 10 ** 10), 2)),
+            'pe': str(round(rng.uniform(5, 80), 2)), 'forwardPe': str(round(rng.uniform(5, 60), 2)),
+            'indicatedPe': str(round(rng.uniform(5, 80), 2)), 'peTtm': str(round(rng.uniform(5, 80), 2)),
+            'eps': str(round(rng.uniform(-2, 15), 2)), 'epsTtm': str(round(rng.uniform(-2, 15), 2)),
+            'pb': str(round(rng.uniform(0.5, 20), 2)), 'totalShares': str(rng.randint(10 ** 7, 10 ** 10)),
+            'outstandingShares': str(rng.randint(10 ** 7, 10 ** 10)), 'fiftyTwoWkHigh': str(round(close * 1.3, 2)),
+            'fiftyTwoWkLow': str(round(close * 0.7, 2)), 'dividend': str(round(rng.uniform(0, 3), 2)),
+            'yield': str(round(rng.uniform(0, 0.05), 4)), 'latestDividendDate': '2024-02-09', 'latestSplitDate': '2020-08-31',
+            'latestEarningsDate': '2024-01-25', 'ps': str(round(rng.uniform(0.5, 30), 2)), 'bps': str(round(rng.uniform(1, 100), 2)),
+            'estimateEarningsDate': '04/25/2024', 'nextEarningDay': '2024-04-25',
+        })
+    return quotes
+
+
+def main():
+    rng = random.Random(SEED)
+    contracts = _chain(rng)
+    _dump('spy_chain.json.gz', polygon_chain(contracts, rng))
+    _dump('webull_chain.json.gz', webull_chain(contracts, rng))
+    _dump('webull_derivatives.json.gz', webull_derivatives(contracts, rng))
+    _dump('candles_5k.json.gz', candles(rng))
+    _dump('multi_quotes_400.json.gz', multi_quotes(rng))
+    for path in sorted(FIXTURES.glob('*.json.gz')):
+        print(f"{path.name}: {path.stat().st_size / 1024:.0f} KiB")
+    print(f"{len(contracts)} contracts")
+
+
+if __name__ == '__main__':
+    main()
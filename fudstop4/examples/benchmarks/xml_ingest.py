@@ -0,0 +1,171 @@
+"""
+Tree vs streaming XML ingestion: the old ElementTree parse_title_12_xml
+against cfr_helpers.iter_title_batches, and a full-tree RSS walk against
+rss_helpers.iter_feed_items. Reports wall time and peak RSS growth, and
+checks both CFR parsers produce the same records.
+
+    python fudstop4/examples/benchmarks/xml_ingest.py                  # generated ~60 MB title
+    python fudstop4/examples/benchmarks/xml_ingest.py --file title-12.xml
+    python fudstop4/examples/benchmarks/xml_ingest.py --parts 4000 --sections 40
+
+The sample is written to a temp dir (seeded, so sizes are repeatable) unless
+--file points at a real eCFR download (CFRManager.get_xml_document).
+"""
+import os
+import time
+import random
+import argparse
+import tempfile
+import resource
+import multiprocessing
+from pathlib import Path
+from xml.etree import ElementTree as ET
+from xml.sax.saxutils import escape
+
+from fudstop4.apis.cfr.cfr_helpers import clean_string, iter_title_batches
+from fudstop4.apis.rss.rss_helpers import iter_feed_items
+
+WORDS = ('bank', 'holding', 'capital', 'reserve', 'deposit', 'insured', 'liquidity', 'credit', 'risk', 'federal',
+         'board', 'member', 'asset', 'exposure', 'margin', 'collateral', 'report', 'requirement', 'agency', 'ratio')
+
+
+def sentence(rng, n):
+    return ' '.join(rng.choice(WORDS) for _ in range(n)).capitalize() + '.'
+
+
+def write_title(path, chapters=12, parts=2400, sections=25, seed=12):
+    rng = random.Random(seed)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('<?xml version="1.0" encoding="UTF-8"?>\n<ECFR><DIV1 N="12" TYPE="TITLE"><HEAD>Title 12ùBanks and Banking</HEAD>\n')
+        part_no = 1
+        for c in range(1, chapters + 1):
+            f.write(f'<DIV3 N="{c}" TYPE="CHAPTER"><HEAD>CHAPTER {c}ùComptroller {sentence(rng, 4)}</HEAD>\n')
+            for s in range(1, 4):
+                f.write(f'<DIV4 N="{s}" TYPE="SUBCHAP"><HEAD>SUBCHAPTER {s}ùRules</HEAD>\n')
+                for _ in range(parts // chapters // 3):
+                    f.write(f'<DIV5 N="{part_no}" TYPE="PART"><HEAD>PART {part_no}ù{escape(sentence(rng, 6))}</HEAD>\n')
+                    f.write(f'<AUTH><HED>Authority:</HED><PSPACE>12 U.S.C. {rng.randint(1, 5000)}, <I>et seq.</I></PSPACE></AUTH>\n')
+                    f.write(f'<SOURCE><HED>Source:</HED><PSPACE>{rng.randint(40, 89)} FR {rng.randint(1, 99999)}</PSPACE></SOURCE>\n')
+                    for k in range(1, sections + 1):
+                        f.write(f'<DIV8 N="{part_no}.{k}" TYPE="SECTION"><HEAD>§ {part_no}.{k} {sentence(rng, 5)}</HEAD>')
+                        for _ in range(3):
+                            f.write(f'<P>({rng.choice("abcdefgh")}) {sentence(rng, 40)}</P>')
+                        f.write('<CITA>[FR citation]</CITA></DIV8>\n')
+                    f.write('</DIV5>\n')
+                    part_no += 1
+                f.write('</DIV4>\n')
+            f.write('</DIV3>\n')
+        f.write('</DIV1></ECFR>\n')
+
+
+def write_feed(path, items=60000, seed=13):
+    rng = random.Random(seed)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('<?xml version="1.0" encoding="UTF-8"?>\n<feed xmlns="http://www.w3.org/2005/Atom"><title>Latest Filings</title>\n')
+        for i in range(items):
+            f.write(f'<entry><title>4 - {escape(sentence(rng, 3))} ({i})</title>'
+                    f'<link rel="alternate" type="text/html" href="https://www.sec.gov/Archives/edgar/data/{i}/index.htm"/>'
+                    f'<summary type="html">{escape(sentence(rng, 30))}</summary><updated>2024-03-01T16:{i % 60:02d}:00-05:00</updated>'
+                    f'<category scheme="https://www.sec.gov/" label="form type" term="4"/><id>urn:tag:sec.gov,2008:accession-number={i}</id></entry>\n')
+        f.write('</feed>\n')
+
+
+def tree_title(file_path):
+    """The original parse_title_12_xml (full tree, nested .// searches)."""
+    titles, chapters, parts, authorities, sources = [], [], [], [], []
+    tree = ET.ElementTree()
+    tree.parse(file_path)
+    title_id = chapter_id = part_id = 1
+    for div1 in tree.findall(".//DIV1"):
+        titles.append({"id": title_id, "title_name": clean_string(div1.find(".//HEAD").text)})
+        for div3 in div1.findall(".//DIV3"):
+            chapters.append({"id": chapter_id, "chapter_name": clean_string(div3.find(".//HEAD").text), "title_id": title_id})
+            for div5 in div3.findall(".//DIV5"):
+                parts.append({"id": part_id, "part_name": clean_string(div5.find(".//HEAD").text), "chapter_id": chapter_id})
+                authority = div5.find(".//AUTH")
+                if authority is not None:
+                    authorities.append({"id": len(authorities) + 1, "authority_text": clean_string("".join(authority.itertext())), "part_id": part_id})
+                source = div5.find(".//SOURCE")
+                if source is not None:
+                    sources.append({"id": len(sources) + 1, "source_text": clean_string("".join(source.itertext())), "part_id": part_id})
+                part_id += 1
+            chapter_id += 1
+        title_id += 1
+    return {"titles": titles, "chapters": chapters, "parts": parts, "authorities": authorities, "sources": sources}
+
+
+def stream_title(file_path, batch_size):
+    merged, batches = {}, 0
+    for batch in iter_title_batches(file_path, batch_size=batch_size):
+        batches += 1
+        for table, records in batch.items():
+            merged.setdefault(table, []).extend(records)
+    return merged, batches
+
+
+def tree_feed(file_path):
+    root = ET.parse(file_path).getroot()
+    ns = {'a': 'http://www.w3.org/2005/Atom'}
+    return [{'title': e.findtext('a:title', namespaces=ns), 'link': e.find('a:link', ns).get('href'),
+             'updated': e.findtext('a:updated', namespaces=ns)} for e in root.findall('a:entry', ns)]
+
+
+def stream_feed(file_path):
+    return sum(len(batch) for batch in iter_feed_items(file_path, batch_size=1000))
+
+
+def _rss_kib():
+    with open('/proc/self/status') as f:
+        return next(int(line.split()[1]) for line in f if line.startswith('VmRSS'))
+
+
+def _measure(fn, args, conn):
+    start_rss = _rss_kib()
+    started = time.perf_counter()
+    fn(*args)
+    elapsed = time.perf_counter() - started
+    conn.send((elapsed, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - start_rss))
+
+
+def run(label, fn, *args):
+    """Time and peak RSS growth of one call in a forked child (counts lxml's C allocations too)."""
+    ctx = multiprocessing.get_context('fork')
+    parent, child = ctx.Pipe()
+    proc = ctx.Process(target=_measure, args=(fn, args, child))
+    proc.start()
+    elapsed, grown = parent.recv()
+    proc.join()
+    print(f'{label:<34} {elapsed:8.2f} s   peak +{grown / 1024:8.1f} MiB')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--file', help='a real eCFR title XML instead of the generated sample')
+    parser.add_argument('--parts', type=int, default=2400)
+    parser.add_argument('--sections', type=int, default=25)
+    parser.add_argument('--items', type=int, default=60000, help='entries in the generated Atom feed')
+    parser.add_argument('--batch-size', type=int, default=2000)
+    args = parser.parse_args()
+
+    workdir = Path(tempfile.mkdtemp())
+    title = args.file
+    if title is None:
+        title = str(workdir / 'title-sample.xml')
+        write_title(title, parts=args.parts, sections=args.sections)
+    feed = str(workdir / 'feed-sample.xml')
+    write_feed(feed, items=args.items)
+    print(f'title {os.path.getsize(title) / 2 ** 20:.1f} MiB, feed {os.path.getsize(feed) / 2 ** 20:.1f} MiB\n')
+
+    run('cfr: ElementTree + .// finds', tree_title, title)
+    run(f'cfr: iterparse (batch {args.batch_size})', stream_title, title, args.batch_size)
+    streamed, batches = stream_title(title, args.batch_size)
+    assert streamed == tree_title(title), 'streaming parser disagrees with the tree parser'
+    print(f'  {sum(len(v) for v in streamed.values())} records in {batches} batches, identical to the tree parser\n')
+
+    run('rss: ElementTree + findall', tree_feed, feed)
+    run('rss: iter_feed_items', stream_feed, feed)
+    assert stream_feed(feed) == len(tree_feed(feed))
+
+
+if __name__ == '__main__':
+    main()
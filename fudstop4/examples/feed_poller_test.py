@@ -0,0 +1,118 @@
+"""
+FeedPoller against a local feed server: a busy RSS feed (ETag), a quiet
+Atom feed (Last-Modified) and one with no validators at all. Checks 304s
+and body-hash skips on unchanged feeds, adaptive intervals (busy polls
+fast, quiet backs off), exactly-once delivery, and that a restarted
+poller with the same SeenIndex redelivers nothing. No network needed.
+"""
+import sys
+import time
+import asyncio
+import tempfile
+from pathlib import Path
+from email.utils import formatdate
+
+from aiohttp import web
+
+root = Path(__file__).resolve().parents[2]
+sys.path[0] = str(root)
+
+from fudstop4.apis.rss.feed_poller import FeedPoller, SeenIndex
+
+
+def rss(posts):
+    items = ''.join(f'<item><title>Post {n}</title><link>http://feeds.local/busy/{n}</link><guid>busy-{n}</guid>'
+                    f'<pubDate>{formatdate(t)}</pubDate></item>' for n, t in reversed(posts[-20:]))
+    return f'<?xml version="1.0"?><rss version="2.0"><channel><title>Busy</title>{items}</channel></rss>'
+
+
+def atom(entries):
+    body = ''.join(f'<entry><title>Notice {n}</title><id>urn:quiet:{n}</id><link href="http://feeds.local/quiet/{n}"/>'
+                   f'<updated>2024-03-0{n}T12:00:00Z</updated></entry>' for n in entries)
+    return f'<?xml version="1.0"?><feed xmlns="http://www.w3.org/2005/Atom"><title>Quiet</title>{body}</feed>'
+
+
+def feed_server(posts, served):
+    quiet = atom(range(1, 8))
+    quiet_modified = formatdate(time.time() - 86400, usegmt=True)
+
+    async def busy(request):
+        tag = f'"{len(posts)}"'
+        if request.headers.get('If-None-Match') == tag:
+            served['busy_304'] += 1
+            return web.Response(status=304)
+        return web.Response(text=rss(posts), content_type='application/rss+xml', headers={'ETag': tag})
+
+    async def quiet_feed(request):
+        if request.headers.get('If-Modified-Since') == quiet_modified:
+            served['quiet_304'] += 1
+            return web.Response(status=304)
+        return web.Response(text=quiet, content_type='application/atom+xml', headers={'Last-Modified': quiet_modified})
+
+    async def plain(request):
+        served['plain'] += 1
+        return web.Response(text=atom(range(1, 4)), content_type='application/atom+xml')
+
+    app = web.Application()
+    app.router.add_get('/busy', busy)
+    app.router.add_get('/quiet', quiet_feed)
+    app.router.add_get('/plain', plain)
+    return app
+
+
+async def main():
+    posts = [(n, time.time() - 60 * (10 - n)) for n in range(10)]   # history: one a minute
+    served = {'busy_304': 0, 'quiet_304': 0, 'plain': 0}
+    runner = web.AppRunner(feed_server(posts, served))
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    base = f'http://127.0.0.1:{site._server.sockets[0].getsockname()[1]}'
+
+    async def publish():
+        while True:
+            await asyncio.sleep(0.4)
+            posts.append((len(posts), time.time()))
+
+    path = str(Path(tempfile.mkdtemp()) / 'rss_seen.sqlite')
+    delivered = []
+    poller = FeedPoller(seen=SeenIndex(path, capacity=10000), min_interval=0.2, max_interval=3, jitter=0)
+    poller.add(f'{base}/busy', handler=lambda url, items: delivered.extend(i['guid'] for i in items))
+    poller.add(f'{base}/quiet')
+    poller.add(f'{base}/plain')
+    publisher = asyncio.create_task(publish())
+    running = asyncio.create_task(poller.run())
+    await asyncio.sleep(6)
+    publisher.cancel()
+    await asyncio.sleep(0.5)
+    poller.stop()
+    await running
+
+    stats = poller.stats().set_index('url')
+    print(stats.to_string())
+    print(served, f'seen index {len(poller.seen)} ids, {poller.seen.bloom_negatives}/{poller.seen.lookups} lookups answered by the bloom filter')
+    published = [f'busy-{n}' for n, _ in posts[10:]]
+    assert sorted(delivered) == sorted(published), (len(delivered), len(published))   # every new post once, no history
+    busy, quiet, plain = (stats.loc[f'{base}/{name}'] for name in ('busy', 'quiet', 'plain'))
+    assert busy['interval'] < quiet['interval'] and quiet['interval'] == 3
+    assert quiet['not_modified'] == quiet['polls'] - 1 and plain['unchanged'] == plain['polls'] - 1
+    assert busy['not_modified'] > 0
+    await poller.close()
+    poller.seen.close()
+
+    # restart: validators and seen ids come back from disk
+    posts.append((len(posts), time.time()))
+    again = FeedPoller(seen=SeenIndex(path, capacity=10000), min_interval=0.2, max_interval=3)
+    redelivered = []
+    for name in ('busy', 'quiet', 'plain'):
+        again.add(f'{base}/{name}', handler=lambda url, items: redelivered.extend(items))
+    for url in list(again.feeds):
+        await again.poll(url)
+    assert [i['guid'] for i in redelivered] == [f'busy-{len(posts) - 1}'], redelivered
+    assert again.feeds[f'{base}/quiet'].not_modified == 1
+    await again.close()
+    await runner.cleanup()
+    print('ok')
+
+
+asyncio.run(main())
@@ -0,0 +1,68 @@
+"""
+Record/replay harness against a synthetic opening-bell burst: writes a
+recording of stock trades and quotes, then replays it through
+handle_stock_msg into a MessageRing - once directly at max speed, once
+through the local stub server and the real polygon client at 20x.
+"""
+import sys
+import json
+import random
+import asyncio
+import tempfile
+from pathlib import Path
+
+root = Path(__file__).resolve().parents[2]
+sys.path[:0] = [str(root), str(root / 'fudstop4'), str(root / 'fudstop4' / '_markets')]
+
+from fudstop4._markets.feed_replay import FeedReplayer, write_frames, read_frames
+from fudstop4._markets.ring_buffer import MessageRing
+from market_handlers.stocks import handle_stock_msg
+
+TICKERS = ['SPY', 'QQQ', 'TSLA', 'NVDA', 'AAPL', 'AMD', 'META', 'AMZN']
+
+
+def synthetic_frames(seconds: float = 2.0, frames_per_sec: int = 400):
+    ts = 1709303400000
+    for i in range(int(seconds * frames_per_sec)):
+        batch = []
+        for _ in range(random.randint(5, 40)):
+            sym = random.choice(TICKERS)
+            if random.random() < 0.6:
+                batch.append({'ev': 'T', 'sym': sym, 'x': 4, 'p': round(random.uniform(100, 500), 2), 's': random.randint(1, 500),
+                              'c': [12, 37], 't': ts + i, 'q': i, 'z': 3})
+            else:
+                batch.append({'ev': 'Q', 'sym': sym, 'bx': 4, 'bp': 100.0, 'bs': 2, 'ax': 7, 'ap': 100.05, 'as': 3,
+                              'c': 1, 'i': [604], 't': ts + i, 'q': i, 'z': 3})
+        yield int(i * 1e9 / frames_per_sec), json.dumps(batch)
+
+
+async def consume(ring, seen):
+    async for batch in ring.batches(max_items=4096):
+        seen.append(len(batch))
+
+
+async def main():
+    path = str(Path(tempfile.mkdtemp()) / 'burst.feed.gz')
+    write_frames(path, synthetic_frames())
+    total = sum(len(json.loads(frame)) for _, frame in read_frames(path))
+
+    for mode, speed in (('direct', None), ('server', 20)):
+        ring = MessageRing()
+        seen = []
+        consumer = asyncio.create_task(consume(ring, seen))
+        replayer = FeedReplayer(path, market='stocks')
+        if mode == 'direct':
+            report = await replayer.run(handle_stock_msg, speed=speed, args=(ring,), queue=ring)
+        else:
+            report = await replayer.run_via_server(handle_stock_msg, speed=speed, args=(ring,), queue=ring)
+        await asyncio.sleep(0.05)
+        consumer.cancel()
+        print(mode, json.dumps(report, indent=2, default=str))
+        print(ring.stats())
+        assert report['messages'] == total, (report['messages'], total)
+        assert report['errors'] == 0
+        assert sum(seen) == total
+    print('ok')
+
+
+asyncio.run(main())
@@ -0,0 +1,108 @@
+"""
+FiscalDataClient / Treasury offline: a local stub of the Fiscal Data API
+(paged, honours sort and ``record_date:gt`` filters) checks concurrent
+pagination, that repeat reads inside ``refresh_every`` make no requests,
+that a refresh only pulls rows past the cached record_date, and that the
+on-disk cache survives a new client. Also checks the NY Fed fetch helper
+collapses repeat calls. No network needed.
+"""
+import sys
+import asyncio
+import tempfile
+from datetime import date, timedelta
+from pathlib import Path
+
+from aiohttp import web
+
+root = Path(__file__).resolve().parents[2]
+sys.path[0] = str(root)
+
+from fudstop4.apis.treasury.fiscaldata import FiscalDataClient, DatasetCache
+from fudstop4.apis.treasury.treasury_sdk import Treasury
+from fudstop4.apis.newyork_fed.newyork_fed_sdk import FedNewyork
+
+
+def debt_rows(days, start=date(2010, 1, 4)):
+    return [{'record_date': str(start + timedelta(days=i)), 'debt_held_public_amt': f'{1e13 + i * 1e9:.2f}',
+             'intragov_hold_amt': '4500000000000.00', 'tot_pub_debt_out_amt': f'{1.45e13 + i * 1e9:.2f}',
+             'src_line_nbr': '1', 'record_fiscal_year': str((start + timedelta(days=i)).year)} for i in range(days)]
+
+
+def stub_api(datasets, requests):
+    async def handler(request):
+        name = request.match_info['path']
+        requests.append((name, dict(request.query)))
+        rows = sorted(datasets[name], key=lambda r: r['record_date'], reverse=request.query.get('sort', '').startswith('-'))
+        for clause in filter(None, request.query.get('filter', '').split(',')):
+            field, op, value = clause.split(':', 2)
+            rows = [r for r in rows if r[field] > value] if op == 'gt' else rows
+        size, number = int(request.query['page[size]']), int(request.query['page[number]'])
+        pages = max(1, -(-len(rows) // size))
+        return web.json_response({'data': rows[(number - 1) * size:number * size],
+                                  'meta': {'count': len(rows[(number - 1) * size:number * size]), 'total-count': len(rows), 'total-pages': pages}})
+
+    async def fed(request):
+        requests.append(('nyfed', {}))
+        return web.json_response({'ambs': {'auctions': [{'operationDate': '2024-03-01', 'totalAcceptedOrigFace': 1000}]}})
+
+    app = web.Application()
+    app.router.add_get('/services/api/fiscal_service/{path:.*}', handler)
+    app.router.add_get('/api/ambs/all/results/details/last/10.json', fed)
+    return app
+
+
+async def main():
+    datasets = {'v2/accounting/od/debt_to_penny': debt_rows(5000)}
+    requests = []
+    runner = web.AppRunner(stub_api(datasets, requests))
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    base = f'http://127.0.0.1:{site._server.sockets[0].getsockname()[1]}'
+    api = f'{base}/services/api/fiscal_service/'
+    cache_dir = tempfile.mkdtemp()
+
+    fiscal = FiscalDataClient(cache=DatasetCache(cache_dir), base_url=api, page_size=1000)
+    treasury = Treasury()
+    treasury.fiscal = fiscal
+    debt = await treasury.debt_to_penny()
+    assert len(debt.as_dataframe) == 100 and debt.record_date[0] == datasets['v2/accounting/od/debt_to_penny'][-1]['record_date']
+    assert len(requests) == 5, requests                     # 5 pages, pages 2-5 concurrently
+
+    # ten concurrent callers inside refresh_every: zero requests
+    await asyncio.gather(*(treasury.debt_to_penny() for _ in range(10)))
+    assert len(requests) == 5
+
+    # upstream publishes 3 more days; once the refresh window lapses only those come down
+    datasets['v2/accounting/od/debt_to_penny'] += debt_rows(3, start=date(2010, 1, 4) + timedelta(days=5000))
+    fiscal.refresh_every = 0
+    requests.clear()
+    full = await fiscal.dataset('v2/accounting/od/debt_to_penny')
+    assert len(requests) == 1 and requests[0][1]['filter'].startswith('record_date:gt:'), requests
+    assert len(full) == 5003 and full['record_date'].iloc[0] > full['record_date'].iloc[3]
+    requests.clear()
+    await fiscal.dataset('v2/accounting/od/debt_to_penny')      # nothing new: one empty page
+    assert len(requests) == 1
+    print(fiscal.stats())
+
+    # a new process: the disk copy is picked up, no full download
+    fresh_client = FiscalDataClient(cache=DatasetCache(cache_dir), base_url=api)
+    requests.clear()
+    again = await fresh_client.dataset('v2/accounting/od/debt_to_penny')
+    assert len(again) == 5003 and requests == []
+
+    fed = FedNewyork()
+    fed.base_url = f'{base}/api/'
+    requests.clear()
+    results = await asyncio.gather(*(fed.agency_mbs_count() for _ in range(5)))
+    await fed.agency_mbs_count()
+    assert len(requests) == 1 and results[0].operationDate == ['2024-03-01']
+
+    await fiscal.close()
+    await fresh_client.close()
+    await fed.close_session()
+    await runner.cleanup()
+    print('ok')
+
+
+asyncio.run(main())
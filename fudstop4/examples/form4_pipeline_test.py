@@ -0,0 +1,122 @@
+"""
+Form4Pipeline offline: parses the recorded submissions in fixtures/form4,
+then runs a backfill against a local stub of the EDGAR archive (the
+recorded master.idx plus 60 synthetic filings) and checks no one-second
+window exceeds the 10 req/s cap, and that a rerun fetches nothing it has
+already loaded. No database or network needed.
+"""
+import sys
+import time
+import asyncio
+import tempfile
+from bisect import bisect_right
+from datetime import date
+from pathlib import Path
+
+from aiohttp import web
+
+root = Path(__file__).resolve().parents[2]
+sys.path[0] = str(root)
+
+from fudstop4.apis.sec.form4 import Form4Pipeline, Form4Index, Form4Loader, parse_form4, parse_master_index, _ddl
+
+FIXTURES = Path(__file__).parent / 'fixtures' / 'form4'
+SYNTHETIC = 60
+
+
+class CaptureLoader:
+    def __init__(self):
+        self.filings, self.transactions, self.batches = [], [], 0
+
+    async def load(self, filings, transactions):
+        self.batches += 1
+        self.filings.extend(filings)
+        self.transactions.extend(transactions)
+
+
+def check_parser():
+    raw = (FIXTURES / '0001000002-24-000011.txt').read_bytes()
+    filing, txns = parse_form4(raw, '0001000002-24-000011', date(2024, 3, 4))
+    assert (filing.ticker, filing.owner_name, filing.officer_title) == ('EXRB', 'Doe Jane', 'Chief Financial Officer')
+    assert filing.is_officer and not filing.is_director and filing.aff10b5one and filing.period == date(2024, 2, 29)
+    assert [t.kind for t in txns] == ['non_derivative', 'non_derivative', 'non_derivative_holding', 'derivative']
+    sale = txns[1]
+    assert (sale.code, sale.shares, sale.price, sale.acquired_disposed, sale.shares_after) == ('S', 6000.0, 187.4312, 'D', 78210.0)
+    assert txns[3].exercise_price is None and txns[3].underlying_shares == 12500.0
+
+    amended, txns = parse_form4((FIXTURES / '0001000004-24-000002.txt').read_bytes(), '0001000004-24-000002')
+    assert amended.document_type == '4/A' and amended.is_director and txns[0].shares == 2000.0
+
+    fund, txns = parse_form4((FIXTURES / '0001000006-24-000007.txt').read_bytes(), '0001000006-24-000007')
+    assert fund.owner_count == 2 and fund.owner_name == 'Capital Partners Fund LP'
+    assert fund.is_ten_pct and fund.is_director      # the second owner is a director
+    assert txns[1].kind == 'derivative_holding' and txns[1].expiration_date == date(2027, 6, 1)
+
+    started = time.perf_counter()
+    for _ in range(2000):
+        parse_form4(raw, 'x')
+    print(f'parse_form4: {(time.perf_counter() - started) / 2000 * 1e6:.0f} us/filing')
+    print(_ddl('form4_transactions', *Form4Loader.tables[1][1:]))
+
+
+def stub_archive(hits):
+    index = (FIXTURES / 'master.idx').read_text()
+    template = (FIXTURES / '0001000002-24-000011.txt').read_bytes()
+    index += ''.join(f'{2000000 + i}|SYNTHETIC {i} INC|4|2024-03-15|edgar/data/{2000000 + i}/0002000000-24-{i:06d}.txt\n'
+                     for i in range(SYNTHETIC))
+
+    async def archive(request):
+        hits.append(time.monotonic())
+        path = request.match_info['path']
+        if path.endswith('master.idx'):
+            return web.Response(text=index)
+        name = path.rsplit('/', 1)[-1]
+        if (FIXTURES / name).exists():
+            return web.Response(body=(FIXTURES / name).read_bytes())
+        if name.startswith('0002000000-'):
+            return web.Response(body=template)
+        return web.Response(status=404)
+
+    app = web.Application()
+    app.router.add_get('/Archives/{path:.*}', archive)
+    return app
+
+
+def busiest_second(hits):
+    return max(bisect_right(hits, t + 1.0 - 1e-6) - i for i, t in enumerate(hits))
+
+
+async def main():
+    check_parser()
+    entries = parse_master_index((FIXTURES / 'master.idx').read_text())
+    assert [e.accession for e in entries] == ['0001000002-24-000011', '0001000004-24-000002',
+                                              '0001000006-24-000007', '0001000008-24-000001']
+
+    hits = []
+    runner = web.AppRunner(stub_archive(hits))
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+
+    index = Form4Index(str(Path(tempfile.mkdtemp()) / 'form4_index.sqlite'))
+    loader = CaptureLoader()
+    pipeline = Form4Pipeline(loader=loader, index=index, base_url=f'http://127.0.0.1:{port}', batch_size=25)
+    first = await pipeline.backfill(2024, 1)
+    print(first)
+    assert first['loaded'] == SYNTHETIC + 3 and first['unparsed'] == 1 and first['failed'] == 0
+    assert len(index) == SYNTHETIC + 3 and loader.batches == 3
+    assert busiest_second(hits) <= 10, busiest_second(hits)
+    print(f'{len(hits)} requests, busiest second {busiest_second(hits)}, '
+          f'{len(loader.transactions)} transactions, {first["requests_per_sec"]} req/s')
+
+    hits.clear()
+    again = await Form4Pipeline(loader=loader, index=index, base_url=f'http://127.0.0.1:{port}').backfill(2024, 1)
+    print(again)
+    # only the index and the one filing that 404'd (never marked) are requested again
+    assert again['skipped'] == SYNTHETIC + 3 and again['loaded'] == 0 and len(hits) == 2
+    await runner.cleanup()
+    print('ok')
+
+
+asyncio.run(main())
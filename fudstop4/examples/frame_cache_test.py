@@ -0,0 +1,85 @@
+"""
+FrameCache on the in-memory backend: Arrow codec vs the old to_json
+round trip (size, time, dtypes), L1/L2 hits, coalesced misses, and
+stale-while-revalidate serving old data while one refresh runs.
+"""
+import io
+import time
+import asyncio
+
+import numpy as np
+import pandas as pd
+
+from fudstop4.apis.frame_cache import FrameCache, MemoryBackend, encode, decode
+
+
+def candles(n=800, seed=0):
+    rng = np.random.default_rng(seed)
+    close = 100 + rng.normal(size=n).cumsum()
+    return pd.DataFrame({
+        'ts': pd.date_range('2024-03-01 09:30', periods=n, freq='5min'),
+        'o': close + rng.normal(size=n) * 0.1, 'c': close, 'h': close + 0.5, 'l': close - 0.5,
+        'vwap': close, 'v': rng.integers(1000, 100000, n).astype('int64'), 'ticker': 'SPY',
+    })
+
+
+async def main():
+    df = candles()
+    started = time.perf_counter()
+    for _ in range(50):
+        blob = encode(df, 0, 0)
+        back = decode(blob)[0]
+    arrow = (time.perf_counter() - started) / 50
+    started = time.perf_counter()
+    for _ in range(50):
+        js = df.to_json(orient='split', date_format='iso')
+        legacy = pd.read_json(io.StringIO(js), orient='split')
+    as_json = (time.perf_counter() - started) / 50
+    print(f'arrow {len(blob)} bytes {arrow * 1000:.2f} ms | json {len(js)} bytes {as_json * 1000:.2f} ms')
+    pd.testing.assert_frame_equal(back, df)
+    print('json dtypes lost:', {c: str(t) for c, t in legacy.dtypes.items() if t != df[c].dtype})
+    assert decode(js)[0].shape == df.shape   # old entries still readable
+
+    backend = MemoryBackend()
+    cache = FrameCache(backend, l1_size=2, default_ttl=1, stale_ttl=5)
+    fetches = []
+
+    async def fetch():
+        fetches.append(time.perf_counter())
+        await asyncio.sleep(0.05)
+        return candles(seed=len(fetches))
+
+    results = await asyncio.gather(*(cache.get_or_fetch('candles:SPY:m5:800', fetch) for _ in range(20)))
+    assert len(fetches) == 1 and all(r.equals(results[0]) for r in results)
+    results[0]['c'] = 0.0    # callers get their own copies
+    assert (await cache.get('candles:SPY:m5:800'))['c'].ne(0).all()
+
+    for key in ('a', 'b'):
+        await cache.set(key, candles())      # evicts SPY from the 2-entry L1
+    again = await cache.get_or_fetch('candles:SPY:m5:800', fetch)
+    assert len(fetches) == 1 and cache.counts['l2_hits'] == 1
+
+    await cache.set('empty', pd.DataFrame())
+    assert await cache.get('empty') is None
+
+    await asyncio.sleep(1.1)                   # past the TTL, inside the stale window
+    stale = await asyncio.gather(*(cache.get_or_fetch('candles:SPY:m5:800', fetch) for _ in range(10)))
+    assert all(s.equals(again) for s in stale) and cache.counts['stale_served'] == 10
+    await asyncio.sleep(0.1)
+    assert len(fetches) == 2
+    fresh = await cache.get_or_fetch('candles:SPY:m5:800', fetch)
+    assert not fresh.equals(again)
+
+    # a pre-envelope JSON entry lives default_ttl, then gets refetched like anything else
+    await backend.set('legacy', js.encode(), ex=1)
+    assert (await cache.get_or_fetch('legacy', fetch)).shape == df.shape and len(fetches) == 2
+    await asyncio.sleep(1.1)
+    await cache.get_or_fetch('legacy', fetch)
+    await asyncio.sleep(0.1)
+    assert len(fetches) == 3
+    print(cache.stats())
+    await cache.close()
+    print('ok')
+
+
+asyncio.run(main())
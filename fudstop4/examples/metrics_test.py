@@ -0,0 +1,65 @@
+"""
+Metrics registry smoke test: runs fake fetches through sem_timed / timed,
+serves /metrics and /debug/profile on a random port and prints both.
+"""
+import sys
+import random
+import asyncio
+from pathlib import Path
+
+import aiohttp
+
+root = Path(__file__).resolve().parents[2]
+sys.path[0] = str(root)  # examples/polygonio would shadow the SDK package
+sys.path.append(str(root / 'fudstop4' / 'apis'))
+
+from fudstop4.apis.metrics import metrics, timed
+from fudstop4.apis.polygonio.polygon_options import sem_timed
+
+
+@timed()
+async def fetch_page(url: str):
+    await asyncio.sleep(random.uniform(0.001, 0.05))
+    if random.random() < 0.1:
+        raise ValueError('bad page')
+    metrics.observe_http(url, 200, random.uniform(0.001, 0.05), random.randint(1000, 50000))
+    return {'url': url}
+
+
+def busy(ms: float):
+    # something for the profiler to find on the loop thread
+    end = asyncio.get_running_loop().time() + ms / 1000
+    while asyncio.get_running_loop().time() < end:
+        sum(range(1000))
+
+
+async def main():
+    port = await metrics.serve(port=0)
+    semaphore = asyncio.Semaphore(8)
+    urls = [f'https://api.polygon.io/v3/snapshot/options/SPY?page={i}' for i in range(200)]
+    results = await asyncio.gather(*(sem_timed(fetch_page(url), semaphore, timeout=0.04) for url in urls))
+    errors = sum(1 for _, _, e in results if e is not None)
+    print(f'{len(results)} calls, {errors} errors')
+    print(metrics.stats().to_string())
+    print(metrics.http_stats().to_string())
+
+    async with aiohttp.ClientSession() as session:
+        async with session.get(f'http://127.0.0.1:{port}/metrics') as r:
+            text = await r.text()
+            print('\n'.join(line for line in text.splitlines() if 'bucket' not in line))
+        profile = asyncio.create_task(session.get(f'http://127.0.0.1:{port}/debug/profile?seconds=0.5'))
+        for _ in range(40):
+            busy(10)
+            await asyncio.sleep(0.001)
+        async with await profile as r:
+            print('\n'.join((await r.text()).splitlines()[:8]))
+    await metrics.stop()
+
+    assert metrics.latency[('fetch_page', 'exec')].count == len(urls)
+    assert metrics.latency[('fetch_page', 'wait')].count == len(urls)
+    assert metrics.inflight[('fetch_page', 'exec')] == 0
+    assert 'fudstop_call_seconds_bucket{fn="fetch_page",phase="exec",le="+Inf"} 200' in text
+    print('ok')
+
+
+asyncio.run(main())
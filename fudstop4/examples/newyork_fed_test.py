@@ -1,9 +1,18 @@
+import asyncio
+
 from apis.newyork_fed.newyork_fed_sdk import FedNewyork
 
 
 fed = FedNewyork()
 
 
-agency_mbs = fed.agency_mbs_count()
+async def main():
+    try:
+        agency_mbs = await fed.agency_mbs_count()
+
+        print(agency_mbs.operationDate, agency_mbs.totalAcceptedOrigFace)
+    finally:
+        await fed.close_session()
+
 
-print(agency_mbs.operationDate, agency_mbs.totalAcceptedOrigFace)
\ No newline at end of file
+asyncio.run(main())
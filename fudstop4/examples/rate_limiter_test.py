@@ -0,0 +1,72 @@
+"""
+Adaptive limiter against a local stub server that answers 429 (with
+Retry-After) whenever it sees more than SERVER_RPS requests in a second.
+Checks that the rate backs off, throttled requests still complete, and that
+LIVE requests queued behind a BACKFILL burst are served first.
+"""
+import time
+import asyncio
+from collections import deque
+
+import aiohttp
+from aiohttp import web
+
+from fudstop4.apis.rate_limiter import RateLimiter, LIVE, BACKFILL
+import fudstop4.apis.rate_limiter as limiter_module
+
+SERVER_RPS = 20
+recent = deque()
+served = []
+
+
+async def handler(request):
+    now = time.monotonic()
+    while recent and now - recent[0] > 1.0:
+        recent.popleft()
+    if len(recent) >= SERVER_RPS:
+        return web.Response(status=429, headers={'Retry-After': '0.2'})
+    recent.append(now)
+    served.append(request.query.get('kind'))
+    return web.json_response({'ok': True})
+
+
+async def main():
+    app = web.Application()
+    app.router.add_get('/data', handler)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    url = f'http://127.0.0.1:{port}/data'
+
+    # start well above what the server allows
+    limiter = RateLimiter(host_rates={'127.0.0.1': (100, 200)})
+    limiter_module.rate_limiter = limiter
+
+    async with aiohttp.ClientSession() as session:
+        started = time.monotonic()
+        backfill = [asyncio.ensure_future(limiter_module.limited_get_json(session, f'{url}?kind=backfill', priority=BACKFILL, retries=10))
+                    for _ in range(80)]
+        await asyncio.sleep(0.5)
+        live = [asyncio.ensure_future(limiter_module.limited_get_json(session, f'{url}?kind=live', priority=LIVE, retries=10))
+                for _ in range(5)]
+        await asyncio.sleep(0)
+        print(limiter.stats().to_string(index=False))
+        results = await asyncio.gather(*backfill, *live)
+        elapsed = time.monotonic() - started
+
+    await runner.cleanup()
+    stats = limiter.stats().iloc[0]
+    print(limiter.stats().to_string(index=False))
+    print(f'{len(results)} requests in {elapsed:.2f}s')
+
+    assert all(r == {'ok': True} for r in results)
+    assert stats['throttled'] > 0
+    assert stats['rate'] < 100, 'rate should have backed off'
+    last_live = max(i for i, kind in enumerate(served) if kind == 'live')
+    assert last_live < len(served) - 20, 'live requests should jump the backfill queue'
+    print('ok')
+
+
+asyncio.run(main())
@@ -0,0 +1,73 @@
+"""
+Singleflight against a local stub server: 50 identical concurrent requests
+should reach the server once, errors should reach every waiter, and the
+micro-TTL should answer repeats until it lapses.
+"""
+import asyncio
+
+import aiohttp
+from aiohttp import web
+
+from fudstop4.apis.singleflight import SingleFlight, coalesced
+
+hits = {'/quote': 0, '/boom': 0}
+
+
+async def quote(request):
+    hits['/quote'] += 1
+    await asyncio.sleep(0.05)
+    return web.json_response({'ticker': request.query.get('ticker'), 'price': 101.5})
+
+
+async def boom(request):
+    hits['/boom'] += 1
+    await asyncio.sleep(0.05)
+    return web.Response(status=500)
+
+
+flight = SingleFlight(ttl=0.2)
+
+
+@coalesced('url', flight=flight)
+async def fetch_endpoint(session, url):
+    async with session.get(url) as resp:
+        resp.raise_for_status()
+        return await resp.json()
+
+
+async def main():
+    app = web.Application()
+    app.router.add_get('/quote', quote)
+    app.router.add_get('/boom', boom)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    base = f'http://127.0.0.1:{port}'
+
+    async with aiohttp.ClientSession() as session:
+        results = await asyncio.gather(*(fetch_endpoint(session, f'{base}/quote?ticker=SPY') for _ in range(50)))
+        assert all(r == {'ticker': 'SPY', 'price': 101.5} for r in results)
+        assert hits['/quote'] == 1, hits
+
+        await fetch_endpoint(session, f'{base}/quote?ticker=SPY')  # inside the micro-TTL
+        assert hits['/quote'] == 1, hits
+        await asyncio.sleep(0.25)
+        await fetch_endpoint(session, f'{base}/quote?ticker=SPY')  # TTL lapsed
+        assert hits['/quote'] == 2, hits
+
+        await asyncio.gather(fetch_endpoint(session, f'{base}/quote?ticker=QQQ'),
+                             fetch_endpoint(session, f'{base}/quote?ticker=IWM'))
+        assert hits['/quote'] == 4, hits
+
+        errors = await asyncio.gather(*(fetch_endpoint(session, f'{base}/boom') for _ in range(10)), return_exceptions=True)
+        assert all(isinstance(e, aiohttp.ClientResponseError) for e in errors)
+        assert hits['/boom'] == 1, hits
+
+    await runner.cleanup()
+    print(flight.stats())
+    print('ok')
+
+
+asyncio.run(main())
@@ -0,0 +1,121 @@
+"""
+StockSera offline: a local stub of the Stocksera API (token auth, dated
+short volume / FTD series, per-ticker snapshots) checks that a fan-out over
+many tickers stays inside the client's concurrency bound on one session,
+that frames come back typed, and that repeat short-volume pulls only
+request the days the local cache doesn't have. No network needed.
+"""
+import sys
+import asyncio
+import tempfile
+from datetime import date
+from pathlib import Path
+
+import pandas as pd
+from aiohttp import web
+
+root = Path(__file__).resolve().parents[2]
+sys.path[0] = str(root)
+
+from fudstop4.apis.stocksera_.stocksera_client import StockseraClient
+from fudstop4.apis.stocksera_.stocksera_ import StockSera
+from fudstop4.apis.treasury.fiscaldata import DatasetCache
+
+KEY = 'test-key'
+TICKERS = [f'T{i:02d}' for i in range(20)]
+
+
+def business_days(start, end):
+    return [d.date() for d in pd.bdate_range(start, end)]
+
+
+def stub_api(state):
+    async def guarded(request, build):
+        if request.headers.get('Authorization') != f'Token {KEY}':
+            return web.json_response({'Error': 'Invalid API Key / Authorization Headers is empty'})
+        state['requests'].append((request.path, dict(request.query)))
+        state['active'] += 1
+        state['peak'] = max(state['peak'], state['active'])
+        await asyncio.sleep(0.05)
+        state['active'] -= 1
+        return web.json_response(build(request))
+
+    def short_volume(request):
+        start = date.fromisoformat(request.query['date_from'])
+        end = min(date.fromisoformat(request.query['date_to']), state['published'])
+        return [{'Date': str(d), 'Short Vol': 1000 + d.day, 'Short Exempt Vol': 10, 'Total Vol': 2000, '% Shorted': 51.2}
+                for d in reversed(business_days(start, end))]
+
+    def borrowed(request):
+        return [{'ticker': request.match_info['ticker'], 'fee': '1.25', 'available': '350000', 'date_updated': '2024-03-01 09:30:00'}]
+
+    app = web.Application()
+    app.router.add_get('/api/short_volume/{ticker}/', lambda r: guarded(r, short_volume))
+    app.router.add_get('/api/borrowed_shares/{ticker}', lambda r: guarded(r, borrowed))
+    return app
+
+
+async def main():
+    state = {'requests': [], 'active': 0, 'peak': 0, 'published': date(2024, 3, 1)}
+    runner = web.AppRunner(stub_api(state))
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    base = f'http://127.0.0.1:{site._server.sockets[0].getsockname()[1]}/api/'
+    cache = DatasetCache(tempfile.mkdtemp())
+    ss = StockSera(StockseraClient(KEY, base_url=base, concurrency=4, cache=cache))
+
+    # fan-out: 20 tickers, never more than 4 in flight, typed columns
+    borrowed = await ss.borrowed_shares(TICKERS)
+    assert len(borrowed) == 20 and state['peak'] <= 4, state['peak']
+    assert borrowed['fee'].dtype == 'float64' and str(borrowed['available'].dtype) == 'Int64'
+    assert pd.api.types.is_datetime64_any_dtype(borrowed['date_updated'])
+
+    # first short-volume pull: one request per ticker
+    state['requests'].clear()
+    sv = await ss.short_volume(TICKERS[:5], date_from='2024-02-01', date_to='2024-03-01')
+    assert len(state['requests']) == 5 and len(sv) == 5 * len(business_days('2024-02-01', '2024-03-01'))
+    assert list(sv.columns[:5]) == ['date', 'short_vol', 'short_exempt_vol', 'total_vol', 'percent_shorted']
+    assert sv['percent_shorted'].dtype == 'float64'
+
+    # same window or a narrower one: served from the cache
+    state['requests'].clear()
+    narrow = await ss.short_volume(TICKERS[:5], date_from='2024-02-15', date_to='2024-02-29')
+    assert state['requests'] == [] and narrow['date'].min() >= pd.Timestamp('2024-02-15')
+
+    # reaching further back: only the missing older span is requested
+    older = await ss.short_volume('T00', date_from='2024-01-02', date_to='2024-03-01')
+    assert len(state['requests']) == 1 and state['requests'][0][1] == {'date_from': '2024-01-02', 'date_to': '2024-01-31'}
+    assert len(older) == len(business_days('2024-01-02', '2024-03-01')) and older['date'].is_monotonic_decreasing
+
+    # a later date_to, well inside refresh_every: the days past the covered span are still fetched
+    state['published'] = date(2024, 3, 8)
+    state['requests'].clear()
+    newer = await ss.short_volume('T00', date_from='2024-01-02', date_to='2024-03-08')
+    assert state['requests'] == [('/api/short_volume/T00/', {'date_from': '2024-03-02', 'date_to': '2024-03-08'})], state['requests']
+    assert newer['date'].max() == pd.Timestamp('2024-03-08')
+
+    # days asked for before they were published: re-checked only once refresh_every lapses
+    await ss.short_volume('T01', date_from='2024-02-01', date_to='2024-03-12')
+    state['published'] = date(2024, 3, 12)
+    state['requests'].clear()
+    stale = await ss.short_volume('T01', date_from='2024-02-01', date_to='2024-03-12')
+    assert state['requests'] == [] and stale['date'].max() == pd.Timestamp('2024-03-08')
+    ss.client.refresh_every = 0
+    fresh = await ss.short_volume('T01', date_from='2024-02-01', date_to='2024-03-12')
+    assert state['requests'] == [('/api/short_volume/T01/', {'date_from': '2024-03-09', 'date_to': '2024-03-12'})], state['requests']
+    assert fresh['date'].max() == pd.Timestamp('2024-03-12')
+
+    # a bad key: each ticker fails on its own, the call still returns a frame
+    bad = StockSera(StockseraClient('wrong', base_url=base, cache=DatasetCache(tempfile.mkdtemp())))
+    assert (await bad.borrowed_shares(['AAPL', 'MSFT'])).empty and bad.client.counts['failed'] == 2
+
+    print(sv.head(3).to_string())
+    print(ss.client.stats())
+    await ss.close()
+    await bad.close()
+    await runner.cleanup()
+    print('ok')
+
+
+asyncio.run(main())
@@ -0,0 +1,126 @@
+"""
+YfOffload / YfSDK against a stubbed yfinance backend whose calls block
+like the real thing (time.sleep). Checks the event loop keeps ticking
+while they run, the pool bound holds, one Ticker per symbol is reused,
+fundamentals are cached for the day, and concurrent candle requests
+become one download. No network or yfinance install needed.
+"""
+import sys
+import time
+import asyncio
+import threading
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+root = Path(__file__).resolve().parents[2]
+sys.path[0] = str(root)
+
+from fudstop4.apis.y_finance.yf_offload import YfOffload
+from fudstop4.apis.y_finance.yf_sdk import YfSDK
+
+LATENCY = 0.3
+
+
+class StubYFinance:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.active = self.peak = 0
+        self.calls, self.tickers, self.downloads = [], [], []
+
+    def blocking(self, what):
+        with self.lock:
+            self.calls.append(what)
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        time.sleep(LATENCY)
+        with self.lock:
+            self.active -= 1
+
+    def Ticker(self, symbol):
+        self.tickers.append(symbol)
+        stub = self
+
+        class Ticker:
+            def get_balance_sheet(self, freq='quarterly', pretty=False, as_dict=False):
+                stub.blocking(('balance_sheet', symbol))
+                return pd.DataFrame({'2024-03-31': [1e9, 5e8], '2023-12-31': [9e8, 4e8]}, index=['TotalAssets', 'TotalDebt'])
+
+            def get_fast_info(self):
+                stub.blocking(('fast_info', symbol))
+                return {'lastPrice': 101.5, 'marketCap': 2e12}
+
+            def get_dividends(self):
+                stub.blocking(('dividends', symbol))
+                return pd.Series([0.24, 0.25], index=pd.to_datetime(['2024-02-09', '2024-05-10']), name='Dividends')
+
+            @property
+            def calendar(self):
+                stub.blocking(('calendar', symbol))
+                return {'Earnings Date': ['2024-05-02'], 'Earnings Average': [1.5]}
+
+        return Ticker()
+
+    def download(self, symbols, group_by='column', progress=True, auto_adjust=True, period='max', interval='1d'):
+        self.downloads.append(list(symbols))
+        self.blocking(('download', tuple(symbols)))
+        index = pd.date_range('2024-01-02', periods=5, freq='B', name='Date')
+        fields = ['Open', 'High', 'Low', 'Close', 'Adj Close', 'Volume']
+        columns = pd.MultiIndex.from_product([symbols, fields])
+        return pd.DataFrame(np.arange(len(index) * len(columns), dtype=float).reshape(len(index), -1), index=index, columns=columns)
+
+
+async def heartbeat(gaps, stop):
+    last = time.perf_counter()
+    while not stop.is_set():
+        await asyncio.sleep(0.01)
+        now = time.perf_counter()
+        gaps.append(now - last)
+        last = now
+
+
+async def main():
+    stub = StubYFinance()
+    sdk = YfSDK()
+    sdk.yf = YfOffload(backend=stub, max_workers=4, batch_window=0.02)
+
+    gaps, stop = [], asyncio.Event()
+    beat = asyncio.create_task(heartbeat(gaps, stop))
+    symbols = ['AAPL', 'MSFT', 'NVDA', 'AMD', 'TSLA', 'META', 'AMZN', 'GOOG']
+    started = time.perf_counter()
+    sheets = await asyncio.gather(*(sdk.balance_sheet(s) for s in symbols))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await beat
+    print(f'8 balance sheets in {elapsed:.2f}s on 4 workers, longest loop stall {max(gaps) * 1000:.0f} ms')
+    assert max(gaps) < 0.1, max(gaps)
+    assert stub.peak == 4 and elapsed < LATENCY * 3
+    assert all(df['ticker'].iloc[0] == s for df, s in zip(sheets, symbols))
+
+    # same day: served from cache, and the caller's mutation didn't leak into it
+    sheets[0]['totalassets'] = -1
+    calls = len(stub.calls)
+    again = await sdk.balance_sheet('AAPL')
+    assert len(stub.calls) == calls and again['totalassets'].iloc[0] == 1e9
+
+    # one Ticker per symbol, whatever is asked of it
+    await asyncio.gather(sdk.fast_info('AAPL'), sdk.dividends('AAPL'), sdk.calendar('AAPL'))
+    assert stub.tickers.count('AAPL') == 1
+    dividends = await sdk.dividends('AAPL')
+    dividends[:] = 0
+    assert (await sdk.dividends('AAPL')).iloc[0] == 0.24
+
+    # candles: every concurrent request rides one download
+    started = time.perf_counter()
+    wide, spy = await asyncio.gather(sdk.get_all_candles('QQQ,IWM, DIA'), sdk.yf.candles('SPY', period='max', interval='1d'))
+    assert len(stub.downloads) == 1 and set(stub.downloads[0]) == {'QQQ', 'IWM', 'DIA', 'SPY'}, stub.downloads
+    assert set(wide['ticker']) == {'QQQ', 'IWM', 'DIA'} and len(wide) == 15 and list(spy.columns)[:2] == ['Open', 'High']
+    print(f'4 symbols, 1 download, {time.perf_counter() - started:.2f}s')
+    print(wide.head(3).to_string())
+    print(sdk.yf.stats())
+    sdk.yf.shutdown()
+    print('ok')
+
+
+asyncio.run(main())
@@ -3,6 +3,7 @@ from typing import List, Any
 import subprocess
 from plotly.subplots import make_subplots
 from fudstop4.apis.polygonio.polygon_options import PolygonOptions
+from fudstop4.apis.polygonio.snapshot_service import snapshot_service
 db = PolygonOptions(database='fudstop3')
 poly = PolygonOptions(user='chuck', database='charlie', host='localhost', port=5432, password='fud')
 from kaleido.scopes.plotly import PlotlyScope
@@ -198,12 +199,9 @@ async def plot_oi_volume(all_options_df):
 
 
 async def plot_calls_and_puts(ticker, underlying_price):
-    call_all_options_df = await poly.get_option_chain_all(ticker, contract_type='call')
-    put_all_options_df = await poly.get_option_chain_all(ticker, contract_type='put')
-
-
-    call_data = call_all_options_df.df
-    put_data = put_all_options_df.df
+    chain = await snapshot_service.snapshot(ticker, max_age=30)
+    call_data = chain.df[chain.df['call_put'] == 'call']
+    put_data = chain.df[chain.df['call_put'] == 'put']
 
     # Calculate the underlying price (assuming it's a constant for all rows, hence taking the first row's value)
   
@@ -289,7 +287,7 @@ async def plot_calls_and_puts(ticker, underlying_price):
 
 async def volume_histogram(ticker):
     # Fetch data asynchronously
-    options_df = await poly.get_option_chain_all(ticker)
+    options_df = await snapshot_service.snapshot(ticker, max_age=30)
     options_df = options_df.df
     
     # Check if the DataFrame is empty
@@ -326,7 +324,7 @@ async def volume_histogram(ticker):
 
 async def plot_iv_surface(ticker):
     # Filter data for the specific ticker (optional)
-    df = await poly.get_option_chain_all(ticker)
+    df = await snapshot_service.snapshot(ticker, max_age=30)
     df = df.df
 
     filtered_df = df[df['ticker'] == ticker]
@@ -394,7 +392,7 @@ async def plot_iv_surface(ticker):
 
 # Function to plot consolidated gamma exposure across all strikes with custom styling and additional title information
 async def plot_greek_exposure(ticker: str, greek:str):
-    df = await poly.get_option_chain_all(ticker)
+    df = await snapshot_service.snapshot(ticker, max_age=30)
     df = df.df
     
     # Filter data for the specific ticker (optional)
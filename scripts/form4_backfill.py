@@ -0,0 +1,27 @@
+import sys
+import asyncio
+from datetime import date
+
+from fudstop4.apis.sec.form4 import Form4Pipeline
+
+# python scripts/form4_backfill.py 2024 1      -> a whole quarter
+# python scripts/form4_backfill.py 2024-03-28  -> one day's filings
+
+
+async def main(args):
+    pipeline = Form4Pipeline()
+    try:
+        if len(args) == 2:
+            stats = await pipeline.backfill(int(args[0]), int(args[1]))
+        else:
+            stats = await pipeline.ingest_day(date.fromisoformat(args[0]) if args else date.today())
+    finally:
+        await pipeline.loader.close()
+        pipeline.index.close()
+    print(f"✅ Loaded {stats['loaded']} Form 4 filings ({stats['transactions']} transactions), "
+          f"skipped {stats['skipped']} already ingested, {stats['failed']} failed - {stats['requests_per_sec']} req/s")
+    for accession, error in pipeline.failures[:20]:
+        print(f"❌ {accession}: {error}")
+
+
+asyncio.run(main(sys.argv[1:]))